@@ -0,0 +1,91 @@
+"""
+Microbenchmark of the conversion of batches, predictions and losses to numpy
+by a :class:`StructuredConverter` (i.e. by its flat conversion plan) compared
+to the recursive conversion of :func:`recursively_convert_elements`.
+
+Each structure is converted once before measuring, to learn its plan. The
+structures are:
+
+* ``flat``: a dict of arrays as yielded by the :class:`DataManager`
+* ``nested``: predictions with nested dicts, lists and tuples (e.g. of a
+  detection network with outputs of several levels)
+* ``scalars``: a dict of zero-dimensional losses, whose shapes are
+  corrected
+
+The numpy structures are converted by :func:`convert_to_numpy_identity`;
+if torch is installed, the same structures are converted from
+:class:`torch.Tensor` by the torch backend's ``convert_to_numpy``, which
+previously traversed each structure twice.
+
+Example
+-------
+    python benchmarks/batch_conversion.py --repeats 10000
+"""
+import argparse
+import json
+import timeit
+
+import numpy as np
+
+from delira.training.utils import _identity_converter
+
+
+def _structures(array_fn):
+    def _level():
+        return [(array_fn((8, 4)), array_fn((8,))) for _ in range(4)]
+
+    return {
+        "flat": {"data": array_fn((8, 1, 28, 28)), "label": array_fn((8,)),
+                 "weight": array_fn((8,))},
+        "nested": {"pred": {"level_%d" % idx: _level() for idx in range(3)},
+                   "features": [array_fn((8, 16)) for _ in range(5)],
+                   "names": ["sample_%d" % idx for idx in range(8)]},
+        "scalars": {"loss_%d" % idx: array_fn(()) for idx in range(6)},
+    }
+
+
+def _bench(converter, structures, repeats):
+    results = {}
+    for name, structure in structures.items():
+        converter(**structure)
+        planned = min(timeit.repeat(lambda: converter(**structure),
+                                    number=repeats, repeat=3)) / repeats
+        recursive = min(timeit.repeat(
+            lambda: converter.convert_recursively(**structure),
+            number=repeats, repeat=3)) / repeats
+
+        results[name] = {"planned_us": planned * 1e6,
+                         "recursive_us": recursive * 1e6,
+                         "speedup": recursive / planned}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=5000)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    results = {"config": vars(args),
+               "numpy": _bench(_identity_converter,
+                               _structures(np.zeros), args.repeats)}
+
+    try:
+        import torch
+    except ImportError:
+        pass
+    else:
+        from delira.training.backends.torch.utils import _converter
+        results["torch"] = _bench(_converter, _structures(torch.zeros),
+                                  args.repeats)
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Time per batch to assemble the batch and predictions for the metric
+calculation and to look up the metric inputs by
+:meth:`LookupConfig.nested_get`, compared between the previous
+:class:`LookupConfig` (including the garbage collection the predictor ran
+per batch to free it), an :class:`IndexedLookupConfig` and a
+:class:`BatchDict`.
+
+Example
+-------
+    python benchmarks/batch_lookup.py --keys 8 --lookups 6
+"""
+import argparse
+import gc
+import json
+import timeit
+
+import numpy as np
+
+from delira.utils.config import BatchDict, IndexedLookupConfig, LookupConfig
+
+
+def _lookup_config(data_dict, preds, keys):
+    batch = LookupConfig(**data_dict, **preds)
+    gc.collect()
+    return [batch.nested_get(key) for key in keys]
+
+
+def _indexed_lookup_config(data_dict, preds, keys):
+    batch = IndexedLookupConfig(**data_dict, **preds)
+    return [batch.nested_get(key) for key in keys]
+
+
+def _batch_dict(data_dict, preds, keys):
+    batch = BatchDict(**data_dict, **preds)
+    return [batch.nested_get(key) for key in keys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--keys", type=int, default=8,
+                        help="number of entries of batch and predictions")
+    parser.add_argument("--lookups", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    data_dict = {"data": np.zeros((8, 1, 28, 28)), "label": np.zeros(8)}
+    data_dict.update({"extra_%d" % idx: np.zeros(8)
+                      for idx in range(args.keys - 2)})
+    preds = {"pred": np.zeros((8, 10)),
+             "aux": {"level_%d" % idx: np.zeros(8)
+                     for idx in range(args.keys - 1)}}
+
+    keys = (["pred", "label"] + ["level_%d" % idx
+                                 for idx in range(args.keys - 1)]
+            )[:args.lookups]
+
+    results = {"config": vars(args)}
+    for name, fn in (("lookup_config", _lookup_config),
+                     ("indexed_lookup_config", _indexed_lookup_config),
+                     ("batch_dict", _batch_dict)):
+        results[name + "_us"] = min(timeit.repeat(
+            lambda: fn(data_dict, preds, keys), number=args.repeats,
+            repeat=3)) / args.repeats * 1e6
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
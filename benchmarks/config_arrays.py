@@ -0,0 +1,88 @@
+"""
+Time to dump and load a :class:`Config` carrying arrays (class weights,
+normalization statistics and an anchor grid) and the size of the written
+files. The arrays are stored as nested lists inside the yaml file, either
+by the pure python yaml implementation (as before) or by the C-accelerated
+one (if pyyaml was built with libyaml), or in a binary
+:class:`ArraySidecar` (compressed ``.npz`` archive or raw ``.npy`` files,
+which are memory mapped on loading).
+
+Example
+-------
+    python benchmarks/config_arrays.py --anchors 64 --repeats 3
+"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+import numpy as np
+import yaml
+
+from delira.utils.config import Config, _YAML_DUMPER
+
+
+def _dir_size_mb(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, _file))
+                    for _file in files)
+    return size / 1024. ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--classes", type=int, default=1000)
+    parser.add_argument("--anchors", type=int, default=64,
+                        help="size of the (square) anchor grid")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    config = Config()
+    config["model"] = {
+        "class_weights": rng.rand(args.classes),
+        "anchors": rng.rand(args.anchors, args.anchors, 9, 4).astype(
+            np.float32),
+        "num_classes": args.classes}
+    config["data"] = {"mean": rng.rand(3), "std": rng.rand(3),
+                      "path": "/data/train"}
+
+    modes = {
+        "inline_python": ({"formatter": yaml.dump},
+                          {"formatter": yaml.load,
+                           "Loader": getattr(yaml, "FullLoader",
+                                             yaml.Loader)}),
+        "npz": ({"array_format": "npz"}, {}),
+        "npy": ({"array_format": "npy"}, {"mmap_mode": "r"}),
+    }
+    if _YAML_DUMPER is not yaml.Dumper:
+        modes["inline_c"] = ({}, {})
+
+    results = {"config": vars(args)}
+    for name, (dump_kwargs, load_kwargs) in modes.items():
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "parameters")
+
+        dump_time = min(timeit.repeat(
+            lambda: config.dump(path, **dump_kwargs), number=1,
+            repeat=args.repeats))
+        load_time = min(timeit.repeat(
+            lambda: Config.create_from_file(path, **load_kwargs), number=1,
+            repeat=args.repeats))
+
+        results[name] = {"dump_s": dump_time, "load_s": load_time,
+                         "size_mb": _dir_size_mb(tmpdir)}
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
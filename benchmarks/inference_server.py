@@ -0,0 +1,105 @@
+"""
+Offline load generator comparing per-request prediction with the
+micro-batching :class:`delira.training.InferenceServer`.
+
+A numpy-only dense network is used as model, so the benchmark runs without
+any backend, network access or GPU. Each simulated client sends
+``--requests`` requests of batch size 1 in a closed loop.
+
+Example
+-------
+    python benchmarks/inference_server.py --clients 64 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from delira.training import Predictor, InferenceServer
+
+
+class NumpyMLP(object):
+    def __init__(self, n_features=256, n_hidden=1024, n_outputs=10, seed=0):
+        rng = np.random.RandomState(seed)
+        self.w1 = rng.randn(n_features, n_hidden).astype(np.float32)
+        self.w2 = rng.randn(n_hidden, n_outputs).astype(np.float32)
+
+    def __call__(self, x):
+        return {"pred": np.maximum(x.dot(self.w1), 0).dot(self.w2)}
+
+
+def bench_sequential(predictor, inputs):
+    start = time.perf_counter()
+    latencies = []
+    for _x in inputs:
+        _start = time.perf_counter()
+        predictor.predict({"data": _x})
+        latencies.append(time.perf_counter() - _start)
+
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000.
+    return {"requests_per_s": len(inputs) / elapsed,
+            "latency_p50_ms": float(np.percentile(latencies, 50)),
+            "latency_p95_ms": float(np.percentile(latencies, 95))}
+
+
+def bench_server(predictor, inputs, n_clients, max_batch_size,
+                 max_wait_time):
+    server = InferenceServer(predictor, max_batch_size=max_batch_size,
+                             max_wait_time=max_wait_time)
+
+    async def _client(client_inputs):
+        for _x in client_inputs:
+            await server.predict({"data": _x})
+
+    async def _run():
+        await server.start()
+        await asyncio.gather(*[_client(inputs[idx::n_clients])
+                               for idx in range(n_clients)])
+        summary = server.stats.summary()
+        await server.stop()
+        return summary
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_run())
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50,
+                        help="requests per client")
+    parser.add_argument("--features", type=int, default=256)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    predictor = Predictor(NumpyMLP(args.features), key_mapping={"x": "data"})
+    rng = np.random.RandomState(1)
+    inputs = [rng.rand(1, args.features).astype(np.float32)
+              for _ in range(args.clients * args.requests)]
+
+    results = {
+        "config": vars(args),
+        "sequential": bench_sequential(predictor, inputs),
+        "micro_batching": bench_server(predictor, inputs, args.clients,
+                                       args.max_batch_size,
+                                       args.max_wait_ms / 1000.)
+    }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
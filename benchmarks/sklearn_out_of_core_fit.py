@@ -0,0 +1,114 @@
+"""
+Peak memory and time of assembling the whole training set for estimators
+without ``partial_fit``: the previous full-dataset batch of the
+:class:`DataManager` compared to :func:`assemble_data` with in-memory and
+memory mapped arrays.
+
+The samples are generated on access from their index, so that the dataset
+itself does not occupy memory. Each mode runs in a separate (spawned)
+process; ``peak_rss_mb`` is the increase of the peak resident memory over
+the process' baseline after creating the dataset and includes fitting a
+:class:`sklearn.linear_model.Ridge` on the assembled data. ``data_mb`` is
+the size of the design matrix for reference.
+
+Example
+-------
+    python benchmarks/sklearn_out_of_core_fit.py --samples 200000 \
+        --features 256
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.linear_model import Ridge
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.training.backends.sklearn.utils import assemble_data
+
+
+class GeneratedDataset(AbstractDataset):
+    def __init__(self, length, n_features):
+        super().__init__(None, None)
+        self.length = length
+        self.n_features = n_features
+
+    def __getitem__(self, index):
+        rng = np.random.RandomState(index)
+        data = rng.randn(self.n_features).astype(np.float32)
+        return {"data": data, "label": np.array([data.sum()])}
+
+    def get_sample_from_index(self, index):
+        return self.__getitem__(index)
+
+    def __len__(self):
+        return self.length
+
+
+def _max_rss_mb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return max_rss / (1024. ** 2 if sys.platform == "darwin" else 1024.)
+
+
+def _bench_in_process(mode, args, queue):
+    dmgr = DataManager(GeneratedDataset(args.samples, args.features),
+                       args.chunk_size, 0, None)
+    baseline = _max_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "full_batch":
+        full_dmgr = DataManager(dmgr.dataset, args.samples, 0, None)
+        batch = next(iter(full_dmgr.get_batchgen()))
+    else:
+        batch = assemble_data(
+            dmgr, args.chunk_size,
+            tempfile.mkdtemp() if mode == "memmap" else None)
+    assemble_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Ridge().fit(batch["data"].reshape(len(batch["data"]), -1),
+                batch["label"].ravel())
+    fit_time = time.perf_counter() - start
+
+    queue.put({"assemble_s": assemble_time, "fit_s": fit_time,
+               "peak_rss_mb": _max_rss_mb() - baseline})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--features", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--modes", nargs="+",
+                        default=["full_batch", "assembled", "memmap"],
+                        choices=["full_batch", "assembled", "memmap"])
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+
+    results = {"config": vars(args),
+               "data_mb": args.samples * args.features * 4 / 1024. ** 2}
+    for mode in args.modes:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_bench_in_process,
+                              args=(mode, args, queue))
+        process.start()
+        results[mode] = queue.get()
+        process.join()
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Fit and prediction time of a one-vs-rest classifier trained by the
+:class:`SklearnEstimatorTrainer` with a single job compared to all jobs of
+its core budget (``n_jobs=-1``) and chunked parallel prediction.
+
+The binary estimators of the :class:`OneVsRestClassifier` are fitted in
+parallel; the wrapped :class:`RandomForestClassifier` keeps a single job to
+not oversubscribe the cores. ``predict_s`` is the time to predict the whole
+dataset in one call.
+
+Example
+-------
+    python benchmarks/sklearn_parallel_fit.py --samples 20000 --classes 8
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multiclass import OneVsRestClassifier
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.models import SklearnEstimator
+from delira.training import SklearnEstimatorTrainer
+
+
+class ClassificationDataset(AbstractDataset):
+    def __init__(self, length, n_features, n_classes, seed):
+        super().__init__(None, None)
+        rng = np.random.RandomState(seed)
+        self.data = rng.randn(length, n_features).astype(np.float32)
+        self.labels = (np.abs(self.data[:, :n_classes]).argmax(axis=1)
+                       ).reshape(-1, 1)
+
+    def __getitem__(self, index):
+        return {"data": self.data[index], "label": self.labels[index]}
+
+    def get_sample_from_index(self, index):
+        return self.__getitem__(index)
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def run(args, dataset, n_jobs, predict_chunk_size):
+    trainer = SklearnEstimatorTrainer(
+        SklearnEstimator(OneVsRestClassifier(RandomForestClassifier(
+            n_estimators=args.trees, random_state=args.seed))),
+        tempfile.mkdtemp(), key_mapping={"X": "X"},
+        logging_type="tensorboardx",
+        logging_kwargs={"logdir": tempfile.mkdtemp()},
+        n_jobs=n_jobs, predict_chunk_size=predict_chunk_size)
+
+    start = time.perf_counter()
+    model = trainer.train(1, DataManager(dataset, 1024, 0, None),
+                          verbose=False)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preds = model(dataset.data)["pred"]
+    predict_time = time.perf_counter() - start
+
+    return {"fit_s": fit_time, "predict_s": predict_time,
+            "n_jobs": model.n_jobs,
+            "accuracy": float((preds == dataset.labels.ravel()).mean())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--classes", type=int, default=8)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--predict-chunk-size", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    dataset = ClassificationDataset(args.samples, args.features,
+                                    args.classes, args.seed)
+
+    results = {"config": vars(args),
+               "single_job": run(args, dataset, 1, None),
+               "parallel": run(args, dataset, -1, args.predict_chunk_size)}
+
+    results["comparison"] = {
+        "fit_speedup": results["single_job"]["fit_s"] /
+        results["parallel"]["fit_s"],
+        "predict_speedup": results["single_job"]["predict_s"] /
+        results["parallel"]["predict_s"]
+    }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
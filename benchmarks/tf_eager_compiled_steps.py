@@ -0,0 +1,154 @@
+"""
+Training and prediction step time comparison between eagerly executed and
+:func:`tf.function` compiled steps of the :class:`TfEagerNetworkTrainer` on
+CPU.
+
+The same MLP (with identical initialization) is trained with both modes on
+a synthetic dataset. The step times include the conversion of the losses to
+numpy (as done once per iteration by the trainer). The number of samples is
+chosen to not be divisible by the batch size per default, so that the last
+batch of each epoch has a different size, which must not trigger a
+retracing of the compiled steps. The first steps (containing the tracing)
+are skipped as warmup.
+
+Example
+-------
+    python benchmarks/tf_eager_compiled_steps.py --hidden 256 --epochs 3
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.models import AbstractTfEagerNetwork
+from delira.training import TfEagerNetworkTrainer
+
+
+class RegressionDataset(AbstractDataset):
+    def __init__(self, length, n_features, seed):
+        super().__init__(None, None)
+        rng = np.random.RandomState(seed)
+        self.data = rng.randn(length, n_features).astype(np.float32)
+        self.labels = self.data.sum(axis=1, keepdims=True)
+
+    def __getitem__(self, index):
+        return {"data": self.data[index], "label": self.labels[index]}
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class MLP(AbstractTfEagerNetwork):
+    def __init__(self, n_features, n_hidden):
+        super().__init__()
+        self.model = tf.keras.models.Sequential(layers=[
+            tf.keras.layers.Dense(n_hidden, input_shape=(n_features,)),
+            tf.keras.layers.ReLU(),
+            tf.keras.layers.Dense(n_hidden),
+            tf.keras.layers.ReLU(),
+            tf.keras.layers.Dense(1)])
+
+    def call(self, x: tf.Tensor):
+        return {"pred": self.model(x)}
+
+
+def _summarize(times, n_warmup):
+    times = np.array(times[min(n_warmup, len(times) - 1):])
+    return {"mean": float(times.mean()),
+            "p50": float(np.percentile(times, 50)),
+            "p95": float(np.percentile(times, 95))}
+
+
+def run(args, compile_steps, weights, dmgr_train):
+    network = MLP(args.features, args.hidden)
+    network(np.zeros((1, args.features), dtype=np.float32))
+    network.set_weights(weights)
+
+    trainer = TfEagerNetworkTrainer(
+        network, tempfile.mkdtemp(), key_mapping={"x": "data"},
+        losses={"L2": tf.losses.mean_squared_error},
+        optimizer_cls=tf.train.GradientDescentOptimizer,
+        optimizer_params={"learning_rate": args.lr},
+        logging_type="tensorboardx",
+        logging_kwargs={"logdir": tempfile.mkdtemp()},
+        compile_steps=compile_steps)
+
+    train_times, predict_times, losses = [], [], []
+    for _ in range(args.epochs):
+        for iter_num, batch in enumerate(dmgr_train.get_batchgen()):
+            data_dict = trainer._prepare_batch(batch)
+
+            start = time.perf_counter()
+            _losses, _ = trainer.closure_fn(
+                trainer.module, data_dict, optimizers=trainer.optimizers,
+                losses=trainer.losses, iter_num=iter_num)
+            _losses = trainer._convert_to_npy_fn(**_losses)[1]
+            train_times.append(time.perf_counter() - start)
+            losses.append(float(_losses["L2"]))
+
+    for batch in dmgr_train.get_batchgen():
+        data_dict = trainer._prepare_batch(batch)
+
+        start = time.perf_counter()
+        trainer.predict(data_dict, already_prepared=True)
+        predict_times.append(time.perf_counter() - start)
+
+    return {"train_step": _summarize(train_times, args.warmup),
+            "predict_step": _summarize(predict_times, args.warmup),
+            "final_loss": float(np.mean(losses[-10:]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--hidden", type=int, default=256)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=5,
+                        help="number of initial steps to skip")
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    tf.enable_eager_execution()
+    tf.set_random_seed(args.seed)
+
+    dmgr_train = DataManager(
+        RegressionDataset(args.samples, args.features, seed=args.seed),
+        args.batch_size, 0, None)
+
+    # both modes start with the same weights
+    network = MLP(args.features, args.hidden)
+    network(np.zeros((1, args.features), dtype=np.float32))
+    weights = network.get_weights()
+
+    results = {"config": vars(args), "tf_version": tf.__version__}
+    with tf.device("/cpu:0"):
+        results["eager"] = run(args, False, weights, dmgr_train)
+        results["compiled"] = run(args, True, weights, dmgr_train)
+
+    eager, compiled = results["eager"], results["compiled"]
+    results["comparison"] = {
+        "train_speedup": eager["train_step"]["mean"] /
+        compiled["train_step"]["mean"],
+        "predict_speedup": eager["predict_step"]["mean"] /
+        compiled["predict_step"]["mean"],
+        "final_loss_diff": compiled["final_loss"] - eager["final_loss"]
+    }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Training step time and accuracy comparison between full precision (fp32)
+and bfloat16 autocast mixed precision training of an
+:class:`AbstractPyTorchNetwork` on CPU.
+
+The same classifier (with identical initialization) is trained with both
+precisions on a synthetic dataset. The speedup depends on the CPU's bfloat16
+support (e.g. AVX512-BF16 or AMX); CPUs without native support emulate the
+bfloat16 operations and may be slower than fp32.
+
+Example
+-------
+    python benchmarks/torch_bf16_autocast.py --hidden 1024 --epochs 3
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+import torch
+from sklearn.metrics import accuracy_score
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.models import AbstractPyTorchNetwork
+from delira.training import PyTorchNetworkTrainer
+
+
+class BlobDataset(AbstractDataset):
+    def __init__(self, length, n_features, n_classes, seed):
+        super().__init__(None, None)
+        # the class centers are shared between all splits
+        centers = np.random.RandomState(0).randn(
+            n_classes, n_features).astype(np.float32)
+        rng = np.random.RandomState(seed)
+        self.labels = rng.randint(0, n_classes, length)
+        self.data = (centers[self.labels] + rng.randn(
+            length, n_features).astype(np.float32))
+
+    def __getitem__(self, index):
+        return {"data": self.data[index],
+                "label": np.array(self.labels[index])}
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class MLP(AbstractPyTorchNetwork):
+    def __init__(self, n_features, n_hidden, n_classes):
+        super().__init__()
+        self.module = torch.nn.Sequential(
+            torch.nn.Linear(n_features, n_hidden),
+            torch.nn.ReLU(),
+            torch.nn.Linear(n_hidden, n_hidden),
+            torch.nn.ReLU(),
+            torch.nn.Linear(n_hidden, n_classes)
+        )
+
+    def forward(self, x):
+        return {"pred": self.module(x)}
+
+    @staticmethod
+    def prepare_batch(batch: dict, input_device, output_device):
+        return {
+            "data": torch.from_numpy(batch["data"]).float().to(input_device),
+            "label": torch.from_numpy(batch["label"]).long().to(output_device)
+        }
+
+
+def run(args, autocast_dtype, dmgr_train, dset_test):
+    torch.manual_seed(args.seed)
+    trainer = PyTorchNetworkTrainer(
+        MLP(args.features, args.hidden, args.classes), tempfile.mkdtemp(),
+        key_mapping={"x": "data"},
+        losses={"CE": torch.nn.CrossEntropyLoss()},
+        optimizer_cls=torch.optim.SGD,
+        optimizer_params={"lr": args.lr},
+        logging_type="tensorboardx",
+        logging_kwargs={"logdir": tempfile.mkdtemp()},
+        autocast_dtype=autocast_dtype)
+    trainer.module.train()
+
+    step_times, losses = [], []
+    for _ in range(args.epochs):
+        for batch in dmgr_train.get_batchgen():
+            data_dict = trainer._prepare_batch(batch)
+
+            start = time.perf_counter()
+            _losses, _ = trainer.closure_fn(
+                trainer.module, data_dict, optimizers=trainer.optimizers,
+                losses=trainer.losses, iter_num=0)
+            step_times.append(time.perf_counter() - start)
+            losses.append(_losses["CE"])
+
+    # skip the first steps as warmup
+    step_times = np.array(step_times[min(5, len(step_times) - 1):])
+
+    trainer.module.eval()
+    with torch.no_grad():
+        preds = trainer.predict({"data": dset_test.data,
+                                 "label": dset_test.labels})["pred"]
+
+    return {
+        "step_time_mean": float(step_times.mean()),
+        "step_time_p50": float(np.percentile(step_times, 50)),
+        "step_time_p95": float(np.percentile(step_times, 95)),
+        "final_loss": float(np.mean(losses[-10:])),
+        "test_accuracy": float(accuracy_score(dset_test.labels,
+                                              preds.argmax(-1)))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--hidden", type=int, default=512)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--lr", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    dmgr_train = DataManager(
+        BlobDataset(args.samples, args.features, args.classes, seed=1),
+        args.batch_size, 0, None)
+    dset_test = BlobDataset(args.samples // 4, args.features, args.classes,
+                            seed=2)
+
+    results = {"config": vars(args), "torch_version": torch.__version__}
+    results["fp32"] = run(args, None, dmgr_train, dset_test)
+    results["bf16"] = run(args, torch.bfloat16, dmgr_train, dset_test)
+
+    fp32, bf16 = results["fp32"], results["bf16"]
+    results["comparison"] = {
+        "speedup": fp32["step_time_mean"] / bf16["step_time_mean"],
+        "accuracy_diff": bf16["test_accuracy"] - fp32["test_accuracy"]
+    }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Accuracy, latency and size comparison between an
+:class:`AbstractPyTorchNetwork` and its int8 quantized copies
+(dynamic and static post-training quantization) on CPU.
+
+A small classifier is trained for a few epochs on a synthetic dataset
+before quantization, so that the reported metric differences are
+meaningful.
+
+Example
+-------
+    python benchmarks/torch_quantization.py --hidden 1024 --epochs 3
+"""
+import argparse
+import json
+import tempfile
+
+import numpy as np
+import torch
+from sklearn.metrics import accuracy_score
+
+from delira.data_loading import AbstractDataset, DataManager, \
+    SequentialSampler
+from delira.models import AbstractPyTorchNetwork
+from delira.training import PyTorchNetworkTrainer
+
+
+class BlobDataset(AbstractDataset):
+    def __init__(self, length, n_features, n_classes, seed):
+        super().__init__(None, None)
+        # the class centers are shared between all splits
+        centers = np.random.RandomState(0).randn(
+            n_classes, n_features).astype(np.float32)
+        rng = np.random.RandomState(seed)
+        self.labels = rng.randint(0, n_classes, length)
+        self.data = (centers[self.labels] + rng.randn(
+            length, n_features).astype(np.float32))
+
+    def __getitem__(self, index):
+        return {"data": self.data[index],
+                "label": np.array(self.labels[index])}
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class MLP(AbstractPyTorchNetwork):
+    def __init__(self, n_features, n_hidden, n_classes):
+        super().__init__()
+        self.module = torch.nn.Sequential(
+            torch.nn.Linear(n_features, n_hidden),
+            torch.nn.ReLU(),
+            torch.nn.Linear(n_hidden, n_hidden),
+            torch.nn.ReLU(),
+            torch.nn.Linear(n_hidden, n_classes)
+        )
+
+    def forward(self, x):
+        return {"pred": self.module(x)}
+
+    @staticmethod
+    def prepare_batch(batch: dict, input_device, output_device):
+        return {
+            "data": torch.from_numpy(batch["data"]).float().to(input_device),
+            "label": torch.from_numpy(batch["label"]).long().to(output_device)
+        }
+
+
+def accuracy(y_true, y_pred):
+    return accuracy_score(y_true.reshape(-1), y_pred.argmax(-1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--hidden", type=int, default=512)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    dmgr_train = DataManager(
+        BlobDataset(args.samples, args.features, args.classes, seed=1),
+        args.batch_size, 0, None)
+    dmgr_test = DataManager(
+        BlobDataset(args.samples // 4, args.features, args.classes, seed=2),
+        args.batch_size, 0, None, sampler_cls=SequentialSampler)
+
+    trainer = PyTorchNetworkTrainer(
+        MLP(args.features, args.hidden, args.classes), tempfile.mkdtemp(),
+        key_mapping={"x": "data"},
+        losses={"CE": torch.nn.CrossEntropyLoss()},
+        optimizer_cls=torch.optim.Adam, metrics={"accuracy": accuracy},
+        logging_type="tensorboardx",
+        logging_kwargs={"logdir": tempfile.mkdtemp()})
+    trainer.train(args.epochs, dmgr_train, None, verbose=False)
+
+    results = {"config": vars(args), "torch_version": torch.__version__}
+    for mode in ["dynamic", "static"]:
+        quantized = trainer.quantize(mode, datamgr=dmgr_train)
+        results[mode] = trainer.quantization_report(
+            quantized, dmgr_test, n_repeats=args.repeats)
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+CPU latency comparison between an eager :class:`AbstractPyTorchNetwork`
+and its frozen TorchScript export
+(:func:`delira.io.torch.export_inference_torchscript`).
+
+Example
+-------
+    python benchmarks/torchscript_inference.py --batch-sizes 1 16 64
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from delira.io.torch import export_inference_torchscript, \
+    load_inference_torchscript
+from delira.models import AbstractPyTorchNetwork
+
+
+class ConvNet(AbstractPyTorchNetwork):
+    def __init__(self, in_channels=1, n_outputs=10):
+        super().__init__()
+        self.features = torch.nn.Sequential(
+            torch.nn.Conv2d(in_channels, 32, 3, padding=1),
+            torch.nn.BatchNorm2d(32),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(2),
+            torch.nn.Conv2d(32, 64, 3, padding=1),
+            torch.nn.BatchNorm2d(64),
+            torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1),
+        )
+        self.classifier = torch.nn.Linear(64, n_outputs)
+
+    def forward(self, x):
+        return {"pred": self.classifier(self.features(x).flatten(1))}
+
+
+def measure(model, inputs, n_warmup, n_iters):
+    with torch.no_grad():
+        for _ in range(n_warmup):
+            model(**inputs)
+
+        timings = []
+        for _ in range(n_iters):
+            start = time.perf_counter()
+            model(**inputs)
+            timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings) * 1000.
+    return {"mean_ms": float(np.mean(timings)),
+            "p50_ms": float(np.percentile(timings, 50)),
+            "p95_ms": float(np.percentile(timings, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 16, 64])
+    parser.add_argument("--image-size", type=int, default=28)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--iters", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    model = ConvNet().eval()
+    file = os.path.join(tempfile.mkdtemp(), "model.ptj")
+    example = {"x": torch.rand(args.batch_sizes[0], 1, args.image_size,
+                               args.image_size)}
+    export_inference_torchscript(file, model, example)
+    exported = load_inference_torchscript(file)
+
+    results = {"config": vars(args), "torch_version": torch.__version__,
+               "batch_sizes": {}}
+
+    for batch_size in args.batch_sizes:
+        inputs = {"x": torch.rand(batch_size, 1, args.image_size,
+                                  args.image_size)}
+        eager = measure(model, inputs, args.warmup, args.iters)
+        scripted = measure(exported, inputs, args.warmup, args.iters)
+        results["batch_sizes"][str(batch_size)] = {
+            "eager": eager,
+            "torchscript": scripted,
+            "speedup": eager["mean_ms"] / scripted["mean_ms"]
+        }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
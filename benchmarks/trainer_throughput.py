@@ -0,0 +1,403 @@
+"""
+Training loop throughput of the delira trainers compared to the raw
+framework training step for all installed backends.
+
+For each backend, a small reference network (the same two-layer MLP as in the
+backend tests) is trained on synthetic :class:`DictDataset` data and the
+following quantities are measured:
+
+* ``iters_per_s``: training iterations per second after the first epoch
+* ``step``: wall time per iteration inside
+  :meth:`BaseNetworkTrainer._train_single_epoch` together with the single
+  phases as measured by the :class:`StepProfiler`
+* ``raw_step``: wall time of the backend's bare ``closure_fn`` on already
+  prepared batches, which corresponds to a hand-written training loop
+* ``overhead_per_step``: the difference of both, which is the time spent in
+  delira's data loading, conversion, metric and callback code per iteration
+* ``startup_latency``: time from the beginning of an epoch to the first
+  batch being available
+* ``peak_rss_mb``: peak resident memory of the process training the backend
+
+Each backend runs in a separate (spawned) process, to measure the peak memory
+in isolation and to avoid conflicting global states (e.g. the tensorflow
+execution modes). The timings include the (small) overhead of the
+:class:`StepProfiler` itself.
+
+Example
+-------
+    python benchmarks/trainer_throughput.py --backends torch chainer \
+        --output results.json --compare baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error
+
+from delira import get_backends
+from delira.data_loading import DataManager, DictDataset
+from delira.training.callbacks import AbstractCallback, StepProfiler
+
+
+class _EpochTimer(AbstractCallback):
+    def __init__(self):
+        super().__init__()
+        self.startup_latencies = []
+        self.epoch_times = []
+        self._epoch_start = None
+
+    def at_epoch_begin(self, trainer, **kwargs):
+        self._epoch_start = time.perf_counter()
+        self.epoch_times.append([])
+        return {}
+
+    def at_iter_begin(self, trainer, iter_num=None, train=True, **kwargs):
+        # the first iteration begins as soon as the first batch is available
+        if train and iter_num == 0:
+            self.startup_latencies.append(
+                time.perf_counter() - self._epoch_start)
+        return {}
+
+    def at_iter_end(self, trainer, train=True, **kwargs):
+        if train:
+            self.epoch_times[-1].append(
+                time.perf_counter() - self._epoch_start)
+        return {}
+
+
+def _build_torch(args, save_path, callbacks, script=False):
+    import torch
+    from delira.models import AbstractPyTorchNetwork, \
+        AbstractTorchScriptNetwork
+    from delira.training import PyTorchNetworkTrainer, \
+        TorchScriptNetworkTrainer
+
+    torch.manual_seed(args.seed)
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    def _mlp():
+        return torch.nn.Sequential(
+            torch.nn.Linear(args.features, args.hidden),
+            torch.nn.ReLU(),
+            torch.nn.Linear(args.hidden, 1))
+
+    if script:
+        class Network(AbstractTorchScriptNetwork):
+            __constants__ = ["module"]
+
+            def __init__(self):
+                super().__init__()
+                self.module = _mlp()
+
+            @torch.jit.script_method
+            def forward(self, x):
+                return {"pred": self.module(x)}
+
+        trainer_cls = TorchScriptNetworkTrainer
+    else:
+        class Network(AbstractPyTorchNetwork):
+            def __init__(self):
+                super().__init__()
+                self.module = _mlp()
+
+            def forward(self, x):
+                return {"pred": self.module(x)}
+
+        trainer_cls = PyTorchNetworkTrainer
+
+    return trainer_cls(
+        Network(), save_path, key_mapping={"x": "data"},
+        losses={"BCE": torch.nn.BCEWithLogitsLoss()},
+        optimizer_cls=torch.optim.Adam,
+        metrics={"mae": mean_absolute_error},
+        logging_kwargs={"logdir": os.path.join(save_path, "logs")},
+        callbacks=callbacks)
+
+
+def _build_torchscript(args, save_path, callbacks):
+    return _build_torch(args, save_path, callbacks, script=True)
+
+
+def _keras_mlp(args):
+    import tensorflow as tf
+    return tf.keras.models.Sequential(
+        layers=[tf.keras.layers.Dense(args.hidden,
+                                      input_shape=(args.features,)),
+                tf.keras.layers.ReLU(),
+                tf.keras.layers.Dense(1)])
+
+
+def _build_tf_eager(args, save_path, callbacks):
+    import tensorflow as tf
+    tf.enable_eager_execution()
+    from delira.models import AbstractTfEagerNetwork
+    from delira.training import TfEagerNetworkTrainer
+
+    tf.set_random_seed(args.seed)
+
+    class Network(AbstractTfEagerNetwork):
+        def __init__(self):
+            super().__init__()
+            self.model = _keras_mlp(args)
+
+        def call(self, x: tf.Tensor):
+            return {"pred": self.model(x)}
+
+    return TfEagerNetworkTrainer(
+        Network(), save_path, key_mapping={"x": "data"},
+        losses={"L1": tf.losses.absolute_difference},
+        optimizer_cls=tf.train.AdamOptimizer,
+        optimizer_params={"learning_rate": 1e-3},
+        metrics={"mae": mean_absolute_error},
+        logging_kwargs={"logdir": os.path.join(save_path, "logs")},
+        callbacks=callbacks)
+
+
+def _build_tf_graph(args, save_path, callbacks):
+    import tensorflow as tf
+    tf.disable_eager_execution()
+    from delira.models import AbstractTfGraphNetwork
+    from delira.training import TfGraphNetworkTrainer
+
+    tf.set_random_seed(args.seed)
+
+    class Network(AbstractTfGraphNetwork):
+        def __init__(self):
+            super().__init__()
+            self.model = _keras_mlp(args)
+
+            data = tf.placeholder(shape=[None, args.features],
+                                  dtype=tf.float32)
+            labels = tf.placeholder_with_default(
+                tf.zeros([tf.shape(data)[0], 1]), shape=[None, 1])
+
+            self.inputs["data"] = data
+            self.inputs["label"] = labels
+            self.outputs_train["pred"] = self.model(data)
+            self.outputs_eval["pred"] = self.model(data)
+
+    return TfGraphNetworkTrainer(
+        Network(), save_path, key_mapping={"data": "data"},
+        losses={"L1": tf.losses.absolute_difference},
+        optimizer_cls=tf.train.AdamOptimizer,
+        optimizer_params={"learning_rate": 1e-3},
+        metrics={"mae": mean_absolute_error},
+        logging_kwargs={"logdir": os.path.join(save_path, "logs")},
+        callbacks=callbacks)
+
+
+def _build_chainer(args, save_path, callbacks):
+    import chainer
+    from delira.models import AbstractChainerNetwork
+    from delira.training import ChainerNetworkTrainer
+
+    class Network(AbstractChainerNetwork):
+        def __init__(self):
+            super().__init__()
+            with self.init_scope():
+                self.dense_1 = chainer.links.Linear(args.features,
+                                                    args.hidden)
+                self.dense_2 = chainer.links.Linear(args.hidden, 1)
+
+        def forward(self, x):
+            return {"pred": self.dense_2(chainer.functions.relu(
+                self.dense_1(x)))}
+
+    return ChainerNetworkTrainer(
+        Network(), save_path, key_mapping={"x": "data"},
+        losses={"L1": chainer.functions.mean_absolute_error},
+        optimizer_cls=chainer.optimizers.Adam,
+        metrics={"mae": mean_absolute_error},
+        logging_kwargs={"logdir": os.path.join(save_path, "logs")},
+        callbacks=callbacks)
+
+
+def _build_sklearn(args, save_path, callbacks):
+    from sklearn.linear_model import SGDClassifier
+    from delira.models import SklearnEstimator
+    from delira.training import SklearnEstimatorTrainer
+
+    return SklearnEstimatorTrainer(
+        SklearnEstimator(SGDClassifier(random_state=args.seed)), save_path,
+        key_mapping={"X": "X"},
+        metrics={"mae": mean_absolute_error},
+        metric_keys={"mae": ("y", "pred")},
+        logging_kwargs={"logdir": os.path.join(save_path, "logs")},
+        callbacks=callbacks)
+
+
+# benchmark name: (required delira backend, trainer builder)
+BACKENDS = {
+    "torch": ("TORCH", _build_torch),
+    "torchscript": ("TORCH", _build_torchscript),
+    "tf_eager": ("TF", _build_tf_eager),
+    "tf_graph": ("TF", _build_tf_graph),
+    "chainer": ("CHAINER", _build_chainer),
+    "sklearn": ("SKLEARN", _build_sklearn),
+}
+
+
+def _aggregate(durations):
+    durations = np.asarray(durations)
+    return {"mean": float(durations.mean()),
+            "p50": float(np.percentile(durations, 50)),
+            "p95": float(np.percentile(durations, 95))}
+
+
+def _max_rss_mb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return max_rss / (1024. ** 2 if sys.platform == "darwin" else 1024.)
+
+
+def bench_backend(backend, args):
+    rng = np.random.RandomState(args.seed)
+    data = rng.randn(args.samples, args.features).astype(np.float32)
+    labels = rng.randint(0, 2, (args.samples, 1)).astype(np.float32)
+    dmgr = DataManager(DictDataset({"data": data, "label": labels}),
+                       args.batch_size, args.workers, None)
+
+    profiler = StepProfiler(trace=False, verbose=False)
+    timer = _EpochTimer()
+    save_path = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    trainer = BACKENDS[backend][1](args, save_path, [profiler, timer])
+    setup_time = time.perf_counter() - start
+    setup_rss = _max_rss_mb()
+
+    trainer.train(args.epochs, dmgr, None, verbose=False)
+
+    # the first epoch is treated as warmup
+    epochs = list(range(1, args.epochs + 1))[1:] or [1]
+    n_iters = sum([profiler.summaries[_epoch]["n_iterations"]
+                   for _epoch in epochs])
+    train_time = sum([timer.epoch_times[_epoch - 1][-1]
+                      for _epoch in epochs])
+    step_times = np.concatenate([
+        np.diff([0.] + timer.epoch_times[_epoch - 1]) for _epoch in epochs])
+
+    phases = {}
+    for _epoch in epochs:
+        for name, vals in profiler.summaries[_epoch]["phases"].items():
+            phases.setdefault(name, []).append(vals["mean"])
+    phases = {name: float(np.mean(vals)) for name, vals in phases.items()}
+
+    # the raw framework step: the closure on already prepared batches
+    batches = [trainer._prepare_batch(_batch)
+               for _batch in dmgr.get_batchgen(seed=0)]
+    raw_step_times = []
+    for _ in range(args.epochs):
+        for iter_num, data_dict in enumerate(batches):
+            start = time.perf_counter()
+            trainer.closure_fn(trainer.module, data_dict,
+                               optimizers=trainer.optimizers,
+                               losses=trainer.losses, fold=trainer.fold,
+                               iter_num=iter_num)
+            raw_step_times.append(time.perf_counter() - start)
+    raw_step_times = raw_step_times[len(batches):] or raw_step_times
+
+    step = _aggregate(step_times)
+    raw_step = _aggregate(raw_step_times)
+
+    return {
+        "iters_per_s": n_iters / train_time,
+        "step": {**step, "phases": phases},
+        "raw_step": raw_step,
+        "overhead_per_step": step["mean"] - raw_step["mean"],
+        "overhead_fraction": 1. - raw_step["mean"] / step["mean"],
+        "stall_fraction": float(np.mean(
+            [profiler.summaries[_epoch]["stall_fraction"]
+             for _epoch in epochs])),
+        "startup_latency": _aggregate(timer.startup_latencies),
+        "setup_time": setup_time,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": _max_rss_mb(),
+    }
+
+
+def _bench_in_process(backend, args, queue):
+    try:
+        queue.put(bench_backend(backend, args))
+    except Exception as e:
+        queue.put({"error": "%s: %s" % (type(e).__name__, str(e))})
+
+
+def compare(results, baseline):
+    """
+    Relative change of the throughput and the overhead per step compared to
+    a previous run (positive values are regressions)
+    """
+    comparison = {}
+    for backend, vals in results.items():
+        old_vals = baseline.get(backend, {})
+        if "error" in vals or "iters_per_s" not in old_vals:
+            continue
+        comparison[backend] = {
+            "iters_per_s": 1. - vals["iters_per_s"] / old_vals["iters_per_s"],
+            "overhead_per_step": (vals["overhead_per_step"]
+                                  - old_vals["overhead_per_step"])
+            / old_vals["step"]["mean"],
+            "peak_rss_mb": vals["peak_rss_mb"] / old_vals["peak_rss_mb"] - 1.
+        }
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS),
+                        choices=list(BACKENDS))
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--samples", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="number of augmentation processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", type=str, default=None,
+                        help="optional JSON file to store the results in")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="optional JSON file of a previous run to "
+                             "compare the results against")
+    args = parser.parse_args()
+
+    installed = get_backends()
+    ctx = multiprocessing.get_context("spawn")
+
+    results = {}
+    for backend in args.backends:
+        if BACKENDS[backend][0] not in installed:
+            results[backend] = {"error": "backend not installed"}
+            continue
+
+        queue = ctx.Queue()
+        process = ctx.Process(target=_bench_in_process,
+                              args=(backend, args, queue))
+        process.start()
+        results[backend] = queue.get()
+        process.join()
+
+    output = {"config": vars(args), "results": results}
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            output["comparison"] = compare(results, json.load(f)["results"])
+
+    print(json.dumps(output, indent=4, sort_keys=True))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -76,7 +76,8 @@ class _ParallelAugmenter(AbstractAugmenter):
     """
 
     def __init__(self, data_loader, batchsize, sampler, num_processes=None,
-                 transforms=None, seed=1, drop_last=False):
+                 transforms=None, seed=1, drop_last=False,
+                 resource_plan=None):
         """
         Parameters
         ----------
@@ -98,11 +99,16 @@ class _ParallelAugmenter(AbstractAugmenter):
             the basic seed; default: 1
         drop_last : bool
             whether to drop the last (possibly smaller) batch or not
+        resource_plan : :class:`delira.utils.resources.ResourcePlan`
+            the plan to configure the CPU cores and threads of the workers;
+            if None: the workers are not configured
         """
 
         super().__init__(data_loader, batchsize, sampler, transforms, seed,
                          drop_last)
 
+        self._resource_plan = resource_plan
+
         if num_processes is None:
             num_processes = os.cpu_count()
 
@@ -165,7 +171,8 @@ class _ParallelAugmenter(AbstractAugmenter):
                                      index_pipe=recv_conn_in,
                                      transforms=self._transforms,
                                      abort_event=self._abort_event,
-                                     process_id=i)
+                                     process_id=i,
+                                     resource_plan=self._resource_plan)
             process.daemon = True
             process.start()
             # wait until process was created and started
@@ -327,7 +334,8 @@ class _WorkerProcess(multiprocessing.Process):
                  index_pipe: mpconnection.Connection,
                  abort_event: multiprocessing.Event,
                  transforms: Callable,
-                 process_id):
+                 process_id,
+                 resource_plan=None):
         """
         Parameters
         ----------
@@ -345,6 +353,9 @@ class _WorkerProcess(multiprocessing.Process):
             the transforms to transform the data
         process_id : int
             the process id
+        resource_plan : :class:`delira.utils.resources.ResourcePlan`
+            the plan to configure the CPU cores and threads of this worker
+            with; if None: the worker is not configured
         """
         super().__init__()
 
@@ -354,11 +365,15 @@ class _WorkerProcess(multiprocessing.Process):
         self._abort_event = abort_event
         self._process_id = process_id
         self._transforms = transforms
+        self._resource_plan = resource_plan
 
     def run(self) -> None:
         # set the process id
         self._data_loader.process_id = self._process_id
 
+        if self._resource_plan is not None:
+            self._resource_plan.apply_worker(self._process_id)
+
         try:
             while True:
                 # check if worker should terminate
@@ -447,7 +462,8 @@ class Augmenter(object):
     """
 
     def __init__(self, data_loader, batchsize, sampler, num_processes=None,
-                 transforms=None, seed=1, drop_last=False):
+                 transforms=None, seed=1, drop_last=False,
+                 resource_plan=None):
         """
         Parameters
         ----------
@@ -467,18 +483,18 @@ class Augmenter(object):
             the basic seed; default: 1
         drop_last : bool
             whether to drop the last (possibly smaller) batch or not
+        resource_plan : :class:`delira.utils.resources.ResourcePlan`
+            the plan to configure the CPU cores and threads of the worker
+            processes with; ignored for sequential augmentation
         """
 
-        self._augmenter = self._resolve_augmenter_cls(num_processes,
-                                                      data_loader=data_loader,
-                                                      batchsize=batchsize,
-                                                      sampler=sampler,
-                                                      transforms=transforms,
-                                                      seed=seed,
-                                                      drop_last=drop_last)
+        self._augmenter = self._resolve_augmenter_cls(
+            num_processes, data_loader=data_loader, batchsize=batchsize,
+            sampler=sampler, transforms=transforms, seed=seed,
+            drop_last=drop_last, resource_plan=resource_plan)
 
     @staticmethod
-    def _resolve_augmenter_cls(num_processes, **kwargs):
+    def _resolve_augmenter_cls(num_processes, resource_plan=None, **kwargs):
         """
         Resolves the augmenter class by the number of specified processes and
         the debug mode and creates an instance of the chosen class
@@ -488,6 +504,9 @@ class Augmenter(object):
             the number of processes to use for dataloading + augmentation;
             if None: the number of available CPUs will be used as number of
             processes
+        resource_plan : :class:`delira.utils.resources.ResourcePlan`
+            the plan to configure the worker processes with (only used for
+            parallel augmentation)
         **kwargs :
             additional keyword arguments, used for instantiation of the chosen
             class
@@ -498,7 +517,8 @@ class Augmenter(object):
         """
         if get_current_debug_mode() or num_processes == 0:
             return _SequentialAugmenter(**kwargs)
-        return _ParallelAugmenter(num_processes=num_processes, **kwargs)
+        return _ParallelAugmenter(num_processes=num_processes,
+                                  resource_plan=resource_plan, **kwargs)
 
     def __iter__(self):
         """
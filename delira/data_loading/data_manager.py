@@ -4,7 +4,8 @@ from batchgenerators.transforms import AbstractTransform
 
 from delira import get_current_debug_mode
 from delira.data_loading.data_loader import DataLoader
-from delira.data_loading.sampler import SequentialSampler, AbstractSampler
+from delira.data_loading.sampler import SequentialSampler, AbstractSampler, \
+    DistributedSampler
 from delira.data_loading.augmenter import Augmenter
 from delira.data_loading.dataset import DictDataset, IterableDataset, \
     AbstractDataset
@@ -24,7 +25,7 @@ class DataManager(object):
     def __init__(self, data, batch_size, n_process_augmentation,
                  transforms, sampler_cls=SequentialSampler,
                  drop_last=False, data_loader_cls=None,
-                 **sampler_kwargs):
+                 resource_manager=None, **sampler_kwargs):
         """
 
         Parameters
@@ -35,7 +36,8 @@ class DataManager(object):
         batch_size : int
             Number of samples per batch
         n_process_augmentation : int
-            Number of processes for augmentations
+            Number of processes for augmentations (None: one process per
+            CPU)
         transforms :
             Data transformations for augmentation
         sampler_cls : AbstractSampler
@@ -44,6 +46,10 @@ class DataManager(object):
             whether to drop the last (possibly smaller) batch
         data_loader_cls : subclass of SlimDataLoaderBase
             DataLoader class
+        resource_manager : :class:`CPUResourceManager`, optional
+            if given, the CPU cores are split between the main process and
+            the augmentation workers and the number of threads per process
+            is limited accordingly (see :attr:`DataManager.resource_plan`)
         **sampler_kwargs :
             other keyword arguments (passed to sampler_cls)
 
@@ -99,6 +105,7 @@ class DataManager(object):
 
         self.sampler_cls = sampler_cls
         self.sampler_kwargs = sampler_kwargs
+        self.resource_manager = resource_manager
 
     def get_batchgen(self, seed=1):
         """
@@ -135,7 +142,8 @@ class DataManager(object):
                          num_processes=self.n_process_augmentation,
                          transforms=self.transforms,
                          seed=seed,
-                         drop_last=self.drop_last
+                         drop_last=self.drop_last,
+                         resource_plan=self.resource_plan
                          )
 
     def get_subset(self, indices):
@@ -161,6 +169,7 @@ class DataManager(object):
             "sampler_cls": self.sampler_cls,
             "data_loader_cls": self.data_loader_cls,
             "drop_last": self.drop_last,
+            "resource_manager": self.resource_manager,
             **self.sampler_kwargs
         }
 
@@ -168,6 +177,37 @@ class DataManager(object):
             self.data.get_subset(indices),
             **subset_kwargs)
 
+    def get_shard(self, rank, world_size):
+        """
+        Returns a manager, which only samples the shard of a single process
+        in distributed training (see :class:`DistributedSampler`).
+        The current sampling strategy is kept and applied before sharding.
+
+        Parameters
+        ----------
+        rank : int
+            the rank of the current process
+        world_size : int
+            the number of processes
+
+        Returns
+        -------
+        :class:`DataManager`
+            manager sampling the shard of the current process
+
+        """
+        if issubclass(self.sampler_cls, DistributedSampler):
+            raise ValueError("DataManager is already sharded")
+
+        return self.__class__(
+            self.data, batch_size=self.batch_size,
+            n_process_augmentation=self.n_process_augmentation,
+            transforms=self.transforms, sampler_cls=DistributedSampler,
+            data_loader_cls=self.data_loader_cls, drop_last=self.drop_last,
+            resource_manager=self.resource_manager,
+            num_replicas=world_size, rank=rank,
+            base_sampler_cls=self.sampler_cls, **self.sampler_kwargs)
+
     def update_state_from_dict(self, new_state: dict):
         """
         Updates internal state and therefore the behavior from dict.
@@ -185,6 +225,7 @@ class DataManager(object):
                 * ``sampler_cls``
                 * ``sampler_kwargs``
                 * ``transforms``
+                * ``resource_manager``
 
             If a key is not specified, the old value of the corresponding
             attribute will be used
@@ -210,6 +251,8 @@ class DataManager(object):
                                             self.sampler_kwargs)
 
         self.transforms = new_state.pop("transforms", self.transforms)
+        self.resource_manager = new_state.pop("resource_manager",
+                                              self.resource_manager)
 
         if new_state:
             raise KeyError("Invalid Keys in new_state given: %s"
@@ -269,11 +312,14 @@ class DataManager(object):
         ----------
         new_process_number : int, Any
             new number of augmentation processes; should be int but can be of
-            any type that can be casted to an int
+            any type that can be casted to an int. None means one process
+            per CPU
 
         """
 
-        self._n_process_augmentation = int(new_process_number)
+        if new_process_number is not None:
+            new_process_number = int(new_process_number)
+        self._n_process_augmentation = new_process_number
 
     @property
     def transforms(self):
@@ -341,6 +387,22 @@ class DataManager(object):
 
         self._data_loader_cls = new_loader_cls
 
+    @property
+    def resource_plan(self):
+        """
+        The assignment of CPU cores and threads to the main process and the
+        current number of augmentation workers
+
+        Returns
+        -------
+        :class:`ResourcePlan` or None
+            the resource plan (None if no ``resource_manager`` is given)
+
+        """
+        if self.resource_manager is None:
+            return None
+        return self.resource_manager.plan(self.n_process_augmentation)
+
     @property
     def n_samples(self):
         """
@@ -352,6 +414,10 @@ class DataManager(object):
             Number of Samples
 
         """
+        # distributed managers only sample the shard of a single process
+        if issubclass(self.sampler_cls, DistributedSampler):
+            return DistributedSampler.shard_length(
+                len(self.dataset), self.sampler_kwargs["num_replicas"])
         return len(self.dataset)
 
     @property
@@ -1,5 +1,6 @@
 from delira.data_loading.sampler.abstract import AbstractSampler
 from delira.data_loading.sampler.batch import BatchSampler
+from delira.data_loading.sampler.distributed import DistributedSampler
 from delira.data_loading.sampler.random import RandomSampler, \
     RandomSamplerNoReplacement, RandomSamplerWithReplacement
 from delira.data_loading.sampler.sequential import SequentialSampler
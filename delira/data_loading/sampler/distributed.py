@@ -0,0 +1,119 @@
+from delira.data_loading.dataset import AbstractDataset
+from delira.data_loading.sampler.abstract import AbstractSampler
+from delira.data_loading.sampler.sequential import SequentialSampler
+
+
+class DistributedSampler(AbstractSampler):
+    """
+    Sampler restricting another sampling strategy to the shard of a single
+    process in distributed training.
+
+    All processes must use the same random seed, since each of them
+    samples the whole index order by means of the wrapped sampler and keeps
+    every ``num_replicas``-th index (starting at its ``rank``). The order is
+    padded by repeating its first indices, so that all processes sample the
+    same number of indices (which is necessary to keep their collective
+    operations in sync).
+
+    """
+
+    def __init__(self, sampler: AbstractSampler, num_replicas, rank):
+        """
+
+        Parameters
+        ----------
+        sampler : :class:`AbstractSampler`
+            the sampler defining the sampling strategy, which is restricted
+            to the shard
+        num_replicas : int
+            the number of processes taking part in the training
+        rank : int
+            the rank of the current process
+
+        """
+        super().__init__(list(range(len(sampler))))
+
+        if not 0 <= rank < num_replicas:
+            raise ValueError("Invalid rank %d for %d replicas"
+                             % (rank, num_replicas))
+
+        self._num_replicas = num_replicas
+        self._rank = rank
+        self._sampler = sampler
+
+    @classmethod
+    def from_dataset(cls, dset: AbstractDataset, num_replicas, rank,
+                     base_sampler_cls=SequentialSampler, **kwargs):
+        """
+        Class Method to create a sampler from a given dataset
+
+        Parameters
+        ----------
+        dset : :class:`AbstractDataset`
+            the dataset to create the sampler from
+        num_replicas : int
+            the number of processes taking part in the training
+        rank : int
+            the rank of the current process
+        base_sampler_cls : type
+            the sampling strategy to restrict to the shard
+        **kwargs :
+            additional keyword arguments (passed to
+            ``base_sampler_cls.from_dataset``)
+
+        """
+        return cls(base_sampler_cls.from_dataset(dset, **kwargs),
+                   num_replicas, rank)
+
+    @staticmethod
+    def shard_length(n_samples, num_replicas):
+        """
+        Calculates the number of samples per process
+
+        Parameters
+        ----------
+        n_samples : int
+            the total number of samples
+        num_replicas : int
+            the number of processes
+
+        Returns
+        -------
+        int
+            the number of samples per process
+
+        """
+        return -(-n_samples // num_replicas)
+
+    def __iter__(self):
+        """
+        Creates an iterator returning the indices of the current shard
+
+        Returns
+        -------
+        Iterator
+            iterator returning the shard's indices
+
+        """
+        indices = list(iter(self._sampler))
+        total_size = self.shard_length(len(indices),
+                                       self._num_replicas) * \
+            self._num_replicas
+
+        # pad to make the order evenly divisible
+        while len(indices) < total_size:
+            indices += indices[:total_size - len(indices)]
+
+        return iter(indices[self._rank:total_size:self._num_replicas])
+
+    def __len__(self):
+        """
+        Defines the length of the sampler
+
+        Returns
+        -------
+        int
+            the number of samples of the current shard
+
+        """
+        return self.shard_length(len(self._sampler), self._num_replicas)
@@ -1,14 +1,27 @@
 from delira import get_backends
 
+from delira.io.async_writer import AsyncCheckpointWriter
+
 if "TORCH" in get_backends():
     from delira.io.torch import save_checkpoint_torch as torch_save_checkpoint
     from delira.io.torch import load_checkpoint_torch as torch_load_checkpoint
+    from delira.io.torch import snapshot_checkpoint_torch \
+        as torch_snapshot_checkpoint
+    from delira.io.torch import write_checkpoint_torch \
+        as torch_write_checkpoint
+    from delira.io.torch import load_model_state_torch \
+        as torch_load_model_state
 
     from delira.io.torch import save_checkpoint_torchscript \
         as torchscript_save_checkpoint
     from delira.io.torch import load_checkpoint_torchscript \
         as torchscript_load_checkpoint
 
+    from delira.io.torch import export_inference_torchscript \
+        as torch_export_inference
+    from delira.io.torch import load_inference_torchscript \
+        as torch_load_inference
+
 if "TF" in get_backends():
     from delira.io.tf import save_checkpoint as tf_save_checkpoint
     from delira.io.tf import load_checkpoint as tf_load_checkpoint
@@ -19,7 +32,15 @@ if "TF" in get_backends():
 if "CHAINER" in get_backends():
     from delira.io.chainer import save_checkpoint as chainer_save_checkpoint
     from delira.io.chainer import load_checkpoint as chainer_load_checkpoint
+    from delira.io.chainer import snapshot_checkpoint \
+        as chainer_snapshot_checkpoint
+    from delira.io.chainer import write_checkpoint \
+        as chainer_write_checkpoint
 
 if "SKLEARN" in get_backends():
     from delira.io.sklearn import load_checkpoint as sklearn_load_checkpoint
     from delira.io.sklearn import save_checkpoint as sklearn_save_checkpoint
+    from delira.io.sklearn import snapshot_checkpoint \
+        as sklearn_snapshot_checkpoint
+    from delira.io.sklearn import write_checkpoint \
+        as sklearn_write_checkpoint
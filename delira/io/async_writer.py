@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCheckpointWriter(object):
+    """
+    Writes checkpoints in a background thread.
+
+    The state to save is snapshotted in the calling thread (which is cheap
+    compared to the serialization) and serialized to a temporary file by the
+    background thread afterwards. The temporary file atomically replaces the
+    actual file once it is written completely, so that a checkpoint file is
+    never partially written, even if the process is killed.
+
+    The number of snapshots in flight is limited by ``max_pending`` to bound
+    the additional memory. If this limit is reached, new snapshots are only
+    taken after the oldest pending checkpoint has been written.
+
+    Checkpoints are written in the order they were submitted. Errors raised
+    during writing are re-raised by the next call to :meth:`submit` or
+    :meth:`flush`.
+
+    """
+
+    def __init__(self, max_pending=1):
+        """
+
+        Parameters
+        ----------
+        max_pending : int
+            the maximum number of snapshots, which are submitted but not
+            completely written yet
+
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1, but got %d"
+                             % max_pending)
+
+        self._max_pending = max_pending
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    @property
+    def max_pending(self):
+        return self._max_pending
+
+    @property
+    def n_pending(self):
+        """
+        The number of submitted checkpoints, which are not written yet
+        """
+        return len([_future for _future in self._futures
+                    if not _future.done()])
+
+    @staticmethod
+    def _temporary_file(file):
+        # keep the directory (for an atomic replacement) and the extension
+        # (some serializers depend on it)
+        dirname, basename = os.path.split(file)
+        stem, ext = os.path.splitext(basename)
+        return os.path.join(dirname, ".%s.tmp%s" % (stem, ext))
+
+    @staticmethod
+    def _write(save_fn, file, state):
+        tmp_file = AsyncCheckpointWriter._temporary_file(file)
+
+        try:
+            save_fn(tmp_file, state)
+            os.replace(tmp_file, file)
+        except BaseException:
+            if os.path.isfile(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+        logger.debug("Checkpoint written to %s" % file)
+        return file
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def _check_errors(self, wait=False):
+        """
+        Removes finished futures and re-raises the first error
+
+        Parameters
+        ----------
+        wait : bool
+            whether to wait for all pending futures
+
+        """
+        futures, self._futures = self._futures, []
+        error = None
+
+        for _future in futures:
+            if not (wait or _future.done()):
+                self._futures.append(_future)
+                continue
+
+            _error = _future.exception()
+            if _error is not None and error is None:
+                error = _error
+
+        if error is not None:
+            raise error
+
+    def submit(self, save_fn, file, snapshot_fn):
+        """
+        Snapshots the state and writes it in the background
+
+        Parameters
+        ----------
+        save_fn : function
+            function serializing the state; called as ``save_fn(file, state)``
+            in the background thread
+        file : str
+            the file to write the checkpoint to
+        snapshot_fn : function
+            function without arguments, which returns a copy of the state
+            that is independent of further training (called in the calling
+            thread as soon as the number of pending snapshots allows it)
+
+        Raises
+        ------
+        Exception
+            any error raised while writing a previously submitted checkpoint
+
+        """
+        self._check_errors()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._slots.acquire()
+        try:
+            state = snapshot_fn()
+            future = self._executor.submit(self._write, save_fn, file, state)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(self._release_slot)
+        self._futures.append(future)
+
+    def submit_task(self, fn, *args, **kwargs):
+        """
+        Runs a function in the background thread after all previously
+        submitted checkpoints have been written (e.g. to update an index of
+        the written checkpoints)
+
+        Parameters
+        ----------
+        fn : function
+            the function to run
+        *args :
+            positional arguments for ``fn``
+        **kwargs :
+            keyword arguments for ``fn``
+
+        Raises
+        ------
+        Exception
+            any error raised while writing a previously submitted checkpoint
+
+        """
+        self._check_errors()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._futures.append(self._executor.submit(fn, *args, **kwargs))
+
+    def flush(self):
+        """
+        Waits until all submitted checkpoints are written
+
+        Raises
+        ------
+        Exception
+            any error raised while writing the submitted checkpoints
+
+        """
+        self._check_errors(wait=True)
+
+    def close(self):
+        """
+        Writes all pending checkpoints and stops the background thread
+        """
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self):
+        # neither the thread nor the pending futures can be pickled
+        self.flush()
+        return {"max_pending": self._max_pending}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -1,4 +1,5 @@
 import chainer
+import numpy as np
 import zipfile
 import os
 import json
@@ -71,6 +72,90 @@ def save_checkpoint(file, model=None, optimizers=None, epoch=None):
             os.remove(_file)
 
 
+class _SerializedState(dict):
+    """
+    Copied arrays of a serialized link or optimizer (keyed by their paths),
+    which can be written by the chainer serializers like the original
+    object
+    """
+
+    def serialize(self, serializer):
+        for key, value in self.items():
+            serializer(key, value)
+
+
+def _snapshot_state(obj):
+    """
+    Serializes the state of a link or an optimizer to copies of its arrays
+    in CPU memory
+
+    Parameters
+    ----------
+    obj : :class:`chainer.Link` or :class:`chainer.Optimizer`
+        the object to serialize
+
+    Returns
+    -------
+    :class:`_SerializedState`
+        the copied state
+
+    """
+    target = {}
+    chainer.serializers.DictionarySerializer(target).save(obj)
+    # the serializer only copies arrays from the GPU and references arrays
+    # in CPU memory, which are updated in-place by further training
+    return _SerializedState({key: np.array(value, copy=True)
+                             for key, value in target.items()})
+
+
+def snapshot_checkpoint(model=None, optimizers=None, epoch=None):
+    """
+    Creates a snapshot of the checkpoint state, which contains copies of the
+    serialized states of the model and the optimizers (e.g. the moments of
+    Adam) in CPU memory and is therefore not affected by further training.
+    The snapshot can be saved by :func:`write_checkpoint`
+
+    Parameters
+    ----------
+    model : :class:`AbstractChainerNetwork`
+    optimizers : dict
+        dictionary containing all optimizers
+    epoch : int
+        the current epoch
+
+    Returns
+    -------
+    dict
+        the checkpoint state
+
+    """
+    state = {"model": None, "optimizers": None, "epoch": epoch}
+
+    if model is not None:
+        state["model"] = _snapshot_state(model)
+
+    if optimizers is not None:
+        state["optimizers"] = {key: _snapshot_state(optim)
+                               for key, optim in optimizers.items()}
+
+    return state
+
+
+def write_checkpoint(file, state: dict):
+    """
+    Writes a snapshot created by :func:`snapshot_checkpoint`
+
+    Parameters
+    ----------
+    file : str
+        string containing the path, the snapshot should be saved to
+    state : dict
+        the snapshot
+
+    """
+    save_checkpoint(file, **state)
+
+
 def _deserialize_and_load(archive: zipfile.ZipFile, file: str, obj,
                           temp_dir: str):
     """
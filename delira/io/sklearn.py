@@ -1,3 +1,4 @@
+import copy
 import logging
 import joblib
 logger = logging.getLogger(__name__)
@@ -23,6 +24,45 @@ def save_checkpoint(file: str, model=None, epoch=None, **kwargs):
     return return_val
 
 
+def snapshot_checkpoint(model=None, epoch=None):
+    """
+    Creates a snapshot of the checkpoint state, which contains a copy of the
+    model and is therefore not affected by further training. The snapshot
+    can be saved by :func:`write_checkpoint`
+
+    Parameters
+    ----------
+    model : AbstractNetwork or None
+        the model which should be saved
+    epoch : int
+        current epoch
+
+    Returns
+    -------
+    dict
+        the checkpoint state
+
+    """
+    return {"model": copy.deepcopy(model), "epoch": epoch}
+
+
+def write_checkpoint(file: str, state: dict, **kwargs):
+    """
+    Writes a snapshot created by :func:`snapshot_checkpoint`
+
+    Parameters
+    ----------
+    file : str
+        filepath the snapshot should be saved to
+    state : dict
+        the snapshot
+    **kwargs :
+        additional keyword arguments (passed to :func:`joblib.dump`)
+
+    """
+    return joblib.dump(state, file, **kwargs)
+
+
 def load_checkpoint(file, **kwargs):
     """
     Loads a saved model
@@ -1,34 +1,33 @@
 from delira.models.backends.torchscript import AbstractTorchScriptNetwork
 from delira.models.backends.torch import AbstractPyTorchNetwork
 import torch
+import inspect
+import json
 import logging
 import os
+import pickle
+import types
+import zipfile
 from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
 
-def save_checkpoint_torch(file: str, model=None, optimizers=None,
-                          epoch=None, **kwargs):
+def _create_checkpoint_state_torch(model=None, optimizers=None, epoch=None):
     """
-    Save checkpoint
+    Creates the state to save from the model and the optimizers (see
+    :func:`save_checkpoint_torch` for the arguments)
 
-    Parameters
-    ----------
-    file : str
-        filepath the model should be saved to
-    model : AbstractNetwork or None
-        the model which should be saved
-        if None: empty dict will be saved as state dict
-    optimizers : dict
-        dictionary containing all optimizers
-    epoch : int
-        current epoch (will also be pickled)
+    Returns
+    -------
+    dict
+        the checkpoint state
 
     """
     if optimizers is None:
         optimizers = {}
-    if isinstance(model, torch.nn.DataParallel):
+    if isinstance(model, (torch.nn.DataParallel,
+                          torch.nn.parallel.DistributedDataParallel)):
         _model = model.module
     else:
         _model = model
@@ -55,10 +54,191 @@ def save_checkpoint_torch(file: str, model=None, optimizers=None,
              "model": model_state,
              "epoch": epoch}
 
+    # quantized networks need their quantization settings to re-create the
+    # quantized structure before loading the state
+    quantization_config = getattr(_model, "quantization_config", None)
+    if quantization_config is not None:
+        state["quantization"] = quantization_config
+
+    return state
+
+
+def save_checkpoint_torch(file: str, model=None, optimizers=None,
+                          epoch=None, **kwargs):
+    """
+    Save checkpoint
+
+    Parameters
+    ----------
+    file : str
+        filepath the model should be saved to
+    model : AbstractNetwork or None
+        the model which should be saved
+        if None: empty dict will be saved as state dict
+    optimizers : dict
+        dictionary containing all optimizers
+    epoch : int
+        current epoch (will also be pickled)
+
+    """
+    torch.save(_create_checkpoint_state_torch(model, optimizers, epoch),
+               file, **kwargs)
+
+
+def _copy_to_cpu(state):
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return type(state)((k, _copy_to_cpu(v)) for k, v in state.items())
+    if isinstance(state, (list, tuple)):
+        return type(state)(_copy_to_cpu(v) for v in state)
+    return state
+
+
+def snapshot_checkpoint_torch(model=None, optimizers=None, epoch=None):
+    """
+    Creates a snapshot of the checkpoint state, which contains copies of all
+    tensors in CPU memory and is therefore not affected by further training.
+    The snapshot can be saved by :func:`write_checkpoint_torch` (e.g. in a
+    background thread by a :class:`delira.io.AsyncCheckpointWriter`)
+
+    Parameters
+    ----------
+    model : AbstractNetwork or None
+        the model which should be saved
+    optimizers : dict
+        dictionary containing all optimizers
+    epoch : int
+        current epoch
+
+    Returns
+    -------
+    dict
+        the checkpoint state
+
+    """
+    return _copy_to_cpu(_create_checkpoint_state_torch(model, optimizers,
+                                                       epoch))
+
+
+def write_checkpoint_torch(file: str, state: dict, **kwargs):
+    """
+    Writes a snapshot created by :func:`snapshot_checkpoint_torch`
+
+    Parameters
+    ----------
+    file : str
+        filepath the snapshot should be saved to
+    state : dict
+        the snapshot
+    **kwargs :
+        additional keyword arguments (passed to :func:`torch.save`)
+
+    """
     torch.save(state, file, **kwargs)
 
 
-def load_checkpoint_torch(file, **kwargs):
+class _LazyStorage(object):
+    """
+    Placeholder for a storage of a checkpoint, which is only read from the
+    file when it is needed
+    """
+
+    def __init__(self, load_fn, saved_id):
+        self._load_fn = load_fn
+        self._saved_id = saved_id
+
+    def materialize(self):
+        return self._load_fn(self._saved_id)
+
+
+class _LazyTensor(object):
+    """
+    Placeholder for a tensor of a checkpoint, which is only created (and its
+    storage read from the file) when it is needed
+    """
+
+    def __init__(self, rebuild_fn, args):
+        self._rebuild_fn = rebuild_fn
+        self._args = args
+
+    def materialize(self):
+        return self._rebuild_fn(*_materialize(self._args))
+
+
+def _materialize(obj):
+    """
+    Replaces all placeholders in (possibly nested) checkpoint contents by
+    the actual storages and tensors
+
+    """
+    if isinstance(obj, (_LazyStorage, _LazyTensor)):
+        return obj.materialize()
+    if isinstance(obj, dict):
+        return type(obj)((k, _materialize(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_materialize(v) for v in obj)
+    return obj
+
+
+class _LazyUnpickler(pickle.Unpickler):
+    """
+    Unpickler returning placeholders instead of reading the tensor storages
+    (which are stored as separate records of the zipfile based format)
+
+    """
+
+    @property
+    def persistent_load(self):
+        return self._lazy_persistent_load
+
+    @persistent_load.setter
+    def persistent_load(self, load_fn):
+        # torch sets its storage loading function after creating the
+        # unpickler
+        self._storage_load_fn = load_fn
+
+    def _lazy_persistent_load(self, saved_id):
+        return _LazyStorage(self._storage_load_fn, saved_id)
+
+    def find_class(self, module, name):
+        obj = super().find_class(module, name)
+
+        if module == "torch._utils" and name == "_rebuild_tensor_v2":
+            return lambda *args: _LazyTensor(obj, args)
+
+        # all other tensor types are created directly
+        if module == "torch._utils" and name.startswith("_rebuild"):
+            return lambda *args: obj(*_materialize(args))
+
+        return obj
+
+
+_lazy_pickle_module = types.ModuleType("_delira_lazy_pickle")
+_lazy_pickle_module.__dict__.update(pickle.__dict__)
+_lazy_pickle_module.Unpickler = _LazyUnpickler
+
+# the sections of a checkpoint containing tensors
+_STATE_SECTIONS = ("model", "optimizer")
+
+
+def _supports_mmap():
+    return "mmap" in inspect.signature(torch.load).parameters
+
+
+def _select_sections(checkpoint, sections):
+    return {k: v for k, v in checkpoint.items()
+            if k in sections or k not in _STATE_SECTIONS}
+
+
+def _unwrap_checkpoint(checkpoint):
+    if not all([_key in checkpoint
+                for _key in ["model", "optimizer", "epoch"]]):
+        return checkpoint['state_dict']
+    return checkpoint
+
+
+def load_checkpoint_torch(file, sections=None, mmap=False, **kwargs):
     """
     Loads a saved model
 
@@ -66,6 +246,16 @@ def load_checkpoint_torch(file, **kwargs):
     ----------
     file : str
         filepath to a file containing a saved model
+    sections : list, optional
+        the sections of the checkpoint to load (any of ['model',
+        'optimizer']); the tensors of the other sections are not read at
+        all for checkpoints in the zipfile based format (the default since
+        torch 1.6). Entries without tensors (like the epoch) are always
+        loaded. Per default all sections are loaded
+    mmap : bool
+        whether to memory-map the tensor storages instead of reading them
+        into memory (only supported by torch versions providing the
+        ``mmap`` argument of :func:`torch.load`; ignored otherwise)
     **kwargs:
         Additional keyword arguments (passed to torch.load)
         Especially "map_location" is important to change the device the
@@ -76,15 +266,122 @@ def load_checkpoint_torch(file, **kwargs):
     OrderedDict
         checkpoint state_dict
 
+    Notes
+    -----
+    Checkpoints of quantized networks additionally contain the quantization
+    settings as ``"quantization"``. To load them, the quantized structure
+    has to be re-created first by
+    :func:`delira.models.backends.torch.restore_quantized_network`
+
+    See Also
+    --------
+    :func:`load_model_state_torch` to load the model state directly into a
+    network
+
     """
-    checkpoint = torch.load(file, **kwargs)
+    if mmap and not _supports_mmap():
+        logger.debug("torch %s does not support memory-mapped loading"
+                     % torch.__version__)
+        mmap = False
+
+    if mmap and zipfile.is_zipfile(file):
+        checkpoint = _unwrap_checkpoint(torch.load(file, mmap=True,
+                                                   **kwargs))
+
+    elif sections is not None and zipfile.is_zipfile(file):
+        # read only the storages of the requested sections
+        with open(file, "rb") as f:
+            checkpoint = _unwrap_checkpoint(
+                torch.load(f, pickle_module=_lazy_pickle_module, **kwargs))
+            return _materialize(_select_sections(checkpoint, sections))
+
+    else:
+        checkpoint = _unwrap_checkpoint(torch.load(file, **kwargs))
+
+    if sections is not None:
+        checkpoint = _select_sections(checkpoint, sections)
 
-    if not all([_key in checkpoint
-                for _key in ["model", "optimizer", "epoch"]]):
-        return checkpoint['state_dict']
     return checkpoint
 
 
+def load_model_state_torch(file, model, strict=True, **kwargs):
+    """
+    Loads the model state of a checkpoint directly into the parameters and
+    buffers of an existing network.
+
+    In contrast to :func:`load_checkpoint_torch` followed by
+    ``load_state_dict``, the optimizer states of the checkpoint are neither
+    read nor unpickled (for checkpoints in the zipfile based format), which
+    lowers the peak memory and the start-up time for large networks (e.g.
+    for testing or inference). The state is loaded by the network's
+    ``load_state_dict`` (and thus also supports modules with custom loading
+    hooks).
+
+    Parameters
+    ----------
+    file : str
+        filepath to a file containing a saved model
+    model : :class:`torch.nn.Module`
+        the network to load the state into (:class:`torch.nn.DataParallel`
+        will be unwrapped)
+    strict : bool
+        whether the keys of the checkpoint and the network's state must match
+        exactly
+    **kwargs :
+        additional keyword arguments (passed to :func:`torch.load`)
+
+    Returns
+    -------
+    dict
+        the remaining entries of the checkpoint (without model and optimizer
+        states; e.g. the epoch)
+
+    Raises
+    ------
+    RuntimeError
+        if the state does not match the network
+
+    """
+    if isinstance(model, (torch.nn.DataParallel,
+                          torch.nn.parallel.DistributedDataParallel)):
+        model = model.module
+
+    with open(file, "rb") as f:
+        if zipfile.is_zipfile(file):
+            checkpoint = torch.load(f, pickle_module=_lazy_pickle_module,
+                                    **kwargs)
+        else:
+            checkpoint = torch.load(f, **kwargs)
+
+        if "model" in checkpoint:
+            model_state = checkpoint["model"]
+        else:
+            model_state = checkpoint["state_dict"]
+
+        target_state = model.state_dict()
+
+        state = {}
+        for key, value in model_state.items():
+            value = _materialize(value)
+            target = target_state.get(key)
+            if (isinstance(value, torch.Tensor)
+                    and isinstance(target, torch.Tensor)
+                    and value.shape != target.shape):
+                raise RuntimeError("Size mismatch for %s: the shape in the "
+                                   "checkpoint is %s, but the shape of the "
+                                   "network is %s"
+                                   % (key, str(tuple(value.shape)),
+                                      str(tuple(target.shape))))
+            state[key] = value
+
+        # let the network load the state itself to support modules with
+        # custom loading (e.g. extra states or packed quantized parameters)
+        model.load_state_dict(state, strict=strict)
+
+    return {k: v for k, v in checkpoint.items()
+            if k not in _STATE_SECTIONS + ("state_dict",)}
+
+
 def save_checkpoint_torchscript(file: str, model=None, optimizers=None,
                                 epoch=None, **kwargs):
     """
@@ -170,3 +467,204 @@ def load_checkpoint_torchscript(file: str, **kwargs):
     trainer_state.update({"model": torch.jit.load(model_file)})
 
     return trainer_state
+
+
+def _flatten_outputs(outputs):
+    """
+    Flattens (possibly nested) network outputs to a list of tensors
+
+    Parameters
+    ----------
+    outputs : Any
+        the network outputs
+
+    Returns
+    -------
+    list
+        all tensors contained in ``outputs`` (in a deterministic order)
+
+    """
+    if isinstance(outputs, torch.Tensor):
+        return [outputs]
+    if isinstance(outputs, dict):
+        return [_tensor for _key in sorted(outputs.keys())
+                for _tensor in _flatten_outputs(outputs[_key])]
+    if isinstance(outputs, (list, tuple)):
+        return [_tensor for _item in outputs
+                for _tensor in _flatten_outputs(_item)]
+    return []
+
+
+def export_inference_torchscript(file: str, model, example_inputs: dict,
+                                 check_inputs=None, method="trace",
+                                 freeze=True, rtol=1e-4, atol=1e-5):
+    """
+    Exports a trained network as (frozen) TorchScript module for inference.
+
+    The network is switched to evaluation mode, traced (or scripted) with the
+    given example inputs, frozen (parameters are inlined as constants, which
+    enables constant folding and operator fusion) and checked for numerical
+    parity against the eager network before it is saved.
+
+    Parameters
+    ----------
+    file : str
+        filepath the module should be saved to
+    model : :class:`AbstractPyTorchNetwork` or :class:`torch.nn.Module`
+        the trained network (:class:`torch.nn.DataParallel` will be
+        unwrapped)
+    example_inputs : dict
+        keyword inputs for the network's forward (keys must correspond to the
+        names of the forward's arguments, typically the keys of the
+        trainer's ``key_mapping``)
+    check_inputs : list
+        additional dicts of keyword inputs to check the numerical parity on;
+        the ``example_inputs`` are always checked
+    method : str
+        one of ['trace', 'script']; whether to trace the network with the
+        example inputs or to compile it with :func:`torch.jit.script`
+    freeze : bool
+        whether to freeze the module (requires a torch version providing
+        :func:`torch.jit.freeze`; ignored otherwise)
+    rtol : float
+        relative tolerance for the parity check
+    atol : float
+        absolute tolerance for the parity check
+
+    Returns
+    -------
+    :class:`torch.jit.ScriptModule`
+        the exported module
+
+    Raises
+    ------
+    ValueError
+        invalid ``method`` or ``example_inputs`` not matching the forward's
+        arguments
+    RuntimeError
+        if the exported module's outputs differ from the eager outputs
+
+    """
+    if isinstance(model, torch.nn.DataParallel):
+        model = model.module
+
+    if check_inputs is None:
+        check_inputs = []
+    check_inputs = [example_inputs] + list(check_inputs)
+
+    # order the keyword inputs by the forward's signature since tracing only
+    # supports positional inputs
+    input_names = [_name for _name in
+                   inspect.signature(model.forward).parameters.keys()
+                   if _name in example_inputs]
+
+    if len(input_names) != len(example_inputs):
+        raise ValueError("The example inputs %s do not match the arguments "
+                         "of the network's forward"
+                         % str(sorted(example_inputs.keys())))
+
+    was_training = model.training
+    model.eval()
+
+    try:
+        with torch.no_grad():
+            if method == "trace":
+                trace_kwargs = {}
+                # allow dict outputs (only exists for newer torch versions)
+                if "strict" in inspect.signature(
+                        torch.jit.trace).parameters:
+                    trace_kwargs["strict"] = False
+
+                exported = torch.jit.trace(
+                    model,
+                    tuple(example_inputs[_name] for _name in input_names),
+                    check_trace=False, **trace_kwargs)
+
+            elif method == "script":
+                exported = torch.jit.script(model)
+
+            else:
+                raise ValueError("method must be one of ['trace', 'script'], "
+                                 "but got %s" % str(method))
+
+            exported.eval()
+
+            if freeze and hasattr(torch.jit, "freeze"):
+                exported = torch.jit.freeze(exported)
+            elif freeze:
+                logger.info("torch.jit.freeze is not available in torch %s; "
+                            "exporting an unfrozen module"
+                            % torch.__version__)
+                freeze = False
+
+            for _inputs in check_inputs:
+                eager_outputs = _flatten_outputs(model(**_inputs))
+                exported_outputs = _flatten_outputs(exported(**_inputs))
+
+                if len(eager_outputs) != len(exported_outputs):
+                    raise RuntimeError("Exported module returns %d tensors, "
+                                       "but the eager network returns %d"
+                                       % (len(exported_outputs),
+                                          len(eager_outputs)))
+
+                for _eager, _exported in zip(eager_outputs,
+                                             exported_outputs):
+                    if not torch.allclose(_eager, _exported, rtol=rtol,
+                                          atol=atol):
+                        raise RuntimeError(
+                            "Numerical parity check failed: maximum absolute "
+                            "difference between eager and exported outputs "
+                            "is %f" % (_eager - _exported).abs().max().item())
+
+    finally:
+        model.train(was_training)
+
+    meta = {"input_names": input_names,
+            "method": method,
+            "frozen": bool(freeze),
+            "torch_version": torch.__version__}
+
+    torch.jit.save(exported, file,
+                   _extra_files={"delira_inference.json": json.dumps(meta)})
+
+    return exported
+
+
+def load_inference_torchscript(file: str, optimize=True, **kwargs):
+    """
+    Loads a module saved by :func:`export_inference_torchscript`.
+    The returned module can directly be passed as ``model`` to a
+    :class:`Predictor`
+
+    Parameters
+    ----------
+    file : str
+        filepath to the saved module
+    optimize : bool
+        whether to run :func:`torch.jit.optimize_for_inference` on frozen
+        modules (if available in the installed torch version). This is done at
+        load time, since the optimized graph may contain device-specific
+        operations
+    **kwargs :
+        additional keyword arguments (passed to :func:`torch.jit.load`);
+        especially ``map_location`` to change the device
+
+    Returns
+    -------
+    :class:`torch.jit.ScriptModule`
+        the loaded inference module
+
+    """
+    extra_files = {"delira_inference.json": ""}
+    module = torch.jit.load(file, _extra_files=extra_files, **kwargs)
+    module.eval()
+
+    meta = {}
+    if extra_files["delira_inference.json"]:
+        meta = json.loads(extra_files["delira_inference.json"])
+
+    if optimize and meta.get("frozen", False) and \
+            hasattr(torch.jit, "optimize_for_inference"):
+        module = torch.jit.optimize_for_inference(module)
+
+    return module
@@ -1,15 +1,44 @@
+import contextlib
 from inspect import signature as get_signature
+
+import numpy as np
+from joblib import Parallel, delayed, parallel_backend
 from sklearn.base import BaseEstimator
 
 from delira.models.abstract_network import AbstractNetwork
 
 
+def _n_jobs_params(estimator):
+    """
+    Returns the names of the ``n_jobs`` parameters of an estimator and its
+    nested estimators (e.g. the estimators wrapped by
+    :class:`sklearn.multiclass.OneVsRestClassifier` or
+    :class:`sklearn.multioutput.MultiOutputRegressor`) sorted by depth
+
+    """
+    if not hasattr(estimator, "get_params"):
+        return []
+
+    return sorted((key for key in estimator.get_params(deep=True)
+                   if key == "n_jobs" or key.endswith("__n_jobs")),
+                  key=lambda key: key.count("__"))
+
+
+def _predict_chunk(estimator, X):
+    return estimator.predict(X)
+
+
 class SklearnEstimator(AbstractNetwork):
     """
     Wrapper Class to wrap all ``sklearn`` estimators and provide delira
     compatibility
     """
 
+    # the parallelism set up by :meth:`configure_parallelism`
+    n_jobs = None
+    joblib_backend = None
+    predict_chunk_size = None
+
     def __init__(self, module: BaseEstimator):
         """
 
@@ -39,7 +68,16 @@ class SklearnEstimator(AbstractNetwork):
 
     def __call__(self, *args, **kwargs):
         """
-        Calls ``self.predict`` with args and kwargs
+        Calls ``self.predict`` with args and kwargs.
+
+        If a ``predict_chunk_size`` and more than one job are configured
+        (see :meth:`configure_parallelism`), inputs with more samples than
+        the chunk size are split into chunks, which are predicted in
+        parallel by a pool of worker processes (or by the configured
+        ``joblib`` backend). The estimator's own ``n_jobs`` parameters are
+        set to one meanwhile to not exceed the number of jobs. Only a single
+        (large) input is split this way; the batches of a
+        :class:`DataManager` are predicted one after another.
 
         Parameters
         ----------
@@ -54,8 +92,109 @@ class SklearnEstimator(AbstractNetwork):
             dictionary containing the predictions under key 'pred'
 
         """
+        if (len(args) == 1 and not kwargs and self.n_jobs is not None
+                and self.n_jobs != 1 and self.predict_chunk_size
+                and len(args[0]) > self.predict_chunk_size):
+            return {"pred": self._predict_parallel(args[0])}
+
         return {"pred": self.predict(*args, **kwargs)}
 
+    def _predict_parallel(self, X):
+        chunks = [X[idx: idx + self.predict_chunk_size]
+                  for idx in range(0, len(X), self.predict_chunk_size)]
+
+        params = _n_jobs_params(self.module)
+        prev_params = {key: val for key, val in
+                       self.module.get_params(deep=True).items()
+                       if key in params}
+
+        self.module.set_params(**{key: 1 for key in params})
+        try:
+            with self.parallel_context():
+                preds = Parallel(n_jobs=self.n_jobs)(
+                    delayed(_predict_chunk)(self.module, chunk)
+                    for chunk in chunks)
+        finally:
+            self.module.set_params(**prev_params)
+
+        return np.concatenate(preds)
+
+    def set_n_jobs(self, n_jobs):
+        """
+        Sets the number of jobs of the wrapped estimator: the outermost
+        ``n_jobs`` parameters (e.g. of a
+        :class:`sklearn.multiclass.OneVsRestClassifier`, which fits its
+        binary estimators in parallel) receive ``n_jobs``, while the
+        estimators nested inside of them run with a single job to not
+        multiply the number of jobs
+
+        Parameters
+        ----------
+        n_jobs : int
+            the number of jobs
+
+        Returns
+        -------
+        dict
+            the values of all ``n_jobs`` parameters, which have been set
+            (empty if the estimator does not support parallelism)
+
+        """
+        params = _n_jobs_params(self.module)
+        if not params:
+            return {}
+
+        min_depth = params[0].count("__")
+        new_params = {key: n_jobs if key.count("__") == min_depth else 1
+                      for key in params}
+
+        self.module.set_params(**new_params)
+        return new_params
+
+    def configure_parallelism(self, n_jobs=None, joblib_backend=None,
+                              predict_chunk_size=None):
+        """
+        Configures the parallelism of fitting and prediction
+
+        Parameters
+        ----------
+        n_jobs : int, optional
+            the number of jobs of the estimator (see :meth:`set_n_jobs`)
+            and of the chunked prediction; if None: the estimator's
+            parameters are not changed and the prediction is not chunked
+        joblib_backend : str, optional
+            the ``joblib`` backend (e.g. 'loky' or 'threading') to fit and
+            predict with; defaults to the estimator's choice
+        predict_chunk_size : int, optional
+            the number of samples per chunk to predict in parallel; if None:
+            the prediction is not chunked
+
+        """
+        self.n_jobs = n_jobs
+        self.joblib_backend = joblib_backend
+        self.predict_chunk_size = predict_chunk_size
+
+        if n_jobs is not None:
+            self.set_n_jobs(n_jobs)
+
+    def parallel_context(self):
+        """
+        Returns a context activating the configured ``joblib`` backend (see
+        :meth:`configure_parallelism`)
+
+        Returns
+        -------
+        context manager
+            the context (does nothing if no backend is configured)
+
+        """
+        if self.joblib_backend is None:
+            return contextlib.suppress()
+
+        if self.n_jobs is None:
+            return parallel_backend(self.joblib_backend)
+        return parallel_backend(self.joblib_backend, n_jobs=self.n_jobs)
+
     @property
     def iterative_training(self):
         """
@@ -98,7 +237,13 @@ class SklearnEstimator(AbstractNetwork):
 
         new_batch = {"X": batch["data"].reshape(batch["data"].shape[0], -1)}
         if "label" in batch:
-            new_batch["y"] = batch["label"].ravel()
+            label = batch["label"]
+            if label.size == label.shape[0]:
+                new_batch["y"] = label.ravel()
+            else:
+                # multiple targets per sample (e.g. for multi-output
+                # estimators)
+                new_batch["y"] = label.reshape(label.shape[0], -1)
 
         return new_batch
 
@@ -145,13 +290,14 @@ class SklearnEstimator(AbstractNetwork):
         else:
             fit_fn = model.fit
 
-        if hasattr(model, "classes"):
-            # classes must be specified here, because not all classes
-            # must be present in each batch and some estimators are build
-            # dynamically
-            fit_fn(**data_dict, classes=model.classes)
-        else:
-            fit_fn(**data_dict)
+        with model.parallel_context():
+            if hasattr(model, "classes"):
+                # classes must be specified here, because not all classes
+                # must be present in each batch and some estimators are
+                # build dynamically
+                fit_fn(**data_dict, classes=model.classes)
+            else:
+                fit_fn(**data_dict)
 
         preds = model(data_dict["X"])
 
@@ -139,8 +139,7 @@ class AbstractTfEagerNetwork(AbstractNetwork, tf.keras.layers.Layer):
         Returns
         -------
         dict
-            Loss values (with same keys as input dict losses; will always
-            be empty here)
+            Loss values as tensors (with same keys as input dict losses)
         dict
             dictionary containing all predictions
 
@@ -155,7 +154,9 @@ class AbstractTfEagerNetwork(AbstractNetwork, tf.keras.layers.Layer):
             for k, loss_fn in losses.items():
                 _loss_val = loss_fn(preds["pred"],
                                     data_dict["label"])
-                loss_vals[k] = _loss_val.numpy()
+                # kept as tensor (to be usable in a compiled step); the
+                # trainer converts it to numpy afterwards
+                loss_vals[k] = _loss_val
                 if total_loss is None:
                     total_loss = _loss_val
                 else:
@@ -35,6 +35,7 @@ class AbstractTfGraphNetwork(AbstractNetwork, metaclass=abc.ABCMeta):
         self._losses = None
         self._optims = None
         self.training = True
+        self.input_iterator = None
 
     def __call__(self, *args, **kwargs):
         """
@@ -88,6 +89,58 @@ class AbstractTfGraphNetwork(AbstractNetwork, metaclass=abc.ABCMeta):
 
         return self._sess.run(self.outputs_eval, feed_dict=_feed_dict)
 
+    def _build_inputs(self, input_specs: dict):
+        """
+        Creates the network's inputs, which can either be fed (like
+        placeholders) or pulled from the :attr:`input_iterator` by the graph
+        itself, if they are not fed. Networks using these inputs support the
+        ``"dataset"`` input mode of the :class:`TfGraphNetworkTrainer`
+
+        Parameters
+        ----------
+        input_specs : dict
+            dictionary containing a tuple of dtype and shape for each input
+            (e.g. ``{"data": (tf.float32, [None, 32])}``)
+
+        Returns
+        -------
+        dict
+            the created inputs (which are also registered in ``self.inputs``)
+
+        """
+        self.input_iterator = tf.data.Iterator.from_structure(
+            {k: v[0] for k, v in input_specs.items()},
+            {k: tf.TensorShape(v[1]) for k, v in input_specs.items()})
+        next_batch = self.input_iterator.get_next()
+
+        for k, (_, shape) in input_specs.items():
+            self.inputs[k] = tf.placeholder_with_default(next_batch[k],
+                                                         shape, name=k)
+
+        return dict(self.inputs)
+
+    def run_from_iterator(self):
+        """
+        Evaluates `self.outputs_train` or `self.outputs_eval` based on
+        `self.training` with inputs pulled from the :attr:`input_iterator`
+
+        Returns
+        -------
+        dict
+            sames keys as outputs_train or outputs_eval,
+            containing evaluated expressions as values
+        dict
+            the pulled inputs
+
+        """
+        if self.training:
+            outputs = self.outputs_train
+        else:
+            outputs = self.outputs_eval
+
+        results = self._sess.run({"outputs": outputs, "inputs": self.inputs})
+        return results["outputs"], results["inputs"]
+
     def _add_losses(self, losses: dict):
         """
         Adds losses to model that are to be used by optimizers or
@@ -209,3 +262,46 @@ class AbstractTfGraphNetwork(AbstractNetwork, metaclass=abc.ABCMeta):
         loss_vals = outputs['losses']
 
         return loss_vals, outputs
+
+    @staticmethod
+    def closure_from_iterator(model, data_dict: dict, optimizers: dict,
+                              losses: dict, iter_num: int, fold=0,
+                              **kwargs):
+        """
+        closure method to do a single training step with the inputs pulled
+        from the network's :attr:`input_iterator` (as used by the
+        ``"dataset"`` input mode of the :class:`TfGraphNetworkTrainer`);
+        Could be overwritten for more advanced models
+
+        Parameters
+        ----------
+        model : :class:`AbstractTfGraphNetwork`
+            trainable model
+        data_dict : dict
+            dictionary containing the data; ignored here, since the data is
+            pulled by the graph
+        optimizers : dict
+            dictionary of optimizers to optimize model's parameters;
+            ignored here, just passed for compatibility reasons
+        losses : dict
+            dict holding the losses to calculate errors;
+            ignored here, just passed for compatibility reasons
+        iter_num: int
+            the number of of the current iteration in the current epoch;
+            Will be restarted at zero at the beginning of every epoch
+        fold : int
+            Current Fold in Crossvalidation (default: 0)
+        **kwargs:
+            additional keyword arguments
+
+        Returns
+        -------
+        dict
+            Loss values
+        dict
+            dictionary containing all predictions and the pulled inputs
+
+        """
+        outputs, inputs = model.run_from_iterator()
+
+        return outputs['losses'], {**inputs, **outputs}
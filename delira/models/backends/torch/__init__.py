@@ -4,5 +4,9 @@ if "TORCH" in _get_backends():
     from delira.models.backends.torch.abstract_network import \
         AbstractPyTorchNetwork
     from delira.models.backends.torch.data_parallel import \
-        DataParallelPyTorchNetwork
-    from delira.models.backends.torch.utils import scale_loss
+        DataParallelPyTorchNetwork, DistributedDataParallelPyTorchNetwork
+    from delira.models.backends.torch.quantization import \
+        QuantizedPyTorchNetwork, quantize_dynamic_network, \
+        quantize_static_network, restore_quantized_network
+    from delira.models.backends.torch.utils import scale_loss, autocast, \
+        to_full_precision
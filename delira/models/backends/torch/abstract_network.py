@@ -2,7 +2,8 @@ import abc
 import torch
 from delira.models.abstract_network import AbstractNetwork
 
-from delira.models.backends.torch.utils import scale_loss
+from delira.models.backends.torch.utils import scale_loss, autocast, \
+    to_full_precision
 
 
 class AbstractPyTorchNetwork(AbstractNetwork, torch.nn.Module):
@@ -121,7 +122,9 @@ class AbstractPyTorchNetwork(AbstractNetwork, torch.nn.Module):
         fold : int
             Current Fold in Crossvalidation (default: 0)
         **kwargs:
-            additional keyword arguments
+            additional keyword arguments; ``autocast_dtype`` enables the
+            mixed precision forward pass with the given lower precision type
+            (see :func:`delira.models.backends.torch.autocast`)
 
         Returns
         -------
@@ -137,9 +140,14 @@ class AbstractPyTorchNetwork(AbstractNetwork, torch.nn.Module):
 
         with torch.enable_grad():
 
-            # predict
+            # predict (only the forward pass runs in mixed precision)
             inputs = data_dict["data"]
-            preds = model(inputs)
+            with autocast(kwargs.get("autocast_dtype", None),
+                          inputs.device.type):
+                preds = model(inputs)
+
+            # compute the losses in full precision for numerical stability
+            preds = to_full_precision(preds)
 
             # calculate losses
             for key, crit_fn in losses.items():
@@ -66,3 +66,73 @@ class DataParallelPyTorchNetwork(AbstractPyTorchNetwork,
     @property
     def prepare_batch(self):
         return self.module.prepare_batch
+
+
+class DistributedDataParallelPyTorchNetwork(
+        torch.nn.parallel.DistributedDataParallel, AbstractPyTorchNetwork):
+    """
+    A Wrapper around a :class:`AbstractPyTorchNetwork` instance to
+    implement multi-process data parallel training by all-reducing the
+    gradients of all processes during the backward pass.
+
+    The default process group of :mod:`torch.distributed` must be
+    initialized before creating this wrapper.
+
+    """
+
+    def __init__(self, module: AbstractPyTorchNetwork, device_ids=None,
+                 output_device=None, dim=0, **kwargs):
+        """
+
+        Parameters
+        ----------
+        module : :class:`AbstractPyTorchNetwork`
+            the module to wrap (its parameters will be synchronized with
+            the module of the process with rank 0)
+        device_ids : list
+            the device of the module (must be None for CPU modules and for
+            multi-device modules)
+        output_device : str or :class:`torch.device`
+            The output device (must be None for CPU modules)
+        dim : int
+            the index of the batchdimension (usually 0, but can become
+            e.g. 1 in NLP tasks)
+        **kwargs :
+            additional keyword arguments (passed to
+            :class:`torch.nn.parallel.DistributedDataParallel`)
+
+        """
+
+        # initializes AbstractPyTorchNetwork as base of
+        # DistributedDataParallel in the method resolution order
+        torch.nn.parallel.DistributedDataParallel.__init__(
+            self, module, device_ids, output_device, dim, **kwargs)
+
+    def forward(self, *args, **kwargs):
+        """
+        Feeds the inputs through the wrapped module and prepares the
+        gradient synchronization for the following backward pass
+
+        Parameters
+        ----------
+        *args :
+            positional arguments of arbitrary number and type
+        **kwargs :
+            keyword arguments of arbitrary number and type
+
+        Returns
+        -------
+        Any
+            the module's outputs
+
+        """
+        return torch.nn.parallel.DistributedDataParallel.forward(
+            self, *args, **kwargs)
+
+    @property
+    def closure(self):
+        return self.module.closure
+
+    @property
+    def prepare_batch(self):
+        return self.module.prepare_batch
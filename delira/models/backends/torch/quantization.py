@@ -0,0 +1,281 @@
+import copy
+import inspect
+import logging
+import warnings
+
+import torch
+
+from delira.models.backends.torch.abstract_network import \
+    AbstractPyTorchNetwork
+
+logger = logging.getLogger(__name__)
+
+try:
+    from torch.quantization.quantize_fx import prepare_fx, convert_fx
+except ImportError:
+    prepare_fx, convert_fx = None, None
+
+
+class QuantizedPyTorchNetwork(AbstractPyTorchNetwork):
+    """
+    A Wrapper around a quantized copy of an :class:`AbstractPyTorchNetwork`
+    for CPU inference.
+
+    The wrapper keeps the ``prepare_batch`` and ``closure`` functions of the
+    original network class (which may get lost during graph mode
+    quantization) and stores the quantization settings needed to re-create
+    the quantized structure before loading a saved state.
+
+    See Also
+    --------
+    :func:`quantize_dynamic_network`
+    :func:`quantize_static_network`
+    :func:`restore_quantized_network`
+
+    """
+
+    def __init__(self, module: torch.nn.Module, network_cls,
+                 quantization_config: dict):
+        """
+
+        Parameters
+        ----------
+        module : :class:`torch.nn.Module`
+            the quantized module
+        network_cls : type
+            the class of the original (not quantized) network
+        quantization_config : dict
+            the settings used for quantization
+
+        """
+        super().__init__()
+        self.module = module
+        self._network_cls = network_cls
+        self.quantization_config = quantization_config
+
+    def forward(self, *args, **kwargs):
+        """
+        Forwards all inputs through the quantized module
+
+        Parameters
+        ----------
+        *args :
+            positional arguments of arbitrary number and type
+        **kwargs :
+            keyword arguments of arbitrary number and type
+
+        Returns
+        -------
+        Any
+            the outputs of the quantized module
+
+        """
+        return self.module(*args, **kwargs)
+
+    @property
+    def closure(self):
+        return self._network_cls.closure
+
+    @property
+    def prepare_batch(self):
+        return self._network_cls.prepare_batch
+
+
+def _unwrap_network(network):
+    if isinstance(network, torch.nn.DataParallel):
+        network = network.module
+    if isinstance(network, QuantizedPyTorchNetwork):
+        raise ValueError("The given network is already quantized")
+    return network
+
+
+def _resolve_layer_types(layer_types):
+    resolved = set()
+    for _type in layer_types:
+        if isinstance(_type, str):
+            _type = getattr(torch.nn, _type)
+        resolved.add(_type)
+    return resolved
+
+
+def quantize_dynamic_network(network: AbstractPyTorchNetwork,
+                             layer_types=("Linear", "LSTM"),
+                             dtype="qint8"):
+    """
+    Applies dynamic quantization to a copy of the given network.
+    The weights of all layers of the given types are quantized ahead of
+    time, while the activations are quantized on the fly during inference.
+
+    Parameters
+    ----------
+    network : :class:`AbstractPyTorchNetwork`
+        the network to quantize (will not be modified)
+    layer_types : tuple
+        the layer types to quantize (either as classes or as names of
+        classes inside :mod:`torch.nn`); default: ("Linear", "LSTM")
+    dtype : str
+        the quantized weight dtype; either "qint8" or "float16"
+
+    Returns
+    -------
+    :class:`QuantizedPyTorchNetwork`
+        the quantized network (for CPU inference only)
+
+    """
+    network = _unwrap_network(network)
+
+    if dtype not in ("qint8", "float16"):
+        raise ValueError("Invalid dtype for dynamic quantization: %s"
+                         % str(dtype))
+
+    config = {"mode": "dynamic",
+              "dtype": dtype,
+              "layer_types": [_type if isinstance(_type, str)
+                              else _type.__name__
+                              for _type in layer_types]}
+
+    quantized = torch.quantization.quantize_dynamic(
+        copy.deepcopy(network).cpu().eval(),
+        _resolve_layer_types(layer_types),
+        dtype=getattr(torch, dtype))
+
+    return QuantizedPyTorchNetwork(quantized, type(network), config)
+
+
+def _prepare_static(network, example_inputs, backend):
+    if prepare_fx is None:
+        raise RuntimeError("Static quantization requires graph mode "
+                           "quantization (torch.quantization.quantize_fx), "
+                           "which is not available in torch %s"
+                           % torch.__version__)
+
+    torch.backends.quantized.engine = backend
+    qconfig_dict = {"": torch.quantization.get_default_qconfig(backend)}
+    network = copy.deepcopy(network).cpu().eval()
+
+    # newer torch versions require example inputs for graph tracing
+    if "example_inputs" in inspect.signature(prepare_fx).parameters:
+        forward_args = list(inspect.signature(
+            network.forward).parameters.keys())
+        return prepare_fx(network, qconfig_dict, example_inputs=tuple(
+            example_inputs[_name] for _name in forward_args
+            if _name in example_inputs))
+
+    return prepare_fx(network, qconfig_dict)
+
+
+def _to_cpu(inputs):
+    return {k: v.cpu() if isinstance(v, torch.Tensor) else v
+            for k, v in inputs.items()}
+
+
+def quantize_static_network(network: AbstractPyTorchNetwork,
+                            calibration_inputs, backend="fbgemm"):
+    """
+    Applies post-training static quantization to a copy of the given
+    network. The network is traced by :mod:`torch.fx`, observers are
+    inserted and the quantization parameters of the activations are
+    calibrated by feeding the given inputs through the network.
+
+    Parameters
+    ----------
+    network : :class:`AbstractPyTorchNetwork`
+        the network to quantize (will not be modified); the forward pass
+        must be symbolically traceable by :mod:`torch.fx`
+    calibration_inputs : list
+        a list of dicts containing the keyword inputs of the network,
+        which are used for calibration
+    backend : str
+        the quantized engine; "fbgemm" (x86) or "qnnpack" (ARM)
+
+    Returns
+    -------
+    :class:`QuantizedPyTorchNetwork`
+        the quantized network (for CPU inference only)
+
+    Raises
+    ------
+    ValueError
+        no calibration inputs are given
+    RuntimeError
+        graph mode quantization is not available in the installed torch
+        version
+
+    """
+    network = _unwrap_network(network)
+
+    if not calibration_inputs:
+        raise ValueError("Static quantization requires at least one batch "
+                         "of calibration inputs")
+
+    calibration_inputs = [_to_cpu(_inputs) for _inputs in calibration_inputs]
+
+    prepared = _prepare_static(network, calibration_inputs[0], backend)
+
+    with torch.no_grad():
+        for _inputs in calibration_inputs:
+            prepared(**_inputs)
+
+    config = {"mode": "static", "backend": backend}
+    return QuantizedPyTorchNetwork(convert_fx(prepared), type(network),
+                                   config)
+
+
+def restore_quantized_network(network: AbstractPyTorchNetwork,
+                              quantization_config: dict, state_dict=None,
+                              example_inputs=None):
+    """
+    Re-creates the quantized structure of a network (e.g. after loading a
+    checkpoint saved by :func:`delira.io.torch.save_checkpoint_torch`) and
+    optionally loads a quantized state into it.
+
+    Parameters
+    ----------
+    network : :class:`AbstractPyTorchNetwork`
+        a freshly created (not quantized) instance of the network
+    quantization_config : dict
+        the quantization settings (stored as ``"quantization"`` inside the
+        checkpoint)
+    state_dict : dict, optional
+        the quantized state to load (stored as ``"model"`` inside the
+        checkpoint)
+    example_inputs : dict, optional
+        keyword inputs of the network; only necessary for static
+        quantization with torch versions requiring example inputs for
+        tracing
+
+    Returns
+    -------
+    :class:`QuantizedPyTorchNetwork`
+        the quantized network
+
+    """
+    mode = quantization_config["mode"]
+
+    if mode == "dynamic":
+        quantized = quantize_dynamic_network(
+            network, quantization_config["layer_types"],
+            quantization_config["dtype"])
+
+    elif mode == "static":
+        if example_inputs is None:
+            example_inputs = {}
+        network = _unwrap_network(network)
+        prepared = _prepare_static(network, example_inputs,
+                                   quantization_config["backend"])
+
+        # the observers are not calibrated here, since all quantization
+        # parameters are part of the state to be loaded
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            quantized = QuantizedPyTorchNetwork(convert_fx(prepared),
+                                                type(network),
+                                                quantization_config)
+
+    else:
+        raise ValueError("Invalid quantization mode: %s" % str(mode))
+
+    if state_dict is not None:
+        quantized.load_state_dict(state_dict)
+
+    return quantized
@@ -1,5 +1,7 @@
 import contextlib
 
+import torch
+
 try:
     # use apex loss scaling if possible
     # (and enabled, this is done internally by apex)
@@ -67,3 +69,77 @@ def scale_loss(loss,
                             **kwargs) as _loss:
 
             yield _loss
+
+
+def autocast(dtype=None, device_type="cpu"):
+    """
+    Returns a context manager running the enclosed operations with automatic
+    mixed precision (by means of :func:`torch.autocast`) or a no-op context
+    manager if ``dtype`` is None
+
+    Parameters
+    ----------
+    dtype : :class:`torch.dtype` or None
+        the lower precision type to cast to; on CPU only
+        :obj:`torch.bfloat16` is supported. None disables the autocasting
+    device_type : str
+        the type of the device the enclosed operations run on
+        ('cpu' or 'cuda')
+
+    Returns
+    -------
+    context manager
+        the autocast context
+
+    Raises
+    ------
+    RuntimeError
+        if the installed torch version does not support autocasting on the
+        given device type
+
+    Notes
+    -----
+    Only the forward pass should be autocasted; the loss computation and the
+    backward pass should run in full precision (see
+    :func:`to_full_precision`)
+
+    """
+    if dtype is None:
+        return contextlib.ExitStack()
+
+    if hasattr(torch, "autocast"):
+        return torch.autocast(device_type, dtype=dtype)
+
+    if device_type == "cuda" and dtype == torch.float16:
+        return torch.cuda.amp.autocast()
+
+    raise RuntimeError("Autocasting to %s on %s is not supported by torch %s"
+                       % (str(dtype), device_type, torch.__version__))
+
+
+def to_full_precision(outputs):
+    """
+    Casts all floating point tensors of lower precision in (possibly nested)
+    network outputs to :obj:`torch.float32`
+
+    Parameters
+    ----------
+    outputs : Any
+        the network outputs
+
+    Returns
+    -------
+    Any
+        the outputs with all half precision tensors casted to full precision
+
+    """
+    if isinstance(outputs, torch.Tensor):
+        if outputs.dtype in (torch.float16, torch.bfloat16):
+            return outputs.float()
+        return outputs
+    if isinstance(outputs, dict):
+        return type(outputs)((k, to_full_precision(v))
+                             for k, v in outputs.items())
+    if isinstance(outputs, (list, tuple)):
+        return type(outputs)(to_full_precision(v) for v in outputs)
+    return outputs
@@ -1,6 +1,14 @@
 
+from delira.training.async_validator import AsyncValidator
 from delira.training.base_experiment import BaseExperiment
 from delira.training.base_trainer import BaseNetworkTrainer
+from delira.training.hyperparameter_search import AbstractSearch, \
+    GridSearch, RandomSearch, ASHASearch, HyperparameterSearch
+from delira.training.checkpoint_manager import CheckpointManager
+from delira.training.metric_worker import MetricWorker
 from delira.training.predictor import Predictor
+from delira.training.result_cache import ResultCache, data_fingerprint
+from delira.training.inference_server import InferenceServer, \
+    InferenceStats
 
 from delira.training.backends import *
@@ -0,0 +1,248 @@
+import collections
+import logging
+import multiprocessing
+import traceback
+
+from delira import get_current_debug_mode
+
+logger = logging.getLogger(__name__)
+
+
+def _validate(predictor, datamgr, metrics=None, metric_keys=None):
+    """
+    Predicts the whole validation set and caches the metrics
+
+    Parameters
+    ----------
+    predictor : :class:`Predictor`
+        the predictor holding the snapshotted network
+    datamgr : :class:`DataManager`
+        the manager holding the validation data
+    metrics : dict
+        the metrics to calculate
+    metric_keys : dict
+        the ``batch_dict`` items to use for metric calculation
+
+    Returns
+    -------
+    dict
+        the metrics of all validation batches (converted to numpy)
+
+    """
+    # next must be called here because predict_data_mgr_cache_metrics_only
+    # returns a generator (of size 1)
+    val_metrics = next(predictor.predict_data_mgr_cache_metrics_only(
+        datamgr, datamgr.batch_size, metrics=metrics,
+        metric_keys=metric_keys, verbose=False))
+
+    return predictor._convert_to_npy_fn(**val_metrics)[1]
+
+
+def _validation_loop(connection):
+    """
+    Runs the submitted validations in the worker process until ``None`` is
+    received
+
+    Parameters
+    ----------
+    connection : :class:`multiprocessing.connection.Connection`
+        the connection to receive the validations from and to send the
+        results to
+
+    """
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+
+        try:
+            result = _validate(*task[0], **task[1])
+        except Exception as e:
+            # the exception itself might not be picklable
+            connection.send((False, "%s: %s\n%s" % (
+                type(e).__name__, str(e), traceback.format_exc())))
+        else:
+            connection.send((True, result))
+
+    connection.close()
+
+
+class AsyncValidator(object):
+    """
+    Validates snapshots of a network in a separate worker process.
+
+    Each submitted validation consists of a :class:`Predictor` holding a
+    snapshot of the network (which is not affected by further training) and
+    the :class:`DataManager` holding the validation data. Both are sent to a
+    single worker process, which predicts the whole validation set (starting
+    its own augmentation workers, if the data manager uses any) while the
+    submitting process keeps training.
+
+    Validations are processed in the order they were submitted. Their
+    results are retrieved by :meth:`collect`, which waits for all pending
+    validations. In debug mode, the validations are executed synchronously
+    by :meth:`submit` instead.
+
+    Notes
+    -----
+    The worker process is started by means of ``start_method``; per default
+    it is spawned, which requires the predictor, the data manager and the
+    metrics to be picklable.
+
+    """
+
+    def __init__(self, start_method="spawn"):
+        """
+
+        Parameters
+        ----------
+        start_method : str
+            the method to start the worker process with
+
+        """
+        self._start_method = start_method
+        self._process = None
+        self._connection = None
+        self._pending = collections.deque()
+        self._results = []
+
+    @property
+    def start_method(self):
+        return self._start_method
+
+    @property
+    def n_pending(self):
+        """
+        The number of submitted validations, whose results were not
+        collected yet
+        """
+        return len(self._pending) + len(self._results)
+
+    def _start(self):
+        if self._process is not None:
+            if self._process.is_alive():
+                return
+            raise RuntimeError("The validation process terminated "
+                               "unexpectedly with exitcode %s"
+                               % str(self._process.exitcode))
+
+        ctx = multiprocessing.get_context(self._start_method)
+        self._connection, child_connection = ctx.Pipe()
+
+        # the process is not daemonic to be able to start the augmentation
+        # workers of the data manager
+        self._process = ctx.Process(target=_validation_loop,
+                                    args=(child_connection,),
+                                    name="delira-validation")
+        self._process.start()
+        child_connection.close()
+
+    def submit(self, epoch, predictor, datamgr, metrics=None,
+               metric_keys=None):
+        """
+        Schedules the validation of a snapshot
+
+        Parameters
+        ----------
+        epoch : int
+            the epoch the snapshot was taken at
+        predictor : :class:`Predictor`
+            the predictor holding the snapshot; must not be modified
+            afterwards
+        datamgr : :class:`DataManager`
+            the manager holding the validation data
+        metrics : dict
+            the metrics to calculate
+        metric_keys : dict
+            the ``batch_dict`` items to use for metric calculation
+
+        """
+        task = ((predictor, datamgr),
+                {"metrics": metrics, "metric_keys": metric_keys})
+
+        if get_current_debug_mode():
+            self._results.append((epoch, _validate(*task[0], **task[1]),
+                                  predictor))
+            return
+
+        self._start()
+        self._connection.send(task)
+        self._pending.append((epoch, predictor))
+
+    def _receive(self):
+        epoch, predictor = self._pending.popleft()
+
+        try:
+            success, result = self._connection.recv()
+        except EOFError:
+            raise RuntimeError("The validation process terminated "
+                               "unexpectedly while validating epoch %d"
+                               % epoch)
+
+        if not success:
+            raise RuntimeError("The validation of epoch %d failed:\n%s"
+                               % (epoch, result))
+
+        logger.debug("Validation of epoch %d finished" % epoch)
+        self._results.append((epoch, result, predictor))
+
+    def collect(self):
+        """
+        Waits for all submitted validations and returns their results
+
+        Returns
+        -------
+        list
+            tuples of the epoch, the validation metrics (a dict containing
+            the metric values of all batches) and the predictor of every
+            validation in the order of submission
+
+        Raises
+        ------
+        RuntimeError
+            if a validation failed
+
+        """
+        try:
+            while self._pending:
+                self._receive()
+        except BaseException:
+            # the remaining validations are dropped
+            self._pending.clear()
+            self._results = []
+            raise
+
+        results, self._results = self._results, []
+        return results
+
+    def shutdown(self):
+        """
+        Discards all results not collected yet and stops the worker process
+
+        """
+        n_pending = len(self._pending)
+        self._pending.clear()
+        self._results = []
+
+        if self._process is not None:
+            try:
+                if self._process.is_alive():
+                    # receive the pending results, since the worker blocks
+                    # while sending them
+                    for _ in range(n_pending):
+                        self._connection.recv()
+                    self._connection.send(None)
+                self._process.join()
+            except EOFError:
+                self._process.join()
+            finally:
+                self._connection.close()
+                self._process = None
+                self._connection = None
+
+    def __getstate__(self):
+        # the worker process cannot be pickled; it is restarted on demand
+        return {"start_method": self._start_method}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
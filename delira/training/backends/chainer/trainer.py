@@ -1,7 +1,8 @@
 from delira.training.backends.chainer.utils import convert_to_numpy
 from delira.training.backends.chainer.utils import create_optims_default
 from delira.training.callbacks.logging_callback import DefaultLoggingCallback
-from delira.io.chainer import load_checkpoint, save_checkpoint
+from delira.io.chainer import load_checkpoint, save_checkpoint, \
+    snapshot_checkpoint, write_checkpoint
 from delira.models.backends.chainer import AbstractChainerNetwork, \
     DataParallelChainerNetwork, \
     DataParallelChainerOptimizer
@@ -24,6 +25,8 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
 
     """
 
+    _supports_async_checkpointing = True
+
     def __init__(self,
                  network: AbstractChainerNetwork,
                  save_path: str,
@@ -340,6 +343,8 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
         self.save_state(os.path.join(
             self.save_path, "checkpoint_epoch_%d" % self.start_epoch),
             self.start_epoch)
+        self._register_checkpoint("checkpoint_epoch_%d" % self.start_epoch,
+                                  self.start_epoch)
 
     def _at_training_end(self, *args, **kwargs):
         """
@@ -352,6 +357,8 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
             best network
 
         """
+        self._flush_checkpoints()
+
         if os.path.isfile(os.path.join(self.save_path,
                                        'checkpoint_best.chain')):
 
@@ -362,7 +369,7 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
         return super()._at_training_end(*args, **kwargs)
 
     def _at_epoch_end(self, metrics_val, val_score_key, epoch, is_best,
-                      **kwargs):
+                      val_epoch=None, checkpoint_metrics=None, **kwargs):
         """
         Defines behaviour at beginning of each epoch: Executes all
         callbacks's `at_epoch_end` method and saves current state if
@@ -380,17 +387,28 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
             total number of epochs
         is_best : bool
             whether current model is best one so far
+        val_epoch : int, optional
+            the epoch the validation metrics belong to; differs from
+            ``epoch`` for the asynchronous validation. Defaults to ``epoch``
+        checkpoint_metrics : dict, optional
+            the metrics to register the epoch's checkpoint with; defaults to
+            ``metrics_val``
         **kwargs :
             keyword arguments
 
         """
+        if val_epoch is None:
+            val_epoch = epoch
+        if checkpoint_metrics is None:
+            checkpoint_metrics = metrics_val
 
         for cb in self._callbacks:
 
             self._update_state(cb.at_epoch_end(self,
                                                val_metrics=metrics_val,
                                                val_score_key=val_score_key,
-                                               curr_epoch=epoch))
+                                               curr_epoch=epoch,
+                                               val_epoch=val_epoch))
 
         if epoch % self.save_freq == 0:
             self.save_state(
@@ -399,11 +417,15 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
                     "checkpoint_epoch_%d.chain" %
                     epoch),
                 epoch)
+            self._register_checkpoint("checkpoint_epoch_%d" % epoch, epoch,
+                                      checkpoint_metrics)
 
         if is_best:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_best.chain"),
                             epoch)
+            self._register_checkpoint("checkpoint_best", epoch, metrics_val,
+                                      is_best=True)
 
     def _train_single_epoch(self, batchgen: MultiThreadedAugmenter, epoch,
                             verbose=False):
@@ -462,7 +484,8 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
     def save_state(self, file_name, epoch, **kwargs):
         """
         saves the current state via
-        :func:`delira.io.chainer.save_checkpoint`
+        :func:`delira.io.chainer.save_checkpoint` (or snapshots it and writes
+        it in the background, if asynchronous checkpointing is enabled)
 
         Parameters
         ----------
@@ -478,8 +501,14 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
         """
         if not file_name.endswith(".chain"):
             file_name = file_name + ".chain"
-        save_checkpoint(file_name, self.module, self.optimizers,
-                        **kwargs)
+
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.submit(
+                write_checkpoint, file_name,
+                partial(snapshot_checkpoint, self.module, self.optimizers))
+        else:
+            save_checkpoint(file_name, self.module, self.optimizers,
+                            **kwargs)
 
     @staticmethod
     def load_state(file_name, **kwargs):
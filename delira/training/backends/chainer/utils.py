@@ -1,7 +1,7 @@
+import numpy as np
 import chainer
 from delira.models.backends.chainer import DataParallelChainerOptimizer
-from delira.training.utils import convert_to_numpy_identity, \
-    recursively_convert_elements
+from delira.training.utils import StructuredConverter, _correct_zero_shape
 
 
 def _single_element_tensor_conversion(element):
@@ -27,13 +27,13 @@ def convert_to_numpy(*args, **kwargs):
     dict
         converted keyboard arguments
     """
-    args = recursively_convert_elements(args, chainer.Variable,
-                                        _single_element_tensor_conversion)
+    return _converter(*args, **kwargs)
 
-    kwargs = recursively_convert_elements(kwargs, chainer.Variable,
-                                          _single_element_tensor_conversion)
 
-    return convert_to_numpy_identity(*args, **kwargs)
+# converts the tensors and corrects the shapes of all arrays in a single pass
+_converter = StructuredConverter([
+    (chainer.Variable, _single_element_tensor_conversion),
+    (np.ndarray, _correct_zero_shape)])
 
 
 def create_optims_default(model, optim_cls, **optimizer_params):
@@ -6,3 +6,4 @@ if "SKLEARN" in _get_backends():
     from delira.training.backends.sklearn.experiment import SklearnExperiment
     from delira.training.backends.sklearn.utils import create_optims_default \
         as create_sklearn_optims_default
+    from delira.training.backends.sklearn.utils import assemble_data
@@ -1,13 +1,14 @@
-from delira.training.backends.sklearn.utils import create_optims_default
+from delira.training.backends.sklearn.utils import create_optims_default, \
+    assemble_data, rebatch
 from delira.training.utils import convert_to_numpy_identity as \
     convert_to_numpy
 from delira.training.base_trainer import BaseNetworkTrainer
-from delira.io.sklearn import save_checkpoint, load_checkpoint
+from delira.io.sklearn import save_checkpoint, load_checkpoint, \
+    snapshot_checkpoint, write_checkpoint
 from delira.models.backends.sklearn import SklearnEstimator
 from delira.data_loading import DataManager
-from delira.data_loading.sampler import RandomSamplerWithReplacement, \
-    RandomSamplerNoReplacement
 from delira.training.callbacks.logging_callback import DefaultLoggingCallback
+from delira.utils.resources import available_cpus, resolve_n_workers
 import os
 import logging
 import numpy as np
@@ -17,6 +18,21 @@ from functools import partial
 logger = logging.getLogger(__name__)
 
 
+class _AssembledData(object):
+    """
+    Replaces the :class:`DataManager` in the training loop of non-iterative
+    estimators by yielding the whole assembled dataset as single batch
+
+    """
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.n_batches = 1
+
+    def get_batchgen(self, seed=1):
+        return iter([self.batch])
+
+
 class SklearnEstimatorTrainer(BaseNetworkTrainer):
     """
     Train and Validate a ``sklearn`` estimator
@@ -27,6 +43,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
 
     """
 
+    _supports_async_checkpointing = True
+
     def __init__(self,
                  estimator: SklearnEstimator,
                  save_path: str,
@@ -44,6 +62,12 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
                  metric_keys=None,
                  convert_batch_to_npy_fn=convert_to_numpy,
                  val_freq=1,
+                 fit_chunk_size=1024,
+                 fit_memmap_dir=None,
+                 partial_fit_batch_size=None,
+                 n_jobs=None,
+                 joblib_backend=None,
+                 predict_chunk_size=None,
                  ** kwargs):
         """
 
@@ -110,6 +134,35 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
             model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        fit_chunk_size : int
+            the number of samples to load at once, when assembling the
+            whole dataset for estimators without ``partial_fit``
+        fit_memmap_dir : str, optional
+            a directory to assemble the dataset in as memory mapped arrays
+            for estimators without ``partial_fit`` (if it exceeds the
+            memory); per default it is assembled in memory
+        partial_fit_batch_size : int, optional
+            the batch size to stream the training data to ``partial_fit``
+            with; defaults to the batch size of the training
+            :class:`DataManager`
+        n_jobs : int, optional
+            the number of jobs to fit and predict with (see
+            :meth:`SklearnEstimator.configure_parallelism`). It is limited to
+            the cores of the training process, i.e. the cores assigned to it
+            by the ``resource_manager`` of the training :class:`DataManager`
+            or all available cores minus one per augmentation process.
+            Negative values are counted backwards from this budget like in
+            ``joblib`` (-1 uses all of these cores). Per default, the
+            estimator's ``n_jobs`` parameters are kept.
+        joblib_backend : str, optional
+            the ``joblib`` backend to fit and predict with (e.g. 'loky' or
+            'threading'); defaults to the estimator's choice
+        predict_chunk_size : int, optional
+            if given (and more than one job is used), batches with more
+            samples are predicted in chunks of this size in parallel
+            processes. The batches of a :class:`DataManager` are still
+            predicted one after another, i.e. its batch size must exceed the
+            chunk size to predict it in parallel
         **kwargs :
             additional keyword arguments
 
@@ -148,6 +201,14 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
                          **kwargs
                          )
 
+        self.fit_chunk_size = fit_chunk_size
+        self.fit_memmap_dir = fit_memmap_dir
+        self.partial_fit_batch_size = partial_fit_batch_size
+        self.n_jobs = n_jobs
+        self.joblib_backend = joblib_backend
+        self.predict_chunk_size = predict_chunk_size
+        self._resolved_n_jobs = None
+
         self._setup(estimator,
                     key_mapping, convert_batch_to_npy_fn, callbacks)
 
@@ -195,6 +256,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
 
                 self.start_epoch = latest_epoch
 
+        self._configure_parallelism()
+
         self.use_gpu = False
         self.input_device = "cpu"
         self.output_device = "cpu"
@@ -221,6 +284,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
         self.save_state(os.path.join(
             self.save_path, "checkpoint_epoch_%d" % self.start_epoch),
             self.start_epoch)
+        self._register_checkpoint("checkpoint_epoch_%d" % self.start_epoch,
+                                  self.start_epoch)
 
     def _at_training_end(self, *args, **kwargs):
         """
@@ -233,6 +298,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
             best network
 
         """
+        self._flush_checkpoints()
+
         if os.path.isfile(os.path.join(self.save_path,
                                        'checkpoint_best.pkl')):
 
@@ -243,7 +310,7 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
         return super()._at_training_end(*args, **kwargs)
 
     def _at_epoch_end(self, metrics_val, val_score_key, epoch, is_best,
-                      **kwargs):
+                      val_epoch=None, checkpoint_metrics=None, **kwargs):
         """
         Defines behaviour at beginning of each epoch: Executes all callbacks's
         `at_epoch_end` method and saves current state if necessary
@@ -260,27 +327,42 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
             total number of epochs
         is_best : bool
             whether current model is best one so far
+        val_epoch : int, optional
+            the epoch the validation metrics belong to; differs from
+            ``epoch`` for the asynchronous validation. Defaults to ``epoch``
+        checkpoint_metrics : dict, optional
+            the metrics to register the epoch's checkpoint with; defaults to
+            ``metrics_val``
         **kwargs :
             keyword arguments
 
         """
+        if val_epoch is None:
+            val_epoch = epoch
+        if checkpoint_metrics is None:
+            checkpoint_metrics = metrics_val
 
         for cb in self._callbacks:
             self._update_state(cb.at_epoch_end(self,
                                                val_metrics=metrics_val,
                                                val_score_key=val_score_key,
-                                               curr_epoch=epoch))
+                                               curr_epoch=epoch,
+                                               val_epoch=val_epoch))
 
         if epoch % self.save_freq == 0:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_epoch_%d.pkl"
                                          % epoch),
                             epoch)
+            self._register_checkpoint("checkpoint_epoch_%d" % epoch, epoch,
+                                      checkpoint_metrics)
 
         if is_best:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_best.pkl"),
                             epoch)
+            self._register_checkpoint("checkpoint_best", epoch, metrics_val,
+                                      is_best=True)
 
     def _get_classes_if_necessary(self, dmgr: DataManager, verbose,
                                   label_key=None):
@@ -327,6 +409,74 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
         unique_targets = np.concatenate(list(sorted(unique_targets)))
         self.module.classes = unique_targets
 
+    def _resolve_n_jobs(self, dmgr: DataManager = None):
+        """
+        Limits the number of jobs to the cores of the training process
+
+        Parameters
+        ----------
+        dmgr : :class:`DataManager`, optional
+            the training data manager (its augmentation processes run
+            concurrently to the estimator); if None: the jobs are limited to
+            all available cores
+
+        Returns
+        -------
+        int or None
+            the number of jobs (None if no number of jobs was given)
+
+        """
+        if self.n_jobs is None:
+            return None
+
+        if dmgr is None:
+            n_workers = 0
+            resource_plan = None
+        else:
+            n_workers = resolve_n_workers(dmgr.n_process_augmentation)
+            resource_plan = getattr(dmgr, "resource_plan", None)
+        if resource_plan is not None:
+            budget = resource_plan.main_threads
+        else:
+            budget = len(available_cpus()) - n_workers
+        budget = max(budget, 1)
+
+        if self.n_jobs < 0:
+            return max(budget + 1 + self.n_jobs, 1)
+
+        if self.n_jobs > budget:
+            logger.info("Limiting the number of jobs from %d to %d to not "
+                        "oversubscribe the cores shared with %d augmentation "
+                        "processes" % (self.n_jobs, budget,
+                                       n_workers))
+            return budget
+
+        return self.n_jobs
+
+    def _configure_parallelism(self, dmgr: DataManager = None):
+        """
+        Configures the parallelism of the current estimator (see
+        :meth:`SklearnEstimator.configure_parallelism`)
+
+        Parameters
+        ----------
+        dmgr : :class:`DataManager`, optional
+            the training data manager to limit the number of jobs with (see
+            :meth:`_resolve_n_jobs`); if None: the number of jobs of the last
+            training is kept (or limited to all available cores)
+
+        """
+        if (self.n_jobs, self.joblib_backend, self.predict_chunk_size) == (
+                None, None, None):
+            return
+
+        if dmgr is not None or self._resolved_n_jobs is None:
+            self._resolved_n_jobs = self._resolve_n_jobs(dmgr)
+
+        self.module.configure_parallelism(
+            self._resolved_n_jobs, self.joblib_backend,
+            self.predict_chunk_size)
+
     def train(self, num_epochs, datamgr_train, datamgr_valid=None,
               val_score_key=None, val_score_mode='highest',
               reduce_mode='mean', verbose=True, label_key="label"):
@@ -360,6 +510,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
             If not overwritten by subclass
 
         """
+        self._configure_parallelism(datamgr_train)
+
         if self.module.iterative_training:
 
             # estimate classes from validation data
@@ -369,27 +521,21 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
             else:
                 self._get_classes_if_necessary(datamgr_train, verbose,
                                                label_key)
+
+            if self.partial_fit_batch_size is not None:
+                datamgr_train = rebatch(datamgr_train,
+                                        self.partial_fit_batch_size)
         else:
-            # Setting batchsize to length of dataset and replacing random
-            # sampler_old with replacement by random sampler_old without
-            # replacement ensures, that each sample is present in each
-            # batch and only one batch is sampled per epoch
-            datamgr_train.batchsize = len(datamgr_train.dataset)
-            if issubclass(datamgr_train.sampler_cls,
-                          RandomSamplerWithReplacement):
-                datamgr_train.sampler_cls = RandomSamplerNoReplacement
-
-            # additionally setting the number of epochs to train ensures,
-            # that only one epoch consisting of one batch (which holds the
-            # whole dataset) is used for training
+            # the whole dataset is assembled as one batch per epoch (see
+            # _train_single_epoch); setting the number of epochs to train
+            # ensures, that the estimator is only fitted once
             if num_epochs > 1:
 
                 logging.info(
                     "An epoch number greater than 1 is given, "
                     "but the current module does not support "
                     "iterative training. Falling back to usual "
-                    "dataset fitting. For huge datasets, this "
-                    "might easily result in out of memory errors!")
+                    "dataset fitting.")
 
                 num_epochs = 1
 
@@ -397,10 +543,41 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
                              val_score_key, val_score_mode, reduce_mode,
                              verbose)
 
+    def _train_single_epoch(self, dmgr_train: DataManager, epoch,
+                            verbose=False):
+        """
+        Trains the estimator a single epoch; estimators without
+        ``partial_fit`` are fitted on the whole dataset at once, which is
+        assembled in chunks into preallocated arrays (see
+        :func:`assemble_data`)
+
+        Parameters
+        ----------
+        dmgr_train : :class:`DataManager`
+            Datamanager to create the data generator
+        epoch : int
+            current epoch
+
+        Returns
+        -------
+        :class:`RunningDictReduction`
+            the running reduction of the training metrics
+        :class:`RunningDictReduction`
+            the running reduction of the training losses
+
+        """
+        if not self.module.iterative_training:
+            dmgr_train = _AssembledData(assemble_data(
+                dmgr_train, self.fit_chunk_size, self.fit_memmap_dir,
+                verbose))
+
+        return super()._train_single_epoch(dmgr_train, epoch, verbose=verbose)
+
     def save_state(self, file_name, epoch, **kwargs):
         """
         saves the current state via
-        :func:`delira.io.sklearn.save_checkpoint`
+        :func:`delira.io.sklearn.save_checkpoint` (or snapshots it and writes
+        it in the background, if asynchronous checkpointing is enabled)
 
         Parameters
         ----------
@@ -416,7 +593,13 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
         """
         if not file_name.endswith(".pkl"):
             file_name = file_name + ".pkl"
-        save_checkpoint(file_name, self.module, epoch, **kwargs)
+
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.submit(
+                partial(write_checkpoint, **kwargs), file_name,
+                partial(snapshot_checkpoint, self.module, epoch))
+        else:
+            save_checkpoint(file_name, self.module, epoch, **kwargs)
 
     @staticmethod
     def load_state(file_name, *args, **kwargs):
@@ -460,6 +643,8 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
 
         if "model" in new_state:
             self.module = new_state.pop("model")
+            # the loaded estimator does not know the trainer's parallelism
+            self._configure_parallelism()
 
         if "epoch" in new_state:
             self.start_epoch = new_state.pop("epoch")
@@ -1,3 +1,16 @@
+import logging
+import os
+import tempfile
+
+import numpy as np
+from tqdm.auto import tqdm
+
+from delira.data_loading import DataManager
+from delira.data_loading.sampler import SequentialSampler
+
+logger = logging.getLogger(__name__)
+
+
 def create_optims_default(*args, **kwargs):
     """
     Function returning an empty optimizer dict
@@ -17,3 +30,114 @@ def create_optims_default(*args, **kwargs):
 
     """
     return {}
+
+
+def rebatch(datamgr: DataManager, batch_size, sampler_cls=None):
+    """
+    Creates a copy of a :class:`DataManager` with another batch size (and
+    optionally another sampling strategy)
+
+    Parameters
+    ----------
+    datamgr : :class:`DataManager`
+        the manager to copy
+    batch_size : int
+        the new batch size
+    sampler_cls : subclass of :class:`AbstractSampler`, optional
+        the new sampling strategy; defaults to the current one
+
+    Returns
+    -------
+    :class:`DataManager`
+        the copied manager
+
+    """
+    sampler_kwargs = datamgr.sampler_kwargs
+    if sampler_cls is None:
+        sampler_cls = datamgr.sampler_cls
+    else:
+        sampler_kwargs = {}
+
+    return DataManager(datamgr.dataset, batch_size,
+                       datamgr.n_process_augmentation, datamgr.transforms,
+                       sampler_cls=sampler_cls, drop_last=False,
+                       data_loader_cls=datamgr.data_loader_cls,
+                       resource_manager=datamgr.resource_manager,
+                       **sampler_kwargs)
+
+
+def _allocate(shape, dtype, memmap_dir=None):
+    if memmap_dir is None or dtype.hasobject:
+        return np.empty(shape, dtype=dtype)
+
+    fd, file_name = tempfile.mkstemp(suffix=".dat", dir=memmap_dir)
+    os.close(fd)
+    array = np.memmap(file_name, dtype=dtype, mode="w+", shape=shape)
+
+    # the mapping stays valid after unlinking the file; its disk space is
+    # freed as soon as the array is released
+    try:
+        os.remove(file_name)
+    except OSError:
+        logger.debug("Could not remove memory mapped file %s" % file_name)
+
+    return array
+
+
+def assemble_data(datamgr: DataManager, chunk_size=1024, memmap_dir=None,
+                  verbose=False):
+    """
+    Assembles the whole dataset of a :class:`DataManager` into a single
+    batch without intermediate copies: the arrays are allocated for all
+    samples once and filled chunk by chunk (with the transforms and
+    augmentation workers of the manager), which keeps the peak memory
+    close to the size of the result.
+
+    Parameters
+    ----------
+    datamgr : :class:`DataManager`
+        the manager holding the data
+    chunk_size : int
+        the number of samples to load at once
+    memmap_dir : str, optional
+        a directory to allocate the arrays in as :class:`numpy.memmap`
+        (for datasets exceeding the memory); per default, the arrays are
+        allocated in memory
+    verbose : bool
+        whether to show a progress bar
+
+    Returns
+    -------
+    dict
+        the batch containing the stacked arrays of all samples (entries of
+        the batches, which are no arrays, are dropped)
+
+    """
+    n_samples = len(datamgr.dataset)
+    chunk_mgr = rebatch(datamgr, max(min(chunk_size, n_samples), 1),
+                        SequentialSampler)
+
+    batchgen = chunk_mgr.get_batchgen()
+    if verbose:
+        batchgen = tqdm(batchgen, unit=' chunk', total=chunk_mgr.n_batches,
+                        desc="Assembling data")
+
+    arrays, offset = {}, 0
+    for batch in batchgen:
+        batch = {key: val for key, val in batch.items()
+                 if isinstance(val, np.ndarray) and val.ndim}
+        if not batch:
+            continue
+
+        if not arrays:
+            arrays = {key: _allocate((n_samples,) + val.shape[1:],
+                                     val.dtype, memmap_dir)
+                      for key, val in batch.items()}
+
+        n_batch = len(next(iter(batch.values())))
+        for key, array in arrays.items():
+            array[offset:offset + n_batch] = batch[key]
+        offset += n_batch
+
+    # views of the filled part (all samples, unless the sampler skipped some)
+    return {key: array[:offset] for key, array in arrays.items()}
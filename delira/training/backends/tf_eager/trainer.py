@@ -40,6 +40,7 @@ class TfEagerNetworkTrainer(BaseNetworkTrainer):
                  metric_keys=None,
                  convert_batch_to_npy_fn=convert_to_numpy,
                  val_freq=1,
+                 compile_steps=False,
                  **kwargs):
         """
 
@@ -120,6 +121,14 @@ class TfEagerNetworkTrainer(BaseNetworkTrainer):
             model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        compile_steps : bool
+            whether to compile the training step (the network's ``closure``)
+            and the prediction step with :func:`tf.function`. Both are traced
+            once with an input signature derived from their first batch
+            (with a variable batch dimension), so that the closure must not
+            depend on python values of its arguments: ``iter_num`` is passed
+            as scalar tensor and all other arguments are captured at tracing
+            time
         **kwargs :
             Additional keyword arguments
 
@@ -172,6 +181,13 @@ class TfEagerNetworkTrainer(BaseNetworkTrainer):
                     lr_scheduler_cls, lr_scheduler_params,
                     key_mapping, convert_batch_to_npy_fn, gpu_ids, callbacks)
 
+        self._compile_steps = compile_steps
+        self._train_step = None
+        self._predict_step = None
+        if compile_steps:
+            self._eager_closure_fn = self.closure_fn
+            self.closure_fn = self._compiled_closure
+
         for key, val in kwargs.items():
             setattr(self, key, val)
 
@@ -251,6 +267,112 @@ class TfEagerNetworkTrainer(BaseNetworkTrainer):
                 self.update_state(latest_state_path)
                 self.start_epoch = latest_epoch
 
+    @staticmethod
+    def _input_signature(batch: dict):
+        """
+        Creates the input signature of a batch with a variable batch
+        dimension
+
+        Parameters
+        ----------
+        batch : dict
+            dictionary containing the batch's tensors
+
+        Returns
+        -------
+        dict
+            dictionary containing a :class:`tf.TensorSpec` per tensor
+
+        """
+        return {k: tf.TensorSpec([None] + v.shape.as_list()[1:], v.dtype,
+                                 name=k)
+                for k, v in batch.items()}
+
+    def _compiled_closure(self, model, data_dict: dict, optimizers, losses,
+                          iter_num, fold=0, **kwargs):
+        """
+        Runs the network's closure as a step compiled by :func:`tf.function`
+        (which is traced at the first call)
+
+        Parameters
+        ----------
+        model : :class:`AbstractTfEagerNetwork`
+            trainable model
+        data_dict : dict
+            dictionary containing the data
+        optimizers : dict
+            dictionary of optimizers to optimize model's parameters
+        losses : dict
+            dict holding the losses to calculate errors
+        iter_num: int
+            the number of of the current iteration in the current epoch
+        fold : int
+            Current Fold in Crossvalidation (default: 0)
+        **kwargs:
+            additional keyword arguments
+
+        Returns
+        -------
+        dict
+            Loss values (as tensors)
+        dict
+            dictionary containing all predictions (as tensors)
+
+        """
+        if self._train_step is None:
+            closure_fn = self._eager_closure_fn
+
+            def _train_step(_data_dict, _iter_num):
+                return closure_fn(model, _data_dict, optimizers=optimizers,
+                                  losses=losses, iter_num=_iter_num,
+                                  fold=fold, **kwargs)
+
+            self._train_step = tf.function(
+                _train_step,
+                input_signature=[self._input_signature(data_dict),
+                                 tf.TensorSpec([], tf.int64)])
+
+        return self._train_step(data_dict,
+                                tf.constant(iter_num, dtype=tf.int64))
+
+    def predict(self, data: dict, already_prepared=False, **kwargs):
+        """
+        Predict single batch (with a step compiled by :func:`tf.function`, if
+        ``compile_steps`` is enabled)
+
+        Parameters
+        ----------
+        data : dict
+            batch dictionary
+        already_prepared : bool
+            if True, the `prepare_batch` function won't be called on the data
+            anymore
+        **kwargs :
+            keyword arguments(directly passed to ``prepare_batch``)
+
+        Returns
+        -------
+        dict
+            predicted data
+
+        """
+        if not getattr(self, "_compile_steps", False):
+            return super().predict(data, already_prepared=already_prepared,
+                                   **kwargs)
+
+        if not already_prepared:
+            data = self._prepare_batch(data, **kwargs)
+
+        mapped_data = {k: data[v] for k, v in self.key_mapping.items()}
+
+        if self._predict_step is None:
+            module = self.module
+            self._predict_step = tf.function(
+                lambda _inputs: module(**_inputs),
+                input_signature=[self._input_signature(mapped_data)])
+
+        return self._convert_to_npy_fn(**self._predict_step(mapped_data))[1]
+
     def _at_training_end(self, *args, **kwargs):
         """
         Defines Behaviour at end of training: Loads best model if available
@@ -1,7 +1,7 @@
+import numpy as np
 import tensorflow as tf
 
-from delira.training.utils import convert_to_numpy_identity, \
-    recursively_convert_elements
+from delira.training.utils import StructuredConverter, _correct_zero_shape
 
 
 def _single_element_tensor_conversion(element):
@@ -26,13 +26,13 @@ def convert_to_numpy(*args, **kwargs):
     dict
         converted keyboard arguments
     """
-    args = recursively_convert_elements(args, tf.Tensor,
-                                        _single_element_tensor_conversion)
+    return _converter(*args, **kwargs)
 
-    kwargs = recursively_convert_elements(kwargs, tf.Tensor,
-                                          _single_element_tensor_conversion)
 
-    return convert_to_numpy_identity(*args, **kwargs)
+# converts the tensors and corrects the shapes of all arrays in a single pass
+_converter = StructuredConverter([
+    (tf.Tensor, _single_element_tensor_conversion),
+    (np.ndarray, _correct_zero_shape)])
 
 
 def create_optims_default(optim_cls, **optim_params):
@@ -10,6 +10,8 @@ from delira.data_loading import DataManager
 import os
 import logging
 
+import numpy as np
+import tensorflow as tf
 from tensorflow import executing_eagerly
 
 from batchgenerators.dataloading import MultiThreadedAugmenter
@@ -17,6 +19,21 @@ from batchgenerators.dataloading import MultiThreadedAugmenter
 logger = logging.getLogger(__name__)
 
 
+class _PulledBatches(object):
+    """
+    Replaces the :class:`DataManager` in the training loop, if the batches
+    are pulled by the graph itself (yields empty batches, since the actual
+    data never passes the training loop)
+
+    """
+
+    def __init__(self, n_batches):
+        self.n_batches = n_batches
+
+    def get_batchgen(self, seed=1):
+        return iter([{} for _ in range(self.n_batches)])
+
+
 class TfGraphNetworkTrainer(BaseNetworkTrainer):
     """
     Train and Validate a Network
@@ -51,6 +68,8 @@ class TfGraphNetworkTrainer(BaseNetworkTrainer):
                  metric_keys=None,
                  convert_batch_to_npy_fn=convert_to_numpy,
                  val_freq=1,
+                 input_mode="feed_dict",
+                 prefetch_batches=2,
                  **kwargs
                  ):
         """
@@ -132,12 +151,32 @@ class TfGraphNetworkTrainer(BaseNetworkTrainer):
             model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        input_mode : str
+            how the training batches are passed to the graph; one of
+            ``"feed_dict"`` (the batches are fed by the network's closure)
+            and ``"dataset"`` (the augmenter's batches are passed to a
+            prefetching :class:`tf.data.Dataset` and pulled by the graph
+            itself, which allows the input transfer to overlap with the
+            previous step). The latter requires the network to create its
+            inputs by ``_build_inputs`` and trains with the network's
+            ``closure_from_iterator``. The prediction always feeds the
+            batches (including all network inputs contained in them)
+        prefetch_batches : int
+            the number of batches to prefetch (only used if ``input_mode``
+            is ``"dataset"``)
         **kwargs :
             Additional keyword arguments
 
         """
         assert not executing_eagerly()
 
+        if input_mode not in ("feed_dict", "dataset"):
+            raise ValueError("input_mode must be one of 'feed_dict' and "
+                             "'dataset', but got %s" % str(input_mode))
+        if input_mode == "dataset" and network.input_iterator is None:
+            raise ValueError("The input mode 'dataset' requires the network "
+                             "to create its inputs with '_build_inputs'")
+
         if optimizer_params is None:
             optimizer_params = {}
         if metrics is None:
@@ -181,9 +220,42 @@ class TfGraphNetworkTrainer(BaseNetworkTrainer):
                     lr_scheduler_cls, lr_scheduler_params,
                     key_mapping, convert_batch_to_npy_fn, gpu_ids, callbacks)
 
+        self.input_mode = input_mode
+        if input_mode == "dataset":
+            self.closure_fn = network.closure_from_iterator
+            self._setup_input_pipeline(prefetch_batches)
+
         for key, val in kwargs.items():
             setattr(self, key, val)
 
+    def _setup_input_pipeline(self, prefetch_batches):
+        """
+        Creates the :class:`tf.data.Dataset` passing the batches of the
+        current epoch's batch generator to the network's input iterator
+
+        Parameters
+        ----------
+        prefetch_batches : int
+            the number of batches to prefetch
+
+        """
+        iterator = self.module.input_iterator
+        output_types = iterator.output_types
+        self._epoch_batchgen = None
+
+        def _generate_batches():
+            for batch in self._epoch_batchgen:
+                yield {k: np.asarray(batch[k], dtype=v.as_numpy_dtype)
+                       for k, v in output_types.items()}
+
+        dataset = tf.data.Dataset.from_generator(
+            _generate_batches, output_types, iterator.output_shapes
+        ).prefetch(prefetch_batches)
+
+        # the dataset is created once and re-initialized for each epoch to
+        # not grow the graph
+        self._input_initializer = iterator.make_initializer(dataset)
+
     def _setup(self, network, optim_fn, optimizer_cls, optimizer_params,
                lr_scheduler_cls, lr_scheduler_params, key_mapping,
                convert_batch_to_npy_fn, gpu_ids, callbacks):
@@ -310,8 +382,50 @@ class TfGraphNetworkTrainer(BaseNetworkTrainer):
         """
         self.module.training = True
 
+        if getattr(self, "input_mode", "feed_dict") == "dataset":
+            self._epoch_batchgen = dmgr_train.get_batchgen(seed=epoch)
+            self.module._sess.run(self._input_initializer)
+            dmgr_train = _PulledBatches(dmgr_train.n_batches)
+
         return super()._train_single_epoch(dmgr_train, epoch, verbose=verbose)
 
+    def predict(self, data: dict, already_prepared=False, **kwargs):
+        """
+        Predict single batch by feeding it to the network (also feeding all
+        network inputs, which are not part of the ``key_mapping``, but of the
+        batch, since otherwise they would be pulled from the network's input
+        iterator)
+
+        Parameters
+        ----------
+        data : dict
+            batch dictionary
+        already_prepared : bool
+            if True, the `prepare_batch` function won't be called on the data
+            anymore
+        **kwargs :
+            keyword arguments(directly passed to ``prepare_batch``)
+
+        Returns
+        -------
+        dict
+            predicted data
+
+        """
+        if self.module.input_iterator is None:
+            return super().predict(data, already_prepared=already_prepared,
+                                   **kwargs)
+
+        if not already_prepared:
+            data = self._prepare_batch(data, **kwargs)
+
+        mapped_data = {k: data[v] for k, v in self.key_mapping.items()}
+        for k in self.module.inputs.keys():
+            if k not in mapped_data and k in data:
+                mapped_data[k] = data[k]
+
+        return self._convert_to_npy_fn(**self.module(**mapped_data))[1]
+
     def predict_data_mgr(self, datamgr, batch_size=None, metrics=None,
                          metric_keys=None, verbose=False, **kwargs):
         """
@@ -7,3 +7,9 @@ if "TORCH" in _get_backends():
         as create_pytorch_optims_default
     from delira.training.backends.torch.utils import convert_to_numpy \
         as convert_torch_to_numpy
+    from delira.training.backends.torch.gradient_accumulation import \
+        GradientAccumulationOptimizer
+    from delira.training.backends.torch.quantization import \
+        create_quantization_report
+    from delira.training.backends.torch.distributed import \
+        DistributedPyTorchNetworkTrainer, launch_distributed
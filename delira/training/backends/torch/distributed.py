@@ -0,0 +1,395 @@
+import logging
+import os
+import queue
+import socket
+
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from delira.data_loading.sampler import DistributedSampler
+from delira.models.backends.torch import \
+    DistributedDataParallelPyTorchNetwork
+from delira.training.backends.torch.trainer import PyTorchNetworkTrainer
+from delira.utils.dict_reductions import RunningDictReduction
+from delira.utils.resources import available_cpus, set_cpu_affinity, \
+    set_num_threads
+
+logger = logging.getLogger(__name__)
+
+
+def _find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _distributed_worker(rank, fn, world_size, args, backend, master_addr,
+                        master_port, split_cpus, result_queue):
+    os.environ["MASTER_ADDR"] = master_addr
+    os.environ["MASTER_PORT"] = str(master_port)
+    os.environ["RANK"] = str(rank)
+    os.environ["WORLD_SIZE"] = str(world_size)
+
+    if split_cpus:
+        # give each process its own block of cores to avoid oversubscription
+        cpus = available_cpus()
+        n_cores = max(len(cpus) // world_size, 1)
+        cores = cpus[rank * n_cores:(rank + 1) * n_cores] or \
+            [cpus[rank % len(cpus)]]
+        set_cpu_affinity(cores)
+        set_num_threads(len(cores))
+
+    dist.init_process_group(backend, rank=rank, world_size=world_size)
+
+    try:
+        result = fn(rank, world_size, *args)
+    finally:
+        dist.destroy_process_group()
+
+    result_queue.put((rank, result))
+
+
+def launch_distributed(fn, world_size, args=(), backend="gloo",
+                       master_addr="127.0.0.1", master_port=None,
+                       split_cpus=True):
+    """
+    Launches ``world_size`` local processes, initializes the default process
+    group of :mod:`torch.distributed` in each of them and calls
+    ``fn(rank, world_size, *args)``.
+
+    Parameters
+    ----------
+    fn : function
+        the function to run in each process (must be picklable, i.e.
+        defined on module level)
+    world_size : int
+        the number of processes to launch
+    args : tuple
+        additional positional arguments for ``fn``
+    backend : str
+        the :mod:`torch.distributed` backend; default: "gloo" (CPU)
+    master_addr : str
+        the address of the rank 0 process
+    master_port : int, optional
+        the port of the rank 0 process; a free port is chosen if not given
+    split_cpus : bool
+        whether to split the available cores evenly between the processes
+        (by means of CPU affinity and thread counts)
+
+    Returns
+    -------
+    list
+        the (picklable) return values of ``fn`` ordered by rank
+
+    """
+    if master_port is None:
+        master_port = _find_free_port()
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+
+    # the results must be received while the processes are running: a
+    # process blocks on putting a result larger than the pipe's buffer
+    # until it is read and can't be joined before
+    process_context = mp.spawn(
+        _distributed_worker,
+        args=(fn, world_size, args, backend, master_addr, master_port,
+              split_cpus, result_queue),
+        nprocs=world_size, join=False)
+
+    results = [None] * world_size
+    n_results = 0
+    while n_results < world_size:
+        try:
+            rank, result = result_queue.get(timeout=0.1)
+        except queue.Empty:
+            # re-raises the exception of a failed process and returns True
+            # once all processes have exited
+            if process_context.join(timeout=0) and result_queue.empty():
+                raise RuntimeError("%d of %d processes exited without "
+                                   "returning a result"
+                                   % (world_size - n_results, world_size))
+            continue
+
+        results[rank] = result
+        n_results += 1
+
+    while not process_context.join():
+        pass
+
+    return results
+
+
+class DistributedPyTorchNetworkTrainer(PyTorchNetworkTrainer):
+    """
+    Multi-process data parallel variant of the :class:`PyTorchNetworkTrainer`
+    built on :mod:`torch.distributed`.
+
+    Each process trains on its own shard of the data, the gradients are
+    all-reduced during the backward pass and the metrics and losses are
+    gathered from all processes before reduction. Only the process with
+    rank 0 saves checkpoints and logs.
+
+    The default process group must be initialized before creating the
+    trainer (e.g. by :func:`launch_distributed`).
+
+    See Also
+    --------
+    :class:`PyTorchNetworkTrainer`
+    :class:`DistributedDataParallelPyTorchNetwork`
+    :class:`delira.data_loading.sampler.DistributedSampler`
+
+    """
+
+    def __init__(self, network, save_path, key_mapping, *args,
+                 ddp_kwargs=None, **kwargs):
+        """
+
+        Parameters
+        ----------
+        network : :class:`AbstractPyTorchNetwork`
+            the network to train
+        save_path : str
+            path to save networks to (shared by all processes)
+        key_mapping : dict
+            a dictionary containing the mapping from the ``data_dict`` to
+            the actual model's inputs.
+        *args :
+            positional arguments (passed to :class:`PyTorchNetworkTrainer`)
+        ddp_kwargs : dict, optional
+            additional keyword arguments for
+            :class:`DistributedDataParallelPyTorchNetwork`
+        **kwargs :
+            keyword arguments (passed to :class:`PyTorchNetworkTrainer`)
+
+        Raises
+        ------
+        RuntimeError
+            the default process group is not initialized
+
+        """
+        if not (dist.is_available() and dist.is_initialized()):
+            raise RuntimeError("The default process group of "
+                               "torch.distributed must be initialized "
+                               "before creating a distributed trainer")
+
+        self._rank = dist.get_rank()
+        self._world_size = dist.get_world_size()
+
+        if ddp_kwargs is None:
+            ddp_kwargs = {}
+        self._ddp_kwargs = ddp_kwargs
+
+        super().__init__(network, save_path, key_mapping, *args, **kwargs)
+
+    @property
+    def rank(self):
+        return self._rank
+
+    @property
+    def world_size(self):
+        return self._world_size
+
+    @property
+    def is_main_process(self):
+        return self._rank == 0
+
+    def _setup(self, *args, **kwargs):
+        """
+        Defines the Trainers Setup and wraps the network for gradient
+        synchronization (see :meth:`PyTorchNetworkTrainer._setup` for the
+        arguments)
+
+        """
+        super()._setup(*args, **kwargs)
+
+        if self.use_gpu:
+            device_ids = [self.input_device]
+            output_device = self.input_device
+        else:
+            device_ids, output_device = None, None
+
+        self.module = DistributedDataParallelPyTorchNetwork(
+            self.module, device_ids=device_ids, output_device=output_device,
+            **self._ddp_kwargs)
+
+    def _reinitialize_logging(self, *args, **kwargs):
+        # only the main process logs
+        if self.is_main_process:
+            super()._reinitialize_logging(*args, **kwargs)
+
+    def _shard(self, datamgr):
+        if datamgr is None or issubclass(datamgr.sampler_cls,
+                                         DistributedSampler):
+            return datamgr
+        return datamgr.get_shard(self._rank, self._world_size)
+
+    def _gather(self, values: dict):
+        """
+        Gathers the per-batch values of all processes
+
+        Parameters
+        ----------
+        values : dict
+            dictionary containing lists or arrays of per-batch values
+
+        Returns
+        -------
+        dict
+            dictionary containing the concatenated values of all processes
+
+        """
+        gathered = [None] * self._world_size
+        dist.all_gather_object(gathered, values)
+
+        total_values = {}
+        for _values in gathered:
+            for key, val in _values.items():
+                total_values.setdefault(key, []).extend(list(val))
+
+        if isinstance(next(iter(values.values()), None), np.ndarray):
+            total_values = {k: np.array(v) for k, v in total_values.items()}
+
+        return total_values
+
+    def _gather_reductions(self, reductions: RunningDictReduction):
+        """
+        Combines the running reductions of all processes
+
+        Parameters
+        ----------
+        reductions : :class:`RunningDictReduction`
+            the running reduction of the current process
+
+        Returns
+        -------
+        :class:`RunningDictReduction`
+            the reduction containing the values of all processes (in the
+            order of the ranks)
+
+        """
+        gathered = [None] * self._world_size
+        dist.all_gather_object(gathered, reductions)
+
+        total_reductions = RunningDictReduction()
+        for _reductions in gathered:
+            total_reductions.merge(_reductions)
+
+        return total_reductions
+
+    def train(self, num_epochs, datamgr_train, datamgr_valid=None,
+              val_score_key=None, val_score_mode='highest',
+              reduce_mode='mean', verbose=True):
+        """
+        Defines a routine to train a specified number of epochs on the
+        shards of the given managers (see :meth:`BaseNetworkTrainer.train`
+        for the arguments). Progress bars are only shown by the main
+        process.
+
+        """
+        return super().train(num_epochs, self._shard(datamgr_train),
+                             self._shard(datamgr_valid), val_score_key,
+                             val_score_mode, reduce_mode,
+                             verbose and self.is_main_process)
+
+    def _train_single_epoch(self, batchgen, epoch, verbose=False):
+        total_metrics, total_losses = super()._train_single_epoch(
+            batchgen, epoch, verbose=verbose)
+
+        return self._gather_reductions(total_metrics), \
+            self._gather_reductions(total_losses)
+
+    def predict_data_mgr(self, datamgr, batchsize=None, metrics=None,
+                         metric_keys=None, verbose=False, **kwargs):
+        """
+        Predicts the shard of the current process without synchronizing
+        the processes (see :meth:`PyTorchNetworkTrainer.predict_data_mgr`)
+
+        """
+        # predict with the wrapped module, since the inference does not need
+        # any gradient synchronization
+        ddp_module = self.module
+        self.module = ddp_module.module
+
+        try:
+            yield from super().predict_data_mgr(
+                self._shard(datamgr), batchsize, metrics, metric_keys,
+                verbose and self.is_main_process, **kwargs)
+        finally:
+            self.module = ddp_module
+
+    def predict_data_mgr_cache_metrics_only(self, datamgr, batchsize=None,
+                                            metrics=None, metric_keys=None,
+                                            verbose=False, **kwargs):
+        """
+        Predicts the data of all processes and gathers the metrics of all
+        processes (see
+        :meth:`Predictor.predict_data_mgr_cache_metrics_only`)
+
+        """
+        for metric_vals in super().predict_data_mgr_cache_metrics_only(
+                datamgr, batchsize, metrics, metric_keys, verbose,
+                **kwargs):
+            yield self._gather(metric_vals)
+
+    def save_state(self, file_name, epoch, **kwargs):
+        """
+        Saves the current state (only by the main process) and waits until
+        it has been saved
+
+        Parameters
+        ----------
+        file_name : str
+            filename to save the state to
+        epoch : int
+            current epoch (will be saved for mapping back)
+        **kwargs :
+            keyword arguments
+
+        """
+        if self.is_main_process:
+            super().save_state(file_name, epoch, **kwargs)
+
+        # all processes must be able to load the state afterwards
+        dist.barrier()
+
+    def _register_checkpoint(self, *args, **kwargs):
+        # only the main process writes checkpoints and their manifest
+        if self.is_main_process:
+            super()._register_checkpoint(*args, **kwargs)
+
+    def _at_training_end(self, *args, **kwargs):
+        """
+        Waits until the main process has written all checkpoints before
+        loading the best one (see
+        :meth:`PyTorchNetworkTrainer._at_training_end`)
+
+        """
+        self._flush_checkpoints()
+        dist.barrier()
+
+        return super()._at_training_end(*args, **kwargs)
+
+    def _update_state(self, new_state):
+        """
+        Update the state from a given new state
+
+        Parameters
+        ----------
+        new_state : dict
+            new state to update internal state from
+
+        Returns
+        -------
+        :class:`DistributedPyTorchNetworkTrainer`
+            the trainer with a modified state
+
+        """
+        # checkpoints contain the state of the unwrapped network
+        if "model" in new_state and isinstance(
+                self.module, DistributedDataParallelPyTorchNetwork):
+            self.module.module.load_state_dict(new_state.pop("model"))
+
+        return super()._update_state(new_state)
@@ -3,6 +3,7 @@ import typing
 
 import torch
 
+from delira.io.torch import load_model_state_torch
 from delira.models.backends.torch import AbstractPyTorchNetwork
 from delira.data_loading import DataManager
 
@@ -202,7 +203,7 @@ class PyTorchExperiment(BaseExperiment):
     def test(self, network, test_data: DataManager,
              metrics: dict, metric_keys=None,
              verbose=False, prepare_batch=None,
-             convert_fn=None, **kwargs):
+             convert_fn=None, checkpoint=None, **kwargs):
         """
         Setup and run testing on a given network
 
@@ -232,6 +233,10 @@ class PyTorchExperiment(BaseExperiment):
             function to convert a batch of tensors to numpy
             if not specified defaults to
             :func:`convert_torch_tensor_to_npy`
+        checkpoint : str, optional
+            a checkpoint file to load the ``network``'s state from before
+            testing; only the model state is read and directly copied into
+            the network (see :func:`delira.io.torch.load_model_state_torch`)
         **kwargs :
             additional keyword arguments
 
@@ -250,6 +255,10 @@ class PyTorchExperiment(BaseExperiment):
         # (runs on same device as passed network per default)
 
         device = next(network.parameters()).device
+
+        if checkpoint is not None:
+            load_model_state_torch(checkpoint, network, map_location=device)
+
         if prepare_batch is None:
             prepare_batch = partial(network.prepare_batch,
                                     input_device=device,
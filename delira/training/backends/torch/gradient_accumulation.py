@@ -0,0 +1,158 @@
+import torch
+
+
+class GradientAccumulationOptimizer(torch.optim.Optimizer):
+    """
+    Wraps a :class:`torch.optim.Optimizer` to accumulate the gradients of
+    multiple micro-batches before updating the parameters.
+
+    Only the first call of :meth:`zero_grad` and the last call of
+    :meth:`step` per cycle of ``accumulation_steps`` micro-batches are
+    forwarded to the wrapped optimizer. Before the actual update, the
+    accumulated gradients are divided by the number of accumulated
+    micro-batches, which is equivalent to averaging the losses of all
+    micro-batches. Thus closures (like
+    :meth:`AbstractPyTorchNetwork.closure`) can call ``zero_grad``,
+    ``backward`` and ``step`` for every micro-batch as usual.
+
+    All other attributes (e.g. the ``param_groups`` and the state) are
+    shared with the wrapped optimizer.
+
+    """
+
+    def __init__(self, optimizer: torch.optim.Optimizer,
+                 accumulation_steps: int):
+        """
+
+        Parameters
+        ----------
+        optimizer : :class:`torch.optim.Optimizer`
+            the optimizer performing the actual updates
+        accumulation_steps : int
+            the number of micro-batches to accumulate the gradients of
+
+        """
+        # the base class is not initialized, since all parameters and states
+        # belong to the wrapped optimizer
+        if accumulation_steps < 1:
+            raise ValueError("accumulation_steps must be at least 1, but "
+                             "got %d" % accumulation_steps)
+
+        self.optimizer = optimizer
+        self.accumulation_steps = accumulation_steps
+        self._n_accumulated = 0
+        self._step_next = False
+
+    @property
+    def param_groups(self):
+        return self.optimizer.param_groups
+
+    @property
+    def state(self):
+        return self.optimizer.state
+
+    @property
+    def defaults(self):
+        return self.optimizer.defaults
+
+    @property
+    def n_accumulated(self):
+        """
+        The number of micro-batches accumulated since the last update
+        """
+        return self._n_accumulated
+
+    @property
+    def will_step(self):
+        """
+        Whether the next call of :meth:`step` updates the parameters
+        """
+        return self._step_next or \
+            self._n_accumulated + 1 >= self.accumulation_steps
+
+    def step_next(self):
+        """
+        Forces the next call of :meth:`step` to update the parameters, even
+        if less than ``accumulation_steps`` micro-batches were accumulated
+        (e.g. at the end of an epoch)
+
+        """
+        self._step_next = True
+
+    def zero_grad(self, *args, **kwargs):
+        """
+        Resets the gradients at the beginning of each accumulation cycle
+
+        """
+        if self._n_accumulated == 0:
+            self.optimizer.zero_grad(*args, **kwargs)
+
+    def step(self, closure=None):
+        """
+        Counts the accumulated micro-batches and updates the parameters
+        with the averaged gradients at the end of each accumulation cycle
+
+        Parameters
+        ----------
+        closure : function, optional
+            passed to the wrapped optimizer's ``step``
+
+        Returns
+        -------
+        Any
+            the result of the wrapped optimizer's ``step`` (or None if the
+            parameters were not updated)
+
+        """
+        self._n_accumulated += 1
+        if not (self._step_next or
+                self._n_accumulated >= self.accumulation_steps):
+            return None
+        return self._update(closure)
+
+    def flush(self):
+        """
+        Updates the parameters with all gradients accumulated since the last
+        update (does nothing if no micro-batch was accumulated)
+
+        """
+        if self._n_accumulated:
+            self._update()
+
+    def _update(self, closure=None):
+        if self._n_accumulated > 1:
+            with torch.no_grad():
+                for group in self.optimizer.param_groups:
+                    for param in group["params"]:
+                        if param.grad is not None:
+                            param.grad.div_(self._n_accumulated)
+
+        self._n_accumulated = 0
+        self._step_next = False
+        return self.optimizer.step(closure)
+
+    def state_dict(self):
+        return self.optimizer.state_dict()
+
+    def load_state_dict(self, state_dict):
+        self.optimizer.load_state_dict(state_dict)
+
+    def add_param_group(self, param_group):
+        self.optimizer.add_param_group(param_group)
+
+    def __getattr__(self, item):
+        # only called for attributes not found otherwise
+        if item == "optimizer":
+            raise AttributeError(item)
+        return getattr(self.optimizer, item)
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def __repr__(self):
+        return "%s(%s, accumulation_steps=%d)" % (
+            type(self).__name__, repr(self.optimizer),
+            self.accumulation_steps)
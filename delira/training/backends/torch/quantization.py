@@ -0,0 +1,136 @@
+import copy
+import io
+import logging
+import time
+from functools import partial
+
+import numpy as np
+import torch
+
+from delira.training.predictor import Predictor
+from delira.training.backends.torch.utils import convert_to_numpy
+
+logger = logging.getLogger(__name__)
+
+
+def _state_size(network):
+    buffer = io.BytesIO()
+    torch.save(network.state_dict(), buffer)
+    return buffer.tell()
+
+
+def _measure_latency(network, inputs, n_repeats):
+    timings = []
+    with torch.no_grad():
+        # warmup
+        network(**inputs[0])
+        for _ in range(n_repeats):
+            for _inputs in inputs:
+                start = time.perf_counter()
+                network(**_inputs)
+                timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings) * 1000.
+    return {"mean_ms": float(np.mean(timings)),
+            "p50_ms": float(np.percentile(timings, 50)),
+            "p95_ms": float(np.percentile(timings, 95))}
+
+
+def _evaluate_metrics(network, datamgr, key_mapping, metrics, metric_keys,
+                      prepare_batch_fn):
+    predictor = Predictor(network, key_mapping=key_mapping,
+                          convert_batch_to_npy_fn=convert_to_numpy,
+                          prepare_batch_fn=prepare_batch_fn)
+
+    batch_metrics = {}
+    with torch.no_grad():
+        for _, _metric_vals in predictor.predict_data_mgr(
+                datamgr, metrics=metrics, metric_keys=metric_keys):
+            for key, val in _metric_vals.items():
+                batch_metrics.setdefault(key, []).append(val)
+
+    return {key: float(np.mean(val)) for key, val in batch_metrics.items()}
+
+
+def create_quantization_report(network, quantized_network, datamgr,
+                               key_mapping, metrics=None, metric_keys=None,
+                               example_inputs=None, n_repeats=10):
+    """
+    Compares a network and its quantized counterpart regarding the
+    configured metrics, the CPU latency and the size of the serialized
+    state
+
+    Parameters
+    ----------
+    network : :class:`AbstractPyTorchNetwork`
+        the original network
+    quantized_network : :class:`QuantizedPyTorchNetwork`
+        the quantized network
+    datamgr : :class:`DataManager`
+        the manager providing the evaluation data
+    key_mapping : dict
+        the mapping from the ``data_dict`` to the network's inputs
+    metrics : dict, optional
+        the metrics to evaluate (averaged over all batches)
+    metric_keys : dict, optional
+        the ``batch_dict`` items to use for metric calculation
+    example_inputs : list, optional
+        list of dicts containing the network's (CPU) keyword inputs used
+        for latency measurement; if not given, no latency is measured
+    n_repeats : int
+        how often to forward all ``example_inputs`` for latency measurement
+
+    Returns
+    -------
+    dict
+        the report containing the metrics, latencies and state sizes of
+        both networks (``"float"`` and ``"quantized"``) and their
+        differences (``"comparison"``)
+
+    """
+    if metrics is None:
+        metrics = {}
+
+    if isinstance(network, torch.nn.DataParallel):
+        network = network.module
+
+    # quantized networks run on CPU only; use a copy to leave the
+    # original network (and its device) untouched
+    network = copy.deepcopy(network).cpu().eval()
+
+    report = {}
+    for name, _network in [("float", network),
+                           ("quantized", quantized_network)]:
+        prepare_batch_fn = partial(_network.prepare_batch,
+                                   input_device=torch.device("cpu"),
+                                   output_device=torch.device("cpu"))
+        _report = {
+            "metrics": _evaluate_metrics(_network, datamgr, key_mapping,
+                                         metrics, metric_keys,
+                                         prepare_batch_fn),
+            "state_size_bytes": _state_size(_network)
+        }
+
+        if example_inputs:
+            _report["latency"] = _measure_latency(
+                _network, example_inputs, n_repeats)
+
+        report[name] = _report
+
+    float_report, quantized_report = report["float"], report["quantized"]
+    comparison = {
+        "metrics_diff": {key: quantized_report["metrics"][key] - val
+                         for key, val in float_report["metrics"].items()},
+        "size_ratio": float_report["state_size_bytes"] / max(
+            quantized_report["state_size_bytes"], 1)
+    }
+
+    if example_inputs:
+        comparison["speedup"] = float_report["latency"]["mean_ms"] / max(
+            quantized_report["latency"]["mean_ms"], 1e-12)
+
+    report["comparison"] = comparison
+
+    logger.info("Quantization report: %s" % str(comparison))
+
+    return report
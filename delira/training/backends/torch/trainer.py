@@ -1,3 +1,4 @@
+import copy
 import logging
 import os
 from functools import partial
@@ -6,14 +7,23 @@ import warnings
 import torch
 from batchgenerators.dataloading import MultiThreadedAugmenter
 
-from delira.io.torch import load_checkpoint_torch, save_checkpoint_torch
+from delira.io.torch import load_checkpoint_torch, save_checkpoint_torch, \
+    export_inference_torchscript, snapshot_checkpoint_torch, \
+    write_checkpoint_torch
 from delira.models.backends.torch import AbstractPyTorchNetwork, \
-    DataParallelPyTorchNetwork
+    DataParallelPyTorchNetwork, quantize_dynamic_network, \
+    quantize_static_network, autocast
 
 from delira.training.base_trainer import BaseNetworkTrainer
+from delira.training.predictor import Predictor
 
 from delira.training.backends.torch.utils import create_optims_default
-from delira.training.backends.torch.utils import convert_to_numpy
+from delira.training.backends.torch.gradient_accumulation import \
+    GradientAccumulationOptimizer
+from delira.training.backends.torch.utils import convert_to_numpy, \
+    detach_tensors
+from delira.training.backends.torch.quantization import \
+    create_quantization_report
 from delira.training.callbacks.logging_callback import DefaultLoggingCallback
 
 
@@ -30,6 +40,9 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
 
     """
 
+    _supports_async_checkpointing = True
+    _supports_async_validation = True
+
     def __init__(self,
                  network: AbstractPyTorchNetwork,
                  save_path: str,
@@ -64,6 +77,8 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
                                          "num_losses": 1,
                                          "verbosity": 1},
                  val_freq=1,
+                 autocast_dtype=None,
+                 gradient_accumulation_steps=1,
                  ** kwargs):
         """
 
@@ -193,6 +208,23 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
             trained model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        autocast_dtype : :class:`torch.dtype` or str, optional
+            the lower precision type (e.g. ``torch.bfloat16`` or
+            ``"bfloat16"``) to run the forward passes of training and
+            prediction in by means of :func:`torch.autocast`; the losses are
+            still computed in full precision. In contrast to
+            ``mixed_precision`` this does not require apex and also works on
+            CPU (with bfloat16). None (default) disables autocasting
+        gradient_accumulation_steps : int
+            the number of batches (micro-batches) to accumulate the gradients
+            of before each optimizer step (see
+            :class:`GradientAccumulationOptimizer`), resulting in an
+            effective batch size of ``gradient_accumulation_steps`` times the
+            batch size. The gradients are averaged over the micro-batches
+            and the last micro-batches of each epoch are always used for an
+            update. Iteration based schedulers (like
+            :class:`OneCycleLRCallback`) are stepped once per optimizer step.
+            Defaults to 1 (no accumulation)
         **kwargs :
             additional keyword arguments
 
@@ -242,6 +274,25 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
                     key_mapping, convert_batch_to_npy_fn,
                     mixed_precision, mixed_precision_kwargs, callbacks)
 
+        if isinstance(autocast_dtype, str):
+            autocast_dtype = getattr(torch, autocast_dtype)
+        self.autocast_dtype = autocast_dtype
+
+        if autocast_dtype is not None:
+            self.closure_fn = partial(self.closure_fn,
+                                      autocast_dtype=autocast_dtype)
+
+        self.gradient_accumulation_steps = gradient_accumulation_steps
+        if gradient_accumulation_steps > 1:
+            # the schedulers created during setup keep the original
+            # optimizers, which share their learning rates with the wrappers
+            self.optimizers = {
+                k: GradientAccumulationOptimizer(v,
+                                                 gradient_accumulation_steps)
+                for k, v in self.optimizers.items()}
+            self._micro_batch_closure_fn = self.closure_fn
+            self.closure_fn = self._accumulating_closure
+
         for key, val in kwargs.items():
             setattr(self, key, val)
 
@@ -363,6 +414,20 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
                 "\n%s" %
                 str(e))
 
+    def _forward_context(self):
+        """
+        Creates the context the network's forward pass is executed in during
+        prediction (autocasting to ``autocast_dtype`` if given)
+
+        Returns
+        -------
+        context manager
+            the context of the forward pass
+
+        """
+        return autocast(getattr(self, "autocast_dtype", None),
+                        self.input_device.type)
+
     def _at_training_begin(self, *args, **kwargs):
         """
         Defines the behaviour at beginnig of the training
@@ -378,6 +443,8 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
 
         self.save_state(os.path.join(self.save_path, "checkpoint_epoch_%d"
                                      % self.start_epoch), self.start_epoch)
+        self._register_checkpoint("checkpoint_epoch_%d" % self.start_epoch,
+                                  self.start_epoch)
 
     def _at_training_end(self, *args, **kwargs):
         """
@@ -390,6 +457,8 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
             best network
 
         """
+        self._flush_checkpoints()
+
         if os.path.isfile(os.path.join(self.save_path,
                                        'checkpoint_best.pt')):
 
@@ -400,7 +469,7 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         return super()._at_training_end(*args, **kwargs)
 
     def _at_epoch_end(self, metrics_val, val_score_key, epoch, is_best,
-                      **kwargs):
+                      val_epoch=None, checkpoint_metrics=None, **kwargs):
         """
         Defines behaviour at beginning of each epoch:
         Executes all callbacks's `at_epoch_end` method and saves current
@@ -418,10 +487,20 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
             total number of epochs
         is_best : bool
             whether current model is best one so far
+        val_epoch : int, optional
+            the epoch the validation metrics belong to; differs from
+            ``epoch`` for the asynchronous validation. Defaults to ``epoch``
+        checkpoint_metrics : dict, optional
+            the metrics to register the epoch's checkpoint with; defaults to
+            ``metrics_val``
         **kwargs :
             keyword arguments
 
         """
+        if val_epoch is None:
+            val_epoch = epoch
+        if checkpoint_metrics is None:
+            checkpoint_metrics = metrics_val
 
         for cb in self._callbacks:
             self._update_state(
@@ -429,17 +508,76 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
                     self,
                     val_metrics=metrics_val,
                     val_score_key=val_score_key,
-                    curr_epoch=epoch))
+                    curr_epoch=epoch,
+                    val_epoch=val_epoch))
 
         if epoch % self.save_freq == 0:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_epoch_%d.pt" % epoch),
                             epoch)
+            self._register_checkpoint("checkpoint_epoch_%d" % epoch, epoch,
+                                      checkpoint_metrics)
 
         if is_best:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_best.pt"),
                             epoch)
+            self._register_checkpoint("checkpoint_best", epoch, metrics_val,
+                                      is_best=True)
+
+    def _accumulation_optimizers(self):
+        return [_optim for _optim in self.optimizers.values()
+                if isinstance(_optim, GradientAccumulationOptimizer)]
+
+    def _accumulating_closure(self, model, data_dict, optimizers, losses,
+                              iter_num, **kwargs):
+        """
+        Runs the network's closure on a single micro-batch, while the
+        gradients are accumulated by the
+        :class:`GradientAccumulationOptimizer`
+
+        Parameters
+        ----------
+        model : :class:`AbstractPyTorchNetwork`
+            trainable model
+        data_dict : dict
+            dictionary containing the data
+        optimizers : dict
+            dictionary of (accumulating) optimizers
+        losses : dict
+            dict holding the losses to calculate errors
+        iter_num: int
+            the number of of the current iteration in the current epoch
+        **kwargs :
+            additional keyword arguments passed to the closure
+
+        Returns
+        -------
+        dict
+            Loss values (with same keys as input dict losses)
+        dict
+            Arbitrary number of predictions
+
+        """
+        accumulation_optims = self._accumulation_optimizers()
+
+        # the last micro-batches of an epoch are not carried over
+        if iter_num + 1 == getattr(self, "_n_epoch_batches", None):
+            for _optim in accumulation_optims:
+                _optim.step_next()
+
+        closure = partial(self._micro_batch_closure_fn, model, data_dict,
+                          optimizers=optimizers, losses=losses,
+                          iter_num=iter_num, **kwargs)
+
+        # distributed training: synchronize the gradients only once per
+        # accumulation cycle
+        if hasattr(model, "no_sync") and not any(
+                [_optim.will_step for _optim in accumulation_optims]):
+            with model.no_sync():
+                return closure()
+
+        return closure()
 
     def _train_single_epoch(self, batchgen: MultiThreadedAugmenter, epoch,
                             verbose=False):
@@ -457,8 +595,39 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
 
         self.module.train()
 
-        return super()._train_single_epoch(batchgen, epoch,
-                                           verbose=verbose)
+        self._n_epoch_batches = getattr(batchgen, "n_batches", None)
+
+        total_metrics, total_losses = super()._train_single_epoch(
+            batchgen, epoch, verbose=verbose)
+
+        # in case the number of batches was unknown
+        for _optim in self._accumulation_optimizers():
+            _optim.flush()
+
+        return total_metrics, total_losses
+
+    def _detach_iter_outputs(self, data_dict, preds):
+        """
+        Detaches the batch and the predictions of a training iteration from
+        the computation graph (they stay on their device)
+
+        Parameters
+        ----------
+        data_dict : dict
+            the iteration's (prepared) batch
+        preds : dict
+            the iteration's predictions
+
+        Returns
+        -------
+        dict
+            the detached batch
+        dict
+            the detached predictions
+
+        """
+        detached = detach_tensors(data_dict=data_dict, preds=preds)[1]
+        return detached["data_dict"], detached["preds"]
 
     def predict_data_mgr(self, datamgr, batchsize=None, metrics=None,
                          metric_keys=None, verbose=False, **kwargs):
@@ -498,9 +667,225 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         return super().predict_data_mgr(datamgr, batchsize, metrics,
                                         metric_keys, verbose, **kwargs)
 
+    def _validation_predictor(self):
+        """
+        Snapshots the network for the asynchronous validation
+
+        Returns
+        -------
+        :class:`Predictor`
+            a predictor holding a copy of the network (in evaluation mode
+            and on the CPU), which is not affected by further training
+
+        """
+        module = self.module
+        if isinstance(module, (torch.nn.DataParallel,
+                               torch.nn.parallel.DistributedDataParallel)):
+            module = module.module
+
+        snapshot = copy.deepcopy(module).to("cpu").eval()
+        cpu = torch.device("cpu")
+
+        return Predictor(snapshot, self.key_mapping,
+                         convert_batch_to_npy_fn=self._convert_to_npy_fn,
+                         prepare_batch_fn=partial(snapshot.prepare_batch,
+                                                  input_device=cpu,
+                                                  output_device=cpu))
+
+    def _save_validated_state(self, predictor, epoch, metrics):
+        """
+        Saves the snapshot of an asynchronous validation as best checkpoint
+        (together with the current optimizer states)
+
+        Parameters
+        ----------
+        predictor : :class:`Predictor`
+            the predictor holding the validated snapshot
+        epoch : int
+            the epoch the snapshot was taken at
+        metrics : dict
+            the metrics to register the checkpoint with
+
+        """
+        file_name = os.path.join(self.save_path, "checkpoint_best.pt")
+
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.submit(
+                write_checkpoint_torch, file_name,
+                partial(snapshot_checkpoint_torch, predictor.module,
+                        self.optimizers, epoch))
+        else:
+            save_checkpoint_torch(file_name, predictor.module,
+                                  self.optimizers, epoch)
+
+        self._register_checkpoint("checkpoint_best", epoch, metrics,
+                                  is_best=True)
+
+    def _get_example_inputs(self, datamgr, n_batches=1):
+        """
+        Samples batches from a :class:`DataManager` and converts them to
+        keyword inputs of the network (by means of the ``key_mapping``)
+
+        Parameters
+        ----------
+        datamgr : :class:`DataManager`
+            the manager to sample the batches from
+        n_batches : int
+            the number of batches to sample (or less if the manager
+            provides less batches)
+
+        Returns
+        -------
+        list
+            list of dicts containing the prepared network inputs
+
+        """
+        # sample in the main process to allow stopping after the first
+        # batches without shutting down worker processes
+        orig_num_aug_processes = datamgr.n_process_augmentation
+        datamgr.n_process_augmentation = 0
+
+        example_inputs = []
+        try:
+            for batch in datamgr.get_batchgen():
+                if len(example_inputs) >= n_batches:
+                    break
+
+                batch = self._prepare_batch(batch)
+                example_inputs.append({k: batch[v]
+                                       for k, v in self.key_mapping.items()})
+        finally:
+            datamgr.n_process_augmentation = orig_num_aug_processes
+
+        return example_inputs
+
+    def export_inference(self, file_name, datamgr, n_batches=2, **kwargs):
+        """
+        Exports the current network as frozen TorchScript module for
+        inference via :func:`delira.io.torch.export_inference_torchscript`.
+        The first batch of ``datamgr`` is used to trace the network and all
+        sampled batches are used to check the numerical parity between the
+        exported module and the eager network.
+
+        The exported module can be loaded by
+        :func:`delira.io.torch.load_inference_torchscript` and passed to a
+        :class:`Predictor` (together with the network's ``prepare_batch``)
+
+        Parameters
+        ----------
+        file_name : str
+            the file to save the module to
+        datamgr : :class:`DataManager`
+            the manager providing the example batches
+        n_batches : int
+            number of batches to sample for tracing and parity checks
+        **kwargs :
+            additional keyword arguments (passed to
+            :func:`delira.io.torch.export_inference_torchscript`)
+
+        Returns
+        -------
+        :class:`torch.jit.ScriptModule`
+            the exported module
+
+        """
+        if not (file_name.endswith(".ptj") or file_name.endswith(".pt")):
+            file_name = file_name + ".ptj"
+
+        example_inputs = self._get_example_inputs(datamgr, n_batches)
+
+        if not example_inputs:
+            raise ValueError("The given DataManager did not provide any "
+                             "batches")
+
+        return export_inference_torchscript(
+            file_name, self.module, example_inputs[0],
+            check_inputs=example_inputs[1:], **kwargs)
+
+    def quantize(self, mode="dynamic", datamgr=None, n_batches=10,
+                 **kwargs):
+        """
+        Creates a quantized copy of the current network for CPU inference.
+
+        The quantized network can be passed to a :class:`Predictor` and
+        saved by :meth:`save_state` or
+        :func:`delira.io.torch.save_checkpoint_torch`
+
+        Parameters
+        ----------
+        mode : str
+            "dynamic" to quantize the weights of Linear and LSTM layers
+            (see :func:`quantize_dynamic_network`) or "static" to
+            additionally calibrate the quantization of all activations
+            on batches of ``datamgr`` (see :func:`quantize_static_network`)
+        datamgr : :class:`DataManager`
+            the manager providing the calibration batches; only necessary
+            for static quantization
+        n_batches : int
+            the number of batches to use for calibration
+        **kwargs :
+            additional keyword arguments (passed to the quantization
+            function)
+
+        Returns
+        -------
+        :class:`QuantizedPyTorchNetwork`
+            the quantized network
+
+        """
+        if mode == "dynamic":
+            return quantize_dynamic_network(self.module, **kwargs)
+
+        if mode == "static":
+            if datamgr is None:
+                raise ValueError("Static quantization requires a DataManager "
+                                 "providing the calibration batches")
+
+            calibration_inputs = self._get_example_inputs(datamgr, n_batches)
+            return quantize_static_network(self.module, calibration_inputs,
+                                           **kwargs)
+
+        raise ValueError("Invalid quantization mode: %s" % str(mode))
+
+    def quantization_report(self, quantized_network, datamgr, n_batches=10,
+                            **kwargs):
+        """
+        Compares the current network and a quantized copy regarding the
+        trainer's metrics, the CPU latency and the state size
+        (see :func:`create_quantization_report`)
+
+        Parameters
+        ----------
+        quantized_network : :class:`QuantizedPyTorchNetwork`
+            the quantized network (e.g. obtained by :meth:`quantize`)
+        datamgr : :class:`DataManager`
+            the manager providing the evaluation data
+        n_batches : int
+            the number of batches to use for latency measurement
+        **kwargs :
+            additional keyword arguments (passed to
+            :func:`create_quantization_report`)
+
+        Returns
+        -------
+        dict
+            the quantization report
+
+        """
+        example_inputs = [{k: v.cpu() for k, v in _inputs.items()}
+                          for _inputs in self._get_example_inputs(
+                              datamgr, n_batches)]
+
+        return create_quantization_report(
+            self.module, quantized_network, datamgr, self.key_mapping,
+            metrics=self.metrics, metric_keys=self.metric_keys,
+            example_inputs=example_inputs, **kwargs)
+
     def save_state(self, file_name, epoch, **kwargs):
         """
         saves the current state via :func:`delira.io.torch.save_checkpoint`
+        (or snapshots it and writes it in the background, if asynchronous
+        checkpointing is enabled)
 
         Parameters
         ----------
@@ -514,8 +899,15 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         """
         if not (file_name.endswith(".pth") or file_name.endswith(".pt")):
             file_name = file_name + ".pt"
-        save_checkpoint_torch(file_name, self.module, self.optimizers, epoch,
-                              **kwargs)
+
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.submit(
+                partial(write_checkpoint_torch, **kwargs), file_name,
+                partial(snapshot_checkpoint_torch, self.module,
+                        self.optimizers, epoch))
+        else:
+            save_checkpoint_torch(file_name, self.module, self.optimizers,
+                                  epoch, **kwargs)
 
     @staticmethod
     def load_state(file_name, **kwargs):
@@ -1,8 +1,8 @@
+import numpy as np
 import torch
 
 from delira.utils.decorators import dtype_func
-from delira.training.utils import convert_to_numpy_identity
-from delira.training.utils import recursively_convert_elements
+from delira.training.utils import StructuredConverter, _correct_zero_shape
 
 
 @dtype_func(torch.nn.Module)
@@ -29,6 +29,9 @@ def create_optims_default(model, optim_cls, **optim_params):
 
 
 def _single_element_tensor_conversion(element):
+    # numpy has no bfloat16 type
+    if element.dtype == torch.bfloat16:
+        element = element.float()
     return element.cpu().detach().numpy()
 
 
@@ -51,10 +54,40 @@ def convert_to_numpy(*args, **kwargs):
         converted keyboard arguments
 
     """
-    args = recursively_convert_elements(args, torch.Tensor,
-                                        _single_element_tensor_conversion)
+    return _converter(*args, **kwargs)
 
-    kwargs = recursively_convert_elements(kwargs, torch.Tensor,
-                                          _single_element_tensor_conversion)
 
-    return convert_to_numpy_identity(*args, **kwargs)
+# converts the tensors and corrects the shapes of all arrays in a single pass
+_converter = StructuredConverter([
+    (torch.Tensor, _single_element_tensor_conversion),
+    (np.ndarray, _correct_zero_shape)])
+
+
+def _detach_tensor(tensor):
+    return tensor.detach()
+
+
+def detach_tensors(*args, **kwargs):
+    """
+    Detaches all :class:`torch.Tensor` in args and kwargs from the
+    computation graph (without copying them)
+
+    Parameters
+    ----------
+    *args :
+        positional arguments of arbitrary number and type
+    **kwargs :
+        keyword arguments of arbitrary number and type
+
+    Returns
+    -------
+    list
+        detached positional arguments
+    dict
+        detached keyword arguments
+
+    """
+    return _detacher(*args, **kwargs)
+
+
+_detacher = StructuredConverter([(torch.Tensor, _detach_tensor)])
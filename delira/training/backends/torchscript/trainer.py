@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 
 class TorchScriptNetworkTrainer(PyTorchNetworkTrainer):
+    # the scripted graph is saved synchronously by torch.jit.save
+    _supports_async_checkpointing = False
+
     def __init__(self,
                  network: AbstractTorchScriptNetwork,
                  save_path: str,
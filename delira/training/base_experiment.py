@@ -11,14 +11,17 @@ import numpy as np
 from sklearn.model_selection import KFold, StratifiedKFold, \
     StratifiedShuffleSplit, ShuffleSplit
 
-from delira import get_backends
+from delira import get_backends, get_current_debug_mode
 
 from delira.data_loading import DataManager
 from delira.models import AbstractNetwork
 
 from delira.utils import DeliraConfig
 from delira.training.base_trainer import BaseNetworkTrainer
+from delira.training.hyperparameter_search import HyperparameterSearch
+from delira.training.parallel_kfold import run_folds_parallel
 from delira.training.predictor import Predictor
+from delira.training.result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,7 @@ class BaseExperiment(object):
                  checkpoint_freq=1,
                  trainer_cls=BaseNetworkTrainer,
                  predictor_cls=Predictor,
+                 result_cache=None,
                  **kwargs):
         """
 
@@ -87,6 +91,10 @@ class BaseExperiment(object):
             the trainer class to use for training the model
         predictor_cls : subclass of :class:`Predictor`
             the predictor class to use for testing the model
+        result_cache : :class:`ResultCache` or str or None
+            the cache (or its directory) to reuse the results of previous
+            trainings and k-fold cross-validations from; if None: no results
+            are cached
         **kwargs :
             additional keyword arguments
 
@@ -113,10 +121,20 @@ class BaseExperiment(object):
                                       str(datetime.now().strftime(
                                           "%y-%m-%d_%H-%M-%S")))
 
-        if os.path.isdir(self.save_path):
-            logger.warning("Save Path %s already exists")
-
-        os.makedirs(self.save_path, exist_ok=True)
+        # experiments created within the same second must not share their
+        # directory (the trainers would resume each other's checkpoints)
+        base_path, suffix = self.save_path, 0
+        while True:
+            try:
+                os.makedirs(self.save_path)
+                break
+            except FileExistsError:
+                suffix += 1
+                self.save_path = "%s_%d" % (base_path, suffix)
+
+        if suffix:
+            logger.warning("Save Path %s already exists, using %s instead"
+                           % (base_path, self.save_path))
 
         self.trainer_cls = trainer_cls
         self.predictor_cls = predictor_cls
@@ -137,6 +155,10 @@ class BaseExperiment(object):
         self._optim_builder = optim_builder
         self.checkpoint_freq = checkpoint_freq
 
+        if isinstance(result_cache, str):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+
         self._run = 0
 
         self.kwargs = kwargs
@@ -276,7 +298,7 @@ class BaseExperiment(object):
 
     def run(self, train_data: DataManager,
             val_data: DataManager = None,
-            config: DeliraConfig = None, **kwargs):
+            config: DeliraConfig = None, seed=None, **kwargs):
         """
         Setup and run training
 
@@ -290,6 +312,10 @@ class BaseExperiment(object):
         config : :class:`DeliraConfig` or None
             the config to use for training and model instantiation
             (will be merged with ``self.config``)
+        seed : int or None
+            the seed, the training was started with; only used to identify
+            the result in the ``result_cache`` (the seeding itself must be
+            done by the caller)
         **kwargs :
             additional keyword arguments
 
@@ -302,6 +328,14 @@ class BaseExperiment(object):
         --------
         :class:`BaseNetworkTrainer` for training itself
 
+        Notes
+        -----
+        If a ``result_cache`` is given, the training is skipped if a result
+        for the same config, model class, data, seed, number of epochs and
+        validation score is cached. Instead, the cached state is restored.
+        Other keyword arguments are not part of the cache key; changing them
+        requires to invalidate the cache explicitly.
+
         """
 
         config = self._resolve_params(config)
@@ -319,9 +353,39 @@ class BaseExperiment(object):
         if num_epochs is None:
             num_epochs = self.n_epochs
 
-        return trainer.train(num_epochs, train_data, val_data,
-                             self.val_score_key, kwargs.get("val_score_mode",
-                                                            "lowest"))
+        val_score_mode = kwargs.get("val_score_mode", "lowest")
+
+        if self.result_cache is None:
+            return trainer.train(num_epochs, train_data, val_data,
+                                 self.val_score_key, val_score_mode)
+
+        key = self.result_cache.make_key(
+            config, self.model_cls, (train_data, val_data), seed,
+            trainer_cls=self.trainer_cls, num_epochs=num_epochs,
+            val_score_key=self.val_score_key, val_score_mode=val_score_mode)
+
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            logger.info("Restoring cached training result %s" % key)
+            try:
+                trainer.update_state(os.path.join(cached, "checkpoint"))
+                return trainer.module
+            except Exception as e:
+                warnings.warn("Could not restore the cached training result "
+                              "%s (%s); training again" % (key, str(e)),
+                              UserWarning)
+                self.result_cache.invalidate(key)
+
+        model = trainer.train(num_epochs, train_data, val_data,
+                              self.val_score_key, val_score_mode)
+
+        def _write(path):
+            trainer.save_state(os.path.join(path, "checkpoint"),
+                               epoch=num_epochs)
+            trainer._flush_checkpoints()
+
+        self.result_cache.put(key, _write, {"num_epochs": num_epochs})
+        return model
 
     def resume(self, save_path: str, train_data: DataManager,
                val_data: DataManager = None,
@@ -418,7 +482,9 @@ class BaseExperiment(object):
               num_splits=None, shuffle=False, random_seed=None,
               split_type="random", val_split=0.2, label_key="label",
               train_kwargs: dict = None, metric_keys: dict = None,
-              test_kwargs: dict = None, config=None, verbose=False, **kwargs):
+              test_kwargs: dict = None, config=None, verbose=False,
+              n_workers=1, cpus_per_fold=None, start_method=None,
+              **kwargs):
         """
         Performs a k-Fold cross-validation
 
@@ -471,6 +537,23 @@ class BaseExperiment(object):
             (will be merged with ``self.config``)
         verbose : bool
             verbosity
+        n_workers : int
+            the number of folds to run concurrently in separate worker
+            processes; ignored in debug mode (see
+            :func:`delira.training.parallel_kfold.run_folds_parallel`).
+            Forked workers share the dataset's memory with this process
+            until they modify it, while workers started by "spawn" or
+            "forkserver" receive a pickled copy of ``data`` each, i.e. the
+            dataset is held ``n_workers + 1`` times in memory (lazily
+            loading datasets keep this copy small)
+        cpus_per_fold : int or None
+            the number of CPU cores reserved for each concurrently running
+            fold; these cores are split between its training process and its
+            augmentation processes. If None: the folds share all cores
+        start_method : str or None
+            the method to start the fold workers with (only used if
+            ``n_workers`` is greater than 1); if None: "fork" is used where
+            available, otherwise "spawn"
         **kwargs :
             additional keyword arguments
 
@@ -510,6 +593,10 @@ class BaseExperiment(object):
         each item must be loaded once to obtain the labels necessary for
         stratification.
 
+        When running the folds concurrently, each fold is saved to its own
+        ``fold_XX`` directory and the results of failed folds are missing
+        from the returned dicts (a warning is emitted instead of raising).
+
         """
 
         # set number of splits if not specified
@@ -550,57 +637,194 @@ class BaseExperiment(object):
         if random_seed is not None:
             np.random.seed(random_seed)
 
-        # iterate over folds
+        # the folds are defined by indices into the whole dataset, which
+        # allows to extract the subsets in the workers when running parallel
+        folds = []
         for idx, (train_idxs, test_idxs) in enumerate(
                 fold.split(split_idxs, split_labels)):
 
-            # extract data from single manager
-            train_data = data.get_subset(train_idxs)
-            test_data = data.get_subset(test_idxs)
-
-            train_data.update_state_from_dict(copy.deepcopy(train_kwargs))
-            test_data.update_state_from_dict(copy.deepcopy(test_kwargs))
-
-            val_data = None
+            val_idxs = None
             if val_split is not None:
-                if split_type == "random":
-                    # split_labels are ignored for random splitting, set them
-                    # to split_idxs just ensures same length
-                    train_labels = train_idxs
-                elif split_type == "stratified":
-                    # iterate over dataset to get labels for stratified
-                    # splitting
-                    train_labels = [train_data.dataset[_idx][label_key]
-                                    for _idx in train_idxs]
-                else:
-                    raise ValueError("split_type must be one of "
-                                     "['random', 'stratified'], but got: %s"
-                                     % str(split_type))
-
                 _val_split = val_split_cls(n_splits=1, test_size=val_split,
                                            random_state=random_seed)
 
+                # split_labels are equal to split_idxs for random splitting
+                train_labels = [split_labels[_idx] for _idx in train_idxs]
+
                 for _train_idxs, _val_idxs in _val_split.split(train_idxs,
                                                                train_labels):
-                    val_data = train_data.get_subset(_val_idxs)
-                    val_data.update_state_from_dict(copy.deepcopy(test_kwargs))
-
-                    train_data = train_data.get_subset(_train_idxs)
-
-            model = self.run(train_data=train_data, val_data=val_data,
-                             config=config, num_epochs=num_epochs, fold=idx,
-                             **kwargs)
-
-            _outputs, _metrics_test = self.test(model, test_data,
-                                                metrics=metrics,
-                                                metric_keys=metric_keys,
-                                                verbose=verbose)
+                    val_idxs = train_idxs[_val_idxs]
+                    train_idxs = train_idxs[_train_idxs]
+
+            folds.append((idx, train_idxs, val_idxs, test_idxs))
+
+        fold_kwargs = {"metrics": metrics, "num_epochs": num_epochs,
+                       "train_kwargs": train_kwargs,
+                       "metric_keys": metric_keys, "test_kwargs": test_kwargs,
+                       "config": config, "verbose": verbose,
+                       "seed": random_seed, **kwargs}
+
+        if n_workers > 1 and not get_current_debug_mode():
+            results = run_folds_parallel(
+                self, data, folds, n_workers=n_workers,
+                cpus_per_fold=cpus_per_fold, random_seed=random_seed,
+                start_method=start_method, **fold_kwargs)
+        else:
+            results = {}
+            for fold_idxs in folds:
+                results[fold_idxs[0]] = self._run_fold(data, *fold_idxs,
+                                                       **fold_kwargs)
 
+        for idx, (_outputs, _metrics_test) in sorted(results.items()):
             outputs[str(idx)] = _outputs
             metrics_test[str(idx)] = _metrics_test
 
         return outputs, metrics_test
 
+    def _run_fold(self, data: DataManager, idx, train_idxs, val_idxs,
+                  test_idxs, metrics: dict, num_epochs=None,
+                  train_kwargs: dict = None, metric_keys: dict = None,
+                  test_kwargs: dict = None, config=None, verbose=False,
+                  seed=None, **kwargs):
+        """
+        Trains and tests a single fold of a k-Fold cross-validation
+
+        Parameters
+        ----------
+        data : :class:`DataManager`
+            the manager containing the whole dataset
+        idx : int
+            the index of the fold
+        train_idxs : iterable
+            the indices of the training samples
+        val_idxs : iterable or None
+            the indices of the validation samples (None to disable the
+            validation)
+        test_idxs : iterable
+            the indices of the test samples
+        metrics : dict
+            dictionary containing the metrics to evaluate
+        num_epochs : int or None
+            number of epochs to train
+        train_kwargs : dict
+            kwargs to update the behavior of the :class:`DataManager`
+            containing the train data
+        metric_keys : dict of tuples
+            the batch_dict keys to use for each metric to calculate
+        test_kwargs : dict
+            kwargs to update the behavior of the :class:`DataManager`
+            containing the test and validation data
+        config : :class:`DeliraConfig` or None
+            the training and model parameters
+        verbose : bool
+            verbosity
+        seed : int or None
+            the seed of the cross-validation
+        **kwargs :
+            additional keyword arguments passed to :meth:`run`
+
+        Returns
+        -------
+        dict
+            the predictions of the fold
+        dict
+            the metric values of the fold
+
+        """
+        key = None
+        if self.result_cache is not None:
+            fold_idxs = [None if _idxs is None else [int(_idx)
+                                                     for _idx in _idxs]
+                         for _idxs in (train_idxs, val_idxs, test_idxs)]
+
+            key = self.result_cache.make_key(
+                self._resolve_params(copy.deepcopy(config)), self.model_cls,
+                (data,), seed, fold_idxs=fold_idxs,
+                train_kwargs=train_kwargs, test_kwargs=test_kwargs,
+                num_epochs=num_epochs, metrics=metrics,
+                metric_keys=metric_keys, val_score_key=self.val_score_key,
+                val_score_mode=kwargs.get("val_score_mode", "lowest"))
+
+            cached = self.result_cache.get_result(key)
+            if cached is not None:
+                logger.info("Using cached result %s of fold %d" % (key, idx))
+                return cached
+
+        # extract data from single manager
+        train_data = data.get_subset(train_idxs)
+        test_data = data.get_subset(test_idxs)
+
+        train_data.update_state_from_dict(copy.deepcopy(train_kwargs))
+        test_data.update_state_from_dict(copy.deepcopy(test_kwargs))
+
+        val_data = None
+        if val_idxs is not None:
+            # the validation data is part of the training data
+            val_data = data.get_subset(val_idxs)
+            val_data.update_state_from_dict(copy.deepcopy(train_kwargs))
+            val_data.update_state_from_dict(copy.deepcopy(test_kwargs))
+
+        model = self.run(train_data=train_data, val_data=val_data,
+                         config=config, num_epochs=num_epochs, fold=idx,
+                         seed=seed, **kwargs)
+
+        result = self.test(model, test_data, metrics=metrics,
+                           metric_keys=metric_keys, verbose=verbose)
+
+        if key is not None:
+            self.result_cache.put_result(key, result, {"fold": idx})
+
+        return result
+
+    def search(self, search, train_data: DataManager,
+               val_data: DataManager = None, n_workers=1,
+               cpus_per_trial=None, save_path=None, resume=True, **kwargs):
+        """
+        Performs a hyperparameter search by training the trials of
+        ``search`` concurrently
+
+        Parameters
+        ----------
+        search : :class:`AbstractSearch`
+            the search defining the trials (e.g. :class:`GridSearch`,
+            :class:`RandomSearch` or :class:`ASHASearch`)
+        train_data : :class:`DataManager`
+            the data to train the trials with
+        val_data : :class:`DataManager` or None
+            the data to validate the trials with (necessary to score them)
+        n_workers : int
+            the maximum number of trials trained concurrently
+        cpus_per_trial : int or None
+            the number of CPU cores each running trial is pinned to
+            (if None: the trials share all cores)
+        save_path : str or None
+            the directory to save the search to; an interrupted search is
+            resumed from there (if None: defaults to a ``search`` directory
+            inside ``self.save_path``)
+        resume : bool
+            whether to resume a previous search from ``save_path``
+        **kwargs :
+            additional keyword arguments passed to :meth:`run` for every
+            trial
+
+        Returns
+        -------
+        list
+            the trials sorted by their score
+
+        See Also
+        --------
+        :class:`HyperparameterSearch` for the search itself
+
+        """
+        if save_path is None:
+            save_path = os.path.join(self.save_path, "search")
+
+        return HyperparameterSearch(
+            self, search, save_path, n_workers=n_workers,
+            cpus_per_trial=cpus_per_trial).run(
+            train_data, val_data, resume=resume, **kwargs)
+
     def __str__(self):
         """
         Converts :class:`BaseExperiment` to string representation
@@ -644,7 +868,10 @@ class BaseExperiment(object):
                   "wb") as f:
             pickle.dump(self, f)
 
-        self.config.dump(os.path.join(self.save_path, "parameters"))
+        # store arrays (e.g. class weights) in a compressed sidecar instead
+        # of as (nested) lists inside the yaml file
+        self.config.dump(os.path.join(self.save_path, "parameters"),
+                         array_format="npz")
 
     @staticmethod
     def load(file_name):
@@ -1,23 +1,62 @@
+import collections
+import contextlib
+import functools
 import logging
 import os
 import pickle
 import typing
 import warnings
 
-from delira.utils.config import LookupConfig
+from delira.utils.config import BatchDict
+from delira.utils.dict_reductions import RunningDictReduction
 
-import numpy as np
 from tqdm import tqdm
 
-from .callbacks import AbstractCallback, DefaultLoggingCallback
+from .async_validator import AsyncValidator
+from .callbacks import AbstractCallback, DefaultLoggingCallback, \
+    StepProfiler
+from .checkpoint_manager import CheckpointManager
+from .metric_worker import MetricWorker
 from .predictor import Predictor
 from ..data_loading import Augmenter, DataManager
+from ..io.async_writer import AsyncCheckpointWriter
 from ..models import AbstractNetwork
 from ..logging import register_logger, make_logger
 
 logger = logging.getLogger(__name__)
 
 
+def _flush_checkpoints_on_error(train_fn):
+    """
+    Decorator making sure that checkpoints written in the background are
+    completed (and the validation process is stopped) if the training is
+    interrupted by an exception
+
+    """
+    @functools.wraps(train_fn)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return train_fn(self, *args, **kwargs)
+        except BaseException:
+            validator = getattr(self, "_async_validator", None)
+            if validator is not None:
+                validator.shutdown()
+            self._restore_resources()
+            try:
+                self._flush_checkpoints()
+            except Exception as e:
+                logger.error("Pending checkpoints could not be written: %s"
+                             % str(e))
+            raise
+
+    return wrapper
+
+
+def _untimed(phase):
+    # replaces ``StepProfiler.phase`` if no profiler is registered
+    return contextlib.ExitStack()
+
+
 class BaseNetworkTrainer(Predictor):
     """
     Defines a Base API and basic functions for Network Trainers
@@ -34,6 +73,12 @@ class BaseNetworkTrainer(Predictor):
                        "output_device",
                        "_callbacks"]
 
+    # whether ``save_state`` is able to write snapshots in the background
+    _supports_async_checkpointing = False
+    # whether the network can be snapshotted and validated in a separate
+    # process (see ``_validation_predictor``)
+    _supports_async_validation = False
+
     def __init__(self,
                  network: AbstractNetwork,
                  save_path: str,
@@ -58,6 +103,14 @@ class BaseNetworkTrainer(Predictor):
                  metric_keys=None,
                  convert_batch_to_npy_fn=lambda x: x,
                  val_freq=1,
+                 async_checkpointing=False,
+                 max_pending_checkpoints=1,
+                 checkpoint_retention=None,
+                 async_metrics=False,
+                 metric_workers=1,
+                 max_pending_metrics=None,
+                 train_metrics_freq=1,
+                 async_validation=False,
                  **kwargs
                  ):
         """
@@ -140,6 +193,52 @@ class BaseNetworkTrainer(Predictor):
             model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        async_checkpointing : bool
+            whether to snapshot the states in memory and write the
+            checkpoints in a background thread (see
+            :class:`delira.io.AsyncCheckpointWriter`) instead of blocking
+            the training; ignored by backends not supporting it
+        max_pending_checkpoints : int
+            the maximum number of snapshots not written yet (only used if
+            ``async_checkpointing`` is enabled)
+        checkpoint_retention : dict, optional
+            keyword arguments for the :class:`CheckpointManager` (e.g.
+            ``keep_last``, ``keep_best`` and ``keep_every``) defining which
+            epoch checkpoints to keep; per default all checkpoints are kept
+        async_metrics : bool
+            whether to convert the predictions to numpy, calculate the
+            training metrics and run the iteration end callbacks in
+            background threads (see :class:`MetricWorker`) while the next
+            training step is executed. The iteration end callbacks are still
+            called in the order of the iterations, but from a background
+            thread: they must not modify any state used by the training step
+            and the trainer attributes they return are set by the main thread
+            before one of the next iterations
+        metric_workers : int
+            the number of threads calculating the metrics (only used if
+            ``async_metrics`` is enabled)
+        max_pending_metrics : int, optional
+            the maximum number of iterations, whose metrics are not
+            calculated yet (only used if ``async_metrics`` is enabled);
+            defaults to twice the number of ``metric_workers``
+        train_metrics_freq : int
+            specifies how often to calculate the training metrics (a value of
+            1 denotes calculating them every iteration, a value of 2 denotes
+            calculating them every second iteration etc.); defaults to 1
+        async_validation : bool
+            whether to validate snapshots of the network in a separate
+            process (see :class:`AsyncValidator`) while the training
+            continues instead of interrupting the training for the
+            validation; ignored by backends not supporting it.
+            The validation results are delayed by one epoch: the snapshot
+            taken at the end of epoch ``n`` is validated during epoch
+            ``n + 1`` and its metrics are reported at the end of epoch
+            ``n + 1`` (waiting for the validation if it takes longer than the
+            training epoch). Thus the callbacks (e.g. ``EarlyStopping`` or
+            ``ReduceLROnPlateauCallback``) react one epoch later, while the
+            best checkpoint is still saved from the validated snapshot (and
+            marked with its epoch). The validation of the last epoch is only
+            used to select the best checkpoint
         **kwargs :
             Additional keyword arguments
 
@@ -185,6 +284,39 @@ class BaseNetworkTrainer(Predictor):
             "logging_frequencies": logging_frequencies,
             "reduce_types": logging_reduce_types}
 
+        if checkpoint_retention is None:
+            checkpoint_retention = {}
+        self.checkpoint_manager = CheckpointManager(save_path,
+                                                    **checkpoint_retention)
+
+        self._checkpoint_writer = None
+        if async_checkpointing:
+            if self._supports_async_checkpointing:
+                self._checkpoint_writer = AsyncCheckpointWriter(
+                    max_pending_checkpoints)
+            else:
+                warnings.warn("%s does not support asynchronous "
+                              "checkpointing. Checkpoints will be written "
+                              "synchronously" % type(self).__name__,
+                              UserWarning)
+
+        self.train_metrics_freq = train_metrics_freq
+        self._metric_worker = None
+        self._state_updates = collections.deque()
+        if async_metrics:
+            self._metric_worker = MetricWorker(metric_workers,
+                                               max_pending_metrics)
+
+        self._async_validator = None
+        if async_validation:
+            if self._supports_async_validation:
+                self._async_validator = AsyncValidator()
+            else:
+                warnings.warn("%s does not support asynchronous "
+                              "validation. The network will be validated "
+                              "synchronously" % type(self).__name__,
+                              UserWarning)
+
     def _setup(self, network, lr_scheduler_cls, lr_scheduler_params, gpu_ids,
                key_mapping, convert_batch_to_npy_fn, prepare_batch_fn,
                callbacks):
@@ -226,6 +358,8 @@ class BaseNetworkTrainer(Predictor):
 
         self.save_state(os.path.join(self.save_path, "checkpoint_epoch_%d"
                                      % self.start_epoch))
+        self._register_checkpoint("checkpoint_epoch_%d" % self.start_epoch,
+                                  self.start_epoch)
 
     def _at_training_end(self, *args, **kwargs):
         """
@@ -244,11 +378,100 @@ class BaseNetworkTrainer(Predictor):
             the network with the loaded state
 
         """
+        self._flush_checkpoints()
+
+        metric_worker = getattr(self, "_metric_worker", None)
+        if metric_worker is not None:
+            metric_worker.shutdown()
+
+        validator = getattr(self, "_async_validator", None)
+        if validator is not None:
+            validator.shutdown()
+
+        self._restore_resources()
+
         for cbck in self._callbacks:
             self._update_state(cbck.at_training_end(self, *args, **kwargs))
 
         return self.module
 
+    def _restore_resources(self):
+        """
+        Restores the CPU affinity and thread counts of the process, which
+        were changed by the resource plan of the training data (does
+        nothing if no plan was applied)
+
+        """
+        state = getattr(self, "_resource_state", None)
+        if state is not None:
+            self._resource_state = None
+            state.restore()
+
+    def _flush_checkpoints(self):
+        """
+        Waits until all checkpoints written in the background are completed
+        (does nothing for synchronous checkpointing)
+
+        """
+        writer = getattr(self, "_checkpoint_writer", None)
+        if writer is not None:
+            writer.flush()
+
+    def _register_checkpoint(self, name, epoch, metrics=None, is_best=False):
+        """
+        Records a saved checkpoint in the manifest of the
+        :attr:`checkpoint_manager` and removes outdated checkpoints (after
+        all pending checkpoints are written, if asynchronous checkpointing
+        is enabled)
+
+        Parameters
+        ----------
+        name : str
+            the checkpoint's file name without extension
+        epoch : int
+            the checkpoint's epoch
+        metrics : dict, optional
+            the checkpoint's metrics
+        is_best : bool
+            whether this is the best checkpoint
+
+        """
+        manager = getattr(self, "checkpoint_manager", None)
+        if manager is None:
+            return
+
+        writer = getattr(self, "_checkpoint_writer", None)
+        if writer is not None:
+            writer.submit_task(manager.register, name, epoch, metrics,
+                               is_best)
+        else:
+            manager.register(name, epoch, metrics, is_best)
+
+    def _update_checkpoint_metrics(self, epoch, metrics):
+        """
+        Adds metrics to the recorded checkpoint of an epoch (e.g. the
+        result of an asynchronous validation, which finishes after the
+        checkpoint was registered) in the manifest of the
+        :attr:`checkpoint_manager`
+
+        Parameters
+        ----------
+        epoch : int
+            the checkpoint's epoch
+        metrics : dict
+            the metrics to add
+
+        """
+        manager = getattr(self, "checkpoint_manager", None)
+        if manager is None:
+            return
+
+        writer = getattr(self, "_checkpoint_writer", None)
+        if writer is not None:
+            writer.submit_task(manager.update_metrics, epoch, metrics)
+        else:
+            manager.update_metrics(epoch, metrics)
+
     def _at_epoch_begin(self, val_score_key, epoch, num_epochs,
                         **kwargs):
         """
@@ -274,7 +497,7 @@ class BaseNetworkTrainer(Predictor):
                                                  curr_epoch=epoch))
 
     def _at_epoch_end(self, metrics_val, val_score_key, epoch, is_best,
-                      **kwargs):
+                      val_epoch=None, checkpoint_metrics=None, **kwargs):
         """
         Defines behaviour at beginning of each epoch: Executes all callbacks's
         `at_epoch_end` method and saves current state if necessary
@@ -287,25 +510,42 @@ class BaseNetworkTrainer(Predictor):
             validation score key
         epoch : int
             current epoch
-        num_epochs : int
-            total number of epochs
+        is_best : bool
+            whether the current state is the best one
+        val_epoch : int, optional
+            the epoch the validation metrics belong to; differs from
+            ``epoch`` for the asynchronous validation, where the metrics
+            of the previous epoch's validation are available at the end of
+            an epoch. Defaults to ``epoch``
+        checkpoint_metrics : dict, optional
+            the metrics to register the epoch's checkpoint with; defaults to
+            ``metrics_val``
         **kwargs :
             keyword arguments
 
         """
+        if val_epoch is None:
+            val_epoch = epoch
+        if checkpoint_metrics is None:
+            checkpoint_metrics = metrics_val
 
         for cb in self._callbacks:
             self._update_state(cb.at_epoch_end(self, val_metrics=metrics_val,
                                                val_score_key=val_score_key,
-                                               curr_epoch=epoch))
+                                               curr_epoch=epoch,
+                                               val_epoch=val_epoch))
 
         if epoch % self.save_freq == 0:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_epoch_%d" % epoch))
+            self._register_checkpoint("checkpoint_epoch_%d" % epoch, epoch,
+                                      checkpoint_metrics)
 
         if is_best:
             self.save_state(os.path.join(self.save_path,
                                          "checkpoint_best"))
+            self._register_checkpoint("checkpoint_best", epoch, metrics_val,
+                                      is_best=True)
 
     def _at_iter_begin(self, iter_num, epoch=0, **kwargs):
         """
@@ -330,7 +570,8 @@ class BaseNetworkTrainer(Predictor):
                 **kwargs,
             ))
 
-    def _at_iter_end(self, iter_num, data_dict, metrics, epoch=0, **kwargs):
+    def _at_iter_end(self, iter_num, data_dict, metrics, epoch=0,
+                     global_iter_num=None, state_updates=None, **kwargs):
         """
         Defines the behavior executed at an iteration's end
 
@@ -344,24 +585,166 @@ class BaseNetworkTrainer(Predictor):
             calculated metrics
         epoch : int
             number of current epoch
+        global_iter_num : int, optional
+            the global number of the iteration; if not given, the current
+            global iteration number is used and incremented afterwards
+        state_updates : :class:`collections.deque`, optional
+            if given, the states returned by the callbacks are appended to it
+            instead of updating the trainer (which is done later on by
+            :meth:`_apply_state_updates`)
         **kwargs :
             additional keyword arguments (forwarded to callback calls)
 
         """
+        increment = global_iter_num is None
+        if increment:
+            global_iter_num = self._global_iter_num
 
         for cb in self._callbacks:
-            self._update_state(cb.at_iter_end(
+            new_state = cb.at_iter_end(
                 self, iter_num=iter_num,
                 data_dict=data_dict,
                 metrics=metrics,
                 curr_epoch=epoch,
-                global_iter_num=self._global_iter_num,
+                global_iter_num=global_iter_num,
                 train=True,
                 **kwargs,
-            ))
+            )
+            if state_updates is None:
+                self._update_state(new_state)
+            else:
+                state_updates.append(new_state)
+
+        if increment:
+            self._global_iter_num += 1
+
+    def _apply_state_updates(self):
+        """
+        Updates the trainer with the states returned by the iteration end
+        callbacks, which were run in the background (must be called by the
+        main thread)
+
+        """
+        while self._state_updates:
+            self._update_state(self._state_updates.popleft())
 
+    def _detach_iter_outputs(self, data_dict, preds):
+        """
+        Detaches the batch and the predictions of a training iteration from
+        the computation graph (without copying them to the host memory)
+        before they are processed in the background. Does nothing per
+        default; backends with autograd tensors should override it.
+
+        Parameters
+        ----------
+        data_dict : dict
+            the iteration's (prepared) batch
+        preds : dict
+            the iteration's predictions
+
+        Returns
+        -------
+        dict
+            the detached batch
+        dict
+            the detached predictions
+
+        """
+        return data_dict, preds
+
+    def _calc_iter_metrics(self, data_dict, preds, calc_metrics=True):
+        """
+        Converts the predictions of a training iteration to numpy and
+        calculates the training metrics
+
+        Parameters
+        ----------
+        data_dict : dict
+            the iteration's (prepared) batch
+        preds : dict
+            the iteration's predictions
+        calc_metrics : bool
+            whether to calculate the metrics at all
+
+        Returns
+        -------
+        dict
+            the calculated metrics (empty if ``calc_metrics`` is False)
+        dict
+            the predictions converted to numpy
+
+        """
+        preds = self._convert_to_npy_fn(**preds)[1]
+
+        if not calc_metrics:
+            return {}, preds
+
+        data_dict = self._convert_to_npy_fn(**data_dict)[1]
+        metrics = self.calc_metrics(BatchDict({**data_dict, **preds}),
+                                    self.metrics, self.metric_keys)
+        return metrics, preds
+
+    def _submit_iter_end(self, batch, data_dict, preds, losses,
+                         calc_metrics, iter_num, epoch, metric_reduction):
+        """
+        Calculates the metrics and runs the iteration end callbacks of a
+        training iteration in the background (see :class:`MetricWorker`)
+
+        Parameters
+        ----------
+        batch : dict
+            the iteration's original batch
+        data_dict : dict
+            the iteration's (prepared) batch
+        preds : dict
+            the iteration's predictions
+        losses : dict
+            the iteration's losses
+        calc_metrics : bool
+            whether to calculate the metrics
+        iter_num : int
+            number of current iter
+        epoch : int
+            number of current epoch
+        metric_reduction : :class:`RunningDictReduction`
+            the reduction to add the calculated metrics to
+
+        """
+        # apply the states returned by the callbacks of former iterations
+        self._apply_state_updates()
+
+        # the global iteration number is reserved now, since the iteration's
+        # callbacks may run after the next iteration has begun
+        global_iter_num = self._global_iter_num
         self._global_iter_num += 1
 
+        # the background threads must not access the computation graph
+        data_dict, preds = self._detach_iter_outputs(data_dict, preds)
+
+        def _callback(result):
+            _metrics, _preds = result
+            metric_reduction.update(_metrics)
+            self._at_iter_end(epoch=epoch, iter_num=iter_num,
+                              data_dict={**batch, **_preds},
+                              metrics={**_metrics, **losses},
+                              global_iter_num=global_iter_num,
+                              state_updates=self._state_updates)
+
+        self._metric_worker.submit(
+            functools.partial(self._calc_iter_metrics, data_dict, preds,
+                              calc_metrics),
+            _callback)
+
+    @property
+    def _step_profiler(self):
+        """
+        The first registered :class:`StepProfiler` (or None)
+        """
+        for cb in self._callbacks:
+            if isinstance(cb, StepProfiler):
+                return cb
+        return None
+
     def _train_single_epoch(self, dmgr_train: DataManager, epoch,
                             verbose=False):
         """
@@ -374,12 +757,29 @@ class BaseNetworkTrainer(Predictor):
         epoch : int
             current epoch
 
+        Returns
+        -------
+        :class:`RunningDictReduction`
+            the running reduction of the training metrics
+        :class:`RunningDictReduction`
+            the running reduction of the training losses
+
         """
 
-        metrics, losses = [], []
+        metrics, losses = RunningDictReduction(), RunningDictReduction()
 
         batchgen = dmgr_train.get_batchgen(seed=epoch)
 
+        metric_worker = getattr(self, "_metric_worker", None)
+        metrics_freq = getattr(self, "train_metrics_freq", 1)
+
+        profiler = self._step_profiler
+        if profiler is not None:
+            batchgen = profiler.profile_iterable(batchgen)
+            timed = profiler.phase
+        else:
+            timed = _untimed
+
         n_batches = dmgr_train.n_batches
         if verbose:
             iterable = tqdm(
@@ -392,50 +792,69 @@ class BaseNetworkTrainer(Predictor):
             iterable = enumerate(batchgen)
 
         for iter_num, batch in iterable:
-            self._at_iter_begin(epoch=epoch, iter_num=iter_num)
-
-            data_dict = self._prepare_batch(batch)
-
-            _losses, _preds = self.closure_fn(self.module, data_dict,
-                                              optimizers=self.optimizers,
-                                              losses=self.losses,
-                                              fold=self.fold,
-                                              iter_num=iter_num)
+            with timed("callbacks"):
+                self._at_iter_begin(epoch=epoch, iter_num=iter_num)
+
+            with timed("prepare_batch"):
+                data_dict = self._prepare_batch(batch)
+
+            with timed("closure"):
+                _losses, _preds = self.closure_fn(self.module, data_dict,
+                                                  optimizers=self.optimizers,
+                                                  losses=self.losses,
+                                                  fold=self.fold,
+                                                  iter_num=iter_num)
+
+            calc_metrics = bool(self.metrics) and \
+                iter_num % metrics_freq == 0
+
+            if metric_worker is not None:
+                # the losses may still be tensors (e.g. of a compiled step)
+                with timed("to_npy"):
+                    _losses = self._convert_to_npy_fn(**_losses)[1]
+
+                # blocks only if too many iterations are pending
+                with timed("metrics"):
+                    self._submit_iter_end(batch, data_dict, _preds, _losses,
+                                          calc_metrics, iter_num, epoch,
+                                          metrics)
+                losses.update(_losses)
 
-            data_dict = self._convert_to_npy_fn(**data_dict)[1]
-            _preds = self._convert_to_npy_fn(**_preds)[1]
-
-            _metrics = self.calc_metrics(
-                LookupConfig(**data_dict, **_preds),
-                self.metrics,
-                self.metric_keys)
-
-            metrics.append(_metrics)
-            losses.append(_losses)
+            else:
+                with timed("to_npy"):
+                    _losses = self._convert_to_npy_fn(**_losses)[1]
+                    _preds = self._convert_to_npy_fn(**_preds)[1]
+                    if calc_metrics:
+                        data_dict = self._convert_to_npy_fn(**data_dict)[1]
+
+                with timed("metrics"):
+                    if calc_metrics:
+                        _metrics = self.calc_metrics(
+                            BatchDict({**data_dict, **_preds}),
+                            self.metrics,
+                            self.metric_keys)
+                    else:
+                        _metrics = {}
 
-            self._at_iter_end(epoch=epoch, iter_num=iter_num,
-                              data_dict={**batch, **_preds},
-                              metrics={**_metrics, **_losses},
-                              )
+                metrics.update(_metrics)
+                losses.update(_losses)
 
-        total_losses, total_metrics = {}, {}
+                with timed("callbacks"):
+                    self._at_iter_end(epoch=epoch, iter_num=iter_num,
+                                      data_dict={**batch, **_preds},
+                                      metrics={**_metrics, **_losses},
+                                      )
 
-        for _metrics in metrics:
-            for key, val in _metrics.items():
-                if key in total_metrics:
-                    total_metrics[key].append(val)
-                else:
-                    total_metrics[key] = [val]
+            if profiler is not None:
+                profiler.end_step(epoch, iter_num)
 
-        for _losses in losses:
-            for key, val in _losses.items():
-                if key in total_losses:
-                    total_losses[key].append(val)
-                else:
-                    total_losses[key] = [val]
+        if metric_worker is not None:
+            metric_worker.flush()
+            self._apply_state_updates()
 
-        return total_metrics, total_losses
+        return metrics, losses
 
+    @_flush_checkpoints_on_error
     def train(self, num_epochs, datamgr_train, datamgr_valid=None,
               val_score_key=None, val_score_mode='highest', reduce_mode='mean',
               verbose=True):
@@ -463,6 +882,18 @@ class BaseNetworkTrainer(Predictor):
         """
         self._at_training_begin()
 
+        if self.checkpoint_manager is not None:
+            self.checkpoint_manager.set_default_score(val_score_key,
+                                                      val_score_mode)
+
+        # limit the threads of the main process to the cores not reserved
+        # for the augmentation workers (until the end of the training)
+        resource_plan = getattr(datamgr_train, "resource_plan", None)
+        if resource_plan is not None:
+            logger.info("Applying CPU resource plan: %s"
+                        % str(resource_plan.to_dict()))
+            self._resource_state = resource_plan.apply_main()
+
         if val_score_mode == 'highest':
             best_val_score = 0
         elif val_score_mode == 'lowest':
@@ -473,20 +904,12 @@ class BaseNetworkTrainer(Predictor):
         is_best = False
         new_val_score = best_val_score
 
-        if reduce_mode == 'mean':
-            def reduce_fn(batch):
-                return np.mean(batch)
-        elif reduce_mode == 'sum':
-            def reduce_fn(batch):
-                return np.sum(batch)
-        elif reduce_mode == 'first_only':
-            def reduce_fn(batch):
-                return batch[0]
-        elif reduce_mode == 'last_only':
-            def reduce_fn(batch):
-                return batch[-1]
-        else:
+        # maps the reduce modes to the running reductions
+        reduce_types = {'mean': 'mean', 'sum': 'sum',
+                        'first_only': 'first', 'last_only': 'last'}
+        if reduce_mode not in reduce_types:
             raise ValueError("No valid reduce mode given")
+        reduce_type = reduce_types[reduce_mode]
 
         for epoch in range(self.start_epoch, num_epochs + 1):
 
@@ -498,11 +921,38 @@ class BaseNetworkTrainer(Predictor):
                 datamgr_train, epoch, verbose=verbose)
 
             total_metrics = {
-                **train_metrics,
-                **train_losses}
+                **train_metrics.reduce(reduce_type),
+                **train_losses.reduce(reduce_type)}
+
+            validate = datamgr_valid is not None and \
+                (epoch % self.val_freq == 0)
+            validated_epoch, validated = epoch, []
+            checkpoint_metrics = None
+
+            if self._async_validator is not None:
+                # apply the result of the previous validation (if any) and
+                # validate a snapshot of the current epoch in the background
+                validated = self._async_validator.collect()
+                if validate:
+                    self._async_validator.submit(
+                        epoch, self._validation_predictor(), datamgr_valid,
+                        metrics=self.metrics, metric_keys=self.metric_keys)
+
+                # the current epoch's checkpoint only gets its own metrics;
+                # the validation results belong to the checkpoints of the
+                # validated epochs
+                checkpoint_metrics = dict(total_metrics)
+                for validated_epoch, val_metrics, val_predictor in validated:
+                    val_metrics = self._reduce_val_metrics(val_metrics,
+                                                           reduce_type)
+                    self._update_checkpoint_metrics(validated_epoch,
+                                                    val_metrics)
+
+                if validated:
+                    total_metrics.update(val_metrics)
 
             # validate network
-            if datamgr_valid is not None and (epoch % self.val_freq == 0):
+            elif validate:
                 # next must be called here because self.predict_data_mgr
                 # returns a generator (of size 1) and we want to get the
                 # first (and only) item
@@ -513,31 +963,17 @@ class BaseNetworkTrainer(Predictor):
                         metric_keys=self.metric_keys,
                         verbose=verbose))
 
-                val_metrics = {"val_" + k: v
-                               for k, v in val_metrics.items()}
+                _, val_metrics = self._convert_to_npy_fn(**val_metrics)
 
-                total_metrics.update(val_metrics)
-            _, total_metrics = self._convert_to_npy_fn(**total_metrics)
+                total_metrics.update(self._reduce_val_metrics(
+                    val_metrics, reduce_type))
 
-            for k, v in total_metrics.items():
-                total_metrics[k] = reduce_fn(v)
-
-            # check if metric became better
-            if val_score_key is not None:
-                if val_score_key not in total_metrics:
-                    if "val_" + val_score_key not in total_metrics:
-                        warnings.warn("val_score_key '%s' not a valid key "
-                                      "for validation metrics" %
-                                      str(val_score_key), UserWarning)
-
-                        new_val_score = best_val_score
-
-                    else:
-                        new_val_score = \
-                            total_metrics["val_" + val_score_key]
-                        val_score_key = "val_" + val_score_key
-                else:
-                    new_val_score = total_metrics.get(val_score_key)
+            # check if metric became better (for the asynchronous validation
+            # only if a validation result was applied)
+            if val_score_key is not None and (
+                    self._async_validator is None or validated):
+                val_score_key, new_val_score = self._get_val_score(
+                    total_metrics, val_score_key, best_val_score)
 
             if new_val_score != best_val_score:
                 is_best = self._is_better_val_scores(
@@ -549,10 +985,18 @@ class BaseNetworkTrainer(Predictor):
 
                 if is_best and verbose:
                     logging.info("New Best Value at Epoch %03d : %03.3f" %
-                                 (epoch, best_val_score))
+                                 (validated_epoch, best_val_score))
+
+            # the current state was not validated yet; save the validated
+            # snapshot instead
+            if is_best and self._async_validator is not None:
+                self._save_validated_state(val_predictor, validated_epoch,
+                                           val_metrics)
+                is_best = False
 
             self._at_epoch_end(total_metrics, val_score_key, epoch,
-                               is_best)
+                               is_best, val_epoch=validated_epoch,
+                               checkpoint_metrics=checkpoint_metrics)
 
             is_best = False
 
@@ -560,8 +1004,123 @@ class BaseNetworkTrainer(Predictor):
             if self.stop_training:
                 break
 
+        if self._async_validator is not None:
+            # the last validation is only used for the best model selection
+            # and the metrics of its checkpoint
+            for validated_epoch, val_metrics, val_predictor in \
+                    self._async_validator.collect():
+                val_metrics = self._reduce_val_metrics(val_metrics,
+                                                       reduce_type)
+                self._update_checkpoint_metrics(validated_epoch, val_metrics)
+                if val_score_key is None:
+                    continue
+
+                val_score_key, new_val_score = self._get_val_score(
+                    val_metrics, val_score_key, best_val_score)
+
+                if new_val_score != best_val_score and \
+                        self._is_better_val_scores(best_val_score,
+                                                   new_val_score,
+                                                   val_score_mode):
+                    best_val_score = new_val_score
+                    if verbose:
+                        logging.info("New Best Value at Epoch %03d : %03.3f"
+                                     % (validated_epoch, best_val_score))
+                    self._save_validated_state(val_predictor,
+                                               validated_epoch, val_metrics)
+
         return self._at_training_end()
 
+    @staticmethod
+    def _reduce_val_metrics(val_metrics, reduce_type):
+        """
+        Reduces the metrics of all validation batches
+
+        Parameters
+        ----------
+        val_metrics : dict
+            the (numpy) metric values of all validation batches
+        reduce_type : str
+            the reduction to apply (see :class:`RunningReduction`)
+
+        Returns
+        -------
+        dict
+            the reduced metrics (prefixed with ``val_``)
+
+        """
+        val_reduction = RunningDictReduction()
+        for k, v in val_metrics.items():
+            for _v in v:
+                val_reduction.update({"val_" + k: _v})
+
+        return val_reduction.reduce(reduce_type)
+
+    @staticmethod
+    def _get_val_score(metrics, val_score_key, default):
+        """
+        Extracts the validation score from the metrics
+
+        Parameters
+        ----------
+        metrics : dict
+            the metrics of the current epoch
+        val_score_key : str
+            the key of the validation score (with or without ``val_``
+            prefix)
+        default : Any
+            the score to return if the key is not part of the metrics
+
+        Returns
+        -------
+        str
+            the key of the validation score in the metrics
+        Any
+            the validation score
+
+        """
+        if val_score_key in metrics:
+            return val_score_key, metrics[val_score_key]
+
+        if "val_" + val_score_key in metrics:
+            return "val_" + val_score_key, metrics["val_" + val_score_key]
+
+        warnings.warn("val_score_key '%s' not a valid key for validation "
+                      "metrics" % str(val_score_key), UserWarning)
+        return val_score_key, default
+
+    def _validation_predictor(self):
+        """
+        Snapshots the network for the asynchronous validation; must be
+        implemented by backends supporting it
+
+        Returns
+        -------
+        :class:`Predictor`
+            a picklable predictor holding a copy of the network, which is not
+            affected by further training
+
+        """
+        raise NotImplementedError()
+
+    def _save_validated_state(self, predictor, epoch, metrics):
+        """
+        Saves the snapshot of an asynchronous validation as best checkpoint;
+        must be implemented by backends supporting the asynchronous
+        validation
+
+        Parameters
+        ----------
+        predictor : :class:`Predictor`
+            the predictor holding the validated snapshot
+        epoch : int
+            the epoch the snapshot was taken at
+        metrics : dict
+            the metrics to register the checkpoint with
+
+        """
+        raise NotImplementedError()
+
     @property
     def fold(self):
         """
@@ -876,6 +1435,18 @@ class BaseNetworkTrainer(Predictor):
         """
         if extensions is None:
             extensions = []
+
+        # use the manifest of the checkpoint manager if possible to avoid
+        # scanning the whole directory
+        name, epoch = CheckpointManager.latest_checkpoint(path)
+        if name is not None:
+            for ext in extensions:
+                if not ext.startswith("."):
+                    ext = "." + ext
+
+                if os.path.isfile(os.path.join(path, name + ext)):
+                    return os.path.join(path, name + ext), epoch
+
         files = []
         for file in os.listdir(path):
             for ext in extensions:
@@ -3,6 +3,7 @@ from delira import get_backends
 from delira.training.callbacks.logging_callback import DefaultLoggingCallback
 from delira.training.callbacks.abstract_callback import AbstractCallback
 from delira.training.callbacks.early_stopping import EarlyStopping
+from delira.training.callbacks.step_profiler import StepProfiler
 
 if "TORCH" in get_backends():
     from delira.training.callbacks.pytorch_schedulers import \
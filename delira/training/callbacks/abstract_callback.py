@@ -65,6 +65,9 @@ class AbstractCallback(object):
         -----
         The basetrainer calls the callbacks with the following additional
         arguments: `val_metrics`(dict), `val_score_key`(str), `curr_epoch`(int)
+        and `val_epoch`(int), the epoch the validation metrics belong to. For
+        the asynchronous validation, the validation of an epoch finishes
+        during the next one, so `val_epoch` is `curr_epoch - 1` there.
         """
         return {}
 
@@ -129,6 +132,12 @@ class AbstractCallback(object):
         The basetrainer adds following arguments (wrt the predictor):
         `curr_epoch`(int), `global_iter_num`(int)
 
+        If the trainer calculates its metrics asynchronously (see
+        ``async_metrics``), this function is called from a background thread
+        during training: it must not modify the trainer directly and the
+        returned attributes are set by the trainer's main thread before one
+        of the next iterations
+
         """
         return {}
 
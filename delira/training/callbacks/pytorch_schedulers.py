@@ -87,7 +87,10 @@ if 'TORCH' in get_backends():
             steps_per_epoch (int): The number of steps per epoch to train for.
                 This is used along with epochs in order to infer the total
                 number of steps in the cycle if a value for total_steps is
-                not provided.
+                not provided. If the trainer accumulates gradients, this is
+                the number of optimizer steps per epoch (the number of
+                batches divided by ``gradient_accumulation_steps`` and
+                rounded up).
                 Default: None
             pct_start (float): The percentage of the cycle (in number of steps)
                 spent increasing the learning rate.
@@ -141,15 +144,18 @@ if 'TORCH' in get_backends():
                 final_div_factor,
                 last_epoch)
 
-        def at_iter_begin(self, trainer, train,
+        def at_iter_begin(self, trainer, train, iter_num=0,
                           **kwargs):
             """
-            Executes a single scheduling step
+            Executes a single scheduling step (once per optimizer step, if
+            the trainer accumulates the gradients of multiple iterations)
 
             Parameters
             ----------
             trainer : :class:`PyTorchNetworkTrainer`
                 the trainer class, which can be changed
+            iter_num : int
+                the number of the current iteration in the current epoch
             kwargs :
                 additional keyword arguments
 
@@ -159,7 +165,9 @@ if 'TORCH' in get_backends():
                 modified trainer
 
             """
-            if train:
+            accumulation_steps = getattr(trainer,
+                                         "gradient_accumulation_steps", 1)
+            if train and iter_num % accumulation_steps == 0:
                 self.scheduler.step()
 
             return {}
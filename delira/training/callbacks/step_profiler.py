@@ -0,0 +1,330 @@
+import cProfile
+import contextlib
+import json
+import logging
+import os
+import pstats
+import time
+
+import numpy as np
+
+from delira.training.callbacks.abstract_callback import AbstractCallback
+
+logger = logging.getLogger(__name__)
+
+
+class StepProfiler(AbstractCallback):
+    """
+    Measures the wall time of the single phases of each training iteration.
+
+    If a profiler is registered as callback, the trainer times the following
+    phases of each iteration:
+
+    * ``data``: waiting for the next batch of the data loading
+    * ``prepare_batch``: conversion of the batch to the backend's format
+    * ``closure``: forward and backward pass and the optimizer step
+    * ``to_npy``: conversion of the data and predictions to numpy
+    * ``metrics``: calculation of the metrics
+    * ``callbacks``: the iteration callbacks (including the logging)
+
+    At the end of each epoch, the phase durations are aggregated (mean,
+    median and 95th percentile) together with the fraction of the iteration
+    time spent waiting for data (the data loading stall fraction).
+    The single phases can be exported as Chrome trace (which can be viewed in
+    ``chrome://tracing`` or Perfetto) and selected iterations can be profiled
+    by :mod:`cProfile` in addition.
+
+    Notes
+    -----
+    For asynchronously executing devices (like GPUs), parts of the time
+    spent in a phase may be attributed to the next synchronizing phase.
+
+    See Also
+    --------
+    :class:`AbstractCallback`
+
+    """
+
+    PHASES = ("data", "prepare_batch", "closure", "to_npy", "metrics",
+              "callbacks")
+
+    def __init__(self, trace=True, cprofile_iters=None, verbose=True):
+        """
+
+        Parameters
+        ----------
+        trace : bool
+            whether to keep the single phases of all iterations for
+            :meth:`export_chrome_trace`
+        cprofile_iters : iterable of int, optional
+            the global iteration numbers to profile with :mod:`cProfile`
+            (the data loading of these iterations is not profiled)
+        verbose : bool
+            whether to log a summary at the end of each epoch
+
+        """
+        super().__init__()
+
+        self.trace = trace
+        self.cprofile_iters = set(cprofile_iters or [])
+        self.verbose = verbose
+
+        self.summaries = {}
+        self._trace_events = []
+        self._cprofile = None
+        self._cprofile_stats = None
+        self._origin = time.perf_counter()
+
+        self._reset_epoch()
+        self._reset_step()
+
+    def _reset_epoch(self):
+        self._phase_durations = {}
+        self._step_durations = []
+
+    def _reset_step(self):
+        self._step_phases = []
+        self._step_start = None
+
+    @property
+    def cprofile_stats(self):
+        """
+        The accumulated :mod:`cProfile` statistics of all profiled iterations
+        (or None if no iteration was profiled yet)
+
+        Returns
+        -------
+        :class:`pstats.Stats`
+            the statistics (can be saved by ``dump_stats``)
+
+        """
+        return self._cprofile_stats
+
+    def _record(self, name, start, stop):
+        if self._step_start is None:
+            self._step_start = start
+        self._step_phases.append((name, start, stop))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Times a phase of the current iteration
+
+        Parameters
+        ----------
+        name : str
+            the phase's name; the durations of multiple phases with the same
+            name are summed up per iteration
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def profile_iterable(self, iterable):
+        """
+        Times the retrieval of each item of an iterable as ``data`` phase
+
+        Parameters
+        ----------
+        iterable :
+            the iterable yielding the batches
+
+        Yields
+        ------
+        Any
+            the items of ``iterable``
+
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._record("data", start, time.perf_counter())
+            yield item
+
+    def end_step(self, epoch, iter_num):
+        """
+        Finishes the timing of the current iteration
+
+        Parameters
+        ----------
+        epoch : int
+            the current epoch
+        iter_num : int
+            the number of the iteration inside the current epoch
+
+        """
+        stop = time.perf_counter()
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            if self._cprofile_stats is None:
+                self._cprofile_stats = pstats.Stats(self._cprofile)
+            else:
+                self._cprofile_stats.add(self._cprofile)
+            self._cprofile = None
+
+        if self._step_start is None:
+            return
+
+        durations = {}
+        for name, start, end in self._step_phases:
+            durations[name] = durations.get(name, 0.) + end - start
+
+        for name, duration in durations.items():
+            self._phase_durations.setdefault(name, []).append(duration)
+        self._step_durations.append(stop - self._step_start)
+
+        if self.trace:
+            pid = os.getpid()
+            args = {"epoch": epoch, "iteration": iter_num}
+            for name, start, end in [("step", self._step_start, stop)] \
+                    + self._step_phases:
+                self._trace_events.append({
+                    "name": name, "cat": "train", "ph": "X", "pid": pid,
+                    "tid": 0, "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6, "args": args})
+
+        self._reset_step()
+
+    @staticmethod
+    def _aggregate(durations):
+        durations = np.asarray(durations)
+        return {"mean": float(durations.mean()),
+                "p50": float(np.percentile(durations, 50)),
+                "p95": float(np.percentile(durations, 95)),
+                "total": float(durations.sum())}
+
+    def summarize_epoch(self, epoch):
+        """
+        Aggregates the durations of all iterations since the last summary
+
+        Parameters
+        ----------
+        epoch : int
+            the epoch to store the summary for
+
+        Returns
+        -------
+        dict
+            the summary containing the aggregated durations (in seconds) of
+            each phase (``phases``) and of the whole iterations (``step``),
+            the number of iterations (``n_iterations``) and the fraction of
+            the iteration time spent waiting for data (``stall_fraction``);
+            None if no iteration was timed
+
+        """
+        if not self._step_durations:
+            return None
+
+        step = self._aggregate(self._step_durations)
+        phases = {name: self._aggregate(durations)
+                  for name, durations in self._phase_durations.items()}
+
+        data_time = phases.get("data", {"total": 0.})["total"]
+        stall_fraction = data_time / step["total"] if step["total"] else 0.
+
+        summary = {"phases": phases, "step": step,
+                   "n_iterations": len(self._step_durations),
+                   "stall_fraction": stall_fraction}
+        self.summaries[epoch] = summary
+
+        if self.verbose:
+            logger.info("Epoch %s: %.2f ms per iteration (p95: %.2f ms), "
+                        "data loading stall: %.1f %%, mean phase times: %s"
+                        % (str(epoch), step["mean"] * 1e3, step["p95"] * 1e3,
+                           stall_fraction * 100,
+                           ", ".join(["%s %.2f ms" % (name,
+                                                      vals["mean"] * 1e3)
+                                      for name, vals in phases.items()])))
+
+        self._reset_epoch()
+        return summary
+
+    def export_chrome_trace(self, file):
+        """
+        Writes the timed phases of all iterations as Chrome trace
+
+        Parameters
+        ----------
+        file : str
+            the JSON file to write the trace to
+
+        """
+        with open(file, "w") as f:
+            json.dump({"traceEvents": self._trace_events,
+                       "displayTimeUnit": "ms"}, f)
+
+    def at_epoch_begin(self, trainer, **kwargs):
+        """
+        Discards incomplete timings of a previous epoch
+
+        Parameters
+        ----------
+        trainer : :class:`AbstractNetworkTrainer`
+        **kwargs :
+            additional keyword arguments
+
+        Returns
+        -------
+        dict
+            empty dict, since no trainer attributes are modified
+
+        """
+        self._reset_epoch()
+        self._reset_step()
+        return {}
+
+    def at_epoch_end(self, trainer, curr_epoch=None, **kwargs):
+        """
+        Aggregates the timings of the epoch (see :meth:`summarize_epoch`)
+
+        Parameters
+        ----------
+        trainer : :class:`AbstractNetworkTrainer`
+        curr_epoch : int
+            the current epoch
+        **kwargs :
+            additional keyword arguments
+
+        Returns
+        -------
+        dict
+            empty dict, since no trainer attributes are modified
+
+        """
+        self.summarize_epoch(curr_epoch)
+        return {}
+
+    def at_iter_begin(self, trainer, global_iter_num=None, train=True,
+                      **kwargs):
+        """
+        Starts :mod:`cProfile` for the selected iterations
+
+        Parameters
+        ----------
+        trainer : :class:`AbstractNetworkTrainer`
+        global_iter_num : int
+            the global iteration number
+        train : bool
+            whether the iteration is a training iteration
+        **kwargs :
+            additional keyword arguments
+
+        Returns
+        -------
+        dict
+            empty dict, since no trainer attributes are modified
+
+        """
+        if train and global_iter_num in self.cprofile_iters and \
+                self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return {}
@@ -0,0 +1,308 @@
+import json
+import logging
+import numbers
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointManager(object):
+    """
+    Keeps track of the checkpoints saved during training and removes
+    outdated ones.
+
+    All available checkpoints and their metrics are recorded in a small
+    manifest file inside the checkpoint directory, which makes the lookup of
+    the latest and the best checkpoint independent of the number of files in
+    this directory.
+
+    Epoch checkpoints are kept if they fulfill at least one of the retention
+    policies (``keep_last``, ``keep_best`` and ``keep_every``). If no policy
+    is given, all checkpoints are kept. The latest checkpoint is always kept
+    to be able to resume the training.
+
+    """
+
+    MANIFEST_NAME = "checkpoints.json"
+
+    def __init__(self, save_path, keep_last=None, keep_best=None,
+                 keep_every=None, score_key=None, score_mode="highest"):
+        """
+
+        Parameters
+        ----------
+        save_path : str
+            the directory containing the checkpoints
+        keep_last : int, optional
+            the number of most recent epoch checkpoints to keep
+        keep_best : int, optional
+            the number of epoch checkpoints with the best scores to keep
+        keep_every : int, optional
+            keep every checkpoint whose epoch is a multiple of this value
+        score_key : str, optional
+            the metric to rank the checkpoints by for ``keep_best``; defaults
+            to the ``val_score_key`` of the training
+        score_mode : str
+            one of ['highest', 'lowest']; whether higher or lower scores are
+            better
+
+        """
+        if score_mode not in ("highest", "lowest"):
+            raise ValueError("score_mode must be one of ['highest', "
+                             "'lowest'], but got %s" % str(score_mode))
+
+        for name, value in (("keep_last", keep_last),
+                            ("keep_best", keep_best),
+                            ("keep_every", keep_every)):
+            if value is not None and value < 1:
+                raise ValueError("%s must be at least 1, but got %d"
+                                 % (name, value))
+
+        self.save_path = save_path
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.keep_every = keep_every
+        self.score_key = score_key
+        self.score_mode = score_mode
+
+        self._manifest = self.read_manifest(save_path)
+
+    @property
+    def manifest_file(self):
+        return os.path.join(self.save_path, self.MANIFEST_NAME)
+
+    @property
+    def checkpoints(self):
+        """
+        The recorded epoch checkpoints ordered by epoch
+
+        Returns
+        -------
+        list
+            list of dicts containing the ``name`` (file name without
+            extension), the ``epoch`` and the ``metrics`` of each checkpoint
+
+        """
+        return sorted(self._manifest["checkpoints"].values(),
+                      key=lambda _entry: _entry["epoch"])
+
+    @property
+    def latest(self):
+        """
+        The latest epoch checkpoint (or None if no checkpoint was recorded)
+        """
+        latest = self._manifest["latest"]
+        if latest is None:
+            return None
+        return self._manifest["checkpoints"][latest]
+
+    @property
+    def best(self):
+        """
+        The best checkpoint (or None if no best checkpoint was recorded)
+        """
+        return self._manifest["best"]
+
+    @classmethod
+    def read_manifest(cls, save_path):
+        """
+        Reads the manifest of a checkpoint directory
+
+        Parameters
+        ----------
+        save_path : str
+            the directory containing the checkpoints
+
+        Returns
+        -------
+        dict
+            the manifest (empty if the directory does not contain one)
+
+        """
+        manifest_file = os.path.join(save_path, cls.MANIFEST_NAME)
+        if os.path.isfile(manifest_file):
+            try:
+                with open(manifest_file) as f:
+                    return json.load(f)
+            except ValueError:
+                logger.warning("Ignoring corrupted checkpoint manifest %s"
+                               % manifest_file)
+
+        return {"latest": None, "checkpoints": {}, "best": None}
+
+    @classmethod
+    def latest_checkpoint(cls, save_path):
+        """
+        Looks up the latest epoch checkpoint in the manifest of a checkpoint
+        directory without listing the directory
+
+        Parameters
+        ----------
+        save_path : str
+            the directory containing the checkpoints
+
+        Returns
+        -------
+        str
+            the name of the latest checkpoint (without extension) or None
+            if no checkpoint is recorded
+        int
+            the epoch of the latest checkpoint (or None)
+
+        """
+        manifest = cls.read_manifest(save_path)
+        latest = manifest["latest"]
+        if latest is None:
+            return None, None
+        return (manifest["checkpoints"][latest]["name"],
+                manifest["checkpoints"][latest]["epoch"])
+
+    def set_default_score(self, score_key, score_mode):
+        """
+        Sets the score to rank the checkpoints by, if no ``score_key`` was
+        given explicitly
+
+        Parameters
+        ----------
+        score_key : str
+            the name of the metric
+        score_mode : str
+            one of ['highest', 'lowest']
+
+        """
+        if self.score_key is None and score_key is not None and \
+                score_mode in ("highest", "lowest"):
+            self.score_key = score_key
+            self.score_mode = score_mode
+
+    @staticmethod
+    def _to_json_metrics(metrics):
+        # only scalar metrics can be used for ranking
+        json_metrics = {}
+        for key, val in (metrics or {}).items():
+            try:
+                val = val.item()
+            except (AttributeError, ValueError):
+                pass
+            if isinstance(val, numbers.Number):
+                json_metrics[key] = float(val)
+        return json_metrics
+
+    def _score(self, entry):
+        for key in (self.score_key, "val_%s" % self.score_key):
+            if key in entry["metrics"]:
+                return entry["metrics"][key]
+        return None
+
+    def register(self, name, epoch, metrics=None, is_best=False):
+        """
+        Records a saved checkpoint, removes the checkpoints not retained by
+        the policies and updates the manifest
+
+        Parameters
+        ----------
+        name : str
+            the checkpoint's file name without extension (relative to the
+            ``save_path``)
+        epoch : int
+            the epoch of the checkpoint
+        metrics : dict, optional
+            the metrics of the checkpoint
+        is_best : bool
+            whether the checkpoint is the best one (which is not affected by
+            the retention policies)
+
+        """
+        entry = {"name": name, "epoch": int(epoch),
+                 "metrics": self._to_json_metrics(metrics)}
+
+        if is_best:
+            self._manifest["best"] = entry
+        else:
+            self._manifest["checkpoints"][str(entry["epoch"])] = entry
+            self._prune()
+
+        self._write_manifest()
+
+    def update_metrics(self, epoch, metrics):
+        """
+        Adds metrics to a recorded epoch checkpoint (e.g. the result of a
+        validation finished after the checkpoint was registered) and
+        re-applies the retention policies. Does nothing if no checkpoint of
+        this epoch is recorded (anymore).
+
+        Parameters
+        ----------
+        epoch : int
+            the epoch of the checkpoint
+        metrics : dict
+            the metrics to add
+
+        """
+        entry = self._manifest["checkpoints"].get(str(int(epoch)))
+        if entry is None:
+            return
+
+        entry["metrics"].update(self._to_json_metrics(metrics))
+        self._prune()
+        self._write_manifest()
+
+    def _retained_epochs(self):
+        checkpoints = self.checkpoints
+        if not checkpoints:
+            return set()
+
+        if self.keep_last is None and self.keep_best is None and \
+                self.keep_every is None:
+            return set(_entry["epoch"] for _entry in checkpoints)
+
+        # the latest checkpoint is needed to resume the training
+        retained = {checkpoints[-1]["epoch"]}
+
+        if self.keep_last is not None:
+            retained.update(_entry["epoch"]
+                            for _entry in checkpoints[-self.keep_last:])
+
+        if self.keep_best is not None and self.score_key is not None:
+            scored = [_entry for _entry in checkpoints
+                      if self._score(_entry) is not None]
+            scored = sorted(scored, key=self._score,
+                            reverse=self.score_mode == "highest")
+            retained.update(_entry["epoch"]
+                            for _entry in scored[:self.keep_best])
+
+        if self.keep_every is not None:
+            retained.update(_entry["epoch"] for _entry in checkpoints
+                            if _entry["epoch"] % self.keep_every == 0)
+
+        return retained
+
+    def _prune(self):
+        retained = self._retained_epochs()
+
+        for entry in self.checkpoints:
+            if entry["epoch"] not in retained:
+                self._remove_files(entry["name"])
+                del self._manifest["checkpoints"][str(entry["epoch"])]
+
+        checkpoints = self.checkpoints
+        self._manifest["latest"] = str(checkpoints[-1]["epoch"]) \
+            if checkpoints else None
+
+    def _remove_files(self, name):
+        # a checkpoint may consist of multiple files sharing its name
+        # (e.g. for torchscript or tensorflow)
+        dirname, basename = os.path.split(os.path.join(self.save_path, name))
+        for file in os.listdir(dirname):
+            if file == basename or file.startswith(basename + ".") or \
+                    file.startswith(basename + "-"):
+                os.remove(os.path.join(dirname, file))
+                logger.debug("Removed outdated checkpoint file %s" % file)
+
+    def _write_manifest(self):
+        # replace atomically to never leave a partially written manifest
+        tmp_file = os.path.join(self.save_path,
+                                ".%s.tmp" % self.MANIFEST_NAME)
+        with open(tmp_file, "w") as f:
+            json.dump(self._manifest, f, indent=4, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
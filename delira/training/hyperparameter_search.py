@@ -0,0 +1,580 @@
+import collections
+import csv
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import traceback
+
+import numpy as np
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from delira.training.callbacks import AbstractCallback
+from delira.utils import DeliraConfig
+from delira.utils.resources import partition_cpus, set_cpu_affinity, \
+    set_num_threads
+
+logger = logging.getLogger(__name__)
+
+
+class AbstractSearch(object):
+    """
+    Defines the trials of a hyperparameter search and when to terminate
+    them early.
+
+    The search space maps config keys (starting with ``model.`` or
+    ``training.``, e.g. ``training.optimizer_params.lr``) to the values to
+    search. The sampled values are set as ``variable_params`` of the trials'
+    configs, so the searched keys must not be part of the ``fixed_params``.
+
+    """
+
+    def __init__(self, space: dict):
+        """
+
+        Parameters
+        ----------
+        space : dict
+            the search space
+
+        """
+        for key in space.keys():
+            if key.split(".", 1)[0] not in ("model", "training"):
+                raise ValueError("The keys of the search space must start "
+                                 "with 'model.' or 'training.', but got %s"
+                                 % key)
+
+        self.space = space
+
+    @property
+    def num_epochs(self):
+        """
+        The number of epochs to train each trial (None to use the
+        experiment's number of epochs)
+        """
+        return None
+
+    @property
+    def milestones(self):
+        """
+        The epochs, after which the trials may be terminated early
+        """
+        return ()
+
+    def sample(self):
+        """
+        Samples the parameters of all trials
+
+        Returns
+        -------
+        list
+            the parameters (a dict mapping the keys of the search space to
+            the sampled values) of each trial
+
+        """
+        raise NotImplementedError()
+
+    def should_stop(self, milestone_scores, score, mode="lowest"):
+        """
+        Decides whether to terminate a trial at a milestone
+
+        Parameters
+        ----------
+        milestone_scores : list
+            the scores of all trials (including the current one), which
+            reached the milestone so far
+        score : float
+            the current trial's score
+        mode : str
+            whether a higher or lower score is better; must be one of
+            'highest' and 'lowest'
+
+        Returns
+        -------
+        bool
+            whether to terminate the trial
+
+        """
+        return False
+
+
+class GridSearch(AbstractSearch):
+    """
+    Trains all combinations of the values of the search space, which maps
+    each key to a list of values (see
+    :class:`sklearn.model_selection.ParameterGrid`)
+
+    """
+
+    def sample(self):
+        return list(ParameterGrid(self.space))
+
+
+class RandomSearch(AbstractSearch):
+    """
+    Trains a fixed number of trials with values sampled from the search
+    space, which maps each key to either a list of values (sampled
+    uniformly) or a distribution providing a ``rvs`` method (e.g. from
+    :mod:`scipy.stats`); see :class:`sklearn.model_selection.ParameterSampler`
+
+    """
+
+    def __init__(self, space: dict, n_trials: int, random_state=None):
+        """
+
+        Parameters
+        ----------
+        space : dict
+            the search space
+        n_trials : int
+            the number of trials to sample
+        random_state : int, optional
+            the seed of the sampling
+
+        """
+        super().__init__(space)
+        self.n_trials = n_trials
+        self.random_state = random_state
+
+    def sample(self):
+        return list(ParameterSampler(self.space, self.n_trials,
+                                     random_state=self.random_state))
+
+
+class ASHASearch(RandomSearch):
+    """
+    Asynchronous successive halving (ASHA): randomly sampled trials are
+    trained for up to ``max_epochs`` and compared at the milestones
+    ``min_epochs * reduction_factor ** k``. A trial reaching a milestone is
+    terminated, unless its score is within the best ``1 / reduction_factor``
+    of all scores recorded at this milestone so far. Thus, the trials are
+    never waiting for each other, while most of the budget is spent on the
+    most promising ones.
+
+    """
+
+    def __init__(self, space: dict, n_trials: int, max_epochs: int,
+                 min_epochs=1, reduction_factor=3, random_state=None):
+        """
+
+        Parameters
+        ----------
+        space : dict
+            the search space
+        n_trials : int
+            the number of trials to sample
+        max_epochs : int
+            the maximum number of epochs to train a trial
+        min_epochs : int
+            the number of epochs before the first milestone
+        reduction_factor : int
+            the inverse fraction of trials continued at each milestone
+        random_state : int, optional
+            the seed of the sampling
+
+        """
+        super().__init__(space, n_trials, random_state)
+
+        if not 0 < min_epochs <= max_epochs:
+            raise ValueError("min_epochs must be between 1 and max_epochs "
+                             "(%d), but got %d" % (max_epochs, min_epochs))
+        if reduction_factor < 2:
+            raise ValueError("reduction_factor must be at least 2, but got "
+                             "%s" % str(reduction_factor))
+
+        self.max_epochs = max_epochs
+        self.min_epochs = min_epochs
+        self.reduction_factor = reduction_factor
+
+    @property
+    def num_epochs(self):
+        return self.max_epochs
+
+    @property
+    def milestones(self):
+        milestones = []
+        epoch = self.min_epochs
+        while epoch < self.max_epochs:
+            milestones.append(epoch)
+            epoch = int(math.ceil(epoch * self.reduction_factor))
+        return tuple(milestones)
+
+    def should_stop(self, milestone_scores, score, mode="lowest"):
+        scores = np.asarray(milestone_scores, dtype=np.float64)
+        if mode == "lowest":
+            scores, score = -scores, -score
+
+        cutoff = np.percentile(scores, (1 - 1 / self.reduction_factor) * 100)
+        return score < cutoff
+
+
+def _to_float(value):
+    try:
+        return float(np.asarray(value).mean())
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_score(metrics, val_score_key):
+    if val_score_key is None:
+        return None
+    if val_score_key in metrics:
+        return metrics[val_score_key]
+    return metrics.get("val_" + val_score_key)
+
+
+class _TrialReporter(AbstractCallback):
+    """
+    Streams the metrics of a trial to the search driver and terminates the
+    trial at the milestones of the search if necessary
+
+    """
+
+    def __init__(self, trial_id, result_queue, search, val_score_key,
+                 val_score_mode, milestone_scores, lock):
+        super().__init__()
+        self._trial_id = trial_id
+        self._queue = result_queue
+        self._search = search
+        self._val_score_key = val_score_key
+        self._val_score_mode = val_score_mode
+        self._milestone_scores = milestone_scores
+        self._lock = lock
+
+    def at_epoch_end(self, trainer, val_metrics=None, curr_epoch=None,
+                     val_epoch=None, **kwargs):
+        # the (asynchronous) validation metrics may belong to an earlier
+        # epoch
+        if val_epoch is not None:
+            curr_epoch = val_epoch
+
+        metrics = {}
+        for key, val in (val_metrics or {}).items():
+            val = _to_float(val)
+            if val is not None:
+                metrics[key] = val
+
+        score = _get_score(metrics, self._val_score_key)
+        self._queue.put(("epoch", self._trial_id,
+                         (curr_epoch, metrics, score)))
+
+        if score is None or curr_epoch not in self._search.milestones:
+            return {}
+
+        with self._lock:
+            scores = list(self._milestone_scores.get(curr_epoch, [])) + \
+                [score]
+            self._milestone_scores[curr_epoch] = scores
+
+        self._queue.put(("milestone", self._trial_id, (curr_epoch, score)))
+
+        if self._search.should_stop(scores, score, self._val_score_mode):
+            self._queue.put(("stopped", self._trial_id, curr_epoch))
+            return {"stop_training": True}
+
+        return {}
+
+
+def _run_trial(experiment, trial, train_data, val_data, cores, result_queue,
+               search, milestone_scores, lock, run_kwargs):
+    """
+    Trains a single trial (in a separate process)
+
+    """
+    try:
+        if cores:
+            set_cpu_affinity(cores)
+            set_num_threads(len(cores))
+
+        config = DeliraConfig()
+        for key, val in trial["params"].items():
+            config["variable_" + key] = val
+
+        run_kwargs = dict(run_kwargs)
+        callbacks = list(run_kwargs.pop(
+            "callbacks", experiment.kwargs.get("callbacks", [])))
+        callbacks.append(_TrialReporter(
+            trial["trial_id"], result_queue, search,
+            experiment.val_score_key,
+            run_kwargs.get("val_score_mode", "lowest"), milestone_scores,
+            lock))
+
+        if search.num_epochs is not None:
+            run_kwargs["num_epochs"] = search.num_epochs
+
+        experiment.run(train_data, val_data, config=config,
+                       callbacks=callbacks, save_path=trial["save_path"],
+                       **run_kwargs)
+
+    except Exception as e:
+        result_queue.put(("failed", trial["trial_id"], "%s: %s\n%s" % (
+            type(e).__name__, str(e), traceback.format_exc())))
+    else:
+        result_queue.put(("done", trial["trial_id"], None))
+
+
+class HyperparameterSearch(object):
+    """
+    Runs the trials of a search (see :class:`GridSearch`,
+    :class:`RandomSearch` and :class:`ASHASearch`) for an experiment
+    concurrently in separate processes.
+
+    Each running trial may be assigned a fixed budget of CPU cores, which
+    it is pinned to (together with limiting the threads of the frameworks).
+    The metrics of all trials are streamed to ``metrics.csv`` (with one row
+    per trial, epoch and metric) in the search's ``save_path``, while the
+    state of all trials is checkpointed to ``search_state.pkl`` after every
+    event. An interrupted search is resumed from this state by running it
+    again with the same ``save_path``: finished and terminated trials are
+    kept, while all others are restarted.
+
+    Notes
+    -----
+    The trial processes are spawned, which requires the experiment, the data
+    managers and the search to be picklable.
+
+    """
+
+    STATE_NAME = "search_state.pkl"
+    METRICS_NAME = "metrics.csv"
+
+    def __init__(self, experiment, search: AbstractSearch, save_path: str,
+                 n_workers=1, cpus_per_trial=None, start_method="spawn"):
+        """
+
+        Parameters
+        ----------
+        experiment : :class:`BaseExperiment`
+            the experiment to train the trials with
+        search : :class:`AbstractSearch`
+            the search defining the trials
+        save_path : str
+            the directory to save the search state, the metrics and the
+            trials' checkpoints to
+        n_workers : int
+            the maximum number of trials running concurrently
+        cpus_per_trial : int, optional
+            the number of CPU cores each running trial is pinned to; per
+            default the trials share all cores
+        start_method : str
+            the method to start the trial processes with
+
+        """
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1, but got %d"
+                             % n_workers)
+
+        self.experiment = experiment
+        self.search = search
+        self.save_path = save_path
+        self.start_method = start_method
+
+        if cpus_per_trial is None:
+            self._slots = [None] * n_workers
+        else:
+            self._slots = partition_cpus(n_workers, cpus_per_trial)
+
+        self.trials = []
+
+    @property
+    def n_workers(self):
+        return len(self._slots)
+
+    def _load_state(self):
+        state_file = os.path.join(self.save_path, self.STATE_NAME)
+        if not os.path.isfile(state_file):
+            return False
+
+        with open(state_file, "rb") as f:
+            self.trials = pickle.load(f)["trials"]
+
+        for trial in self.trials:
+            if trial["status"] not in ("done", "stopped"):
+                trial.update(status="pending", epochs=0, score=None,
+                             milestones={}, error=None)
+
+        logger.info("Resuming search from %s" % state_file)
+        return True
+
+    def _save_state(self):
+        state_file = os.path.join(self.save_path, self.STATE_NAME)
+        tmp_file = os.path.join(self.save_path, "." + self.STATE_NAME)
+
+        # the state is replaced atomically to survive interruptions
+        with open(tmp_file, "wb") as f:
+            pickle.dump({"trials": self.trials}, f)
+        os.replace(tmp_file, state_file)
+
+    def _write_metrics(self, trial_id, epoch, metrics):
+        metrics_file = os.path.join(self.save_path, self.METRICS_NAME)
+        write_header = not os.path.isfile(metrics_file)
+
+        with open(metrics_file, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["trial_id", "epoch", "metric", "value"])
+            for key, val in sorted(metrics.items()):
+                writer.writerow([trial_id, epoch, key, val])
+
+    def _handle(self, event, val_score_mode):
+        kind, trial_id, payload = event
+        trial = self.trials[trial_id]
+
+        if kind == "epoch":
+            epoch, metrics, score = payload
+            trial["epochs"] = epoch
+            trial["metrics"] = metrics
+            self._write_metrics(trial_id, epoch, metrics)
+
+            if score is not None and (trial["score"] is None or (
+                    score > trial["score"] if val_score_mode == "highest"
+                    else score < trial["score"])):
+                trial["score"] = score
+
+        elif kind == "milestone":
+            epoch, score = payload
+            trial["milestones"][epoch] = score
+
+        elif kind == "stopped":
+            trial["status"] = "stopped"
+            logger.info("Trial %d terminated at epoch %d"
+                        % (trial_id, payload))
+
+        elif kind == "done":
+            if trial["status"] == "running":
+                trial["status"] = "done"
+
+        elif kind == "failed":
+            trial["status"] = "failed"
+            trial["error"] = payload
+            logger.error("Trial %d failed:\n%s" % (trial_id, payload))
+
+    def run(self, train_data, val_data=None, resume=True, **kwargs):
+        """
+        Runs all trials of the search
+
+        Parameters
+        ----------
+        train_data : :class:`DataManager`
+            the data to train the trials with
+        val_data : :class:`DataManager`
+            the data to validate the trials with
+        resume : bool
+            whether to resume a previous search from the ``save_path``
+        **kwargs :
+            additional keyword arguments passed to
+            :meth:`BaseExperiment.run` (e.g. ``val_score_mode``)
+
+        Returns
+        -------
+        list
+            the trials (dicts containing the trial's id, params, status,
+            number of trained epochs, best score, last metrics and
+            ``save_path``) sorted by their score
+
+        """
+        os.makedirs(self.save_path, exist_ok=True)
+        val_score_mode = kwargs.get("val_score_mode", "lowest")
+
+        if not (resume and self._load_state()):
+            self.trials = [
+                {"trial_id": idx, "params": params, "status": "pending",
+                 "epochs": 0, "score": None, "metrics": {}, "milestones": {},
+                 "error": None, "save_path": os.path.join(
+                     self.save_path, "trial_%03d" % idx)}
+                for idx, params in enumerate(self.search.sample())]
+            self._save_state()
+
+        ctx = multiprocessing.get_context(self.start_method)
+        manager = ctx.Manager()
+        result_queue = ctx.Queue()
+
+        # scores of previous runs, which reached the milestones
+        milestone_scores = manager.dict()
+        for trial in self.trials:
+            for epoch, score in trial["milestones"].items():
+                milestone_scores[epoch] = list(milestone_scores.get(
+                    epoch, [])) + [score]
+        lock = manager.Lock()
+
+        pending = collections.deque([trial["trial_id"]
+                                     for trial in self.trials
+                                     if trial["status"] == "pending"])
+        free_slots = list(self._slots)
+        running = {}
+
+        try:
+            while pending or running:
+                while pending and free_slots:
+                    trial = self.trials[pending.popleft()]
+                    slot = free_slots.pop(0)
+                    process = ctx.Process(
+                        target=_run_trial, args=(
+                            self.experiment, trial, train_data, val_data,
+                            slot, result_queue, self.search,
+                            milestone_scores, lock, kwargs),
+                        name="delira-trial-%d" % trial["trial_id"])
+                    process.start()
+                    trial["status"] = "running"
+                    running[trial["trial_id"]] = (process, slot)
+                    self._save_state()
+
+                try:
+                    event = result_queue.get(timeout=1.)
+                except queue.Empty:
+                    event = None
+
+                if event is not None:
+                    self._handle(event, val_score_mode)
+
+                    if event[0] in ("done", "failed"):
+                        process, slot = running.pop(event[1])
+                        process.join()
+                        free_slots.append(slot)
+
+                    self._save_state()
+                    continue
+
+                # processes terminated without reporting (e.g. killed)
+                for trial_id, (process, slot) in list(running.items()):
+                    if not process.is_alive():
+                        running.pop(trial_id)
+                        free_slots.append(slot)
+                        self._handle(("failed", trial_id,
+                                      "The trial process terminated with "
+                                      "exitcode %s" % str(process.exitcode)),
+                                     val_score_mode)
+                        self._save_state()
+
+        finally:
+            for process, _ in running.values():
+                process.terminate()
+                process.join()
+            manager.shutdown()
+
+        return self.results(val_score_mode)
+
+    def results(self, val_score_mode="lowest"):
+        """
+        Returns the trials sorted by their score (trials without a score
+        last)
+
+        Parameters
+        ----------
+        val_score_mode : str
+            whether a higher or lower score is better; must be one of
+            'highest' and 'lowest'
+
+        Returns
+        -------
+        list
+            the sorted trials
+
+        """
+        sign = -1 if val_score_mode == "highest" else 1
+
+        return sorted(self.trials, key=lambda trial: (
+            trial["score"] is None,
+            sign * trial["score"] if trial["score"] is not None else 0))
@@ -0,0 +1,611 @@
+import asyncio
+import collections
+import collections.abc
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from delira.training.predictor import Predictor
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceStats(object):
+    """
+    Collects latency and throughput counters of an :class:`InferenceServer`
+
+    """
+
+    def __init__(self, window_size=10000):
+        """
+
+        Parameters
+        ----------
+        window_size : int
+            number of most recent request latencies and batch sizes to keep
+            for the percentile calculation
+
+        """
+        self._window_size = window_size
+        self.reset()
+
+    def reset(self):
+        """
+        Resets all counters
+
+        """
+        self.n_requests = 0
+        self.n_samples = 0
+        self.n_batches = 0
+        self.compute_time = 0.
+        self._latencies = collections.deque(maxlen=self._window_size)
+        self._batch_sizes = collections.deque(maxlen=self._window_size)
+        self._start_time = time.perf_counter()
+
+    def record_batch(self, n_requests, n_samples, compute_time):
+        """
+        Records a single processed micro-batch
+
+        Parameters
+        ----------
+        n_requests : int
+            number of requests combined into this micro-batch
+        n_samples : int
+            number of samples inside this micro-batch
+        compute_time : float
+            time (in seconds) spent inside :meth:`Predictor.predict`
+
+        """
+        self.n_batches += 1
+        self.n_requests += n_requests
+        self.n_samples += n_samples
+        self.compute_time += compute_time
+        self._batch_sizes.append(n_samples)
+
+    def record_latency(self, latency):
+        """
+        Records the end-to-end latency of a single request
+
+        Parameters
+        ----------
+        latency : float
+            the time (in seconds) between submitting the request and
+            receiving its result
+
+        """
+        self._latencies.append(latency)
+
+    def summary(self):
+        """
+        Summarizes all counters
+
+        Returns
+        -------
+        dict
+            dictionary containing the request-, sample- and batch-counts,
+            the achieved throughput, the mean batch size and the latency
+            percentiles (in milliseconds)
+
+        """
+        elapsed = time.perf_counter() - self._start_time
+
+        summary = {
+            "n_requests": self.n_requests,
+            "n_samples": self.n_samples,
+            "n_batches": self.n_batches,
+            "elapsed_s": elapsed,
+            "requests_per_s": self.n_requests / max(elapsed, 1e-12),
+            "samples_per_s": self.n_samples / max(elapsed, 1e-12),
+            "compute_time_s": self.compute_time,
+            "mean_batch_size": (float(np.mean(self._batch_sizes))
+                                if self._batch_sizes else 0.)
+        }
+
+        if self._latencies:
+            latencies = np.array(self._latencies) * 1000.
+            summary.update({
+                "latency_mean_ms": float(np.mean(latencies)),
+                "latency_p50_ms": float(np.percentile(latencies, 50)),
+                "latency_p95_ms": float(np.percentile(latencies, 95)),
+                "latency_p99_ms": float(np.percentile(latencies, 99)),
+                "latency_max_ms": float(np.max(latencies))
+            })
+
+        return summary
+
+
+class InferenceServer(object):
+    """
+    Asynchronous inference service around a :class:`Predictor`, which
+    combines concurrent requests into dynamic micro-batches.
+
+    Incoming requests are queued; a single batching loop takes the first
+    queued request and keeps collecting further requests until either
+    ``max_batch_size`` samples are gathered or ``max_wait_time`` has passed.
+    The collected requests are concatenated along the batch dimension,
+    :meth:`Predictor.predict` is called once for the whole micro-batch and
+    the predictions are split back to the single requests.
+
+    The server can either be used in-process (by awaiting
+    :meth:`InferenceServer.predict`) or through a minimal HTTP/1.1 frontend
+    listening on a TCP port (:meth:`InferenceServer.serve_tcp`) or on a unix
+    socket (:meth:`InferenceServer.serve_unix`). The HTTP frontend accepts
+    ``POST /predict`` with a JSON object of (nested) lists as body and
+    returns the predictions in the same format; ``GET /stats`` returns
+    :meth:`InferenceStats.summary`.
+
+    See Also
+    --------
+    :class:`Predictor`
+
+    """
+
+    def __init__(self, predictor: Predictor, max_batch_size=32,
+                 max_wait_time=0.005, stats_window=10000):
+        """
+
+        Parameters
+        ----------
+        predictor : :class:`Predictor`
+            the predictor to run the micro-batches through
+        max_batch_size : int
+            maximum number of samples per micro-batch. A single request
+            exceeding this size is processed as its own batch
+        max_wait_time : float
+            maximum time (in seconds) to wait for further requests after the
+            first request of a micro-batch has arrived
+        stats_window : int
+            number of latencies to keep for the percentile calculation
+
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1, but got %d"
+                             % max_batch_size)
+
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.stats = InferenceStats(stats_window)
+
+        self._queue = None
+        self._batching_task = None
+        self._servers = []
+        # a single worker keeps the model calls serialized while the event
+        # loop continues to collect the next micro-batch
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def running(self):
+        """
+        Whether the batching loop is currently running
+
+        Returns
+        -------
+        bool
+            True if the batching loop was started and is not done yet
+
+        """
+        return self._batching_task is not None and \
+            not self._batching_task.done()
+
+    async def start(self):
+        """
+        Starts the batching loop (no-op if it is already running)
+
+        """
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        self.stats.reset()
+        self._batching_task = asyncio.ensure_future(self._batching_loop())
+
+    async def stop(self):
+        """
+        Stops all frontends and the batching loop. Requests, which are still
+        queued, are cancelled
+
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+
+        if self._batching_task is not None:
+            self._batching_task.cancel()
+            try:
+                await self._batching_task
+            except asyncio.CancelledError:
+                pass
+            self._batching_task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+
+    async def predict(self, data: dict):
+        """
+        Submits a single request and waits for its predictions
+
+        Parameters
+        ----------
+        data : dict
+            the request's batch dictionary. All arrays must share the same
+            size along the first (batch) dimension
+
+        Returns
+        -------
+        dict
+            the predictions belonging to this request
+
+        """
+        if not self.running:
+            await self.start()
+
+        data = {k: np.asarray(v) for k, v in data.items()}
+        n_samples = self._get_n_samples(data)
+
+        future = asyncio.get_event_loop().create_future()
+        start = time.perf_counter()
+        await self._queue.put((data, n_samples, future, start))
+
+        result = await future
+        self.stats.record_latency(time.perf_counter() - start)
+        return result
+
+    async def _batching_loop(self):
+        """
+        Collects queued requests into micro-batches and processes them
+
+        """
+        loop = asyncio.get_event_loop()
+
+        # request, which did not fit into the previous micro-batch anymore
+        carry = None
+
+        while True:
+            if carry is None:
+                carry = await self._queue.get()
+            requests, carry = [carry], None
+            n_samples = requests[0][1]
+            deadline = loop.time() + self.max_wait_time
+
+            while n_samples < self.max_batch_size:
+                # take everything that is already queued without waiting
+                if not self._queue.empty():
+                    request = self._queue.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        request = await asyncio.wait_for(self._queue.get(),
+                                                         remaining)
+                    except asyncio.TimeoutError:
+                        break
+
+                if n_samples + request[1] > self.max_batch_size:
+                    carry = request
+                    break
+
+                requests.append(request)
+                n_samples += request[1]
+
+            # drop requests, whose callers stopped waiting
+            requests = [_req for _req in requests if not _req[2].done()]
+            if not requests:
+                continue
+
+            await self._process(requests, loop)
+
+    async def _process(self, requests, loop):
+        """
+        Runs a single micro-batch through the predictor and scatters the
+        results back to the waiting requests
+
+        Parameters
+        ----------
+        requests : list
+            list of tuples containing the request data, its number of
+            samples, its future and its submission time
+        loop : :class:`asyncio.AbstractEventLoop`
+            the current event loop
+
+        """
+        sizes = [_req[1] for _req in requests]
+
+        try:
+            batch = self._collate([_req[0] for _req in requests])
+
+            start = time.perf_counter()
+            preds = await loop.run_in_executor(self._executor,
+                                               self.predictor.predict, batch)
+            self.stats.record_batch(len(requests), sum(sizes),
+                                    time.perf_counter() - start)
+
+            results = self._scatter(preds, sizes)
+
+        except Exception as e:
+            logger.exception("Micro-batch of %d requests failed"
+                             % len(requests))
+            for _req in requests:
+                if not _req[2].done():
+                    _req[2].set_exception(e)
+            return
+
+        for _req, _result in zip(requests, results):
+            if not _req[2].done():
+                _req[2].set_result(_result)
+
+    @staticmethod
+    def _get_n_samples(data: dict):
+        """
+        Determines the number of samples of a request
+
+        Parameters
+        ----------
+        data : dict
+            the request's batch dictionary
+
+        Returns
+        -------
+        int
+            the number of samples
+
+        Raises
+        ------
+        ValueError
+            if the arrays have different sizes along the batch dimension
+
+        """
+        sizes = set([len(v) for v in data.values() if np.ndim(v) > 0])
+
+        if len(sizes) != 1:
+            raise ValueError("All request items must have the same (non-zero)"
+                             " batch dimension, but got sizes %s"
+                             % str(sorted(sizes)))
+
+        return sizes.pop()
+
+    @staticmethod
+    def _collate(batches):
+        """
+        Concatenates the single request dicts to a micro-batch
+
+        Parameters
+        ----------
+        batches : list
+            list of request batch dicts
+
+        Returns
+        -------
+        dict
+            the combined micro-batch
+
+        """
+        if len(batches) == 1:
+            return batches[0]
+
+        return {k: np.concatenate([_batch[k] for _batch in batches])
+                for k in batches[0].keys()}
+
+    @staticmethod
+    def _scatter(preds, sizes):
+        """
+        Splits the (possibly nested) predictions of a micro-batch back into
+        the predictions of the single requests
+
+        Parameters
+        ----------
+        preds : dict
+            the micro-batch predictions
+        sizes : list
+            the number of samples per request
+
+        Returns
+        -------
+        list
+            list of prediction dicts (one per request)
+
+        """
+        split_idxs = np.cumsum(sizes)[:-1]
+
+        def _split(element):
+            if isinstance(element, collections.abc.Mapping):
+                splitted = {k: _split(v) for k, v in element.items()}
+                return [{k: v[idx] for k, v in splitted.items()}
+                        for idx in range(len(sizes))]
+
+            if isinstance(element, np.ndarray) and element.ndim > 0 \
+                    and len(element) == sum(sizes):
+                return np.split(element, split_idxs)
+
+            # values without a batch dimension are shared by all requests
+            return [element] * len(sizes)
+
+        return _split(preds)
+
+    async def serve_tcp(self, host="127.0.0.1", port=8080):
+        """
+        Starts the HTTP frontend on a TCP port
+
+        Parameters
+        ----------
+        host : str
+            the host to bind to
+        port : int
+            the port to listen on
+
+        Returns
+        -------
+        :class:`asyncio.AbstractServer`
+            the started server
+
+        """
+        await self.start()
+        server = await asyncio.start_server(self._handle_connection,
+                                            host, port)
+        self._servers.append(server)
+        return server
+
+    async def serve_unix(self, path):
+        """
+        Starts the HTTP frontend on a unix socket
+
+        Parameters
+        ----------
+        path : str
+            the path of the unix socket (will be replaced if it exists)
+
+        Returns
+        -------
+        :class:`asyncio.AbstractServer`
+            the started server
+
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+        await self.start()
+        server = await asyncio.start_unix_server(self._handle_connection,
+                                                 path)
+        self._servers.append(server)
+        return server
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Handles a (keep-alive) HTTP connection
+
+        Parameters
+        ----------
+        reader : :class:`asyncio.StreamReader`
+            the connection's reader
+        writer : :class:`asyncio.StreamWriter`
+            the connection's writer
+
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, path = request_line.decode(
+                        "latin-1").split(" ")[:2]
+
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        key, val = line.decode("latin-1").split(":", 1)
+                        headers[key.strip().lower()] = val.strip()
+
+                    body = await reader.readexactly(
+                        int(headers.get("content-length", 0)))
+
+                except ValueError as e:
+                    # malformed request line, header or content length:
+                    # the rest of the stream can't be parsed reliably
+                    await self._write_response(
+                        writer, 400, {"error": "Bad request: %s" % str(e)})
+                    break
+
+                status, response = await self._dispatch(method, path, body)
+                await self._write_response(writer, status, response)
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer, status, response):
+        """
+        Writes a JSON response
+
+        Parameters
+        ----------
+        writer : :class:`asyncio.StreamWriter`
+            the connection's writer
+        status : int
+            the HTTP status code
+        response : dict
+            the JSON-serializable response
+
+        """
+        payload = json.dumps(response).encode("utf-8")
+        writer.write(b"HTTP/1.1 %d %s\r\n"
+                     b"Content-Type: application/json\r\n"
+                     b"Content-Length: %d\r\n\r\n"
+                     % (status, b"OK" if status == 200 else b"ERROR",
+                        len(payload)))
+        writer.write(payload)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        """
+        Dispatches a single HTTP request
+
+        Parameters
+        ----------
+        method : str
+            the HTTP method
+        path : str
+            the requested path
+        body : bytes
+            the request body
+
+        Returns
+        -------
+        int
+            the HTTP status code
+        dict
+            the JSON-serializable response
+
+        """
+        if method == "GET" and path == "/stats":
+            return 200, self.stats.summary()
+
+        if method == "POST" and path == "/predict":
+            try:
+                preds = await self.predict(json.loads(body.decode("utf-8")))
+            except Exception as e:
+                return 500, {"error": str(e)}
+
+            return 200, _to_serializable(preds)
+
+        return 404, {"error": "Unknown route %s %s" % (method, path)}
+
+
+def _to_serializable(element):
+    """
+    Converts (nested) numpy predictions to JSON-serializable objects
+
+    Parameters
+    ----------
+    element : Any
+        the element to convert
+
+    Returns
+    -------
+    Any
+        the converted element
+
+    """
+    if isinstance(element, collections.abc.Mapping):
+        return {k: _to_serializable(v) for k, v in element.items()}
+    if isinstance(element, (np.ndarray, np.generic)):
+        return element.tolist()
+    return element
@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MetricWorker(object):
+    """
+    Computes the metrics of training iterations in background threads.
+
+    Each iteration is processed in two stages: the metric computation (which
+    includes the conversion of the predictions to numpy) runs in a pool of
+    ``n_workers`` threads, while the iteration's callbacks (e.g. the logging)
+    are executed afterwards by a single thread, strictly in the order the
+    iterations were submitted. This allows the next training step to start
+    before the metrics of the previous one are available.
+
+    The number of iterations in flight is limited by ``max_pending`` to bound
+    the memory held by the not yet processed predictions. If this limit is
+    reached, :meth:`submit` blocks until the oldest pending iteration is
+    completely processed.
+
+    The results are only passed to the callbacks and not kept afterwards, so
+    the memory does not grow with the number of submitted iterations.
+    Errors raised in the background are re-raised by the next call to
+    :meth:`submit` or :meth:`flush`.
+
+    """
+
+    def __init__(self, n_workers=1, max_pending=None):
+        """
+
+        Parameters
+        ----------
+        n_workers : int
+            the number of threads computing the metrics
+        max_pending : int, optional
+            the maximum number of iterations, which are submitted but not
+            completely processed yet; defaults to twice the number of workers
+
+        """
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1, but got %d"
+                             % n_workers)
+        if max_pending is None:
+            max_pending = 2 * n_workers
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1, but got %d"
+                             % max_pending)
+
+        self._n_workers = n_workers
+        self._max_pending = max_pending
+        self._metric_executor = None
+        self._callback_executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    @property
+    def n_workers(self):
+        return self._n_workers
+
+    @property
+    def max_pending(self):
+        return self._max_pending
+
+    @property
+    def n_pending(self):
+        """
+        The number of submitted iterations, which are not processed yet
+        """
+        return len([_future for _future in self._futures
+                    if not _future.done()])
+
+    def _start(self):
+        if self._metric_executor is None:
+            self._metric_executor = ThreadPoolExecutor(
+                self._n_workers, thread_name_prefix="delira-metrics")
+            self._callback_executor = ThreadPoolExecutor(
+                1, thread_name_prefix="delira-metric-callbacks")
+
+    @staticmethod
+    def _run_callback(metric_future, callback_fn):
+        result = metric_future.result()
+        if callback_fn is not None:
+            callback_fn(result)
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def _check_errors(self, wait=False):
+        """
+        Removes processed futures and re-raises the first error
+
+        Parameters
+        ----------
+        wait : bool
+            whether to wait for all pending futures
+
+        """
+        futures, self._futures = self._futures, []
+        error = None
+
+        for _future in futures:
+            if not (wait or _future.done()):
+                self._futures.append(_future)
+                continue
+
+            _error = _future.exception()
+            if _error is not None and error is None:
+                error = _error
+
+        if error is not None:
+            raise error
+
+    def submit(self, metric_fn, callback_fn=None):
+        """
+        Schedules the processing of a single iteration
+
+        Parameters
+        ----------
+        metric_fn : function
+            function computing the iteration's metrics; called without
+            arguments in one of the worker threads
+        callback_fn : function, optional
+            function receiving the result of ``metric_fn``; called by a single
+            thread in the order of submission
+
+        """
+        self._check_errors()
+        self._start()
+
+        self._slots.acquire()
+        try:
+            metric_future = self._metric_executor.submit(metric_fn)
+            future = self._callback_executor.submit(
+                self._run_callback, metric_future, callback_fn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(self._release_slot)
+        self._futures.append(future)
+
+    def flush(self):
+        """
+        Waits until all submitted iterations are processed
+
+        """
+        self._check_errors(wait=True)
+
+    def shutdown(self):
+        """
+        Waits for all submitted iterations and stops the threads
+
+        """
+        try:
+            self.flush()
+        finally:
+            for executor in (self._metric_executor, self._callback_executor):
+                if executor is not None:
+                    executor.shutdown(wait=True)
+            self._metric_executor = None
+            self._callback_executor = None
+
+    def __getstate__(self):
+        # the threads cannot be pickled; they are restarted on demand
+        return {"n_workers": self._n_workers,
+                "max_pending": self._max_pending}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -0,0 +1,220 @@
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import traceback
+import warnings
+
+import numpy as np
+
+from delira.utils.resources import CPUResourceManager, partition_cpus, \
+    set_cpu_affinity, set_num_threads
+
+logger = logging.getLogger(__name__)
+
+
+def _seed(random_seed):
+    """
+    Seeds numpy and the backends, which have already been imported (the
+    workers do not inherit the seeds of the parent process)
+
+    """
+    np.random.seed(random_seed)
+
+    if "torch" in sys.modules:
+        import torch
+        torch.manual_seed(random_seed)
+
+    if "tensorflow" in sys.modules:
+        import tensorflow as tf
+        tf.set_random_seed(random_seed)
+
+
+def _fold_worker(experiment, data, cores, random_seed, fold_kwargs,
+                 task_queue, result_queue):
+    """
+    Runs the folds received from ``task_queue`` until ``None`` is received
+    (in a separate process)
+
+    """
+    if cores:
+        set_cpu_affinity(cores)
+        set_num_threads(len(cores))
+        # the subsets of all folds inherit the resource manager, which
+        # splits the fold's cores between training and augmentation
+        data.resource_manager = CPUResourceManager(cpus=cores)
+
+    save_path = fold_kwargs.pop("save_path")
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        idx = task[0]
+        try:
+            if random_seed is not None:
+                _seed(random_seed)
+
+            result = experiment._run_fold(
+                data, *task, save_path=os.path.join(save_path,
+                                                    "fold_%02d" % idx),
+                **fold_kwargs)
+
+        except Exception as e:
+            # the exception itself might not be picklable
+            result_queue.put((idx, False, "%s: %s\n%s" % (
+                type(e).__name__, str(e), traceback.format_exc())))
+        else:
+            result_queue.put((idx, True, result))
+
+
+def _default_start_method():
+    """
+    Forks the workers where possible, since forked workers share the memory
+    of the dataset with the parent process (copy-on-write) instead of
+    unpickling their own copy
+
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return "fork"
+    return "spawn"
+
+
+def run_folds_parallel(experiment, data, folds, n_workers, cpus_per_fold=None,
+                       random_seed=None, start_method=None, **fold_kwargs):
+    """
+    Runs the folds of a k-Fold cross-validation concurrently in separate
+    worker processes (see :meth:`BaseExperiment.kfold`).
+
+    Each worker receives the experiment and the data manager containing the
+    whole dataset only once and extracts the subsets of its folds from it by
+    their indices. Thus, the dataset is copied once per worker (or not at
+    all when forking) instead of once per fold. Each fold is trained with
+    its own ``save_path`` (a ``fold_XX`` directory) to isolate the folds'
+    checkpoints and logs.
+
+    A failing fold does not affect the others: its error is logged and a
+    warning is emitted after all folds finished, while the results of the
+    remaining folds are returned.
+
+    Parameters
+    ----------
+    experiment : :class:`BaseExperiment`
+        the experiment to run the folds with
+    data : :class:`DataManager`
+        the manager containing the whole dataset
+    folds : list
+        tuples of the fold's index and the indices of its training,
+        validation (or None) and test samples
+    n_workers : int
+        the number of worker processes
+    cpus_per_fold : int or None
+        the number of CPU cores each worker is pinned to (split between the
+        training and the augmentation processes); if None: the workers
+        share all cores
+    random_seed : int or None
+        the seed of numpy and the backends at the beginning of each fold
+    start_method : str or None
+        the method to start the workers with; if None: "fork" is used where
+        available (which does not copy the dataset), otherwise "spawn". Use
+        "spawn" or "forkserver" if the parent process has already
+        initialized a GPU backend (e.g. CUDA), which cannot be forked
+    **fold_kwargs :
+        additional keyword arguments passed to
+        :meth:`BaseExperiment._run_fold`; if ``save_path`` is given, the
+        folds' directories are created inside of it (defaults to the
+        ``checkpoints`` directory of the experiment)
+
+    Returns
+    -------
+    dict
+        the predictions and metric values of each successful fold
+
+    Raises
+    ------
+    RuntimeError
+        if all folds failed
+
+    """
+    fold_kwargs.setdefault("save_path", os.path.join(experiment.save_path,
+                                                     "checkpoints"))
+
+    if cpus_per_fold is None:
+        slots = [None] * n_workers
+    else:
+        slots = partition_cpus(n_workers, cpus_per_fold)
+    slots = slots[:len(folds)]
+
+    if start_method is None:
+        start_method = _default_start_method()
+
+    ctx = multiprocessing.get_context(start_method)
+    task_queue, result_queue = ctx.Queue(), ctx.Queue()
+
+    for fold in folds:
+        task_queue.put(fold)
+    for _ in slots:
+        task_queue.put(None)
+
+    # the workers are not daemonic to be able to start the augmentation
+    # workers of the data managers
+    workers = []
+    for worker_id, cores in enumerate(slots):
+        worker = ctx.Process(
+            target=_fold_worker, args=(experiment, data, cores, random_seed,
+                                       fold_kwargs, task_queue,
+                                       result_queue),
+            name="delira-kfold-%d" % worker_id)
+        worker.start()
+        workers.append(worker)
+
+    results, errors = {}, {}
+
+    def _receive(timeout):
+        idx, success, result = result_queue.get(timeout=timeout)
+        if success:
+            results[idx] = result
+        else:
+            errors[idx] = result
+            logger.error("Fold %d failed:\n%s" % (idx, result))
+
+    try:
+        while len(results) + len(errors) < len(folds):
+            try:
+                _receive(1.)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+
+        # results sent right before the workers terminated
+        while len(results) + len(errors) < len(folds):
+            try:
+                _receive(0.1)
+            except queue.Empty:
+                break
+
+    finally:
+        for worker in workers:
+            if worker.is_alive() and len(results) + len(errors) < len(folds):
+                worker.terminate()
+            worker.join()
+
+    for idx, _, _, _ in folds:
+        if idx not in results and idx not in errors:
+            errors[idx] = "The worker process terminated unexpectedly"
+            logger.error("Fold %d failed: %s" % (idx, errors[idx]))
+
+    if errors:
+        if not results:
+            raise RuntimeError("All folds failed:\n%s" % "\n".join(
+                "Fold %d: %s" % (idx, msg)
+                for idx, msg in sorted(errors.items())))
+
+        warnings.warn("%d of %d folds failed (folds %s); their results are "
+                      "missing" % (len(errors), len(folds),
+                                   str(sorted(errors.keys()))),
+                      RuntimeWarning)
+
+    return results
@@ -1,12 +1,12 @@
+import contextlib
 import logging
-import gc
 
 import numpy as np
 from tqdm import tqdm
 
 from delira.data_loading import DataManager
 from delira.training.utils import convert_to_numpy_identity
-from ..utils.config import LookupConfig
+from ..utils.config import BatchDict
 
 from delira.training.callbacks import AbstractCallback
 
@@ -145,9 +145,10 @@ class Predictor(object):
         mapped_data = {
             k: data[v] for k, v in self.key_mapping.items()}
 
-        pred = self.module(
-            **mapped_data
-        )
+        with self._forward_context():
+            pred = self.module(
+                **mapped_data
+            )
 
         # converts positional arguments and keyword arguments,
         # but returns only keyword arguments, since positional
@@ -156,6 +157,20 @@ class Predictor(object):
             **pred
         )[1]
 
+    def _forward_context(self):
+        """
+        Creates the context the network's forward pass is executed in (e.g.
+        to enable mixed precision); does nothing per default and may be
+        overwritten by backend-specific subclasses
+
+        Returns
+        -------
+        context manager
+            the context of the forward pass
+
+        """
+        return contextlib.ExitStack()
+
     def _at_iter_begin(self, iter_num, **kwargs):
         """
         Function defining the behavior executed at beginning of each iteration
@@ -306,11 +321,10 @@ class Predictor(object):
                 # to backend-specific tensor type) - no-op if already numpy
                 batch_dict = self._convert_to_npy_fn(**batch_dict)[1]
 
-                preds_batch = LookupConfig()
-                # explicitly free memory of old lookup config
-                gc.collect()
-                preds_batch.update(batch_dict)
-                preds_batch.update(preds)
+                # unlike a LookupConfig, the batch dict does not convert the
+                # predictions and does not need a garbage collection to be
+                # freed; predictions replace batch entries of the same key
+                preds_batch = BatchDict({**batch_dict, **preds})
 
                 # calculate metrics for predicted batch
                 _metric_vals = self.calc_metrics(preds_batch,
@@ -613,13 +627,13 @@ class Predictor(object):
             super().__setattr__(key, value)
 
     @staticmethod
-    def calc_metrics(batch: LookupConfig, metrics=None, metric_keys=None):
+    def calc_metrics(batch: BatchDict, metrics=None, metric_keys=None):
         """
         Compute metrics
 
         Parameters
         ----------
-        batch: LookupConfig
+        batch: :class:`BatchDict` or :class:`LookupConfig`
             dictionary containing the whole batch
             (including predictions)
         metrics: dict
@@ -0,0 +1,405 @@
+import collections.abc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+
+from delira.data_loading import DataManager
+from delira.utils.codecs import Encoder
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(obj):
+    """
+    Encodes an object (e.g. a config) to a stable string by means of the
+    :class:`Encoder`
+
+    """
+    return json.dumps(Encoder()(obj), sort_keys=True, default=repr)
+
+
+def _update_hash(hasher, obj):
+    if isinstance(obj, np.ndarray):
+        hasher.update(("ndarray:%s:%s:" % (obj.dtype.str, str(obj.shape))
+                       ).encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, collections.abc.Mapping):
+        hasher.update(b"mapping:%d:" % len(obj))
+        for key in sorted(obj.keys(), key=str):
+            hasher.update(("%s=" % str(key)).encode())
+            _update_hash(hasher, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(b"sequence:%d:" % len(obj))
+        for item in obj:
+            _update_hash(hasher, item)
+    elif isinstance(obj, bytes):
+        hasher.update(b"bytes:" + obj)
+    elif isinstance(obj, (str, int, float, bool, np.generic)) or obj is None:
+        hasher.update(("%s:%r;" % (type(obj).__name__, obj)).encode())
+    else:
+        hasher.update(_encode(obj).encode())
+
+
+def data_fingerprint(data):
+    """
+    Computes a fingerprint of a dataset from its class, its length and the
+    raw samples (as returned by ``get_sample_from_index``, i.e. without
+    loading lazy samples). For a :class:`DataManager`, its batch size,
+    sampling and transforms are included as well.
+
+    Parameters
+    ----------
+    data : :class:`DataManager` or :class:`AbstractDataset` or None
+        the data to fingerprint
+
+    Returns
+    -------
+    str
+        the hex digest of the fingerprint (None if no data was given)
+
+    """
+    if data is None:
+        return None
+
+    hasher = hashlib.sha256()
+
+    if isinstance(data, DataManager):
+        hasher.update(_encode({
+            "batch_size": data.batch_size,
+            "sampler_cls": data.sampler_cls,
+            "sampler_kwargs": data.sampler_kwargs,
+            "transforms": data.transforms,
+            "drop_last": data.drop_last}).encode())
+        data = data.dataset
+
+    hasher.update(("%s.%s:%d:" % (type(data).__module__,
+                                  type(data).__qualname__, len(data))
+                   ).encode())
+
+    for idx in range(len(data)):
+        _update_hash(hasher, data.get_sample_from_index(idx))
+
+    return hasher.hexdigest()
+
+
+class ResultCache(object):
+    """
+    Content-addressed on-disk cache of experiment results.
+
+    Each entry is a directory named after its key, which is a hash of
+    everything determining the result (see :meth:`make_key`). Entries are
+    written to a temporary directory first and renamed afterwards, so that
+    incomplete entries are never visible (also when several processes share
+    the cache). If a maximum size is given, the least recently used entries
+    are evicted after each insertion.
+
+    """
+
+    METADATA_NAME = "metadata.json"
+
+    def __init__(self, cache_dir: str, max_size=None):
+        """
+
+        Parameters
+        ----------
+        cache_dir : str
+            the directory to store the entries in
+        max_size : int, optional
+            the maximum size of all entries in bytes; per default the cache
+            size is not limited
+
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(config, model_cls, data=(), seed=None, **kwargs):
+        """
+        Creates the key of a result
+
+        Parameters
+        ----------
+        config : :class:`DeliraConfig`
+            the config, the result was obtained with (encoded by the
+            :class:`Encoder`)
+        model_cls : type
+            the class of the trained model
+        data : iterable
+            the data managers or datasets, the result was obtained with
+            (see :func:`data_fingerprint`)
+        seed : int, optional
+            the seed, the result was obtained with
+        **kwargs :
+            further values determining the result (encoded by the
+            :class:`Encoder`)
+
+        Returns
+        -------
+        str
+            the key
+
+        """
+        hasher = hashlib.sha256()
+        hasher.update(_encode({
+            "config": config,
+            "model_cls": model_cls,
+            "seed": seed,
+            "kwargs": kwargs}).encode())
+
+        for _data in data:
+            hasher.update(str(data_fingerprint(_data)).encode())
+
+        return hasher.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def keys(self):
+        """
+        Returns the keys of all complete entries
+
+        Returns
+        -------
+        list
+            the keys
+
+        """
+        return [key for key in os.listdir(self.cache_dir)
+                if not key.startswith(".") and os.path.isfile(
+                    os.path.join(self._entry_path(key), self.METADATA_NAME))]
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self._entry_path(key),
+                                           self.METADATA_NAME))
+
+    def get(self, key):
+        """
+        Looks up an entry and marks it as recently used
+
+        Parameters
+        ----------
+        key : str
+            the key of the entry
+
+        Returns
+        -------
+        str or None
+            the directory of the entry (None if the key is not cached)
+
+        """
+        if key not in self:
+            return None
+
+        path = self._entry_path(key)
+        try:
+            # the access time of an entry is the modification time of its
+            # metadata
+            os.utime(os.path.join(path, self.METADATA_NAME))
+        except OSError:
+            # the entry was evicted in the meantime
+            return None
+
+        return path
+
+    def metadata(self, key):
+        """
+        Returns the metadata of an entry
+
+        Parameters
+        ----------
+        key : str
+            the key of the entry
+
+        Returns
+        -------
+        dict
+            the metadata
+
+        """
+        with open(os.path.join(self._entry_path(key), self.METADATA_NAME)) \
+                as f:
+            return json.load(f)
+
+    def put(self, key, write_fn, metadata=None):
+        """
+        Adds an entry
+
+        Parameters
+        ----------
+        key : str
+            the key of the entry
+        write_fn : function
+            function writing the entry's files into the directory it
+            receives
+        metadata : dict, optional
+            JSON serializable metadata of the entry (e.g. its metrics)
+
+        Returns
+        -------
+        str
+            the directory of the entry
+
+        """
+        path = self._entry_path(key)
+        tmp_path = os.path.join(self.cache_dir, ".%s-%d" % (key, os.getpid()))
+
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        try:
+            write_fn(tmp_path)
+            with open(os.path.join(tmp_path, self.METADATA_NAME), "w") as f:
+                json.dump({"key": key, "created": time.time(),
+                           **(metadata or {})}, f, default=repr)
+
+            if os.path.isdir(path):
+                # replace outdated or incomplete entries
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+
+        except OSError:
+            # another process added the same entry in the meantime
+            if key not in self:
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        self.evict()
+        return path
+
+    def get_result(self, key):
+        """
+        Loads a result stored by :meth:`put_result`
+
+        Parameters
+        ----------
+        key : str
+            the key of the entry
+
+        Returns
+        -------
+        Any
+            the result (None if the key is not cached)
+
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+
+        with open(os.path.join(path, "result.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def put_result(self, key, result, metadata=None):
+        """
+        Adds a picklable result as entry
+
+        Parameters
+        ----------
+        key : str
+            the key of the entry
+        result : Any
+            the result
+        metadata : dict, optional
+            JSON serializable metadata of the entry
+
+        Returns
+        -------
+        str
+            the directory of the entry
+
+        """
+        def _write(path):
+            with open(os.path.join(path, "result.pkl"), "wb") as f:
+                pickle.dump(result, f)
+
+        return self.put(key, _write, metadata)
+
+    def invalidate(self, key=None):
+        """
+        Removes an entry (or all entries)
+
+        Parameters
+        ----------
+        key : str, optional
+            the key of the entry to remove; if None: all entries are removed
+
+        """
+        keys = self.keys() if key is None else [key]
+        for _key in keys:
+            shutil.rmtree(self._entry_path(_key), ignore_errors=True)
+
+    @staticmethod
+    def _dir_size(path):
+        size = 0
+        for root, _, files in os.walk(path):
+            for _file in files:
+                try:
+                    size += os.path.getsize(os.path.join(root, _file))
+                except OSError:
+                    pass
+        return size
+
+    @property
+    def size(self):
+        """
+        The size of all entries in bytes
+        """
+        return sum(self._dir_size(self._entry_path(key))
+                   for key in self.keys())
+
+    def evict(self, max_size=None):
+        """
+        Removes the least recently used entries until the cache does not
+        exceed its maximum size
+
+        Parameters
+        ----------
+        max_size : int, optional
+            the size to shrink the cache to; defaults to ``self.max_size``
+
+        Returns
+        -------
+        list
+            the keys of the removed entries
+
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if max_size is None:
+            return []
+
+        entries = []
+        for key in self.keys():
+            path = self._entry_path(key)
+            try:
+                last_access = os.path.getmtime(os.path.join(
+                    path, self.METADATA_NAME))
+            except OSError:
+                continue
+            entries.append((last_access, key, self._dir_size(path)))
+
+        total_size = sum(entry[2] for entry in entries)
+        evicted = []
+        for _, key, size in sorted(entries):
+            if total_size <= max_size:
+                break
+            self.invalidate(key)
+            total_size -= size
+            evicted.append(key)
+            logger.debug("Evicted cache entry %s (%d bytes)" % (key, size))
+
+        return evicted
+
+    def __getstate__(self):
+        return {"cache_dir": self.cache_dir, "max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
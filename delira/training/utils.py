@@ -1,4 +1,4 @@
-import collections
+import collections.abc
 import numpy as np
 
 
@@ -34,7 +34,7 @@ def recursively_convert_elements(element, check_type, conversion_fn):
     # recursively convert all keys and values of mapping and convert result
     # back to original mapping type
     # must be checked before iterable since most mappings are also a iterable
-    elif isinstance(element, collections.Mapping):
+    elif isinstance(element, collections.abc.Mapping):
         element = type(element)({
             recursively_convert_elements(k, check_type, conversion_fn):
                 recursively_convert_elements(v, check_type, conversion_fn)
@@ -44,7 +44,7 @@ def recursively_convert_elements(element, check_type, conversion_fn):
 
     # recursively convert all items of iterable and convert result back to
     # original iterable type
-    elif isinstance(element, collections.Iterable):
+    elif isinstance(element, collections.abc.Iterable):
         element = type(element)([recursively_convert_elements(x,
                                                               check_type,
                                                               conversion_fn)
@@ -55,6 +55,252 @@ def recursively_convert_elements(element, check_type, conversion_fn):
     return element
 
 
+class _StructureChanged(Exception):
+    pass
+
+
+class StructuredConverter(object):
+    """
+    Converts all elements of nested structures like
+    :func:`recursively_convert_elements`, but learns the layout of the
+    structures it converts.
+
+    The first conversion of a structure records a flat conversion plan: the
+    paths of all nested containers (``dict``, ``list`` and ``tuple``) and of
+    all leaves together with their types and the conversion functions
+    applied to them (the conversion functions must return the same type for
+    elements of the same type). Later structures of the same layout (e.g.
+    the batches and predictions of the following iterations) are converted
+    by a single loop over this plan, without type dispatch and recursion.
+    If the layout changes, the plan is learned again; structures containing
+    other containers (or whose layout keeps changing) are converted
+    recursively.
+
+    Plans are cached per number of positional arguments and keyword
+    argument names, i.e. for each call site of a training loop.
+
+    """
+
+    # leaves, which are iterable, but must not be converted elementwise
+    _ATOMIC_TYPES = (str, bytes, np.ndarray)
+
+    def __init__(self, rules, max_plans=32, max_failures=3):
+        """
+
+        Parameters
+        ----------
+        rules : list
+            tuples of a type and the function to convert elements of this
+            type with; the rules are applied in order (each like a separate
+            pass of :func:`recursively_convert_elements`), so later rules
+            also receive the results of former ones
+        max_plans : int
+            the maximum number of cached conversion plans
+        max_failures : int
+            the number of layout changes after which a call site is always
+            converted recursively
+
+        """
+        self.rules = tuple(rules)
+        self.max_plans = max_plans
+        self.max_failures = max_failures
+
+        self._plans = {}
+        self._failures = {}
+
+    def __call__(self, *args, **kwargs):
+        """
+        Converts all elements in args and kwargs
+
+        Parameters
+        ----------
+        *args :
+            positional arguments of arbitrary number and type
+        **kwargs :
+            keyword arguments of arbitrary number and type
+
+        Returns
+        -------
+        tuple
+            converted positional arguments
+        dict
+            converted keyword arguments
+
+        """
+        signature = (len(args), tuple(kwargs))
+
+        plan = self._plans.get(signature)
+        if plan is not None:
+            try:
+                return self._convert_planned(plan, args, kwargs)
+            except _StructureChanged:
+                self._failures[signature] = \
+                    self._failures.get(signature, 0) + 1
+                if self._failures[signature] >= self.max_failures:
+                    self._plans[signature] = None
+
+        if (self._failures.get(signature, 0) >= self.max_failures
+                or (signature not in self._plans
+                    and len(self._plans) >= self.max_plans)):
+            return self.convert_recursively(*args, **kwargs)
+
+        containers, leaves = [], []
+        try:
+            converted_args = tuple([
+                self._learn(val, containers, leaves, 0, idx)
+                for idx, val in enumerate(args)])
+            converted_kwargs = {
+                key: self._learn(val, containers, leaves, 1, key)
+                for key, val in kwargs.items()}
+        except _StructureChanged:
+            self._failures[signature] = self.max_failures
+            self._plans[signature] = None
+            return self.convert_recursively(*args, **kwargs)
+
+        tuples = [idx for idx, container in enumerate(containers, 2)
+                  if container[2] is tuple]
+        self._plans[signature] = (containers, leaves, tuples[::-1])
+        return converted_args, converted_kwargs
+
+    def convert_recursively(self, *args, **kwargs):
+        """
+        Converts all elements in args and kwargs without a conversion plan
+        (see :func:`recursively_convert_elements`)
+
+        Parameters
+        ----------
+        *args :
+            positional arguments of arbitrary number and type
+        **kwargs :
+            keyword arguments of arbitrary number and type
+
+        Returns
+        -------
+        tuple
+            converted positional arguments
+        dict
+            converted keyword arguments
+
+        """
+        for check_type, conversion_fn in self.rules:
+            args = recursively_convert_elements(args, check_type,
+                                                conversion_fn)
+            kwargs = recursively_convert_elements(kwargs, check_type,
+                                                  conversion_fn)
+
+        return args, kwargs
+
+    def _convert_leaf(self, element):
+        conversion_fns = []
+        for check_type, conversion_fn in self.rules:
+            if isinstance(element, check_type):
+                element = conversion_fn(element)
+                conversion_fns.append(conversion_fn)
+
+        return tuple(conversion_fns), element
+
+    def _learn(self, element, containers, leaves, parent_idx, key):
+        """
+        Converts an element recursively and records the conversion plan
+
+        """
+        element_type = type(element)
+
+        conversion_fns, converted = self._convert_leaf(element)
+        if conversion_fns:
+            leaves.append((parent_idx, key, element_type, conversion_fns))
+            return converted
+
+        if element_type in (dict, list, tuple):
+            containers.append((parent_idx, key, element_type, len(element)))
+            idx = len(containers) + 1
+
+            if element_type is dict:
+                # keys would be converted as well
+                if any(self._convert_leaf(_key)[0] for _key in element):
+                    raise _StructureChanged()
+
+                return {_key: self._learn(val, containers, leaves, idx, _key)
+                        for _key, val in element.items()}
+
+            return element_type([
+                self._learn(val, containers, leaves, idx, _idx)
+                for _idx, val in enumerate(element)])
+
+        if isinstance(element, self._ATOMIC_TYPES) or not isinstance(
+                element, collections.abc.Iterable):
+            leaves.append((parent_idx, key, element_type, ()))
+            return element
+
+        # other containers are rebuilt by their type during the recursive
+        # conversion
+        raise _StructureChanged()
+
+    @staticmethod
+    def _convert_planned(plan, args, kwargs):
+        """
+        Converts args and kwargs by a conversion plan
+
+        Raises
+        ------
+        _StructureChanged
+            if the layout of args and kwargs does not match the plan
+
+        """
+        containers, leaves, tuples = plan
+
+        # copies of args, kwargs and all nested containers (tuples are
+        # copied to lists and converted back afterwards, starting with the
+        # innermost ones)
+        nodes = [list(args), dict(kwargs)]
+
+        for parent_idx, key, container_type, length in containers:
+            try:
+                container = nodes[parent_idx][key]
+            except (KeyError, IndexError):
+                raise _StructureChanged()
+
+            if (type(container) is not container_type
+                    or len(container) != length):
+                raise _StructureChanged()
+
+            if container_type is dict:
+                container = dict(container)
+            else:
+                container = list(container)
+
+            nodes[parent_idx][key] = container
+            nodes.append(container)
+
+        for parent_idx, key, leaf_type, conversion_fns in leaves:
+            parent = nodes[parent_idx]
+            try:
+                leaf = parent[key]
+            except (KeyError, IndexError):
+                raise _StructureChanged()
+
+            if type(leaf) is not leaf_type:
+                raise _StructureChanged()
+
+            if conversion_fns:
+                for conversion_fn in conversion_fns:
+                    leaf = conversion_fn(leaf)
+                parent[key] = leaf
+
+        for idx in tuples:
+            parent_idx, key = containers[idx - 2][:2]
+            nodes[parent_idx][key] = tuple(nodes[idx])
+
+        return tuple(nodes[0]), nodes[1]
+
+    def __getstate__(self):
+        return {"rules": self.rules, "max_plans": self.max_plans,
+                "max_failures": self.max_failures}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
 def _correct_zero_shape(arg):
     """
     Corrects the shape of numpy array to be at least 1d and returns the
@@ -90,11 +336,13 @@ def convert_to_numpy_identity(*args, **kwargs):
 
     Returns
     -------
+    tuple
+        corrected positional arguments
+    dict
+        corrected keyword arguments
 
     """
-    args = recursively_convert_elements(args, np.ndarray, _correct_zero_shape)
+    return _identity_converter(*args, **kwargs)
 
-    kwargs = recursively_convert_elements(kwargs, np.ndarray,
-                                          _correct_zero_shape)
 
-    return args, kwargs
+_identity_converter = StructuredConverter([(np.ndarray, _correct_zero_shape)])
@@ -1,3 +1,5 @@
 from delira.utils.config import DeliraConfig, Config
 from delira.utils.path import subdirs
 from delira.utils.time import now
+from delira.utils.resources import CPUResourceManager, ResourcePlan, \
+    ResourceState
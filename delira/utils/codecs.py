@@ -1,4 +1,5 @@
 import importlib
+import os
 import types
 import collections
 import inspect
@@ -9,12 +10,174 @@ from functools import partial
 import typing
 
 
+class ArraySidecar:
+    """
+    Binary storage for the arrays of an encoded object next to the file
+    containing the encoded object.
+
+    Instead of encoding an array as (nested) lists, the :class:`Encoder`
+    adds it to the sidecar and only encodes a reference to it, which is
+    resolved by the :class:`Decoder`. The arrays are either stored in a
+    single compressed ``.npz`` archive (``mode="npz"``) or as raw ``.npy``
+    files inside a directory (``mode="npy"``), which can be memory mapped
+    on loading.
+    """
+
+    def __init__(self, path, mode="npz", mmap_mode=None):
+        """
+
+        Parameters
+        ----------
+        path : str
+            path of the file containing the encoded object; the sidecar is
+            stored next to it (at ``path + ".npz"`` or inside the directory
+            ``path + ".arrays"``) and references are resolved relative to
+            its directory
+        mode : str, optional
+            storage mode for newly added arrays, either "npz" or "npy",
+            by default "npz"
+        mmap_mode : str, optional
+            memory map mode to open arrays stored as ``.npy`` files with
+            (see :func:`numpy.load`), by default None (arrays are read into
+            memory)
+
+        Raises
+        ------
+        ValueError
+            invalid mode
+        """
+        if mode not in ("npz", "npy"):
+            raise ValueError("Invalid array sidecar mode: %s. Must be one "
+                             "of 'npz' and 'npy'" % str(mode))
+
+        self._root = os.path.dirname(os.path.abspath(path))
+        self._name = os.path.basename(path)
+        self.mode = mode
+        self.mmap_mode = mmap_mode
+
+        self._arrays = {}
+        self._archives = {}
+
+    def add(self, array: np.ndarray) -> dict:
+        """
+        Add an array to be stored in the sidecar
+
+        Parameters
+        ----------
+        array : :class:`np.ndarray`
+            array to be stored
+
+        Returns
+        -------
+        dict
+            reference to the array
+        """
+        key = "arr_%d" % len(self._arrays)
+        self._arrays[key] = array
+
+        if self.mode == "npz":
+            return {"file": self._name + ".npz", "key": key}
+        return {"file": os.path.join(self._name + ".arrays", key + ".npy")}
+
+    def write(self):
+        """
+        Write all added arrays to the sidecar. Nothing is written if no
+        arrays were added.
+        """
+        if not self._arrays:
+            return
+
+        if self.mode == "npz":
+            np.savez_compressed(
+                os.path.join(self._root, self._name + ".npz"),
+                **self._arrays)
+        else:
+            array_dir = os.path.join(self._root, self._name + ".arrays")
+            os.makedirs(array_dir, exist_ok=True)
+            for key, array in self._arrays.items():
+                np.save(os.path.join(array_dir, key + ".npy"), array,
+                        allow_pickle=False)
+
+    def get(self, reference: dict) -> np.ndarray:
+        """
+        Resolve the reference to a stored array
+
+        Parameters
+        ----------
+        reference : dict
+            reference as returned by :meth:`ArraySidecar.add`
+
+        Returns
+        -------
+        :class:`np.ndarray`
+            the referenced array
+        """
+        file = os.path.join(self._root, reference["file"])
+
+        if "key" not in reference:
+            return np.load(file, mmap_mode=self.mmap_mode,
+                           allow_pickle=False)
+
+        # keep archives open, since each of them usually contains several
+        # referenced arrays
+        if file not in self._archives:
+            self._archives[file] = np.load(file, allow_pickle=False)
+        return self._archives[file][reference["key"]]
+
+    def close(self):
+        """
+        Close all opened archives
+        """
+        for archive in self._archives.values():
+            archive.close()
+        self._archives = {}
+
+    @staticmethod
+    def is_referenced(obj) -> bool:
+        """
+        Checks whether an encoded object contains references to arrays in
+        a sidecar
+
+        Parameters
+        ----------
+        obj : Any
+            the encoded object
+
+        Returns
+        -------
+        bool
+            whether the object contains at least one reference
+        """
+        stack = [obj]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                if "__array_ref__" in item:
+                    return True
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+        return False
+
+
 class Encoder:
     """
     Encode arbitrary objects. The encoded object consists of dicts,
     lists, ints, floats and strings.
     """
 
+    def __init__(self, array_sidecar: ArraySidecar = None):
+        """
+
+        Parameters
+        ----------
+        array_sidecar : :class:`ArraySidecar`, optional
+            if given, arrays are added to this sidecar and only encoded as
+            a reference to it instead of (nested) lists, by default None
+        """
+        super().__init__()
+        self.array_sidecar = array_sidecar
+
     def __call__(self, obj) -> typing.Any:
         """
         Encode arbitrary objects as dicts, str, int, float, list
@@ -121,12 +284,21 @@ class Encoder:
         Returns
         -------
         dict
-            array encoded as a list inside a dict
+            array encoded as a list or as a reference to the array sidecar
+            inside a dict
         """
+        # object arrays cannot be stored without pickling them
+        if self.array_sidecar is not None and obj.dtype.kind != "O":
+            return {"__array_ref__": self.array_sidecar.add(obj)}
+
         # # if numpy array: add explicit array specifier
         # use tolist instead of tostring here (even though this requires
         # additional encoding steps and increases memory usage), since tolist
         # retains the shape and tostring doesn't
+        if obj.dtype.kind in "biuf":
+            # tolist already returns python scalars, which don't need to be
+            # encoded element by element
+            return {"__array__": obj.tolist()}
         return {"__array__": self.encode(obj.tolist())}
 
     def _encode_mapping(self, obj) -> dict:
@@ -259,10 +431,19 @@ class Decoder:
     Deocode arbitrary objects which were encoded by :class:`Encoder`.
     """
 
-    def __init__(self):
+    def __init__(self, array_sidecar: ArraySidecar = None):
+        """
+
+        Parameters
+        ----------
+        array_sidecar : :class:`ArraySidecar`, optional
+            sidecar to resolve array references with, by default None
+        """
         super().__init__()
+        self.array_sidecar = array_sidecar
         self._decode_mapping = {
             "__array__": self._decode_array,
+            "__array_ref__": self._decode_array_ref,
             "__convert__": self._decode_convert,
             "__module__": self._decode_module,
             "__type__": self._decode_type,
@@ -364,6 +545,31 @@ class Decoder:
         """
         return np.array(self.decode(obj))
 
+    def _decode_array_ref(self, obj: dict) -> np.ndarray:
+        """
+        Decode reference to an array stored in an :class:`ArraySidecar`
+
+        Parameters
+        ----------
+        obj : dict
+            reference to be decoded
+
+        Returns
+        -------
+        :class:`np.ndarray`
+            referenced array
+
+        Raises
+        ------
+        ValueError
+            no array sidecar given to resolve the reference with
+        """
+        if self.array_sidecar is None:
+            raise ValueError("Encoded object contains a reference to an "
+                             "array sidecar, but no sidecar was given to "
+                             "the decoder.")
+        return self.array_sidecar.get(self.decode(obj))
+
     def _decode_convert(self, obj: dict) -> typing.Union[
             typing.Iterable, typing.Mapping]:
         """
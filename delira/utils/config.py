@@ -3,13 +3,62 @@ from delira._version import get_versions
 from delira.utils.time import now
 from nested_lookup import nested_lookup
 import warnings
-from .codecs import Encoder, Decoder
+from .codecs import Encoder, Decoder, ArraySidecar
 
 import yaml
 import argparse
 import sys
 import collections
 import inspect
+import weakref
+
+# use the C implementations of the yaml loader and dumper (based on libyaml)
+# if pyyaml was built with them
+_YAML_LOADER = getattr(yaml, "CFullLoader",
+                       getattr(yaml, "FullLoader", yaml.Loader))
+_YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+def yaml_load(stream, **kwargs):
+    """
+    Load yaml with the C-accelerated loader if available
+
+    Parameters
+    ----------
+    stream : str or file-like
+        yaml data to load
+    **kwargs :
+        additional keyword arguments passed to :func:`yaml.load`
+
+    Returns
+    -------
+    Any
+        loaded data
+    """
+    kwargs.setdefault("Loader", _YAML_LOADER)
+    return yaml.load(stream, **kwargs)
+
+
+def yaml_dump(data, stream=None, **kwargs):
+    """
+    Dump yaml with the C-accelerated dumper if available
+
+    Parameters
+    ----------
+    data : Any
+        data to dump
+    stream : file-like, optional
+        stream to write to; if not given, the yaml is returned as string
+    **kwargs :
+        additional keyword arguments passed to :func:`yaml.dump`
+
+    Returns
+    -------
+    str or None
+        the yaml string if no stream was given
+    """
+    kwargs.setdefault("Dumper", _YAML_DUMPER)
+    return yaml.dump(data, stream, **kwargs)
 
 
 def non_string_warning(func):
@@ -318,7 +367,8 @@ class Config(dict):
             raise ValueError("{} already in config. Can "
                              "not overwrite value.".format(key))
 
-    def dump(self, path, formatter=yaml.dump, encoder_cls=Encoder, **kwargs):
+    def dump(self, path, formatter=yaml_dump, encoder_cls=Encoder,
+             array_format=None, **kwargs):
         """
         Save config to a file and add time stamp to config
 
@@ -327,19 +377,35 @@ class Config(dict):
         path : str
             path where config is saved
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_dump`
         encoder_cls : :class:`Encoder`, optional
             transforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
+        array_format : str, optional
+            if None, arrays are saved as (nested) lists inside the file.
+            Otherwise they are saved in a binary :class:`ArraySidecar` next
+            to it, which is referenced from the file: "npz" saves them to a
+            single compressed archive at ``path + ".npz"``, "npy" saves them
+            as raw (memory mappable) files to the directory
+            ``path + ".arrays"``. By default None
         kwargs:
             additional keyword arguments passed to :param:`formatter`
         """
         self._timestamp = now()
-        encoded_self = encoder_cls().encode(self)
+        if array_format is None:
+            encoded_self = encoder_cls().encode(self)
+        else:
+            array_sidecar = ArraySidecar(path, mode=array_format)
+            encoded_self = encoder_cls(
+                array_sidecar=array_sidecar).encode(self)
+            # write the arrays first to never reference missing arrays
+            array_sidecar.write()
+
         with open(path, "w") as f:
             formatter(encoded_self, f, **kwargs)
 
-    def dumps(self, formatter=yaml.dump, encoder_cls=Encoder, **kwargs):
+    def dumps(self, formatter=yaml_dump, encoder_cls=Encoder, **kwargs):
         """
         Create a loadable string representation from the config and
         add time stamp to config
@@ -347,7 +413,8 @@ class Config(dict):
         Parameters
         ----------
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_dump`
         encoder_cls : :class:`Encoder`, optional
             transforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
@@ -358,7 +425,8 @@ class Config(dict):
         encoded_self = encoder_cls().encode(self)
         return formatter(encoded_self, **kwargs)
 
-    def load(self, path, formatter=yaml.load, decoder_cls=Decoder, **kwargs):
+    def load(self, path, formatter=yaml_load, decoder_cls=Decoder,
+             mmap_mode=None, **kwargs):
         """
         Update config from a file
 
@@ -367,19 +435,34 @@ class Config(dict):
         path : str
             path to file
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_load`
         decoder_cls : :class:`Encoder`, optional
             transforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
+        mmap_mode : str, optional
+            memory map mode for arrays saved as raw files in an
+            :class:`ArraySidecar` (see :meth:`Config.dump`), by default None
         kwargs:
             additional keyword arguments passed to :param:`formatter`
         """
         with open(path, "r") as f:
             decoded_format = formatter(f, **kwargs)
-        decoded_format = decoder_cls().decode(decoded_format)
+
+        if ArraySidecar.is_referenced(decoded_format):
+            # arrays referenced from the file are only read on decoding
+            array_sidecar = ArraySidecar(path, mmap_mode=mmap_mode)
+            try:
+                decoded_format = decoder_cls(
+                    array_sidecar=array_sidecar).decode(decoded_format)
+            finally:
+                array_sidecar.close()
+        else:
+            decoded_format = decoder_cls().decode(decoded_format)
         self.update(decoded_format, overwrite=True)
 
-    def loads(self, data, formatter=yaml.load, decoder_cls=Decoder, **kwargs):
+    def loads(self, data, formatter=yaml_load, decoder_cls=Decoder,
+              **kwargs):
         """
         Update config from a string
 
@@ -388,7 +471,8 @@ class Config(dict):
         data: str
             string representation of config
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_load`
         decoder_cls : :class:`Encoder`, optional
             transforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
@@ -462,8 +546,8 @@ class Config(dict):
             raise TypeError("Type of args not supported.")
 
     @classmethod
-    def create_from_file(cls, path, formatter=yaml.load, decoder_cls=Decoder,
-                         **kwargs):
+    def create_from_file(cls, path, formatter=yaml_load, decoder_cls=Decoder,
+                         mmap_mode=None, **kwargs):
         """
         Create config from a file
 
@@ -472,10 +556,14 @@ class Config(dict):
         path : str
             path to file
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_load`
         decoder_cls : :class:`Encoder`, optional
             trasforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
+        mmap_mode : str, optional
+            memory map mode for arrays saved as raw files in an
+            :class:`ArraySidecar` (see :meth:`Config.dump`), by default None
         kwargs:
             additional keyword arguments passed to :param:`formatter`
 
@@ -486,11 +574,11 @@ class Config(dict):
         """
         config = cls()
         config.load(path, formatter=formatter, decoder_cls=decoder_cls,
-                    **kwargs)
+                    mmap_mode=mmap_mode, **kwargs)
         return config
 
     @classmethod
-    def create_from_str(cls, data, formatter=yaml.load, decoder_cls=Decoder,
+    def create_from_str(cls, data, formatter=yaml_load, decoder_cls=Decoder,
                         **kwargs):
         """
         Create config from a string
@@ -500,7 +588,8 @@ class Config(dict):
         data: str
             string representation of config
         formatter : callable, optional
-            defines the format how the config is saved, by default yaml.dump
+            defines the format how the config is saved, by default
+            :func:`yaml_load`
         decoder_cls : :class:`Encoder`, optional
             trasforms config to a format which can be formatted by the
             :param:`formatter`, by default Encoder
@@ -642,6 +731,109 @@ class Config(dict):
             return new_params
 
 
+# marks missing items in the key index updates
+_MISSING = object()
+
+
+def _iter_key_paths(value, path):
+    """
+    Yields all keys nested in ``value`` together with their paths (in the
+    same way as ``nested_lookup`` traverses nested dicts and lists)
+
+    Parameters
+    ----------
+    value : Any
+        the value to traverse
+    path : tuple
+        the path of ``value``
+
+    Yields
+    ------
+    Any
+        a nested key
+    tuple
+        the path of the key's value
+
+    """
+    if isinstance(value, dict):
+        for key, item in dict.items(value):
+            item_path = path + (key,)
+            yield key, item_path
+            yield from _iter_key_paths(item, item_path)
+
+    elif isinstance(value, list):
+        for idx, item in enumerate(value):
+            yield from _iter_key_paths(item, path + (idx,))
+
+
+def _item_key_paths(key, value):
+    """
+    Returns the keys and paths added to (or removed from) a key index by
+    setting (or deleting) an item
+
+    """
+    if value is _MISSING:
+        return []
+    return [(key, (key,))] + list(_iter_key_paths(value, (key,)))
+
+
+def _build_key_index(document):
+    """
+    Creates an index mapping each key nested in ``document`` to the paths of
+    its values
+
+    """
+    index = {}
+    for key, path in _iter_key_paths(document, ()):
+        index.setdefault(key, {})[path] = None
+    return index
+
+
+def _update_key_index(index, removed, added, prefix=()):
+    for key, path in removed:
+        paths = index.get(key)
+        if paths is not None:
+            paths.pop(prefix + path, None)
+            if not paths:
+                del index[key]
+
+    for key, path in added:
+        index.setdefault(key, {})[prefix + path] = None
+
+
+def _resolve_path(document, path):
+    for key in path:
+        # bypasses the shortened access to nested keys of configs
+        if isinstance(document, dict):
+            document = dict.__getitem__(document, key)
+        else:
+            document = document[key]
+    return document
+
+
+def _select_lookup_result(key, results, default_args, default_kwargs,
+                          allow_multiple):
+    """
+    Selects the result of a nested lookup (see
+    :meth:`LookupConfig.nested_get`)
+
+    """
+    if len(results) > 1:
+        if allow_multiple:
+            return results
+        else:
+            raise KeyError("Multiple Values found for key %s" % key)
+    elif len(results) == 0:
+        if "default" in default_kwargs:
+            return default_kwargs["default"]
+        elif default_args:
+            return default_args[0]
+        else:
+            raise KeyError("No Value found for key %s" % key)
+    else:
+        return results[0]
+
+
 class LookupConfig(Config):
     """
     Helper class to have nested lookups in all subdicts of Config
@@ -715,21 +907,304 @@ class LookupConfig(Config):
 
         if "." in key:
             return self[key]
-        results = nested_lookup(key, self)
-        if len(results) > 1:
-            if allow_multiple:
-                return results
-            else:
-                raise KeyError("Multiple Values found for key %s" % key)
-        elif len(results) == 0:
-            if "default" in kwargs:
-                return kwargs["default"]
-            elif args:
-                return args[0]
-            else:
-                raise KeyError("No Value found for key %s" % key)
+        return _select_lookup_result(key, self._lookup(key), args, kwargs,
+                                     allow_multiple)
+
+    def _lookup(self, key):
+        """
+        Returns the values of all occurrences of a key
+
+        Parameters
+        ----------
+        key : str
+            the key to search for
+
+        Returns
+        -------
+        list
+            the values
+
+        """
+        return nested_lookup(key, self)
+
+
+class IndexedLookupConfig(LookupConfig):
+    """
+    :class:`LookupConfig` keeping an index from all nested keys to the
+    paths of their values. The index is created by the first nested lookup
+    and updated incrementally by all changes made through the config (also
+    in nested configs), so that :meth:`nested_get` is a dict lookup instead
+    of a traversal of the whole config.
+
+    Warnings
+    --------
+    Changes of nested containers, which are no :class:`IndexedLookupConfig`
+    (e.g. lists or dicts set without conversion) are not tracked; call
+    :meth:`reindex` after such changes.
+
+    """
+    __slots__ = ("_key_index", "_parents")
+
+    def __init__(self, dict_like=None, **kwargs):
+        object.__setattr__(self, "_key_index", None)
+        # the configs containing this config (and the corresponding keys)
+        object.__setattr__(self, "_parents", [])
+        super().__init__(dict_like, **kwargs)
+
+    @staticmethod
+    def _create_internal_dict(*args, **kwargs):
+        """
+        Defines how internal dicts should be created. Can be used to easily
+        overwrite subclasses
+
+        Returns
+        -------
+        :class:`IndexedLookupConfig`
+            new config
+        """
+        return IndexedLookupConfig(*args, **kwargs)
+
+    @non_string_warning
+    def __setattr__(self, key, value):
+        """
+        Set attribute in config
+
+        Parameters
+        ----------
+        key : str
+            attribute name
+        value : any
+            attribute value
+
+        """
+        if key == "__dict__" or key in IndexedLookupConfig.__slots__:
+            object.__setattr__(self, key, value)
         else:
-            return results[0]
+            self._set_item(key, self._to_config(value))
+
+    @non_string_warning
+    def __setitem__(self, key, value):
+        """
+        Set items inside dict. Supports setting of nested entries by
+        seperating the individual keys with a '.'.
+
+        Parameters
+        ----------
+        key : str
+            key for new value
+        value : any
+            new value
+        """
+        if isinstance(key, str) and '.' in key:
+            # the nested configs index the item themselves
+            super().__setitem__(key, value)
+        else:
+            self._set_item(key, value)
+
+    def __delitem__(self, key):
+        old_value = dict.__getitem__(self, key)
+        super().__delitem__(key)
+        self._item_changed(key, old_value, _MISSING)
+
+    def pop(self, key, *args):
+        old_value = dict.get(self, key, _MISSING)
+        value = super().pop(key, *args)
+        self._item_changed(key, old_value, _MISSING)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._item_changed(key, value, _MISSING)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self._set_item(key, default)
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        for key in list(dict.keys(self)):
+            del self[key]
+
+    def _set_item(self, key, value):
+        old_value = dict.get(self, key, _MISSING)
+        dict.__setitem__(self, key, value)
+        self._item_changed(key, old_value, value)
+
+    def _item_changed(self, key, old_value, new_value):
+        """
+        Updates the parent links of the affected nested configs and the
+        indices of this config and all configs containing it
+
+        """
+        if isinstance(old_value, IndexedLookupConfig) \
+                and old_value is not new_value:
+            old_value._parents[:] = [
+                (ref, _key) for ref, _key in old_value._parents
+                if not (ref() is self and _key == key)]
+
+        if isinstance(new_value, IndexedLookupConfig):
+            new_value._parents[:] = [
+                (ref, _key) for ref, _key in new_value._parents
+                if ref() is not None and not (ref() is self and _key == key)]
+            new_value._parents.append((weakref.ref(self), key))
+
+        self._propagate(_item_key_paths(key, old_value),
+                        _item_key_paths(key, new_value), ())
+
+    def _propagate(self, removed, added, prefix):
+        if self._key_index is not None:
+            _update_key_index(self._key_index, removed, added, prefix)
+
+        for ref, key in self._parents:
+            parent = ref()
+            # the parent might not contain this config anymore
+            if parent is not None and dict.get(parent, key) is self:
+                parent._propagate(removed, added, (key,) + prefix)
+
+    def reindex(self):
+        """
+        Rebuilds the index of this config (e.g. after changes of nested
+        lists)
+
+        """
+        object.__setattr__(self, "_key_index", _build_key_index(self))
+
+        for ref, key in self._parents:
+            parent = ref()
+            if parent is not None:
+                parent.reindex()
+
+    def _lookup(self, key):
+        """
+        Returns the values of all occurrences of a key by means of the
+        index
+
+        Parameters
+        ----------
+        key : str
+            the key to search for
+
+        Returns
+        -------
+        list
+            the values
+
+        """
+        if self._key_index is None:
+            object.__setattr__(self, "_key_index", _build_key_index(self))
+
+        return [_resolve_path(self, path)
+                for path in self._key_index.get(key, ())]
+
+    def __reduce__(self):
+        # the index and the parent links are recreated
+        return self.__class__, (), None, None, iter(dict.items(self))
+
+
+class BatchDict(dict):
+    """
+    Lightweight dict to look up the values of nested batches and
+    predictions (e.g. for the metric calculation) with the same
+    :meth:`nested_get` as :class:`LookupConfig`, but without converting
+    the contained dicts to configs.
+
+    Nested keys are indexed by the first nested lookup and the index is
+    updated by all changes made through the dict itself (but not by changes
+    of the nested containers).
+
+    """
+    __slots__ = ("_key_index",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._key_index = None
+
+    def __setitem__(self, key, value):
+        old_value = self.get(key, _MISSING)
+        super().__setitem__(key, value)
+        self._item_changed(key, old_value, value)
+
+    def __delitem__(self, key):
+        old_value = self[key]
+        super().__delitem__(key)
+        self._item_changed(key, old_value, _MISSING)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key, *args):
+        old_value = self.get(key, _MISSING)
+        value = super().pop(key, *args)
+        self._item_changed(key, old_value, _MISSING)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._item_changed(key, value, _MISSING)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        super().clear()
+        self._key_index = None
+
+    def _item_changed(self, key, old_value, new_value):
+        if self._key_index is not None:
+            _update_key_index(self._key_index,
+                              _item_key_paths(key, old_value),
+                              _item_key_paths(key, new_value))
+
+    def nested_get(self, key, *args, allow_multiple=False, **kwargs):
+        """
+        Returns all occurances of :param:`key` in :param:`self` and subdicts
+
+        Parameters
+        ----------
+        key : str
+            the key to search for (nested keys can be separated by '.')
+        *args :
+            positional arguments to provide default value
+        allow_multiple: bool
+            allow multiple results
+        **kwargs :
+            keyword arguments to provide default value
+
+        Raises
+        ------
+        KeyError
+            Multiple Values are found for key and :param:`allow_multiple` is
+            False (unclear which value should be returned)
+            OR
+            No Value was found for key and no default value was given
+
+        Returns
+        -------
+        Any
+            value corresponding to key (or default if value was not found)
+
+        """
+        if "." in key:
+            return _resolve_path(self, key.split("."))
+
+        if self._key_index is None:
+            self._key_index = _build_key_index(self)
+
+        return _select_lookup_result(
+            key, [_resolve_path(self, path)
+                  for path in self._key_index.get(key, ())],
+            args, kwargs, allow_multiple)
+
+    def copy(self):
+        return BatchDict(self)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
 
 
 class DeliraConfig(LookupConfig):
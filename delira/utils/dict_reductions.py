@@ -112,6 +112,256 @@ def reduce_min(items: list) -> Union[float, int, np.ndarray]:
     return np.min(items)
 
 
+class RunningReduction(object):
+    """
+    Reduces a stream of values (scalars or arrays of equal shape) with
+    constant memory.
+
+    Instead of storing all values, only the count, the sum, the running mean
+    and sum of squared deviations (Welford's algorithm), the extrema and the
+    first and last value are kept. Arrays are accumulated elementwise and
+    reduced over all elements afterwards, so that the results match the
+    corresponding reduction functions (e.g. :func:`reduce_mean`) applied to a
+    list of all values.
+
+    Running reductions of disjoint streams can be combined by :meth:`merge`.
+
+    """
+
+    def __init__(self):
+        self._count = 0
+        self._sum = None
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+        self._first = None
+        self._last = None
+
+    def update(self, value):
+        """
+        Adds a single value to the reduction
+
+        Parameters
+        ----------
+        value : float, int or :class:`numpy.ndarray`
+            the value to add
+
+        """
+        if self._count == 0:
+            self._first = value
+            self._sum = np.array(value, dtype=np.float64)
+            self._mean = self._sum.copy()
+            self._m2 = np.zeros_like(self._sum)
+            self._min = self._sum.copy()
+            self._max = self._sum.copy()
+            self._count = 1
+            self._last = value
+            return
+
+        _value = np.asarray(value, dtype=np.float64)
+        self._count += 1
+        self._sum = self._sum + _value
+
+        delta = _value - self._mean
+        self._mean = self._mean + delta / self._count
+        self._m2 = self._m2 + delta * (_value - self._mean)
+
+        self._min = np.minimum(self._min, _value)
+        self._max = np.maximum(self._max, _value)
+        self._last = value
+
+    def merge(self, other):
+        """
+        Combines the reduction with the reduction of values following the
+        values of this reduction
+
+        Parameters
+        ----------
+        other : :class:`RunningReduction`
+            the reduction to combine with
+
+        Returns
+        -------
+        :class:`RunningReduction`
+            this reduction (containing the values of both reductions)
+
+        """
+        if other._count == 0:
+            return self
+        if self._count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        count = self._count + other._count
+        delta = other._mean - self._mean
+
+        self._mean = self._mean + delta * other._count / count
+        self._m2 = (self._m2 + other._m2
+                    + delta ** 2 * self._count * other._count / count)
+        self._sum = self._sum + other._sum
+        self._min = np.minimum(self._min, other._min)
+        self._max = np.maximum(self._max, other._max)
+        self._last = other._last
+        self._count = count
+
+        return self
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def first(self):
+        return self._first
+
+    @property
+    def last(self):
+        return self._last
+
+    @property
+    def sum(self):
+        return np.sum(self._sum)
+
+    @property
+    def mean(self):
+        return np.mean(self._mean)
+
+    @property
+    def variance(self):
+        """
+        The (population) variance of all elements of all values
+        """
+        # combines the elementwise variances with the variance of the
+        # elementwise means
+        return np.mean(self._m2 / self._count + self._mean ** 2) \
+            - np.mean(self._mean) ** 2
+
+    @property
+    def min(self):
+        return np.min(self._min)
+
+    @property
+    def max(self):
+        return np.max(self._max)
+
+    def reduce(self, reduce_type: str):
+        """
+        Returns the reduced value
+
+        Parameters
+        ----------
+        reduce_type : str
+            the reduction type; must be one of
+            :func:`possible_running_reductions`
+
+        Returns
+        -------
+        float, int or :class:`numpy.ndarray`
+            the reduced value
+
+        Raises
+        ------
+        ValueError
+            no value was added yet or the reduction type is invalid
+
+        """
+        if reduce_type not in _RUNNING_REDUCTIONS:
+            raise ValueError("Invalid reduction type for running "
+                             "reductions: %s. Must be one of %s"
+                             % (reduce_type, possible_running_reductions()))
+        if self._count == 0:
+            raise ValueError("Cannot reduce an empty sequence")
+
+        return getattr(self, _RUNNING_REDUCTIONS[reduce_type])
+
+
+class RunningDictReduction(object):
+    """
+    Reduces a stream of (flat) dicts with constant memory by a
+    :class:`RunningReduction` per key. Dicts may contain only a subset of
+    all keys.
+
+    """
+
+    def __init__(self):
+        self._reductions = {}
+
+    def update(self, values: dict):
+        """
+        Adds the values of a single dict to the reduction
+
+        Parameters
+        ----------
+        values : dict
+            the values to add
+
+        """
+        for key, val in values.items():
+            if key not in self._reductions:
+                self._reductions[key] = RunningReduction()
+            self._reductions[key].update(val)
+
+    def merge(self, other):
+        """
+        Combines the reduction with the reduction of dicts following the
+        dicts of this reduction
+
+        Parameters
+        ----------
+        other : :class:`RunningDictReduction`
+            the reduction to combine with
+
+        Returns
+        -------
+        :class:`RunningDictReduction`
+            this reduction (containing the values of both reductions)
+
+        """
+        for key, reduction in other.items():
+            if key not in self._reductions:
+                self._reductions[key] = RunningReduction()
+            self._reductions[key].merge(reduction)
+        return self
+
+    def reduce(self, reduce_type: str) -> dict:
+        """
+        Reduces the values of all keys
+
+        Parameters
+        ----------
+        reduce_type : str
+            the reduction type; must be one of
+            :func:`possible_running_reductions`
+
+        Returns
+        -------
+        dict
+            the reduced value per key
+
+        """
+        return {key: reduction.reduce(reduce_type)
+                for key, reduction in self._reductions.items()}
+
+    def items(self):
+        return self._reductions.items()
+
+    def keys(self):
+        return self._reductions.keys()
+
+    def __getitem__(self, key):
+        return self._reductions[key]
+
+    def __contains__(self, key):
+        return key in self._reductions
+
+    def __len__(self):
+        return len(self._reductions)
+
+    def __iter__(self):
+        return iter(self._reductions)
+
+
 def flatten_dict(d: dict, parent_key: str = '', sep: str = '.') -> dict:
     """
     Flattens a dictionary by concatenating all keys for subdicts with the
@@ -231,6 +481,33 @@ _REDUCTION_FUNCTIONS = {
 }
 
 
+# string mapping for running reductions (to the attributes of
+# ``RunningReduction``)
+_RUNNING_REDUCTIONS = {
+    "last": "last",
+    "first": "first",
+    "mean": "mean",
+    "sum": "sum",
+    "max": "max",
+    "min": "min",
+    "var": "variance"
+}
+
+
+def possible_running_reductions() -> tuple:
+    """
+    Function returning a tuple containing all reduction strings valid for
+    :class:`RunningReduction` (the median is not supported, since it cannot
+    be computed without storing all values)
+
+    Returns
+    -------
+    tuple
+        a tuple containing all valid running reduction strings
+    """
+    return tuple(_RUNNING_REDUCTIONS.keys())
+
+
 def possible_reductions() -> tuple:
     """
     Function returning a tuple containing all valid reduction strings
@@ -0,0 +1,468 @@
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# environment variables read by the BLAS/OpenMP runtimes on startup
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
+                    "OPENBLAS_NUM_THREADS", "BLIS_NUM_THREADS",
+                    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def available_cpus():
+    """
+    Returns the CPU cores, the current process is allowed to run on
+
+    Returns
+    -------
+    list
+        sorted list of core ids
+
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_cpu_affinity(cores):
+    """
+    Pins the current process to the given CPU cores (if supported by the
+    operating system)
+
+    Parameters
+    ----------
+    cores : list
+        the core ids to pin the process to
+
+    Returns
+    -------
+    bool
+        whether the affinity could be set
+
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        logger.debug("Setting the CPU affinity is not supported on this "
+                     "platform")
+        return False
+
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        logger.warning("Could not set CPU affinity to %s: %s"
+                       % (str(cores), str(e)))
+        return False
+    return True
+
+
+def set_num_threads(n_threads):
+    """
+    Limits the number of threads used by the current process for
+    NumPy/BLAS, OpenMP, PyTorch, TensorFlow and Numba.
+
+    Frameworks are only configured if they have already been imported
+    (to avoid importing them in processes not needing them). Thread pools,
+    which have already been initialized and cannot be resized anymore
+    (e.g. TensorFlow's after the first op), are left untouched.
+
+    Parameters
+    ----------
+    n_threads : int
+        the number of threads
+
+    Returns
+    -------
+    dict
+        the frameworks which have been configured and their new thread
+        counts
+
+    """
+    n_threads = max(int(n_threads), 1)
+    configured = {}
+
+    # environment variables are inherited by child processes and read by
+    # runtimes which are loaded afterwards
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n_threads)
+        configured["blas"] = n_threads
+    except ImportError:
+        logger.debug("threadpoolctl is not installed; BLAS thread pools "
+                     "are only limited by environment variables")
+
+    if "torch" in sys.modules:
+        import torch
+        torch.set_num_threads(n_threads)
+        configured["torch"] = n_threads
+
+    if "tensorflow" in sys.modules:
+        import tensorflow as tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+            configured["tensorflow"] = n_threads
+        except (AttributeError, RuntimeError) as e:
+            logger.debug("Could not set TensorFlow threads: %s" % str(e))
+
+    if "numba" in sys.modules:
+        import numba
+        try:
+            numba.set_num_threads(min(n_threads,
+                                      numba.config.NUMBA_NUM_THREADS))
+            configured["numba"] = numba.get_num_threads()
+        except (AttributeError, ValueError) as e:
+            logger.debug("Could not set Numba threads: %s" % str(e))
+
+    return configured
+
+
+def resolve_n_workers(n_workers):
+    """
+    Resolves the number of augmentation workers like the
+    :class:`delira.data_loading.Augmenter` does
+
+    Parameters
+    ----------
+    n_workers : int or None
+        the number of workers; None means one worker per CPU
+
+    Returns
+    -------
+    int
+        the number of workers
+
+    """
+    if n_workers is None:
+        return os.cpu_count() or 1
+    return int(n_workers)
+
+
+class ResourceState(object):
+    """
+    Snapshot of the CPU affinity, the thread counts and the thread
+    environment variables of the current process, which is taken before
+    applying a :class:`ResourcePlan` to be able to restore them afterwards
+
+    """
+
+    def __init__(self):
+        self.cpus = available_cpus() \
+            if hasattr(os, "sched_getaffinity") else None
+        self.env = {var: os.environ.get(var) for var in _THREAD_ENV_VARS}
+        self.threads = {}
+
+        try:
+            from threadpoolctl import threadpool_info
+            self.threads["blas"] = {_pool["prefix"]: _pool["num_threads"]
+                                    for _pool in threadpool_info()}
+        except ImportError:
+            pass
+
+        if "torch" in sys.modules:
+            import torch
+            self.threads["torch"] = torch.get_num_threads()
+
+        if "tensorflow" in sys.modules:
+            import tensorflow as tf
+            try:
+                self.threads["tensorflow"] = (
+                    tf.config.threading.get_intra_op_parallelism_threads(),
+                    tf.config.threading.get_inter_op_parallelism_threads())
+            except AttributeError:
+                pass
+
+        if "numba" in sys.modules:
+            import numba
+            try:
+                self.threads["numba"] = numba.get_num_threads()
+            except AttributeError:
+                pass
+
+    def restore(self):
+        """
+        Restores the captured affinity, thread counts and environment
+        variables
+
+        """
+        if self.cpus is not None:
+            set_cpu_affinity(self.cpus)
+
+        for var, val in self.env.items():
+            if val is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = val
+
+        if "blas" in self.threads:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=self.threads["blas"])
+
+        if "torch" in self.threads:
+            import torch
+            torch.set_num_threads(self.threads["torch"])
+
+        if "tensorflow" in self.threads:
+            import tensorflow as tf
+            intra_op, inter_op = self.threads["tensorflow"]
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(
+                    intra_op)
+                tf.config.threading.set_inter_op_parallelism_threads(
+                    inter_op)
+            except RuntimeError as e:
+                logger.debug("Could not restore TensorFlow threads: %s"
+                             % str(e))
+
+        if "numba" in self.threads:
+            import numba
+            numba.set_num_threads(self.threads["numba"])
+
+
+def partition_cpus(n_partitions, cpus_per_partition, cpus=None):
+    """
+    Splits the CPU cores into disjoint partitions of equal size (e.g. to
+    assign a fixed budget of cores to each of several concurrent processes)
+
+    Parameters
+    ----------
+    n_partitions : int
+        the maximum number of partitions
+    cpus_per_partition : int
+        the number of cores of each partition
+    cpus : list, optional
+        the core ids to split; defaults to all cores available for the
+        current process
+
+    Returns
+    -------
+    list
+        the core ids of each partition; contains less than ``n_partitions``
+        partitions if there are not enough cores
+
+    Raises
+    ------
+    ValueError
+        if there are not enough cores for a single partition
+
+    """
+    if cpus is None:
+        cpus = available_cpus()
+
+    n_partitions = min(n_partitions, len(cpus) // cpus_per_partition)
+    if n_partitions < 1:
+        raise ValueError("Not enough CPUs (%d) for %d CPUs per partition"
+                         % (len(cpus), cpus_per_partition))
+
+    return [list(cpus[idx * cpus_per_partition:
+                      (idx + 1) * cpus_per_partition])
+            for idx in range(n_partitions)]
+
+
+class ResourcePlan(object):
+    """
+    Assignment of CPU cores and thread counts to the main (compute) process
+    and the augmentation workers
+
+    """
+
+    def __init__(self, main_cores, worker_cores, pin=True):
+        """
+
+        Parameters
+        ----------
+        main_cores : list
+            the core ids of the main process
+        worker_cores : list
+            a list containing the core ids for each worker
+        pin : bool
+            whether to pin the processes to their cores
+
+        """
+        self.main_cores = list(main_cores)
+        self.worker_cores = [list(_cores) for _cores in worker_cores]
+        self.pin = pin
+
+    @property
+    def n_workers(self):
+        return len(self.worker_cores)
+
+    @property
+    def main_threads(self):
+        return len(self.main_cores)
+
+    def worker_threads(self, worker_id):
+        """
+        The number of threads of a specific worker
+
+        Parameters
+        ----------
+        worker_id : int
+            the id of the worker
+
+        Returns
+        -------
+        int
+            the number of threads
+
+        """
+        return len(self.worker_cores[worker_id])
+
+    def _apply(self, cores):
+        if self.pin:
+            set_cpu_affinity(cores)
+        return set_num_threads(len(cores))
+
+    def apply_main(self):
+        """
+        Configures the current process as main process
+
+        Returns
+        -------
+        :class:`ResourceState`
+            the state of the process before applying the plan; call its
+            :meth:`ResourceState.restore` to undo the configuration
+
+        """
+        logger.debug("Configuring main process: %s" % str(self.main_cores))
+        state = ResourceState()
+        configured = self._apply(self.main_cores)
+        logger.debug("Configured threads: %s" % str(configured))
+        return state
+
+    def apply_worker(self, worker_id):
+        """
+        Configures the current process as augmentation worker
+
+        Parameters
+        ----------
+        worker_id : int
+            the id of the worker
+
+        Returns
+        -------
+        dict
+            the configured frameworks and their thread counts
+
+        """
+        return self._apply(self.worker_cores[worker_id])
+
+    def to_dict(self):
+        """
+        Converts the plan to a dictionary
+
+        Returns
+        -------
+        dict
+            the plan
+
+        """
+        return {"main": {"cores": self.main_cores,
+                         "threads": self.main_threads},
+                "workers": [{"cores": _cores, "threads": len(_cores)}
+                            for _cores in self.worker_cores],
+                "pin": self.pin}
+
+    def __repr__(self):
+        lines = ["ResourcePlan(pin=%s)" % str(self.pin),
+                 "    main: cores=%s, threads=%d" % (str(self.main_cores),
+                                                     self.main_threads)]
+        for idx, _cores in enumerate(self.worker_cores):
+            lines.append("    worker %d: cores=%s, threads=%d"
+                         % (idx, str(_cores), len(_cores)))
+        return "\n".join(lines)
+
+
+class CPUResourceManager(object):
+    """
+    Splits the available CPU cores between the main compute process and the
+    augmentation workers to avoid oversubscription, when each process
+    starts its own full-width thread pools.
+
+    See Also
+    --------
+    :class:`ResourcePlan`
+    :class:`delira.data_loading.DataManager`
+
+    """
+
+    def __init__(self, cpus=None, n_main_cores=None, pin=True):
+        """
+
+        Parameters
+        ----------
+        cpus : list or int, optional
+            the core ids to distribute (or the number of cores to use,
+            starting at the first available core); defaults to all cores
+            available for the current process
+        n_main_cores : int, optional
+            the number of cores reserved for the main process; defaults to
+            all cores not needed for one core per worker (and at least half
+            of all cores if there are more workers than cores)
+        pin : bool
+            whether to pin the processes to their cores (additionally to
+            limiting the number of threads)
+
+        """
+        available = available_cpus()
+
+        if cpus is None:
+            cpus = available
+        elif isinstance(cpus, int):
+            if cpus < 1:
+                raise ValueError("At least one CPU must be used")
+            cpus = available[:cpus]
+
+        cpus = sorted(cpus)
+        if not cpus:
+            raise ValueError("No CPUs given")
+
+        if n_main_cores is not None and not 0 < n_main_cores <= len(cpus):
+            raise ValueError("n_main_cores must be between 1 and the number "
+                             "of CPUs (%d), but got %d"
+                             % (len(cpus), n_main_cores))
+
+        self.cpus = cpus
+        self.n_main_cores = n_main_cores
+        self.pin = pin
+
+    def plan(self, n_workers):
+        """
+        Creates the resource plan for a given number of workers
+
+        Parameters
+        ----------
+        n_workers : int or None
+            the number of augmentation workers; None means one worker per
+            CPU (as for the :class:`delira.data_loading.Augmenter`)
+
+        Returns
+        -------
+        :class:`ResourcePlan`
+            the resource plan
+
+        """
+        n_workers = resolve_n_workers(n_workers)
+        n_cpus = len(self.cpus)
+
+        if self.n_main_cores is not None:
+            n_main = self.n_main_cores
+        elif n_workers < n_cpus:
+            n_main = n_cpus - n_workers
+        else:
+            n_main = max(n_cpus // 2, 1)
+
+        main_cores = self.cpus[:n_main]
+        # the workers share all cores if no cores are left for them
+        remaining = self.cpus[n_main:] or self.cpus
+
+        if n_workers <= len(remaining):
+            worker_cores = [remaining[idx::n_workers]
+                            for idx in range(n_workers)]
+        else:
+            worker_cores = [[remaining[idx % len(remaining)]]
+                            for idx in range(n_workers)]
+
+        return ResourcePlan(main_cores, worker_cores, self.pin)
@@ -2,7 +2,8 @@ import unittest
 import numpy as np
 from delira.data_loading.sampler import RandomSamplerWithReplacement, \
     PrevalenceRandomSampler, SequentialSampler, \
-    RandomSamplerNoReplacement, BatchSampler, AbstractSampler
+    RandomSamplerNoReplacement, BatchSampler, AbstractSampler, \
+    DistributedSampler
 
 from ..utils import check_for_no_backend
 from .utils import DummyDataset
@@ -110,6 +111,35 @@ class SamplerTest(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             iter(sampler)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified"
+                         )
+    def test_distributed_sampler(self):
+        for sampler_cls in [SequentialSampler, RandomSamplerNoReplacement]:
+            for num_replicas in [1, 3, 7]:
+                with self.subTest(sampler_cls=sampler_cls,
+                                  num_replicas=num_replicas):
+                    shards = []
+                    for rank in range(num_replicas):
+                        # all replicas must use the same seed
+                        np.random.seed(1)
+                        sampler = DistributedSampler.from_dataset(
+                            self.dset, num_replicas=num_replicas, rank=rank,
+                            base_sampler_cls=sampler_cls)
+                        shards.append(list(sampler))
+                        self.assertEqual(len(sampler), len(shards[-1]))
+
+                    # all shards have the same length and cover the dataset
+                    self.assertEqual(len(set(map(len, shards))), 1)
+                    self.assertSetEqual(
+                        set(idx for shard in shards for idx in shard),
+                        set(range(len(self.dset))))
+
+        with self.assertRaises(ValueError):
+            DistributedSampler.from_dataset(self.dset, num_replicas=2,
+                                            rank=2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+
+from delira.io import AsyncCheckpointWriter
+
+from ..utils import check_for_no_backend
+
+
+def _write_text(file, state):
+    with open(file, "w") as f:
+        f.write(state)
+
+
+def _write_blocking(file, state):
+    event, text = state
+    event.wait()
+    _write_text(file, text)
+
+
+def _write_failing(file, state):
+    with open(file, "w") as f:
+        f.write("partial")
+    raise IOError("disk full")
+
+
+class AsyncCheckpointWriterTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_write(self):
+        save_path = tempfile.mkdtemp()
+        file = os.path.join(save_path, "checkpoint.txt")
+        state = {"value": "first"}
+
+        with AsyncCheckpointWriter(max_pending=2) as writer:
+            event = threading.Event()
+            writer.submit(_write_blocking, file,
+                          lambda: (event, state["value"]))
+
+            # the snapshot must not be affected by later changes
+            state["value"] = "second"
+            self.assertEqual(writer.n_pending, 1)
+            self.assertFalse(os.path.isfile(file))
+
+            event.set()
+            writer.flush()
+            self.assertEqual(writer.n_pending, 0)
+            with open(file) as f:
+                self.assertEqual(f.read(), "first")
+
+            # checkpoints are written in order
+            for idx in range(5):
+                writer.submit(_write_text, file, lambda: str(idx))
+            writer.flush()
+            with open(file) as f:
+                self.assertEqual(f.read(), "4")
+
+        # no temporary files are left
+        self.assertListEqual(os.listdir(save_path), ["checkpoint.txt"])
+
+        # the writer can be pickled (without its pending checkpoints)
+        writer = pickle.loads(pickle.dumps(writer))
+        self.assertEqual(writer.max_pending, 2)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_errors(self):
+        save_path = tempfile.mkdtemp()
+        file = os.path.join(save_path, "checkpoint.txt")
+
+        writer = AsyncCheckpointWriter()
+        writer.submit(_write_failing, file, lambda: None)
+
+        with self.assertRaises(IOError):
+            writer.flush()
+
+        # partially written checkpoints never replace the actual file
+        self.assertListEqual(os.listdir(save_path), [])
+
+        # the writer is still usable after the error has been raised
+        writer.submit(_write_text, file, lambda: "valid")
+        writer.close()
+        with open(file) as f:
+            self.assertEqual(f.read(), "valid")
+
+        with self.assertRaises(ValueError):
+            AsyncCheckpointWriter(max_pending=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
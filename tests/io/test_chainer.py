@@ -36,6 +36,49 @@ class IoChainerTest(unittest.TestCase):
         save_checkpoint("./model_chainer.chain", model=net)
         self.assertTrue(load_checkpoint("./model_chainer.chain", model=net))
 
+    @unittest.skipUnless(check_for_chainer_backend(),
+                         "Test should be only executed if chainer backend is "
+                         "installed and specified")
+    def test_snapshot_write(self):
+
+        import numpy as np
+        from delira.io.chainer import load_checkpoint, snapshot_checkpoint, \
+            write_checkpoint
+
+        def train_step(net, optim):
+            net.cleargrads()
+            loss = chainer.functions.sum(
+                net(np.random.rand(4, 1).astype(np.float32))["pred"])
+            loss.backward()
+            optim.update()
+
+        net = Model()
+        optim = chainer.optimizers.Adam()
+        optim.setup(net)
+        train_step(net, optim)
+
+        snapshot = snapshot_checkpoint(net, {"default": optim}, epoch=3)
+        weight = net.dense.W.array.copy()
+        moment = net.dense.W.update_rule.state["m"].copy()
+
+        # further training must not change the snapshot
+        train_step(net, optim)
+        write_checkpoint("./model_chainer_snapshot.chain", snapshot)
+
+        new_net = Model()
+        new_optim = chainer.optimizers.Adam()
+        new_optim.setup(new_net)
+        train_step(new_net, new_optim)
+
+        state = load_checkpoint("./model_chainer_snapshot.chain",
+                                model=new_net,
+                                optimizers={"default": new_optim})
+
+        self.assertEqual(state["epoch"], 3)
+        np.testing.assert_allclose(new_net.dense.W.array, weight)
+        np.testing.assert_allclose(
+            new_net.dense.W.update_rule.state["m"], moment)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -35,6 +35,87 @@ class IoTorchTest(unittest.TestCase):
         save_checkpoint_torch("./model_torch.pt", model=net)
         self.assertTrue(load_checkpoint_torch("./model_torch.pt"))
 
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_lazy_load(self):
+        import os
+        import tempfile
+        from delira.io.torch import load_checkpoint_torch, \
+            load_model_state_torch, save_checkpoint_torch
+        from delira.models import AbstractPyTorchNetwork
+        import torch
+
+        class ExtraStateLinear(torch.nn.Linear):
+            # a module with a custom (non tensor) entry in its state dict
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.scale = 1.
+
+            def get_extra_state(self):
+                return {"scale": self.scale}
+
+            def set_extra_state(self, state):
+                self.scale = state["scale"]
+
+        class DummyNetwork(AbstractPyTorchNetwork):
+            def __init__(self, n_outputs=2):
+                super().__init__(n_outputs=n_outputs)
+                self.module = torch.nn.Sequential(
+                    torch.nn.Linear(8, 16),
+                    torch.nn.BatchNorm1d(16),
+                    ExtraStateLinear(16, n_outputs))
+
+            def forward(self, x):
+                return self.module(x)
+
+        net = DummyNetwork()
+        net.module[2].scale = 0.5
+        optim = torch.optim.Adam(net.parameters())
+        net(torch.rand(4, 8)).sum().backward()
+        optim.step()
+
+        save_path = tempfile.mkdtemp()
+        files = {"zipfile": os.path.join(save_path, "zip.pt"),
+                 "legacy": os.path.join(save_path, "legacy.pt")}
+        save_checkpoint_torch(files["zipfile"], net, {"default": optim}, 3)
+        save_checkpoint_torch(files["legacy"], net, {"default": optim}, 3,
+                              _use_new_zipfile_serialization=False)
+
+        for file_format, file in files.items():
+            with self.subTest(file_format=file_format):
+                checkpoint = load_checkpoint_torch(file, sections=["model"],
+                                                   mmap=True)
+                self.assertNotIn("optimizer", checkpoint)
+                self.assertEqual(checkpoint["epoch"], 3)
+                for key, val in net.state_dict().items():
+                    if isinstance(val, torch.Tensor):
+                        self.assertTrue(
+                            torch.equal(val, checkpoint["model"][key]))
+                    else:
+                        self.assertEqual(val, checkpoint["model"][key])
+
+                checkpoint = load_checkpoint_torch(file,
+                                                   sections=["optimizer"])
+                self.assertNotIn("model", checkpoint)
+                self.assertEqual(
+                    checkpoint["optimizer"]["default"]["state"].keys(),
+                    optim.state_dict()["state"].keys())
+
+                # stream the state into a new network
+                new_net = DummyNetwork()
+                remaining = load_model_state_torch(file, new_net)
+                self.assertDictEqual(remaining, {"epoch": 3})
+                self.assertEqual(new_net.module[2].scale, 0.5)
+                self.assertEqual(new_net.module[1].num_batches_tracked, 1)
+                for key, val in net.state_dict().items():
+                    if isinstance(val, torch.Tensor):
+                        self.assertTrue(
+                            torch.equal(val, new_net.state_dict()[key]))
+
+                with self.assertRaises(RuntimeError):
+                    load_model_state_torch(file, DummyNetwork(3))
+
     @unittest.skipUnless(check_for_torchscript_backend(),
                          "Test should be only executed if torch backend is "
                          "installed and specified")
@@ -58,6 +139,61 @@ class IoTorchTest(unittest.TestCase):
         save_checkpoint_torchscript("./model_jit.ptj", model=net)
         self.assertTrue(load_checkpoint_torchscript("./model_jit.ptj"))
 
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_inference_export(self):
+        from functools import partial
+        import numpy as np
+        from delira.io.torch import export_inference_torchscript, \
+            load_inference_torchscript
+        from delira.models import AbstractPyTorchNetwork
+        from delira.training import Predictor
+        from delira.training.backends import convert_torch_to_numpy
+        import torch
+
+        class DummyNetwork(AbstractPyTorchNetwork):
+            def __init__(self):
+                super().__init__()
+                self.module = torch.nn.Sequential(
+                    torch.nn.Linear(32, 64),
+                    torch.nn.ReLU(),
+                    torch.nn.Linear(64, 1)
+                )
+
+            def forward(self, x):
+                return {"pred": self.module(x)}
+
+        net = DummyNetwork()
+        export_inference_torchscript("./model_inference.ptj", net,
+                                     {"x": torch.rand(4, 32)},
+                                     check_inputs=[{"x": torch.rand(7, 32)}])
+        # network must be restored to training mode
+        self.assertTrue(net.training)
+
+        prepare_batch = partial(DummyNetwork.prepare_batch,
+                                input_device=torch.device("cpu"),
+                                output_device=torch.device("cpu"))
+
+        predictors = [
+            Predictor(_model, key_mapping={"x": "data"},
+                      convert_batch_to_npy_fn=convert_torch_to_numpy,
+                      prepare_batch_fn=prepare_batch)
+            for _model in [net.eval(), load_inference_torchscript(
+                "./model_inference.ptj")]]
+
+        batch = {"data": np.random.rand(5, 32)}
+        eager_preds, exported_preds = [_predictor.predict(batch)
+                                       for _predictor in predictors]
+
+        np.testing.assert_allclose(eager_preds["pred"],
+                                   exported_preds["pred"], rtol=1e-4,
+                                   atol=1e-5)
+
+        with self.assertRaises(ValueError):
+            export_inference_torchscript("./model_inference.ptj", net,
+                                         {"y": torch.rand(4, 32)})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -92,6 +92,135 @@ class TestSklearnBackend(
                          config.nested_get("metrics", {}),
                          metric_keys)
 
+    @unittest.skipUnless(check_for_sklearn_backend(),
+                         "Test should only be executed if SKLEARN backend is "
+                         "installed and specified")
+    def test_assemble_data(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training.backends.sklearn import assemble_data
+
+        dset = DummyDataset(50)
+
+        for memmap_dir in (None, tempfile.mkdtemp()):
+            with self.subTest(memmap_dir=memmap_dir):
+                batch = assemble_data(DataManager(dset, 16, 0, None),
+                                      chunk_size=16, memmap_dir=memmap_dir)
+
+                self.assertTupleEqual(batch["data"].shape, (50, 32))
+                self.assertTupleEqual(batch["label"].shape, (50, 1))
+                self.assertEqual(isinstance(batch["data"], np.memmap),
+                                 memmap_dir is not None)
+
+    @unittest.skipUnless(check_for_sklearn_backend(),
+                         "Test should only be executed if SKLEARN backend is "
+                         "installed and specified")
+    def test_out_of_core_fit(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.models import SklearnEstimator
+        from delira.training import SklearnEstimatorTrainer
+        from sklearn.neural_network import MLPClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        for estimator, kwargs in (
+                (DecisionTreeClassifier(),
+                 {"fit_chunk_size": 16, "fit_memmap_dir": tempfile.mkdtemp()}),
+                (MLPClassifier(), {"partial_fit_batch_size": 25})):
+            with self.subTest(estimator=estimator):
+                trainer = SklearnEstimatorTrainer(
+                    SklearnEstimator(estimator), tempfile.mkdtemp(),
+                    key_mapping={"X": "X"},
+                    metrics={"mae": mean_absolute_error},
+                    metric_keys={"mae": ("pred", "y")}, **kwargs)
+
+                model = trainer.train(2, DataManager(DummyDataset(50), 4, 0,
+                                                     None),
+                                      verbose=False)
+
+                self.assertTupleEqual(
+                    model(np.random.rand(3, 32))["pred"].shape, (3,))
+
+                # the tree was fitted on all samples at once
+                if isinstance(estimator, DecisionTreeClassifier):
+                    self.assertEqual(
+                        model.module.tree_.n_node_samples[0], 50)
+
+    @unittest.skipUnless(check_for_sklearn_backend(),
+                         "Test should be only executed if sklearn backend is "
+                         "installed and specified")
+    def test_parallel_estimator(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.models import SklearnEstimator
+        from delira.training import SklearnEstimatorTrainer
+        from delira.utils.resources import available_cpus
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.multioutput import MultiOutputRegressor
+
+        class MultiTargetDataset(DummyDataset):
+            def __getitem__(self, index):
+                data = np.random.rand(32)
+                return {"data": data,
+                        "label": np.array([data.sum(), data.mean()])}
+
+        trainer = SklearnEstimatorTrainer(
+            SklearnEstimator(MultiOutputRegressor(
+                RandomForestRegressor(n_estimators=5, n_jobs=4))),
+            tempfile.mkdtemp(), key_mapping={"X": "X"},
+            metrics={"mae": mean_absolute_error},
+            metric_keys={"mae": ("pred", "y")}, n_jobs=-1,
+            predict_chunk_size=10)
+
+        # the estimator is set up before the training (e.g. for testing)
+        self.assertEqual(trainer.module.n_jobs, len(available_cpus()))
+        self.assertEqual(trainer.module.predict_chunk_size, 10)
+
+        model = trainer.train(1, DataManager(MultiTargetDataset(50), 10, 0,
+                                             None),
+                              verbose=False)
+
+        # the targets are fitted in parallel by the outer estimator only
+        params = model.module.get_params()
+        self.assertEqual(model.n_jobs, len(available_cpus()))
+        self.assertEqual(params["n_jobs"], model.n_jobs)
+        self.assertEqual(params["estimator__n_jobs"], 1)
+
+        # chunked prediction
+        data = np.random.rand(35, 32)
+        preds = model(data)["pred"]
+        self.assertTupleEqual(preds.shape, (35, 2))
+        np.testing.assert_allclose(preds, model.module.predict(data))
+        self.assertEqual(model.module.get_params()["n_jobs"], model.n_jobs)
+
+    @unittest.skipUnless(check_for_sklearn_backend(),
+                         "Test should be only executed if sklearn backend is "
+                         "installed and specified")
+    def test_resource_plan_restored(self):
+        import os
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.models import SklearnEstimator
+        from delira.training import SklearnEstimatorTrainer
+        from delira.utils.resources import CPUResourceManager, \
+            available_cpus
+        from sklearn.linear_model import SGDRegressor
+
+        orig_cpus = available_cpus()
+        orig_omp_threads = os.environ.get("OMP_NUM_THREADS")
+
+        trainer = SklearnEstimatorTrainer(
+            SklearnEstimator(SGDRegressor()), tempfile.mkdtemp(),
+            key_mapping={"X": "X"})
+        trainer.train(1, DataManager(
+            DummyDataset(20), 10, 0, None,
+            resource_manager=CPUResourceManager(orig_cpus[:1])),
+            verbose=False)
+
+        # the process is not limited to the plan after the training
+        self.assertListEqual(available_cpus(), orig_cpus)
+        self.assertEqual(os.environ.get("OMP_NUM_THREADS"), orig_omp_threads)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -75,6 +75,57 @@ class TestTfEagerBackend(
 
         super().setUp()
 
+    @unittest.skipUnless(check_for_tf_eager_backend(),
+                         "Test should be only executed if tf eager backend "
+                         "is installed and specified")
+    def test_compiled_steps(self):
+        import tempfile
+        import numpy as np
+        from delira.training import TfEagerNetworkTrainer
+
+        def _create_trainer(network, **kwargs):
+            return TfEagerNetworkTrainer(
+                network, tempfile.mkdtemp(), key_mapping={"x": "data"},
+                losses={"L1": tf.losses.absolute_difference},
+                optimizer_cls=tf.train.GradientDescentOptimizer,
+                optimizer_params={"learning_rate": 0.1}, **kwargs)
+
+        network, network_compiled = DummyNetworkTfEager(), \
+            DummyNetworkTfEager()
+        inputs = np.random.rand(8, 32).astype(np.float32)
+        network(inputs)
+        network_compiled(inputs)
+        network_compiled.set_weights(network.get_weights())
+
+        trainer = _create_trainer(network)
+        trainer_compiled = _create_trainer(network_compiled,
+                                           compile_steps=True)
+
+        # the compiled steps accept changing batch sizes and give the same
+        # results as the eager ones
+        for batch_size in [8, 5]:
+            batch = trainer._prepare_batch(
+                {"data": inputs[:batch_size],
+                 "label": np.random.rand(batch_size, 1).astype(np.float32)})
+
+            losses, _ = trainer.closure_fn(
+                trainer.module, batch, optimizers=trainer.optimizers,
+                losses=trainer.losses, iter_num=0)
+            losses_compiled, _ = trainer_compiled.closure_fn(
+                trainer_compiled.module, batch,
+                optimizers=trainer_compiled.optimizers,
+                losses=trainer_compiled.losses, iter_num=0)
+
+            self.assertIsInstance(losses_compiled["L1"], tf.Tensor)
+            np.testing.assert_allclose(losses["L1"].numpy(),
+                                       losses_compiled["L1"].numpy(),
+                                       rtol=1e-5)
+
+            np.testing.assert_allclose(
+                trainer.predict(batch, already_prepared=True)["pred"],
+                trainer_compiled.predict(batch, already_prepared=True)[
+                    "pred"], rtol=1e-5)
+
     def tearDown(self):
         import sys
         try:
@@ -36,6 +36,27 @@ if check_for_tf_graph_backend():
             self.outputs_train["pred"] = preds_train
             self.outputs_eval["pred"] = preds_eval
 
+    class DummyPullingNetworkTfGraph(AbstractTfGraphNetwork):
+        def __init__(self):
+            super().__init__()
+
+            self.model = tf.keras.models.Sequential(
+                layers=[
+                    tf.keras.layers.Dense(64, input_shape=(
+                        32,), bias_initializer='glorot_uniform'),
+                    tf.keras.layers.ReLU(),
+                    tf.keras.layers.Dense(
+                        1,
+                        bias_initializer='glorot_uniform')]
+            )
+
+            inputs = self._build_inputs({
+                "data": (tf.float32, [None, 32]),
+                "label": (tf.float32, [None, 1])})
+
+            self.outputs_train["pred"] = self.model(inputs["data"])
+            self.outputs_eval["pred"] = self.model(inputs["data"])
+
 
 class TestTfGraphBackend(
     create_experiment_test_template_for_backend("TFGRAPH")
@@ -84,6 +105,49 @@ class TestTfGraphBackend(
 
         super().setUp()
 
+    @unittest.skipUnless(check_for_tf_graph_backend(),
+                         "Test should be only executed if tf graph backend "
+                         "is installed and specified")
+    def test_dataset_input_mode(self):
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.training import TfGraphNetworkTrainer
+        from .utils import DummyDataset
+
+        tf.disable_eager_execution()
+        tf.reset_default_graph()
+
+        with self.assertRaises(ValueError):
+            TfGraphNetworkTrainer(
+                DummyNetworkTfGraph(), tempfile.mkdtemp(),
+                key_mapping={"data": "data"},
+                losses={"L1": tf.losses.absolute_difference},
+                optimizer_cls=tf.train.AdamOptimizer,
+                input_mode="dataset")
+
+        trainer = TfGraphNetworkTrainer(
+            DummyPullingNetworkTfGraph(), tempfile.mkdtemp(),
+            key_mapping={"data": "data"},
+            losses={"L1": tf.losses.absolute_difference},
+            optimizer_cls=tf.train.AdamOptimizer,
+            metrics={"mae": mean_absolute_error},
+            input_mode="dataset")
+
+        # the batches are pulled by the graph and returned by the closure
+        # for the metric calculation
+        for epoch in range(1, 3):
+            train_metrics, train_losses = trainer._train_single_epoch(
+                DataManager(DummyDataset(20), 4, 0, None), epoch)
+            self.assertEqual(train_losses["L1"].count, 5)
+            self.assertEqual(train_metrics["mae"].count, 5)
+
+        # the prediction still feeds the batches
+        preds = trainer.predict(
+            {"data": np.random.rand(3, 32).astype(np.float32),
+             "label": np.random.rand(3, 1).astype(np.float32)})
+        self.assertTupleEqual(preds["pred"].shape, (3, 1))
+
     def tearDown(self):
         import sys
         try:
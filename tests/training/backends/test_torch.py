@@ -1,8 +1,46 @@
+import os
 import unittest
 from tests.utils import check_for_torch_backend
+from delira.training.callbacks import AbstractCallback
 from delira.utils import DeliraConfig
 from sklearn.metrics import mean_absolute_error
-from .utils import create_experiment_test_template_for_backend
+from .utils import create_experiment_test_template_for_backend, \
+    DummyDataset
+
+
+class _FixedDataset(DummyDataset):
+    """
+    Samples the random data of a :class:`DummyDataset` once
+    """
+
+    def __init__(self, dataset):
+        super().__init__(len(dataset))
+        self.data = [dataset[idx] for idx in range(len(dataset))]
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+
+class _MetricsCallback(AbstractCallback):
+    def __init__(self, epoch_metrics):
+        super().__init__()
+        self.epoch_metrics = epoch_metrics
+
+    def at_epoch_end(self, trainer, **kwargs):
+        self.epoch_metrics.append(kwargs["val_metrics"])
+        return {}
+
+
+class _ValScoreCallback(AbstractCallback):
+    def __init__(self, val_scores):
+        super().__init__()
+        self.val_scores = val_scores
+
+    def at_epoch_end(self, trainer, curr_epoch, val_epoch, **kwargs):
+        if "val_mae" in kwargs["val_metrics"]:
+            self.val_scores[val_epoch] = (
+                curr_epoch, float(kwargs["val_metrics"]["val_mae"]))
+        return {}
 
 
 if check_for_torch_backend():
@@ -25,6 +63,40 @@ if check_for_torch_backend():
                     self.module(x)
             }
 
+    def _train_distributed(rank, world_size, save_path):
+        from delira.data_loading import DataManager, RandomSampler
+        from delira.training import DistributedPyTorchNetworkTrainer
+
+        torch.manual_seed(rank)
+        trainer = DistributedPyTorchNetworkTrainer(
+            DummyNetworkTorch(), os.path.join(save_path, "checkpoints"),
+            key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            logging_kwargs={"logdir": os.path.join(save_path, "logs")})
+
+        n_train_batches = DataManager(
+            DummyDataset(20), 4, 0, None,
+            sampler_cls=RandomSampler).get_shard(rank, world_size).n_batches
+
+        epoch_metrics = []
+        trainer.register_callback(_MetricsCallback(epoch_metrics))
+        trainer.train(2, DataManager(DummyDataset(20), 4, 0, None,
+                                     sampler_cls=RandomSampler),
+                      DataManager(DummyDataset(10), 4, 0, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+        return {"params": [p.detach().numpy()
+                           for p in trainer.module.parameters()],
+                "n_train_batches": n_train_batches,
+                "metrics": epoch_metrics}
+
+    def _large_result(rank, world_size, size):
+        import numpy as np
+        return np.full(size, rank, dtype=np.uint8)
+
 
 class TestTorchBackend(
     create_experiment_test_template_for_backend("TORCH")
@@ -72,6 +144,601 @@ class TestTorchBackend(
 
         super().setUp()
 
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_export_inference(self):
+        import os
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.io.torch import load_inference_torchscript
+        from delira.training import PyTorchNetworkTrainer
+
+        save_path = tempfile.mkdtemp()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.L1Loss()},
+            optimizer_cls=torch.optim.Adam)
+
+        dmgr = DataManager(DummyDataset(20), 4, 2, None)
+        trainer.export_inference(os.path.join(save_path, "inference"), dmgr)
+
+        module = load_inference_torchscript(
+            os.path.join(save_path, "inference.ptj"))
+        self.assertIn("pred", module(x=torch.rand(3, 32)))
+        # the number of augmentation processes must be restored
+        self.assertEqual(dmgr.n_process_augmentation, 2)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_quantization(self):
+        import os
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.io.torch import load_checkpoint_torch
+        from delira.models.backends.torch import QuantizedPyTorchNetwork, \
+            restore_quantized_network
+        from delira.training import PyTorchNetworkTrainer, Predictor
+        from delira.training.backends import convert_torch_to_numpy
+
+        save_path = tempfile.mkdtemp()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.L1Loss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error})
+
+        dmgr = DataManager(DummyDataset(20), 4, 0, None)
+        batch = {"data": np.random.rand(5, 32).astype(np.float32)}
+
+        for mode in ["dynamic", "static"]:
+            with self.subTest(mode=mode):
+                quantized = trainer.quantize(mode, datamgr=dmgr,
+                                             n_batches=2)
+                self.assertIsInstance(quantized, QuantizedPyTorchNetwork)
+
+                predictor = Predictor(
+                    quantized, key_mapping={"x": "data"},
+                    convert_batch_to_npy_fn=convert_torch_to_numpy,
+                    prepare_batch_fn=trainer._prepare_batch)
+                preds = predictor.predict(batch)
+                self.assertTupleEqual(preds["pred"].shape, (5, 1))
+
+                # save and restore the quantized state
+                file = os.path.join(save_path, "quantized_%s.pt" % mode)
+                trainer.save_state(file, 1)
+                self.assertNotIn("quantization",
+                                 load_checkpoint_torch(file))
+                trainer.module, orig_module = quantized, trainer.module
+                trainer.save_state(file, 1)
+                trainer.module = orig_module
+
+                checkpoint = load_checkpoint_torch(file)
+                self.assertEqual(checkpoint["quantization"]["mode"], mode)
+                restored = restore_quantized_network(
+                    DummyNetworkTorch(), checkpoint["quantization"],
+                    checkpoint["model"])
+
+                with torch.no_grad():
+                    inputs = torch.from_numpy(batch["data"])
+                    np.testing.assert_allclose(
+                        restored(x=inputs)["pred"].numpy(),
+                        preds["pred"], rtol=1e-5, atol=1e-6)
+
+                report = trainer.quantization_report(quantized, dmgr,
+                                                     n_batches=2,
+                                                     n_repeats=1)
+                self.assertIn("mae", report["comparison"]["metrics_diff"])
+                self.assertIn("speedup", report["comparison"])
+                self.assertGreater(report["comparison"]["size_ratio"], 1)
+
+        with self.assertRaises(ValueError):
+            trainer.quantize("static")
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_autocast(self):
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+
+        save_path = tempfile.mkdtemp()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            autocast_dtype="bfloat16")
+        self.assertEqual(trainer.autocast_dtype, torch.bfloat16)
+
+        # record the dtypes of the linear layers' outputs
+        forward_dtypes = []
+        trainer.module.module[0].register_forward_hook(
+            lambda module, inputs, outputs: forward_dtypes.append(
+                outputs.dtype))
+
+        data_dict = trainer._prepare_batch(
+            {"data": np.random.rand(4, 32).astype(np.float32),
+             "label": np.random.randint(0, 2, (4, 1)).astype(np.float32)})
+        losses, preds = trainer.closure_fn(
+            trainer.module, data_dict, optimizers=trainer.optimizers,
+            losses=trainer.losses, iter_num=0)
+
+        self.assertEqual(forward_dtypes[-1], torch.bfloat16)
+        self.assertEqual(preds["pred"].dtype, torch.float32)
+        self.assertTrue(np.isfinite(losses["L1"]))
+
+        preds = trainer.predict({"data": data_dict["data"].numpy()})
+        self.assertEqual(forward_dtypes[-1], torch.bfloat16)
+        self.assertEqual(preds["pred"].dtype, np.float32)
+
+        trainer.train(1, DataManager(DummyDataset(20), 4, 0, None),
+                      DataManager(DummyDataset(10), 4, 0, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_gradient_accumulation(self):
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer, \
+            GradientAccumulationOptimizer
+        from delira.training.callbacks import OneCycleLRCallbackPyTorch
+
+        def _create_trainer(network, **kwargs):
+            return PyTorchNetworkTrainer(
+                network, tempfile.mkdtemp(), key_mapping={"x": "data"},
+                losses={"L1": torch.nn.BCEWithLogitsLoss()},
+                optimizer_cls=torch.optim.SGD,
+                optimizer_params={"lr": 0.1}, **kwargs)
+
+        network = DummyNetworkTorch()
+        network_acc = DummyNetworkTorch()
+        network_acc.load_state_dict(network.state_dict())
+
+        trainer = _create_trainer(network)
+        trainer_acc = _create_trainer(network_acc,
+                                      gradient_accumulation_steps=2)
+        self.assertIsInstance(trainer_acc.optimizers["default"],
+                              GradientAccumulationOptimizer)
+
+        batch = trainer._prepare_batch(
+            {"data": np.random.rand(8, 32).astype(np.float32),
+             "label": np.random.randint(0, 2, (8, 1)).astype(np.float32)})
+
+        trainer.closure_fn(trainer.module, batch,
+                           optimizers=trainer.optimizers,
+                           losses=trainer.losses, iter_num=0)
+
+        # two micro-batches must result in the same update as the whole batch
+        for iter_num, idxs in enumerate([slice(0, 4), slice(4, 8)]):
+            params = [p.clone() for p in trainer_acc.module.parameters()]
+            trainer_acc.closure_fn(
+                trainer_acc.module, {k: v[idxs] for k, v in batch.items()},
+                optimizers=trainer_acc.optimizers,
+                losses=trainer_acc.losses, iter_num=iter_num)
+
+            updated = [not torch.equal(p, _p) for p, _p in zip(
+                trainer_acc.module.parameters(), params)]
+            self.assertEqual(all(updated), iter_num == 1)
+
+        for p, p_acc in zip(trainer.module.parameters(),
+                            trainer_acc.module.parameters()):
+            self.assertTrue(torch.allclose(p, p_acc, atol=1e-6))
+
+        # 5 batches per epoch result in 3 optimizer and scheduler steps
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), tempfile.mkdtemp(),
+            key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            lr_scheduler_cls=OneCycleLRCallbackPyTorch,
+            lr_scheduler_params={"max_lr": 0.1, "total_steps": 3},
+            gradient_accumulation_steps=2)
+        trainer._train_single_epoch(
+            DataManager(DummyDataset(20), 4, 0, None), 1)
+
+        optim = trainer.optimizers["default"]
+        self.assertEqual(optim.n_accumulated, 0)
+        for _state in optim.state.values():
+            self.assertEqual(int(_state["step"]), 3)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_step_profiler(self):
+        import json
+        import os
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+        from delira.training.callbacks import StepProfiler
+
+        profiler = StepProfiler(cprofile_iters=[1])
+        save_path = tempfile.mkdtemp()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            callbacks=[profiler])
+
+        trainer.train(2, DataManager(DummyDataset(20), 4, 0, None),
+                      DataManager(DummyDataset(10), 4, 0, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+        self.assertEqual(len(profiler.summaries), 2)
+        for summary in profiler.summaries.values():
+            self.assertEqual(summary["n_iterations"], 5)
+            self.assertCountEqual(summary["phases"].keys(),
+                                  StepProfiler.PHASES)
+            self.assertGreaterEqual(summary["stall_fraction"], 0.)
+            self.assertLessEqual(summary["stall_fraction"], 1.)
+            self.assertLessEqual(summary["step"]["p50"],
+                                 summary["step"]["p95"])
+
+        self.assertIsNotNone(profiler.cprofile_stats)
+
+        trace_file = os.path.join(save_path, "trace.json")
+        profiler.export_chrome_trace(trace_file)
+        with open(trace_file) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len([_event for _event in events
+                              if _event["name"] == "step"]), 10)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_async_metrics(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+
+        class _IterCallback(AbstractCallback):
+            def __init__(self):
+                super().__init__()
+                self.global_iters = []
+                self.metric_keys = []
+
+            def at_iter_end(self, trainer, global_iter_num=None,
+                            metrics=None, train=True, **kwargs):
+                if train:
+                    self.global_iters.append(global_iter_num)
+                    self.metric_keys.append(sorted(metrics.keys()))
+                return {"last_iter": global_iter_num}
+
+        callback = _IterCallback()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), tempfile.mkdtemp(),
+            key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            callbacks=[callback], async_metrics=True, metric_workers=2,
+            train_metrics_freq=2)
+
+        train_metrics, train_losses = trainer._train_single_epoch(
+            DataManager(DummyDataset(20), 4, 0, None), 1)
+
+        # the callbacks are called in order and metrics are only
+        # calculated every second iteration
+        self.assertListEqual(callback.global_iters, list(range(1, 6)))
+        self.assertListEqual(callback.metric_keys,
+                             [["L1", "mae"], ["L1"]] * 2 + [["L1", "mae"]])
+        self.assertEqual(train_metrics["mae"].count, 3)
+        self.assertEqual(train_losses["L1"].count, 5)
+        self.assertEqual(trainer._global_iter_num, 6)
+
+        # the returned states are applied by the main thread
+        self.assertEqual(trainer.last_iter, 5)
+        self.assertEqual(len(trainer._state_updates), 0)
+
+        # the outputs are detached before they are passed to the workers
+        preds = {"pred": trainer.module(torch.rand(2, 32))["pred"]}
+        self.assertTrue(preds["pred"].requires_grad)
+        _, detached = trainer._detach_iter_outputs({}, preds)
+        self.assertFalse(detached["pred"].requires_grad)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_async_validation(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+
+        save_path = tempfile.mkdtemp()
+        epoch_metrics = []
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            callbacks=[_MetricsCallback(epoch_metrics)],
+            async_validation=True)
+
+        trainer.train(3, DataManager(DummyDataset(20), 4, 0, None),
+                      DataManager(DummyDataset(10), 4, 1, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+        # the validation results are applied one epoch later
+        self.assertListEqual(["val_mae" in _metrics
+                              for _metrics in epoch_metrics],
+                             [False, True, True])
+        self.assertEqual(trainer._async_validator.n_pending, 0)
+
+        # the best checkpoint is the validated snapshot
+        best = trainer.checkpoint_manager.best
+        self.assertIn(best["epoch"], [1, 2, 3])
+        checkpoint = trainer.load_state(
+            os.path.join(save_path, "checkpoint_best.pt"))
+        self.assertEqual(checkpoint["epoch"], best["epoch"])
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_async_validation_checkpoint_retention(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+
+        save_path = tempfile.mkdtemp()
+        val_scores = {}
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            callbacks=[_ValScoreCallback(val_scores)],
+            async_validation=True,
+            checkpoint_retention={"keep_best": 1})
+
+        trainer.train(4, DataManager(DummyDataset(20), 4, 0, None),
+                      DataManager(DummyDataset(10), 4, 1, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+        # the callbacks get the epoch the validation belongs to
+        self.assertDictEqual({_epoch: _score[0]
+                              for _epoch, _score in val_scores.items()},
+                             {1: 2, 2: 3, 3: 4})
+
+        # the validation scores are registered with the validated epochs'
+        # checkpoints (the last one after the training)
+        checkpoints = {_entry["epoch"]: _entry
+                       for _entry in trainer.checkpoint_manager.checkpoints}
+        scores = {_epoch: _score[1]
+                  for _epoch, _score in val_scores.items()}
+        scores[4] = checkpoints[4]["metrics"]["val_mae"]
+
+        for epoch, entry in checkpoints.items():
+            self.assertAlmostEqual(entry["metrics"]["val_mae"],
+                                   scores[epoch], places=5)
+
+        # the latest and the best scored checkpoint are kept
+        best_epoch = min(scores, key=scores.get)
+        self.assertSetEqual(set(checkpoints), {4, best_epoch})
+        self.assertSetEqual(
+            set(_file for _file in os.listdir(save_path)
+                if _file.startswith("checkpoint_epoch")),
+            set("checkpoint_epoch_%d.pt" % _epoch
+                for _epoch in checkpoints))
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_result_cache(self):
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchExperiment, ResultCache
+
+        # the cache requires deterministic data
+        np.random.seed(0)
+        dataset = _FixedDataset(DummyDataset(20))
+
+        case = self._test_cases[0]
+        cache = ResultCache(tempfile.mkdtemp())
+        experiment = PyTorchExperiment(
+            case["config"], case["network_cls"],
+            key_mapping=case["key_mapping"], val_score_key="mae",
+            save_path=tempfile.mkdtemp(), result_cache=cache)
+
+        model = experiment.run(DataManager(dataset, 4, 0, None),
+                               DataManager(dataset, 4, 0, None), seed=0)
+        self.assertEqual(len(cache.keys()), 1)
+
+        # the second run restores the cached state instead of training
+        with self.assertLogs("delira.training.base_experiment", "INFO") as cm:
+            cached_model = experiment.run(DataManager(dataset, 4, 0, None),
+                                          DataManager(dataset, 4, 0, None),
+                                          seed=0)
+        self.assertTrue(any("Restoring cached training result" in msg
+                            for msg in cm.output))
+        for param, cached_param in zip(model.parameters(),
+                                       cached_model.parameters()):
+            self.assertTrue(torch.equal(param.cpu(), cached_param.cpu()))
+
+        # other seeds are trained again
+        experiment.run(DataManager(dataset, 4, 0, None),
+                       DataManager(dataset, 4, 0, None), seed=1)
+        self.assertEqual(len(cache.keys()), 2)
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_parallel_kfold(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchExperiment
+
+        case = self._test_cases[0]
+        experiment = PyTorchExperiment(
+            case["config"], case["network_cls"],
+            key_mapping=case["key_mapping"], val_score_key="mae",
+            save_path=tempfile.mkdtemp())
+
+        outputs, metrics_test = experiment.kfold(
+            DataManager(DummyDataset(40), 4, 1, None),
+            metrics={"mae": mean_absolute_error}, num_splits=2,
+            val_split=0.2, random_seed=0, n_workers=2, cpus_per_fold=1)
+
+        self.assertListEqual(sorted(outputs.keys()), ["0", "1"])
+        self.assertListEqual(sorted(metrics_test.keys()), ["0", "1"])
+
+        # each fold is saved to its own directory
+        for idx in range(2):
+            self.assertTrue(os.path.isdir(os.path.join(
+                experiment.save_path, "checkpoints", "fold_%02d" % idx)))
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_hyperparameter_search(self):
+        import tempfile
+        from delira.data_loading import DataManager
+        from delira.training import ASHASearch, PyTorchExperiment
+
+        config = DeliraConfig()
+        config.fixed_params = {
+            "model": {},
+            "training": {
+                "losses": {"L1": torch.nn.BCEWithLogitsLoss()},
+                "optimizer_cls": torch.optim.Adam,
+                "num_epochs": 3,
+                "metrics": {"mae": mean_absolute_error}}
+        }
+        experiment = PyTorchExperiment(config, DummyNetworkTorch,
+                                       key_mapping={"x": "data"},
+                                       val_score_key="mae",
+                                       save_path=tempfile.mkdtemp())
+
+        search = ASHASearch(
+            {"training.optimizer_params": [{"lr": 1e-1}, {"lr": 1e-2},
+                                           {"lr": 1e-3}, {"lr": 1e-4}]},
+            n_trials=4, max_epochs=3, min_epochs=1, reduction_factor=2,
+            random_state=0)
+
+        results = experiment.search(
+            search, DataManager(DummyDataset(20), 4, 0, None),
+            DataManager(DummyDataset(10), 4, 0, None), n_workers=2,
+            cpus_per_trial=1, val_score_mode="lowest")
+
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(trial["status"] in ("done", "stopped")
+                            for trial in results))
+        self.assertTrue(any(trial["epochs"] == 3 for trial in results))
+        self.assertTrue(os.path.isfile(os.path.join(
+            experiment.save_path, "search", "metrics.csv")))
+
+        # a finished search is not trained again when resuming
+        resumed = experiment.search(
+            search, DataManager(DummyDataset(20), 4, 0, None),
+            DataManager(DummyDataset(10), 4, 0, None),
+            val_score_mode="lowest")
+        self.assertListEqual([trial["score"] for trial in resumed],
+                             [trial["score"] for trial in results])
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_async_checkpointing(self):
+        import tempfile
+        import numpy as np
+        from delira.data_loading import DataManager
+        from delira.training import PyTorchNetworkTrainer
+
+        save_path = tempfile.mkdtemp()
+        trainer = PyTorchNetworkTrainer(
+            DummyNetworkTorch(), save_path, key_mapping={"x": "data"},
+            losses={"L1": torch.nn.BCEWithLogitsLoss()},
+            optimizer_cls=torch.optim.Adam,
+            metrics={"mae": mean_absolute_error},
+            async_checkpointing=True, max_pending_checkpoints=2,
+            checkpoint_retention={"keep_last": 1})
+
+        trainer.train(2, DataManager(DummyDataset(20), 4, 0, None),
+                      DataManager(DummyDataset(10), 4, 0, None),
+                      val_score_key="mae", val_score_mode="lowest",
+                      verbose=False)
+
+        # all checkpoints are completely written without temporary files and
+        # outdated checkpoints are removed afterwards
+        self.assertEqual(trainer._checkpoint_writer.n_pending, 0)
+        self.assertSetEqual(
+            set(_file for _file in os.listdir(save_path)
+                if _file.endswith(".pt")),
+            {"checkpoint_epoch_2.pt", "checkpoint_best.pt"})
+        self.assertEqual(trainer.checkpoint_manager.latest["epoch"], 2)
+        self.assertIn("val_mae", trainer.checkpoint_manager.best["metrics"])
+
+        # the last checkpoint contains the final state of the network
+        checkpoint = trainer.load_state(
+            os.path.join(save_path, "checkpoint_epoch_2.pt"))
+        self.assertEqual(checkpoint["epoch"], 2)
+        self.assertIn("default", checkpoint["optimizer"])
+
+        trainer.module.module[0].weight.data.add_(1.)
+        trainer.update_state(os.path.join(save_path, "checkpoint_best.pt"))
+        checkpoint = trainer.load_state(
+            os.path.join(save_path, "checkpoint_best.pt"))
+        for key, val in trainer.module.state_dict().items():
+            np.testing.assert_allclose(val.numpy(),
+                                       checkpoint["model"][key].numpy())
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_distributed(self):
+        import tempfile
+        import numpy as np
+        from delira.training import launch_distributed
+
+        save_path = tempfile.mkdtemp()
+        results = launch_distributed(_train_distributed, 2,
+                                     args=(save_path,))
+
+        # each rank trains on its own half of the data
+        self.assertListEqual([_result["n_train_batches"]
+                              for _result in results], [3, 3])
+
+        # parameters and (gathered) metrics are identical on all ranks
+        for param_rank0, param_rank1 in zip(results[0]["params"],
+                                            results[1]["params"]):
+            np.testing.assert_allclose(param_rank0, param_rank1)
+
+        self.assertEqual(results[0]["metrics"], results[1]["metrics"])
+        self.assertIn("val_mae", results[0]["metrics"][-1])
+
+        # only rank 0 saves checkpoints
+        self.assertSetEqual(
+            set(os.listdir(os.path.join(save_path, "checkpoints"))),
+            {"checkpoint_epoch_1.pt", "checkpoint_epoch_2.pt",
+             "checkpoint_best.pt", "checkpoints.json"})
+
+    @unittest.skipUnless(check_for_torch_backend(),
+                         "Test should be only executed if torch backend is "
+                         "installed and specified")
+    def test_distributed_large_result(self):
+        from delira.training import launch_distributed
+
+        # results larger than the pipe buffer must not block the processes
+        results = launch_distributed(_large_result, 2, args=(2 ** 22,),
+                                     split_cpus=False)
+
+        for rank, result in enumerate(results):
+            self.assertEqual(result.shape, (2 ** 22,))
+            self.assertTrue((result == rank).all())
+
 
 if __name__ == "__main__":
     unittest.main()
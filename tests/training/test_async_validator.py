@@ -0,0 +1,94 @@
+import pickle
+import unittest
+
+from delira.training import AsyncValidator
+from delira.utils.context_managers import DebugMode
+
+from ..utils import check_for_no_backend
+
+
+class _DummyDataManager(object):
+    def __init__(self, n_batches):
+        self.n_batches = n_batches
+        self.batch_size = 1
+
+
+class _DummyPredictor(object):
+    """
+    Yields the snapshotted ``offset`` as metric of every batch
+    """
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    @staticmethod
+    def _convert_to_npy_fn(*args, **kwargs):
+        return args, kwargs
+
+    def predict_data_mgr_cache_metrics_only(self, datamgr, batchsize=None,
+                                            metrics=None, metric_keys=None,
+                                            verbose=False):
+        if self.offset < 0:
+            raise ValueError("invalid snapshot")
+
+        yield {key: [self.offset] * datamgr.n_batches
+               for key in metrics}
+
+
+class AsyncValidatorTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_order(self):
+        for debug in (False, True):
+            with self.subTest(debug=debug), DebugMode(debug):
+                validator = AsyncValidator()
+
+                for epoch in range(1, 4):
+                    validator.submit(epoch, _DummyPredictor(epoch),
+                                     _DummyDataManager(2),
+                                     metrics={"mae": None})
+
+                results = validator.collect()
+                self.assertListEqual(
+                    [(epoch, metrics) for epoch, metrics, _ in results],
+                    [(epoch, {"mae": [epoch, epoch]})
+                     for epoch in range(1, 4)])
+                self.assertEqual(validator.n_pending, 0)
+                self.assertListEqual(validator.collect(), [])
+                validator.shutdown()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_errors(self):
+        validator = AsyncValidator()
+        validator.submit(1, _DummyPredictor(-1), _DummyDataManager(1),
+                         metrics={"mae": None})
+
+        with self.assertRaises(RuntimeError):
+            validator.collect()
+
+        # the worker process keeps running after a failed validation
+        validator.submit(2, _DummyPredictor(2), _DummyDataManager(1),
+                         metrics={"mae": None})
+        self.assertEqual(validator.collect()[0][1], {"mae": [2]})
+        validator.shutdown()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_pickle(self):
+        validator = AsyncValidator(start_method="spawn")
+        validator.submit(1, _DummyPredictor(1), _DummyDataManager(1),
+                         metrics={"mae": None})
+
+        restored = pickle.loads(pickle.dumps(validator))
+        self.assertEqual(restored.start_method, "spawn")
+        self.assertEqual(restored.n_pending, 0)
+        validator.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from delira.training import BaseNetworkTrainer, CheckpointManager
+
+from ..utils import check_for_no_backend
+
+
+class TestCheckpointManager(unittest.TestCase):
+
+    @staticmethod
+    def _save(save_path, manager, epoch, score, extensions=(".pt",)):
+        for ext in extensions:
+            open(os.path.join(save_path, "checkpoint_epoch_%d%s"
+                              % (epoch, ext)), "w").close()
+        manager.register("checkpoint_epoch_%d" % epoch, epoch,
+                         {"val_loss": np.float32(score),
+                          "images": np.zeros((2, 2))})
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_retention(self):
+        scores = [0.5, 0.1, 0.9, 0.2, 0.8, 0.7, 0.6, 0.4]
+
+        test_cases = [
+            # kwargs, retained epochs
+            ({}, list(range(1, 9))),
+            ({"keep_last": 2}, [7, 8]),
+            ({"keep_best": 2, "score_key": "loss", "score_mode": "lowest"},
+             [2, 4, 8]),
+            ({"keep_best": 1, "score_key": "val_loss"}, [3, 8]),
+            ({"keep_every": 3}, [3, 6, 8]),
+            ({"keep_last": 1, "keep_every": 4,
+              "keep_best": 1, "score_key": "loss"}, [3, 4, 8]),
+        ]
+
+        for kwargs, retained in test_cases:
+            with self.subTest(kwargs=kwargs):
+                save_path = tempfile.mkdtemp()
+                manager = CheckpointManager(save_path, **kwargs)
+                for epoch, score in enumerate(scores, 1):
+                    self._save(save_path, manager, epoch, score,
+                               extensions=(".model.ptj", ".trainer_state.pt"))
+
+                self.assertListEqual(
+                    [_entry["epoch"] for _entry in manager.checkpoints],
+                    retained)
+                expected_files = {
+                    "checkpoint_epoch_%d%s" % (_epoch, _ext)
+                    for _epoch in retained
+                    for _ext in (".model.ptj", ".trainer_state.pt")}
+                expected_files.add(CheckpointManager.MANIFEST_NAME)
+                self.assertSetEqual(set(os.listdir(save_path)),
+                                    expected_files)
+
+                # the manifest is restored by a new manager
+                self.assertEqual(
+                    CheckpointManager(save_path).latest["epoch"], 8)
+
+        with self.assertRaises(ValueError):
+            CheckpointManager(tempfile.mkdtemp(), keep_last=0)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_resume_lookup(self):
+        save_path = tempfile.mkdtemp()
+        manager = CheckpointManager(save_path, keep_last=2)
+
+        for epoch in range(1, 12):
+            self._save(save_path, manager, epoch, epoch)
+        manager.register("checkpoint_best", 3, {"val_loss": 3.},
+                         is_best=True)
+
+        self.assertTupleEqual(
+            CheckpointManager.latest_checkpoint(save_path),
+            ("checkpoint_epoch_11", 11))
+        self.assertEqual(manager.best["epoch"], 3)
+
+        # lexicographical order differs from the epoch order
+        self.assertTupleEqual(
+            BaseNetworkTrainer._search_for_prev_state(save_path, [".pt"]),
+            (os.path.join(save_path, "checkpoint_epoch_11.pt"), 11))
+
+        # fall back to scanning the directory without a manifest
+        os.remove(manager.manifest_file)
+        self.assertTupleEqual(
+            BaseNetworkTrainer._search_for_prev_state(save_path, [".pt"]),
+            (os.path.join(save_path, "checkpoint_epoch_11.pt"), 11))
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_update_metrics(self):
+        save_path = tempfile.mkdtemp()
+        manager = CheckpointManager(save_path, keep_best=1,
+                                    score_key="val_loss",
+                                    score_mode="lowest")
+
+        # the scores arrive one epoch late (as for asynchronous validation)
+        # and are added before the next checkpoint is registered
+        scores = [0.5, 0.1, 0.9, 0.2]
+        for epoch in range(1, 5):
+            if epoch > 1:
+                manager.update_metrics(epoch - 1,
+                                       {"val_loss": scores[epoch - 2]})
+            open(os.path.join(save_path, "checkpoint_epoch_%d.pt" % epoch),
+                 "w").close()
+            manager.register("checkpoint_epoch_%d" % epoch, epoch,
+                             {"train_loss": 1.})
+
+        self.assertListEqual(
+            [_entry["epoch"] for _entry in manager.checkpoints], [2, 4])
+        self.assertDictEqual(manager.checkpoints[0]["metrics"],
+                             {"train_loss": 1., "val_loss": 0.1})
+
+        manager.update_metrics(4, {"val_loss": scores[3]})
+        self.assertDictEqual(
+            CheckpointManager(save_path).checkpoints[-1]["metrics"],
+            {"train_loss": 1., "val_loss": 0.2})
+
+        # removed checkpoints are not recorded again
+        manager.update_metrics(1, {"val_loss": 0.})
+        self.assertListEqual(
+            [_entry["epoch"] for _entry in manager.checkpoints], [2, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import queue
+import tempfile
+import threading
+import unittest
+
+from delira.training import ASHASearch, GridSearch, HyperparameterSearch, \
+    RandomSearch
+from delira.training.hyperparameter_search import _TrialReporter
+
+from ..utils import check_for_no_backend
+
+
+class HyperparameterSearchTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_sample(self):
+        space = {"model.n_hidden": [16, 32],
+                 "training.optimizer_params.lr": [1e-3, 1e-2, 1e-1]}
+
+        trials = GridSearch(space).sample()
+        self.assertEqual(len(trials), 6)
+        self.assertIn({"model.n_hidden": 32,
+                       "training.optimizer_params.lr": 1e-2}, trials)
+
+        # sampling is reproducible to resume a search
+        self.assertListEqual(RandomSearch(space, 4, random_state=1).sample(),
+                             RandomSearch(space, 4, random_state=1).sample())
+        self.assertEqual(len(RandomSearch(space, 4).sample()), 4)
+
+        with self.assertRaises(ValueError):
+            GridSearch({"n_hidden": [16, 32]})
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_asha(self):
+        search = ASHASearch({"model.n_hidden": [16, 32]}, 4, max_epochs=27,
+                            min_epochs=1, reduction_factor=3)
+        self.assertTupleEqual(search.milestones, (1, 3, 9))
+        self.assertEqual(search.num_epochs, 27)
+
+        # only the best third of the scores continues
+        scores = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+        self.assertFalse(search.should_stop(scores, 0.1, "lowest"))
+        self.assertTrue(search.should_stop(scores, 0.6, "lowest"))
+        self.assertFalse(search.should_stop(scores, 0.6, "highest"))
+        self.assertTrue(search.should_stop(scores, 0.1, "highest"))
+
+        # the first trial reaching a milestone always continues
+        self.assertFalse(search.should_stop([0.5], 0.5, "lowest"))
+
+        with self.assertRaises(ValueError):
+            ASHASearch({"model.n_hidden": [16]}, 4, max_epochs=2,
+                       min_epochs=3)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_reporter(self):
+        search = ASHASearch({"model.n_hidden": [16, 32]}, 4, max_epochs=9,
+                            min_epochs=1, reduction_factor=3)
+        events, milestone_scores = queue.Queue(), {1: [0.1, 0.2, 0.3]}
+
+        reporter = _TrialReporter(0, events, search, "mae", "lowest",
+                                  milestone_scores, threading.Lock())
+
+        self.assertDictEqual(
+            reporter.at_epoch_end(None, val_metrics={"val_mae": 0.5},
+                                  curr_epoch=1),
+            {"stop_training": True})
+        self.assertListEqual(milestone_scores[1], [0.1, 0.2, 0.3, 0.5])
+
+        # epochs, which are no milestones, are only reported
+        self.assertDictEqual(
+            reporter.at_epoch_end(None, val_metrics={"val_mae": 0.5},
+                                  curr_epoch=2), {})
+
+        kinds = []
+        while not events.empty():
+            kinds.append(events.get()[0])
+        self.assertListEqual(kinds, ["epoch", "milestone", "stopped",
+                                     "epoch"])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_resume_state(self):
+        save_path = tempfile.mkdtemp()
+        search = HyperparameterSearch(
+            None, GridSearch({"model.n_hidden": [16, 32, 64]}), save_path,
+            n_workers=2)
+
+        search.trials = [
+            {"trial_id": idx, "params": params, "status": status,
+             "epochs": 2, "score": score, "metrics": {},
+             "milestones": {1: score}, "error": None,
+             "save_path": os.path.join(save_path, "trial_%03d" % idx)}
+            for idx, (params, status, score) in enumerate(zip(
+                search.search.sample(), ["done", "running", "stopped"],
+                [0.3, 0.1, 0.2]))]
+        search._save_state()
+
+        restored = HyperparameterSearch(
+            None, search.search, save_path, n_workers=2)
+        self.assertTrue(restored._load_state())
+
+        # unfinished trials are restarted
+        self.assertListEqual([trial["status"] for trial in restored.trials],
+                             ["done", "pending", "stopped"])
+        self.assertListEqual(
+            [trial["trial_id"] for trial in restored.results("lowest")],
+            [2, 0, 1])
+
+        with self.assertRaises(ValueError):
+            HyperparameterSearch(None, search.search, save_path,
+                                 cpus_per_trial=100000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from delira.training import Predictor, InferenceServer
+
+from ..utils import check_for_no_backend
+
+
+class DummyModel(object):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, x):
+        self.batch_sizes.append(len(x))
+        return {"pred": x * 2, "offset": np.array(1.)}
+
+
+class TestInferenceServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._model = DummyModel()
+        self._predictor = Predictor(self._model, key_mapping={"x": "data"})
+        self._loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        self._loop.close()
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_micro_batching(self):
+        server = InferenceServer(self._predictor, max_batch_size=8,
+                                 max_wait_time=0.05)
+        inputs = [np.random.rand(i % 3 + 1, 4) for i in range(12)]
+
+        async def _run():
+            results = await asyncio.gather(
+                *[server.predict({"data": _x}) for _x in inputs])
+            await server.stop()
+            return results
+
+        results = self._loop.run_until_complete(_run())
+
+        for _x, _result in zip(inputs, results):
+            np.testing.assert_allclose(_result["pred"], _x * 2)
+            self.assertEqual(_result["offset"], 1.)
+
+        # requests must have been combined to larger batches
+        self.assertLess(len(self._model.batch_sizes), len(inputs))
+        self.assertLessEqual(max(self._model.batch_sizes), 8)
+
+        summary = server.stats.summary()
+        self.assertEqual(summary["n_requests"], len(inputs))
+        self.assertEqual(summary["n_samples"],
+                         sum([len(_x) for _x in inputs]))
+        self.assertIn("latency_p95_ms", summary)
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_unix_socket_frontend(self):
+        server = InferenceServer(self._predictor, max_batch_size=4,
+                                 max_wait_time=0.01)
+        socket_path = os.path.join(tempfile.mkdtemp(), "delira.sock")
+
+        async def _send(request):
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            header, content = response.split(b"\r\n\r\n", 1)
+            return int(header.split(b" ")[1]), json.loads(content.decode())
+
+        async def _request(method, route, payload=None):
+            body = json.dumps(payload).encode() if payload else b""
+            return await _send(b"%s %s HTTP/1.1\r\nContent-Length: %d\r\n"
+                               b"Connection: close\r\n\r\n"
+                               % (method, route, len(body)) + body)
+
+        async def _run():
+            await server.serve_unix(socket_path)
+            results = await asyncio.gather(
+                _request(b"POST", b"/predict", {"data": [[1., 2.]]}),
+                _request(b"POST", b"/predict", {"data": [[3., 4.]]}))
+            stats = await _request(b"GET", b"/stats")
+            missing = await _request(b"GET", b"/unknown")
+            malformed = await asyncio.gather(
+                _send(b"GET\r\n\r\n"),
+                _send(b"GET /stats HTTP/1.1\r\nno header\r\n\r\n"),
+                _send(b"POST /predict HTTP/1.1\r\n"
+                      b"Content-Length: abc\r\n\r\n"))
+            await server.stop()
+            return results, stats, missing, malformed
+
+        results, stats, missing, malformed = self._loop.run_until_complete(
+            _run())
+
+        self.assertEqual(results[0], (200, {"pred": [[2., 4.]],
+                                            "offset": [1.]}))
+        self.assertEqual(results[1], (200, {"pred": [[6., 8.]],
+                                            "offset": [1.]}))
+        self.assertEqual(stats[0], 200)
+        self.assertEqual(stats[1]["n_requests"], 2)
+        self.assertEqual(missing[0], 404)
+        for status, _ in malformed:
+            self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
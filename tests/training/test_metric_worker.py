@@ -0,0 +1,97 @@
+import pickle
+import random
+import threading
+import time
+import unittest
+
+from delira.training import MetricWorker
+
+from ..utils import check_for_no_backend
+
+
+def _slow_identity(value):
+    time.sleep(random.random() * 0.01)
+    return value
+
+
+def _failing():
+    raise ValueError("invalid metric")
+
+
+class MetricWorkerTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_order(self):
+        worker = MetricWorker(n_workers=4, max_pending=8)
+        callback_results = []
+
+        for idx in range(20):
+            worker.submit(lambda idx=idx: _slow_identity(idx),
+                          callback_results.append)
+
+        # callbacks must be called in the order of submission
+        worker.flush()
+        self.assertListEqual(callback_results, list(range(20)))
+        self.assertEqual(worker.n_pending, 0)
+        worker.shutdown()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_bounded(self):
+        worker = MetricWorker(n_workers=1, max_pending=1)
+        event = threading.Event()
+        worker.submit(event.wait)
+
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (worker.submit(lambda: 1), submitted.set()))
+        thread.start()
+
+        # blocks until the first iteration is processed
+        self.assertFalse(submitted.wait(0.1))
+        event.set()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+
+        worker.flush()
+        self.assertEqual(worker.n_pending, 0)
+        worker.shutdown()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_errors(self):
+        worker = MetricWorker()
+        worker.submit(_failing)
+
+        with self.assertRaises(ValueError):
+            worker.flush()
+
+        results = []
+        worker.submit(lambda: 2, results.append)
+        worker.flush()
+        self.assertListEqual(results, [2])
+        worker.shutdown()
+
+        with self.assertRaises(ValueError):
+            MetricWorker(n_workers=0)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_pickle(self):
+        worker = MetricWorker(n_workers=2, max_pending=3)
+        worker.submit(lambda: 1)
+
+        restored = pickle.loads(pickle.dumps(worker))
+        self.assertEqual(restored.n_workers, 2)
+        self.assertEqual(restored.max_pending, 3)
+        self.assertEqual(restored.n_pending, 0)
+        worker.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
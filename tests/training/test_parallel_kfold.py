@@ -0,0 +1,84 @@
+import multiprocessing
+import tempfile
+import unittest
+
+from delira.training.parallel_kfold import _default_start_method, \
+    run_folds_parallel
+
+from ..utils import check_for_no_backend
+
+
+class _DummyData(object):
+    def __init__(self):
+        self.resource_manager = None
+
+
+class _DummyExperiment(object):
+    """
+    Returns the fold's test indices and save path as outputs and fails for
+    negative fold indices
+    """
+
+    def __init__(self):
+        self.save_path = tempfile.mkdtemp()
+
+    def _run_fold(self, data, idx, train_idxs, val_idxs, test_idxs,
+                  save_path=None, **kwargs):
+        if idx < 0:
+            raise ValueError("invalid fold")
+
+        return ({"test_idxs": list(test_idxs), "save_path": save_path,
+                 "has_resources": data.resource_manager is not None},
+                {"n_train": len(train_idxs)})
+
+
+class ParallelKFoldTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_run_folds(self):
+        experiment = _DummyExperiment()
+        folds = [(idx, list(range(idx + 1)), None, [idx]) for idx in range(4)]
+
+        results = run_folds_parallel(experiment, _DummyData(), folds,
+                                     n_workers=2, cpus_per_fold=1,
+                                     metrics={})
+
+        self.assertListEqual(sorted(results.keys()), [0, 1, 2, 3])
+        for idx, (outputs, metrics) in results.items():
+            self.assertListEqual(outputs["test_idxs"], [idx])
+            self.assertTrue(outputs["has_resources"])
+            self.assertTrue(outputs["save_path"].endswith("fold_%02d" % idx))
+            self.assertDictEqual(metrics, {"n_train": idx + 1})
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_failing_folds(self):
+        experiment = _DummyExperiment()
+        folds = [(idx, [0], None, [idx]) for idx in (0, -1, 2)]
+
+        # the remaining folds are not affected by the failing one
+        with self.assertWarns(RuntimeWarning):
+            results = run_folds_parallel(experiment, _DummyData(), folds,
+                                         n_workers=2, start_method="spawn")
+        self.assertListEqual(sorted(results.keys()), [0, 2])
+
+        with self.assertRaises(RuntimeError):
+            run_folds_parallel(experiment, _DummyData(),
+                               [(-1, [0], None, [0])], n_workers=2)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_default_start_method(self):
+        # the dataset is only shared with forked workers
+        if "fork" in multiprocessing.get_all_start_methods():
+            self.assertEqual(_default_start_method(), "fork")
+        else:
+            self.assertEqual(_default_start_method(), "spawn")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.training import Predictor
+
+from ..utils import check_for_no_backend
+
+
+class _DatasetWithPredictions(AbstractDataset):
+    """
+    Contains the predictions of a former run under the prediction key
+    """
+
+    def __init__(self, n_samples):
+        super().__init__(None, None)
+        self.data = [np.full(4, idx, dtype=np.float32)
+                     for idx in range(n_samples)]
+
+    def __getitem__(self, index):
+        return {"data": self.data[index], "label": self.data[index] * 2,
+                "pred": np.zeros(4, dtype=np.float32)}
+
+
+class _DummyModel(object):
+    def __call__(self, x):
+        return {"pred": x * 2}
+
+
+def _max_error(label, pred):
+    return np.abs(label - pred).max()
+
+
+class PredictorTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_duplicate_keys(self):
+        predictor = Predictor(_DummyModel(), key_mapping={"x": "data"})
+
+        results = list(predictor.predict_data_mgr(
+            DataManager(_DatasetWithPredictions(6), 3, 0, None),
+            metrics={"max_error": _max_error}))
+
+        # the predictions replace the batch's entries of the same key
+        self.assertEqual(len(results), 2)
+        for preds, metrics in results:
+            np.testing.assert_allclose(preds["pred"][:, 0] % 2, 0)
+            self.assertEqual(metrics["max_error"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import pickle
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.training import ResultCache, data_fingerprint
+from delira.utils import DeliraConfig
+
+from ..utils import check_for_no_backend
+
+
+class _ArrayDataset(AbstractDataset):
+    def __init__(self, data):
+        super().__init__(None, None)
+        self.data = data
+
+    def __getitem__(self, index):
+        return {"data": self.data[index]}
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_key(self):
+        config = DeliraConfig(fixed_model={"n_hidden": 32},
+                              fixed_training={"lr": 1e-3})
+        data = [np.arange(4, dtype=np.float32) + idx for idx in range(5)]
+
+        key = ResultCache.make_key(config, _ArrayDataset,
+                                   (_ArrayDataset(data),), seed=1)
+
+        # the key is stable for equal contents
+        self.assertEqual(key, ResultCache.make_key(
+            DeliraConfig(fixed_model={"n_hidden": 32},
+                         fixed_training={"lr": 1e-3}),
+            _ArrayDataset, (_ArrayDataset([_data.copy()
+                                           for _data in data]),), seed=1))
+
+        changed_data = [_data.copy() for _data in data]
+        changed_data[2][0] = -1
+        config_other = DeliraConfig(fixed_model={"n_hidden": 64},
+                                    fixed_training={"lr": 1e-3})
+
+        for other_key in (
+                ResultCache.make_key(config, _ArrayDataset,
+                                     (_ArrayDataset(data),), seed=2),
+                ResultCache.make_key(config_other, _ArrayDataset,
+                                     (_ArrayDataset(data),), seed=1),
+                ResultCache.make_key(config, _ArrayDataset,
+                                     (_ArrayDataset(changed_data),), seed=1)):
+            self.assertNotEqual(key, other_key)
+
+        # the manager's settings are part of the fingerprint
+        self.assertNotEqual(
+            data_fingerprint(DataManager(_ArrayDataset(data), 2, 0, None)),
+            data_fingerprint(DataManager(_ArrayDataset(data), 4, 0, None)))
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_put_get(self):
+        cache = ResultCache(tempfile.mkdtemp())
+        self.assertIsNone(cache.get("abc"))
+
+        cache.put_result("abc", {"mae": 0.5}, {"fold": 1})
+        self.assertIn("abc", cache)
+        self.assertDictEqual(cache.get_result("abc"), {"mae": 0.5})
+        self.assertEqual(cache.metadata("abc")["fold"], 1)
+        self.assertListEqual(cache.keys(), ["abc"])
+
+        cache.invalidate("abc")
+        self.assertNotIn("abc", cache)
+        self.assertIsNone(cache.get_result("abc"))
+
+        # restored caches share the directory
+        restored = pickle.loads(pickle.dumps(cache))
+        cache.put_result("def", 1)
+        self.assertEqual(restored.get_result("def"), 1)
+
+        cache.invalidate()
+        self.assertListEqual(cache.keys(), [])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_eviction(self):
+        cache_dir = tempfile.mkdtemp()
+        cache = ResultCache(cache_dir)
+
+        def _write(path):
+            with open(os.path.join(path, "payload"), "wb") as f:
+                f.write(b"0" * 1000)
+
+        for key in ("a", "b", "c"):
+            cache.put(key, _write)
+            # distinct access times
+            time.sleep(0.05)
+
+        # accessing an entry marks it as recently used
+        cache.get("a")
+        time.sleep(0.05)
+
+        # only the least recently used entry must be removed
+        self.assertListEqual(cache.evict(cache.size - 1), ["b"])
+        self.assertListEqual(sorted(cache.keys()), ["a", "c"])
+
+        # the metadata of the entries differs slightly in size
+        bounded = ResultCache(cache_dir, max_size=cache.size // 2 + 100)
+        bounded.put("d", _write)
+        self.assertListEqual(bounded.keys(), ["d"])
+
+
+if __name__ == '__main__':
+    unittest.main()
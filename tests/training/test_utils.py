@@ -0,0 +1,125 @@
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from delira.training.utils import StructuredConverter, \
+    convert_to_numpy_identity
+
+from ..utils import check_for_no_backend
+
+
+class _Tensor(object):
+    def __init__(self, value):
+        self.value = value
+
+    def __iter__(self):
+        return iter([self.value])
+
+
+def _to_array(tensor):
+    return np.array(tensor.value)
+
+
+class TestStructuredConverter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.converter = StructuredConverter([
+            (_Tensor, _to_array),
+            (np.ndarray, lambda arr: arr.reshape(1) if arr.shape == ()
+             else arr)])
+
+    @staticmethod
+    def _batch(n_items=2):
+        return {"pred": _Tensor(1.), "label": np.array(3),
+                "nested": [_Tensor(float(idx)) for idx in range(n_items)],
+                "pair": (_Tensor(2.), "name"), "extra": None}
+
+    def _check_batch(self, batch, n_items=2):
+        self.assertIsInstance(batch["pred"], np.ndarray)
+        self.assertTupleEqual(batch["pred"].shape, (1,))
+        self.assertTupleEqual(batch["label"].shape, (1,))
+        self.assertEqual(len(batch["nested"]), n_items)
+        for idx, item in enumerate(batch["nested"]):
+            self.assertEqual(item[0], idx)
+        self.assertIsInstance(batch["pair"], tuple)
+        self.assertEqual(batch["pair"][0][0], 2.)
+        self.assertEqual(batch["pair"][1], "name")
+        self.assertIsNone(batch["extra"])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_planned_conversion(self):
+        for _ in range(3):
+            batch = self._batch()
+            args, kwargs = self.converter(_Tensor(5.), **batch)
+
+            self._check_batch(kwargs)
+            self.assertEqual(args[0][0], 5.)
+            # the inputs are not modified
+            self.assertIsInstance(batch["pred"], _Tensor)
+            self.assertIsInstance(batch["pair"][0], _Tensor)
+
+        self.assertEqual(len(self.converter._plans), 1)
+        self.assertDictEqual(self.converter._failures, {})
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_changed_structure(self):
+        self.converter(**self._batch())
+
+        # more items than in the learned layout
+        _, kwargs = self.converter(**self._batch(3))
+        self._check_batch(kwargs, 3)
+
+        # another leaf type
+        batch = self._batch()
+        batch["extra"] = _Tensor(4.)
+        _, kwargs = self.converter(**batch)
+        self.assertEqual(kwargs["extra"][0], 4.)
+
+        # the layout keeps changing: always converted recursively
+        _, kwargs = self.converter(**self._batch(4))
+        self._check_batch(kwargs, 4)
+        self.assertEqual(len(self.converter._failures), 1)
+        self.assertIsNone(list(self.converter._plans.values())[0])
+
+        _, kwargs = self.converter(**self._batch(5))
+        self._check_batch(kwargs, 5)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_recursive_fallback(self):
+        # other container types are converted recursively
+        batch = OrderedDict([("a", _Tensor(1.)), ("b", [np.array(2)])])
+
+        for _ in range(2):
+            _, kwargs = self.converter(batch=batch)
+            self.assertIsInstance(kwargs["batch"], OrderedDict)
+            self.assertTupleEqual(kwargs["batch"]["a"].shape, (1,))
+            self.assertTupleEqual(kwargs["batch"]["b"][0].shape, (1,))
+
+        self.assertDictEqual(self.converter._plans, {(0, ("batch",)): None})
+
+        args, kwargs = self.converter.convert_recursively(**self._batch())
+        self._check_batch(kwargs)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_convert_to_numpy_identity(self):
+        for _ in range(2):
+            args, kwargs = convert_to_numpy_identity(
+                np.array(1.), preds={"pred": np.zeros((2, 3)),
+                                     "loss": np.array(0.5)})
+
+            self.assertTupleEqual(args[0].shape, (1,))
+            self.assertTupleEqual(kwargs["preds"]["pred"].shape, (2, 3))
+            self.assertTupleEqual(kwargs["preds"]["loss"].shape, (1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
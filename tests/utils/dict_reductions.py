@@ -2,7 +2,8 @@ import unittest
 import numpy as np
 
 from delira.utils.dict_reductions import possible_reductions, \
-    flatten_dict, unflatten_dict, reduce_dict, get_reduction
+    flatten_dict, unflatten_dict, reduce_dict, get_reduction, \
+    possible_running_reductions, RunningReduction, RunningDictReduction
 
 
 class TestDictReductions(unittest.TestCase):
@@ -98,6 +99,58 @@ class TestDictReductions(unittest.TestCase):
 
                 self.assertDictEqual(result_dict, target_dict)
 
+    def test_running_reductions(self):
+        sequences = [self._reduce_sequence,
+                     [np.random.rand(3, 2) for _ in range(7)]]
+        targets = {"mean": np.mean, "sum": np.sum, "min": np.min,
+                   "max": np.max, "var": np.var,
+                   "first": get_reduction("first"),
+                   "last": get_reduction("last")}
+
+        for sequence in sequences:
+            reduction = RunningReduction()
+            for item in sequence:
+                reduction.update(item)
+
+            # merging partial reductions must give the same results
+            merged = RunningReduction()
+            for items in (sequence[:2], [], sequence[2:]):
+                partial = RunningReduction()
+                for item in items:
+                    partial.update(item)
+                merged.merge(partial)
+
+            self.assertEqual(reduction.count, len(sequence))
+            self.assertEqual(merged.count, len(sequence))
+
+            for key in possible_running_reductions():
+                with self.subTest(reduce_type=key):
+                    target = targets[key](sequence)
+                    np.testing.assert_allclose(reduction.reduce(key),
+                                               target)
+                    np.testing.assert_allclose(merged.reduce(key), target)
+
+        with self.assertRaises(ValueError):
+            RunningReduction().reduce("mean")
+        with self.assertRaises(ValueError):
+            reduction.reduce("median")
+
+    def test_running_dict_reduction(self):
+        reduction = RunningDictReduction()
+        for i in self._reduce_sequence:
+            reduction.update({"a": i})
+            if i % 2:
+                reduction.update({"b": i})
+
+        self.assertCountEqual(reduction.keys(), ["a", "b"])
+        self.assertEqual(reduction["a"].count, 5)
+        self.assertEqual(reduction["b"].count, 2)
+        self.assertDictEqual(reduction.reduce("last"), {"a": 6, "b": 5})
+
+        merged = RunningDictReduction().merge(reduction).merge(reduction)
+        self.assertEqual(merged["a"].count, 10)
+        self.assertEqual(merged.reduce("mean")["b"], 4)
+
 
 if __name__ == '__main__':
     unittest.main()
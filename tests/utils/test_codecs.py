@@ -1,8 +1,11 @@
+import copy
+import os
+import tempfile
 import unittest
 import numpy as np
 from functools import partial
 
-from delira.utils.codecs import Encoder, Decoder
+from delira.utils.codecs import Encoder, Decoder, ArraySidecar
 
 from . import check_for_no_backend
 
@@ -96,6 +99,47 @@ class CodecsTest(unittest.TestCase):
         self.assertTrue(test_dict["funcargs"].args[0] == [])
         self.assertTrue(test_dict["funcargs"].args[1]["axis"] == (1, 2))
 
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_array_sidecar(self):
+        test_dict = {"nparray": np.arange(6).reshape(2, 3),
+                     "objarray": np.array([1, "a"], dtype=object),
+                     "list": [np.zeros(2, dtype=np.uint8)]}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for mode in ("npz", "npy"):
+                path = os.path.join(tmpdir, "encoded_" + mode)
+                sidecar = ArraySidecar(path, mode=mode)
+                encoded_dict = Encoder(array_sidecar=sidecar).encode(
+                    test_dict)
+                sidecar.write()
+
+                self.assertIn("__array_ref__", encoded_dict["nparray"])
+                self.assertTrue(ArraySidecar.is_referenced(encoded_dict))
+                self.assertFalse(ArraySidecar.is_referenced(
+                    Encoder().encode(test_dict)))
+                self.assertIn("__array_ref__", encoded_dict["list"][0])
+                # object arrays can't be stored without pickle
+                self.assertDictEqual(encoded_dict["objarray"],
+                                     {"__array__": [1, "a"]})
+
+                # references without sidecar can not be resolved
+                with self.assertRaises(ValueError):
+                    Decoder().decode(copy.deepcopy(encoded_dict))
+
+                sidecar = ArraySidecar(path)
+                decoded_dict = Decoder(array_sidecar=sidecar).decode(
+                    encoded_dict)
+                sidecar.close()
+
+                np.testing.assert_array_equal(decoded_dict["nparray"],
+                                              test_dict["nparray"])
+                self.assertEqual(decoded_dict["list"][0].dtype, np.uint8)
+
+        with self.assertRaises(ValueError):
+            ArraySidecar("encoded", mode="json")
+
 
 if __name__ == '__main__':
     unittest.main()
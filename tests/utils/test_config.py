@@ -3,10 +3,16 @@ import os
 import sys
 import copy
 import argparse
+import pickle
+import tempfile
+import numpy as np
+from nested_lookup import nested_lookup
 from unittest.mock import patch
 from delira._version import get_versions
 
-from delira.utils.config import Config, LookupConfig, DeliraConfig
+from delira.utils.config import Config, LookupConfig, DeliraConfig, \
+    IndexedLookupConfig, BatchDict
+from delira.utils.codecs import Decoder
 from delira.logging import Logger, TensorboardBackend, make_logger, \
     register_logger
 import warnings
@@ -176,6 +182,65 @@ class ConfigTest(unittest.TestCase):
         cf_loaded_str = self.config_cls.create_from_str(cf_string)
         self.assertDictEqual(cf, cf_loaded_str)
 
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_dump_and_load_array_sidecar(self):
+        cf = self.config_cls.create_from_dict(self.example_dict)
+        cf["weights"] = np.arange(12, dtype=np.float32).reshape(3, 4)
+        cf["deep"]["mean"] = np.array([0.5, 0.25])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for array_format, mmap_mode in (("npz", None), ("npy", "r")):
+                with self.subTest(array_format=array_format):
+                    path = os.path.join(tmpdir, "config_" + array_format)
+                    cf.dump(path, array_format=array_format)
+
+                    # arrays must only be referenced from the yaml file
+                    with open(path) as f:
+                        self.assertNotIn("__array__", f.read())
+
+                    cf_loaded = self.config_cls.create_from_file(
+                        path, mmap_mode=mmap_mode)
+                    self.assertEqual(cf_loaded["weights"].dtype, np.float32)
+                    np.testing.assert_array_equal(cf_loaded["weights"],
+                                                  cf["weights"])
+                    np.testing.assert_array_equal(
+                        cf_loaded["deep"]["mean"], cf["deep"]["mean"])
+                    self.assertEqual(cf_loaded["shallowStr"], "a")
+
+                    if mmap_mode is not None:
+                        self.assertIsInstance(cf_loaded["weights"],
+                                              np.memmap)
+                    del cf_loaded
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_load_custom_decoder(self):
+        class CustomDecoder(Decoder):
+            def __init__(self):
+                super().__init__()
+                self.n_decoded = 0
+
+            def decode(self, obj):
+                self.n_decoded += 1
+                return super().decode(obj)
+
+        cf = self.config_cls.create_from_dict(self.example_dict)
+        cf["weights"] = np.arange(3)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "config")
+            # decoders without sidecar support load files without arrays
+            # in a sidecar
+            cf.dump(path)
+            cf_loaded = self.config_cls.create_from_file(
+                path, decoder_cls=CustomDecoder)
+            np.testing.assert_array_equal(cf_loaded["weights"],
+                                          cf["weights"])
+            self.assertEqual(cf_loaded["shallowStr"], "a")
+
     @unittest.skipUnless(
         check_for_no_backend(),
         "Test should only be executed if no backend is specified")
@@ -301,6 +366,110 @@ class LookupConfigTest(ConfigTest):
         self.assertEquals(len(expected_result), 0)
 
 
+class IndexedLookupConfigTest(LookupConfigTest):
+    def setUp(self):
+        super().setUp()
+        self.config_cls = IndexedLookupConfig
+
+    def _check_index(self, cf, keys):
+        for key in keys:
+            expected = nested_lookup(key, cf)
+            found = cf.nested_get(key, allow_multiple=True) \
+                if len(expected) > 1 else cf.nested_get(key, None)
+
+            if len(expected) > 1:
+                self.assertEqual(len(found), len(expected))
+                for val in expected:
+                    self.assertIn(val, found)
+            else:
+                self.assertEqual(found, expected[0] if expected else None)
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_index_updates(self):
+        keys = ["deep", "deepStr", "deepNum", "dictList", "newNum",
+                "shallowNum", "level", "other"]
+
+        cf = self.config_cls.create_from_dict(self.example_dict)
+        self._check_index(cf, keys)
+
+        cf.update(self.update_dict, overwrite=True)
+        self._check_index(cf, keys)
+
+        # changes of nested configs
+        cf["deep"]["deepNum"] = 5
+        cf["deepNew.level.deepStr"] = "d"
+        cf.deep.other = {"deepNum": 6}
+        self._check_index(cf, keys)
+
+        # replaced and removed configs
+        old_deep = cf["deep"]
+        cf.deep = {"level": 1}
+        old_deep["deepStr"] = "not indexed anymore"
+        del cf["deepNew"]
+        cf.pop("shallowNum")
+        self._check_index(cf, keys)
+
+        # the configs share a nested config after a shallow copy
+        cf_shallow = copy.copy(cf)
+        cf["nestedList"][0]["dictList"] = [4]
+        cf_shallow["deep"]["other"] = 7
+        self._check_index(cf, keys)
+        self._check_index(cf_shallow, keys)
+
+        cf_loaded = pickle.loads(pickle.dumps(cf))
+        self.assertDictEqual(cf_loaded, cf)
+        self._check_index(cf_loaded, keys)
+
+        # changes of nested lists are not tracked
+        cf["nestedListOrig"].append({"level": 2})
+        cf.reindex()
+        self._check_index(cf, keys)
+
+
+class BatchDictTest(unittest.TestCase):
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed if no backend is specified")
+    def test_nested_get(self):
+        batch = BatchDict(data=np.zeros((2, 3)), label=np.ones(2),
+                          preds={"pred": np.ones(2), "aux": [{"x": 1}]})
+
+        self.assertIs(batch.nested_get("label"), batch["label"])
+        self.assertIs(batch.nested_get("pred"), batch["preds"]["pred"])
+        self.assertEqual(batch.nested_get("x"), 1)
+        self.assertIs(batch.nested_get("preds.pred"), batch["preds"]["pred"])
+        self.assertIsNone(batch.nested_get("missing", None))
+        with self.assertRaises(KeyError):
+            batch.nested_get("missing")
+
+        # changes are indexed
+        batch["pred"] = np.zeros(2)
+        with self.assertRaises(KeyError):
+            batch.nested_get("pred")
+        self.assertEqual(len(batch.nested_get("pred", allow_multiple=True)),
+                         2)
+
+        del batch["preds"]
+        self.assertIs(batch.nested_get("pred"), batch["pred"])
+        self.assertIsNone(batch.nested_get("x", None))
+
+        batch.update({"x": 2}, label=None)
+        self.assertEqual(batch.nested_get("x"), 2)
+        self.assertIsNone(batch.nested_get("label"))
+
+        # nested dicts are not converted
+        batch["nested"] = {"y": 3}
+        self.assertIs(type(batch["nested"]), dict)
+        self.assertEqual(batch.nested_get("y"), 3)
+
+        batch_loaded = pickle.loads(pickle.dumps(batch))
+        self.assertIsInstance(batch_loaded, BatchDict)
+        self.assertEqual(batch_loaded.nested_get("y"), 3)
+
+
 class DeliraConfigTest(LookupConfigTest):
     def setUp(self):
         super().setUp()
@@ -0,0 +1,114 @@
+import os
+import unittest
+
+import numpy as np
+
+from delira.data_loading import AbstractDataset, DataManager
+from delira.utils.resources import CPUResourceManager, available_cpus
+
+from . import check_for_no_backend
+
+
+class _EnvironmentDataset(AbstractDataset):
+    """
+    Dataset returning the thread settings and CPU affinity of the process
+    loading the sample
+    """
+
+    def __init__(self, length):
+        super().__init__(None, None)
+        self.data = list(range(length))
+
+    def __getitem__(self, index):
+        return {"omp_threads": int(os.environ.get("OMP_NUM_THREADS", -1)),
+                "n_cores": len(available_cpus())}
+
+    def __len__(self):
+        return len(self.data)
+
+
+class ResourceManagerTest(unittest.TestCase):
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_plan(self):
+        test_cases = [
+            # cpus, n_main_cores, n_workers, main_cores, worker_cores
+            (list(range(8)), None, 0, list(range(8)), []),
+            (list(range(8)), None, 2, list(range(6)), [[6], [7]]),
+            (list(range(8)), 4, 2, list(range(4)), [[4, 6], [5, 7]]),
+            (list(range(4)), None, 6, [0, 1], [[2], [3], [2], [3], [2],
+                                               [3]]),
+            ([0], None, 2, [0], [[0], [0]]),
+        ]
+
+        for cpus, n_main, n_workers, main_cores, worker_cores in test_cases:
+            with self.subTest(cpus=cpus, n_main=n_main, n_workers=n_workers):
+                plan = CPUResourceManager(cpus, n_main).plan(n_workers)
+
+                self.assertListEqual(plan.main_cores, main_cores)
+                self.assertListEqual(plan.worker_cores, worker_cores)
+                self.assertEqual(plan.main_threads, len(main_cores))
+                self.assertEqual(plan.to_dict()["workers"],
+                                 [{"cores": _cores, "threads": len(_cores)}
+                                  for _cores in worker_cores])
+
+        with self.assertRaises(ValueError):
+            CPUResourceManager([0, 1], n_main_cores=3)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_datamanager_workers(self):
+        cpus = available_cpus()[:2]
+        manager = CPUResourceManager(cpus, n_main_cores=1)
+
+        dmgr = DataManager(_EnvironmentDataset(8), 2, 2, None,
+                           resource_manager=manager)
+
+        plan = dmgr.resource_plan
+        self.assertEqual(plan.n_workers, 2)
+        self.assertEqual(dmgr.get_subset(list(range(4))).resource_manager,
+                         manager)
+
+        orig_omp_threads = os.environ.get("OMP_NUM_THREADS")
+        omp_threads, n_cores = [], []
+        for batch in dmgr.get_batchgen():
+            omp_threads.append(batch["omp_threads"])
+            n_cores.append(batch["n_cores"])
+
+        # each worker must be limited to its own cores
+        np.testing.assert_array_equal(np.concatenate(omp_threads), 1)
+        np.testing.assert_array_equal(np.concatenate(n_cores), 1)
+
+        # the main process must not be affected by its workers
+        self.assertEqual(os.environ.get("OMP_NUM_THREADS"), orig_omp_threads)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_restore_main(self):
+        orig_cpus = available_cpus()
+        orig_omp_threads = os.environ.get("OMP_NUM_THREADS")
+
+        # one worker per CPU, as for the augmenter
+        dmgr = DataManager(_EnvironmentDataset(8), 2, None, None,
+                           resource_manager=CPUResourceManager(
+                               orig_cpus[:1]))
+        plan = dmgr.resource_plan
+        self.assertEqual(plan.n_workers, os.cpu_count())
+        self.assertListEqual(plan.main_cores, orig_cpus[:1])
+
+        state = plan.apply_main()
+        self.assertEqual(os.environ["OMP_NUM_THREADS"], "1")
+        if hasattr(os, "sched_setaffinity"):
+            self.assertListEqual(available_cpus(), orig_cpus[:1])
+
+        state.restore()
+        self.assertListEqual(available_cpus(), orig_cpus)
+        self.assertEqual(os.environ.get("OMP_NUM_THREADS"), orig_omp_threads)
+
+
+if __name__ == '__main__':
+    unittest.main()